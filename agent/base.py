@@ -70,6 +70,18 @@ class BaseAgent(ABC):
         """
         pass
     
+    async def release_job(self, job_id: int) -> None:
+        """
+        Release per-job state once the job's outcome has been recorded.
+        
+        Override this method if the agent keeps anything keyed by job
+        (checkpoints, caches) that is no longer needed after completion.
+        
+        Args:
+            job_id: Job identifier.
+        """
+        pass
+    
     def get_mcp_tools(self) -> List[Dict[str, Any]]:
         """
         Return MCP tools this agent exposes to the IDE agent via MCP.
@@ -0,0 +1,317 @@
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from agent.github_client import RepoFile
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Marker stored in the path index for paths known not to exist at a commit
+_MISSING = ""
+
+
+class BlobCache:
+    """
+    Content-addressed cache of repository file contents.
+
+    Contents are stored once per `(repo, git blob sha)`. A separate path index
+    maps `(repo, commit sha, path)` to the blob SHA found at that commit, so a
+    file read at a commit is answered without a GitHub call as long as its
+    blob is cached, and identical blobs (an unchanged `requirements.txt`
+    across commits) are stored once. Both keys are immutable in git, so
+    entries never go stale and are only evicted for space.
+
+    The memory tier is an LRU bounded by total content size. The optional
+    disk tier keeps blobs and index entries as files under `disk_dir` and
+    evicts the least recently used files once `disk_max_bytes` is exceeded;
+    disk I/O runs in a thread so it never blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = settings.BLOB_CACHE_MAX_BYTES,
+        max_paths: int = settings.BLOB_CACHE_MAX_PATHS,
+        disk_dir: Optional[str] = settings.BLOB_CACHE_DIR or None,
+        disk_max_bytes: int = settings.BLOB_CACHE_DISK_MAX_BYTES
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Memory budget for cached contents (characters, roughly bytes).
+            max_paths: Maximum number of path index entries kept in memory.
+            disk_dir: Directory for the disk tier; None disables it.
+            disk_max_bytes: Size budget for the disk tier.
+        """
+        self._max_bytes: int = max_bytes
+        self._max_paths: int = max_paths
+        self._disk_dir: Optional[str] = disk_dir
+        self._disk_max_bytes: int = disk_max_bytes
+        self._blobs: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._paths: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self._memory_bytes: int = 0
+        self._disk_bytes: Optional[int] = None
+        self._stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "negative_hits": 0,
+            "evictions": 0,
+            "disk_evictions": 0,
+        }
+
+    async def get_blob(self, repo_name: str, blob_sha: str) -> Optional[str]:
+        """
+        Returns cached contents for a blob.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            blob_sha: Git blob SHA.
+
+        Returns:
+            The blob's text, or None if it is not cached.
+        """
+        key = (repo_name, blob_sha)
+        content = self._blobs.get(key)
+        if content is not None:
+            self._blobs.move_to_end(key)
+            self._stats["memory_hits"] += 1
+            return content
+
+        if self._disk_dir:
+            content = await asyncio.to_thread(self._read_disk, self._blob_path(repo_name, blob_sha))
+            if content is not None:
+                self._stats["disk_hits"] += 1
+                self._remember_blob(key, content)
+                return content
+
+        self._stats["misses"] += 1
+        return None
+
+    async def get_file(self, repo_name: str, commit_sha: str, path: str) -> Optional[RepoFile]:
+        """
+        Returns a cached file as it exists at a commit.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            commit_sha: Commit SHA the file was read at.
+            path: File path within the repository.
+
+        Returns:
+            The cached file, or None if it is not cached (or known missing).
+        """
+        blob_sha = await self._lookup_path(repo_name, commit_sha, path)
+        if not blob_sha:
+            if blob_sha is None:
+                self._stats["misses"] += 1
+            return None
+        content = await self.get_blob(repo_name, blob_sha)
+        if content is None:
+            return None
+        return {"path": path, "sha": blob_sha, "content": content}
+
+    async def is_missing(self, repo_name: str, commit_sha: str, path: str) -> bool:
+        """
+        Returns whether a path is known not to exist at a commit.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            commit_sha: Commit SHA.
+            path: File path within the repository.
+
+        Returns:
+            True if an earlier read found no file at this path and commit.
+        """
+        if await self._lookup_path(repo_name, commit_sha, path) != _MISSING:
+            return False
+        self._stats["negative_hits"] += 1
+        return True
+
+    async def put_file(self, repo_name: str, commit_sha: str, file: RepoFile) -> None:
+        """
+        Caches a file read at a commit.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            commit_sha: Commit SHA the file was read at.
+            file: The file as returned by the GitHub client.
+        """
+        await self.put_blob(repo_name, file["sha"], file["content"])
+        await self._store_path(repo_name, commit_sha, file["path"], file["sha"])
+
+    async def put_missing(self, repo_name: str, commit_sha: str, path: str) -> None:
+        """
+        Records that a path does not exist at a commit.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            commit_sha: Commit SHA.
+            path: File path within the repository.
+        """
+        await self._store_path(repo_name, commit_sha, path, _MISSING)
+
+    async def put_blob(self, repo_name: str, blob_sha: str, content: str) -> None:
+        """
+        Caches a blob's contents.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            blob_sha: Git blob SHA.
+            content: Decoded file text.
+        """
+        key = (repo_name, blob_sha)
+        if key in self._blobs:
+            self._blobs.move_to_end(key)
+            return
+        self._remember_blob(key, content)
+        if self._disk_dir:
+            await asyncio.to_thread(self._write_disk, self._blob_path(repo_name, blob_sha), content)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns cache counters for the metrics endpoint.
+
+        Returns:
+            Dictionary with hit, miss and eviction counts and tier sizes.
+        """
+        return {
+            **self._stats,
+            "blobs": len(self._blobs),
+            "paths": len(self._paths),
+            "memory_bytes": self._memory_bytes,
+            "disk_bytes": self._disk_bytes or 0,
+        }
+
+    def _remember_blob(self, key: Tuple[str, str], content: str) -> None:
+        """Adds a blob to the memory LRU and evicts down to the budget."""
+        if len(content) > self._max_bytes:
+            return
+        self._blobs[key] = content
+        self._memory_bytes += len(content)
+        while self._memory_bytes > self._max_bytes:
+            _, evicted = self._blobs.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._stats["evictions"] += 1
+
+    async def _lookup_path(self, repo_name: str, commit_sha: str, path: str) -> Optional[str]:
+        """Returns the blob SHA (or the missing marker) recorded for a path."""
+        key = (repo_name, commit_sha, path)
+        blob_sha = self._paths.get(key)
+        if blob_sha is not None:
+            self._paths.move_to_end(key)
+            return blob_sha
+        if self._disk_dir:
+            blob_sha = await asyncio.to_thread(self._read_disk, self._index_path(*key))
+            if blob_sha is not None:
+                self._remember_path(key, blob_sha)
+            return blob_sha
+        return None
+
+    async def _store_path(self, repo_name: str, commit_sha: str, path: str, blob_sha: str) -> None:
+        """Records the blob SHA (or the missing marker) for a path."""
+        key = (repo_name, commit_sha, path)
+        self._remember_path(key, blob_sha)
+        if self._disk_dir:
+            await asyncio.to_thread(self._write_disk, self._index_path(*key), blob_sha)
+
+    def _remember_path(self, key: Tuple[str, str, str], blob_sha: str) -> None:
+        """Adds a path index entry to the memory LRU."""
+        self._paths[key] = blob_sha
+        self._paths.move_to_end(key)
+        while len(self._paths) > self._max_paths:
+            self._paths.popitem(last=False)
+
+    def _repo_dir(self, repo_name: str) -> str:
+        """Returns the disk directory for a repository."""
+        return os.path.join(self._disk_dir, hashlib.sha1(repo_name.encode()).hexdigest()[:16])
+
+    def _blob_path(self, repo_name: str, blob_sha: str) -> str:
+        """Returns the disk location of a blob."""
+        return os.path.join(self._repo_dir(repo_name), "blobs", blob_sha[:2], blob_sha)
+
+    def _index_path(self, repo_name: str, commit_sha: str, path: str) -> str:
+        """Returns the disk location of a path index entry."""
+        digest = hashlib.sha1(f"{commit_sha}\0{path}".encode()).hexdigest()
+        return os.path.join(self._repo_dir(repo_name), "paths", digest[:2], digest)
+
+    def _read_disk(self, file_path: str) -> Optional[str]:
+        """Reads a disk entry and marks it recently used."""
+        try:
+            with open(file_path, encoding="utf-8") as handle:
+                content = handle.read()
+            os.utime(file_path)
+            return content
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Blob cache read failed for {file_path}: {e}")
+            return None
+
+    def _write_disk(self, file_path: str, content: str) -> None:
+        """Writes a disk entry atomically and enforces the disk budget."""
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            tmp_path = f"{file_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                handle.write(content)
+            os.replace(tmp_path, file_path)
+        except OSError as e:
+            logger.warning(f"Blob cache write failed for {file_path}: {e}")
+            return
+
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _, _, size in self._scan_disk())
+        else:
+            self._disk_bytes += len(content.encode())
+        if self._disk_bytes > self._disk_max_bytes:
+            self._evict_disk()
+
+    def _scan_disk(self) -> List[Tuple[float, str, int]]:
+        """Lists disk entries as (mtime, path, size)."""
+        entries: List[Tuple[float, str, int]] = []
+        for root, _, files in os.walk(self._disk_dir):
+            for name in files:
+                file_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, file_path, stat.st_size))
+        return entries
+
+    def _evict_disk(self) -> None:
+        """Deletes least recently used disk entries down to 90% of the budget."""
+        entries = sorted(self._scan_disk())
+        total = sum(size for _, _, size in entries)
+        target = int(self._disk_max_bytes * 0.9)
+        for _, file_path, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(file_path)
+            except OSError:
+                continue
+            total -= size
+            self._stats["disk_evictions"] += 1
+        self._disk_bytes = total
+
+
+# Global cache instance
+_blob_cache: Optional[BlobCache] = None
+
+
+def get_blob_cache() -> BlobCache:
+    """
+    Get the global blob cache instance.
+
+    Returns:
+        Global BlobCache singleton.
+    """
+    global _blob_cache
+    if _blob_cache is None:
+        _blob_cache = BlobCache()
+    return _blob_cache
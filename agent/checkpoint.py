@@ -0,0 +1,255 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+import logging
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from sqlalchemy import delete, select
+
+from app.db.base import AsyncSessionLocal
+from app.db.models import GraphCheckpoint, GraphCheckpointWrite
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseCheckpointSaver(BaseCheckpointSaver):
+    """
+    LangGraph checkpointer that stores checkpoints in the application database.
+
+    Every completed graph step is persisted with its full channel values, keyed
+    by thread ID (the job ID). Each call opens its own short-lived session, so
+    a long agent run never holds a database connection between steps.
+
+    Only the async interface is implemented because agents are always run
+    with `ainvoke`; the sync methods inherited from BaseCheckpointSaver raise
+    NotImplementedError.
+    """
+
+    def _to_tuple(
+        self,
+        row: GraphCheckpoint,
+        writes: Sequence[GraphCheckpointWrite]
+    ) -> CheckpointTuple:
+        """Builds a CheckpointTuple from stored rows."""
+        configurable = {
+            "thread_id": row.thread_id,
+            "checkpoint_ns": row.checkpoint_ns,
+        }
+        return CheckpointTuple(
+            config={"configurable": {**configurable, "checkpoint_id": row.checkpoint_id}},
+            checkpoint=self.serde.loads_typed((row.checkpoint_type, row.checkpoint)),
+            metadata=self.serde.loads_typed((row.metadata_type, row.checkpoint_metadata)),
+            parent_config=(
+                {"configurable": {**configurable, "checkpoint_id": row.parent_checkpoint_id}}
+                if row.parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[
+                (write.task_id, write.channel, self.serde.loads_typed((write.value_type, write.value)))
+                for write in writes
+            ],
+        )
+
+    async def _load_writes(
+        self,
+        db: Any,
+        thread_id: str,
+        checkpoint_ns: str,
+        checkpoint_id: str
+    ) -> List[GraphCheckpointWrite]:
+        """Loads the pending writes of one checkpoint in replay order."""
+        result = await db.execute(
+            select(GraphCheckpointWrite)
+            .where(
+                GraphCheckpointWrite.thread_id == thread_id,
+                GraphCheckpointWrite.checkpoint_ns == checkpoint_ns,
+                GraphCheckpointWrite.checkpoint_id == checkpoint_id,
+            )
+            .order_by(
+                GraphCheckpointWrite.task_path,
+                GraphCheckpointWrite.task_id,
+                GraphCheckpointWrite.idx,
+            )
+        )
+        return list(result.scalars().all())
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """
+        Returns the requested checkpoint, or the latest one for the thread.
+
+        Args:
+            config: Config with `thread_id` and optionally `checkpoint_id`.
+
+        Returns:
+            The checkpoint tuple, or None if the thread has no checkpoints.
+        """
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        query = select(GraphCheckpoint).where(
+            GraphCheckpoint.thread_id == thread_id,
+            GraphCheckpoint.checkpoint_ns == checkpoint_ns,
+        )
+        if checkpoint_id := get_checkpoint_id(config):
+            query = query.where(GraphCheckpoint.checkpoint_id == checkpoint_id)
+        else:
+            # Checkpoint IDs are time-ordered, so the largest is the latest
+            query = query.order_by(GraphCheckpoint.checkpoint_id.desc()).limit(1)
+
+        async with AsyncSessionLocal() as db:
+            row = (await db.execute(query)).scalar_one_or_none()
+            if row is None:
+                return None
+            writes = await self._load_writes(db, thread_id, checkpoint_ns, row.checkpoint_id)
+        return self._to_tuple(row, writes)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        """
+        Lists checkpoints, newest first.
+
+        Args:
+            config: Config whose `thread_id` (and optional namespace) to list.
+            filter: Metadata key/value pairs that must all match.
+            before: Only return checkpoints older than this one.
+            limit: Maximum number of checkpoints to return.
+
+        Yields:
+            Matching checkpoint tuples.
+        """
+        query = select(GraphCheckpoint).order_by(GraphCheckpoint.checkpoint_id.desc())
+        if config:
+            query = query.where(GraphCheckpoint.thread_id == str(config["configurable"]["thread_id"]))
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                query = query.where(GraphCheckpoint.checkpoint_ns == checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                query = query.where(GraphCheckpoint.checkpoint_id == checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            query = query.where(GraphCheckpoint.checkpoint_id < before_id)
+
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(query)).scalars().all()
+            results: List[CheckpointTuple] = []
+            for row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                if filter:
+                    metadata = self.serde.loads_typed((row.metadata_type, row.checkpoint_metadata))
+                    if not all(metadata.get(key) == value for key, value in filter.items()):
+                        continue
+                writes = await self._load_writes(db, row.thread_id, row.checkpoint_ns, row.checkpoint_id)
+                results.append(self._to_tuple(row, writes))
+
+        for result in results:
+            yield result
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """
+        Stores a checkpoint with its full channel values.
+
+        Args:
+            config: Config of the parent checkpoint.
+            checkpoint: Checkpoint to store.
+            metadata: Checkpoint metadata.
+            new_versions: Channel versions written in this step (unused, values are stored whole).
+
+        Returns:
+            Config pointing at the stored checkpoint.
+        """
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_type, checkpoint_blob = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        async with AsyncSessionLocal() as db:
+            await db.merge(GraphCheckpoint(
+                thread_id=thread_id,
+                checkpoint_ns=checkpoint_ns,
+                checkpoint_id=checkpoint["id"],
+                parent_checkpoint_id=config["configurable"].get("checkpoint_id"),
+                checkpoint_type=checkpoint_type,
+                checkpoint=checkpoint_blob,
+                metadata_type=metadata_type,
+                checkpoint_metadata=metadata_blob,
+            ))
+            await db.commit()
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """
+        Stores the writes a node produced against the current checkpoint.
+
+        Args:
+            config: Config of the checkpoint the writes belong to.
+            writes: (channel, value) pairs.
+            task_id: ID of the task that produced the writes.
+            task_path: Path of the task that produced the writes.
+        """
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        async with AsyncSessionLocal() as db:
+            for idx, (channel, value) in enumerate(writes):
+                write_idx = WRITES_IDX_MAP.get(channel, idx)
+                key = (thread_id, checkpoint_ns, checkpoint_id, task_id, write_idx)
+                # Regular writes are immutable once stored; special channels are overwritten
+                if write_idx >= 0 and await db.get(GraphCheckpointWrite, key) is not None:
+                    continue
+                value_type, value_blob = self.serde.dumps_typed(value)
+                await db.merge(GraphCheckpointWrite(
+                    thread_id=thread_id,
+                    checkpoint_ns=checkpoint_ns,
+                    checkpoint_id=checkpoint_id,
+                    task_id=task_id,
+                    idx=write_idx,
+                    channel=channel,
+                    value_type=value_type,
+                    value=value_blob,
+                    task_path=task_path,
+                ))
+            await db.commit()
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """
+        Deletes every checkpoint and write of a thread.
+
+        Args:
+            thread_id: Thread (job) ID to delete.
+        """
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(GraphCheckpointWrite).where(GraphCheckpointWrite.thread_id == str(thread_id)))
+            await db.execute(delete(GraphCheckpoint).where(GraphCheckpoint.thread_id == str(thread_id)))
+            await db.commit()
@@ -1,5 +1,13 @@
-from typing import Dict, List, Tuple
+import json
+import re
+from bisect import bisect_right
 from enum import Enum
+from operator import attrgetter
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Pattern, Tuple, Union
+
+from agent.log_parsers import ErrorRecord
+from app.core.config import settings
 
 class FailureCategory(str, Enum):
     """Categories of CI/CD failures for routing."""
@@ -11,45 +19,231 @@ class FailureCategory(str, Enum):
     TIMEOUT = "timeout"
     UNKNOWN = "unknown"
 
-# Common failure patterns for classification
-FAILURE_PATTERNS: Dict[FailureCategory, List[str]] = {
-    FailureCategory.DEPENDENCY: [
-        "module not found",
-        "package not found",
-        "import error",
-        "cannot find module",
-        "missing dependency"
-    ],
-    FailureCategory.SYNTAX: [
-        "syntax error",
-        "indentation error",
-        "invalid syntax",
-        "unexpected token"
-    ],
-    FailureCategory.TEST: [
-        "test failed",
-        "assertion error",
-        "test suite failed",
-        "unit test"
-    ],
-    FailureCategory.CONFIG: [
-        "configuration error",
-        "config file",
-        "environment variable",
-        ".env"
-    ],
-    FailureCategory.INFRASTRUCTURE: [
-        "connection refused",
-        "permission denied",
-        "disk space",
-        "memory error"
-    ],
-    FailureCategory.TIMEOUT: [
-        "timeout",
-        "timed out",
-        "execution timeout"
-    ]
-}
+# Bundled weighted pattern library; FAILURE_PATTERNS_PATH overrides it
+DEFAULT_PATTERNS_PATH = Path(__file__).parent / "data" / "failure_patterns.json"
+
+
+class PatternMatch(NamedTuple):
+    """One occurrence of a library pattern in the matched text."""
+    start: int  # offset of the first character
+    end: int  # offset after the last character
+    category: FailureCategory
+    pattern: str
+    weight: float
+
+
+class PatternMatcher:
+    """
+    One compiled regex over a weighted, case-insensitive pattern library.
+
+    The patterns are merged into a prefix tree and rendered as a single
+    alternation regex with shared prefixes factored out, so the regex engine
+    branches on one character at a time instead of trying every pattern at
+    every position. Every occurrence is reported with its offsets, including
+    overlapping ones, so the same pass can drive both classification and log
+    windowing.
+    """
+
+    def __init__(self, patterns: Dict[FailureCategory, Dict[str, float]], saturation: float = 10.0) -> None:
+        """
+        Compile the pattern library.
+
+        Args:
+            patterns: Pattern weights per category. Patterns are matched
+                case-insensitively; a pattern may appear in several categories.
+            saturation: Category score at which confidence reaches its maximum.
+        """
+        self.saturation: float = saturation
+        self._entries: List[Tuple[FailureCategory, str, float]] = []
+        entry_ids: Dict[str, List[int]] = {}
+        for category, weights in patterns.items():
+            for pattern, weight in weights.items():
+                pattern = pattern.lower()
+                if pattern:
+                    entry_ids.setdefault(pattern, []).append(len(self._entries))
+                    self._entries.append((category, pattern, float(weight)))
+
+        # Prefix tree of the patterns; "" marks the end of a pattern
+        trie: Dict[str, dict] = {}
+        for pattern in entry_ids:
+            node = trie
+            for char in pattern:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        # The regex reports the longest pattern starting at a position; the
+        # shorter ones starting there are its prefixes, reported with it
+        self._outputs: Dict[str, Tuple[int, ...]] = {}
+        for pattern in entry_ids:
+            ids: List[int] = []
+            node = trie
+            for i, char in enumerate(pattern, start=1):
+                node = node[char]
+                if "" in node:
+                    ids.extend(entry_ids[pattern[:i]])
+            self._outputs[pattern] = tuple(ids)
+        self._regex: Optional[Pattern[str]] = re.compile(self._render(trie)) if trie else None
+
+    @classmethod
+    def _render(cls, node: Dict[str, dict]) -> str:
+        """Renders a prefix tree node as a regex, longer continuations first."""
+        branches = [re.escape(char) + cls._render(child) for char, child in sorted(node.items()) if char]
+        if "" in node:
+            return f"(?:{'|'.join(branches)})?" if branches else ""
+        return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "PatternMatcher":
+        """
+        Load and compile a pattern library from a JSON file.
+
+        The file holds `{"saturation": float, "categories": {category:
+        {pattern: weight}}}`; categories must be FailureCategory values.
+
+        Args:
+            path: Path to the JSON library.
+
+        Returns:
+            Compiled matcher.
+
+        Raises:
+            ValueError: If the file names an unknown category.
+        """
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        patterns = {FailureCategory(name): weights for name, weights in data["categories"].items()}
+        return cls(patterns, saturation=data.get("saturation", 10.0))
+
+    def __len__(self) -> int:
+        """Number of patterns in the library."""
+        return len(self._entries)
+
+    def find(self, text: str) -> List[PatternMatch]:
+        """
+        Find every occurrence of every pattern in a text.
+
+        Offsets refer to `text.lower()`, which has the same offsets as the
+        text itself unless it contains characters whose lowercase form is
+        longer (rare outside ASCII logs).
+
+        Args:
+            text: Text to search.
+
+        Returns:
+            Matches ordered by end offset.
+        """
+        if self._regex is None:
+            return []
+        search = self._regex.search
+        outputs = self._outputs
+        entries = self._entries
+        matches: List[PatternMatch] = []
+        lowered = text.lower()
+        match = search(lowered)
+        while match is not None:
+            start = match.start()
+            for pattern_id in outputs[match.group()]:
+                category, pattern, weight = entries[pattern_id]
+                matches.append(PatternMatch(start, start + len(pattern), category, pattern, weight))
+            # Resume one character on, so overlapping occurrences are found too
+            match = search(lowered, start + 1)
+        matches.sort(key=attrgetter("end"))
+        return matches
+
+    def scores(self, matches: List[PatternMatch]) -> Dict[FailureCategory, float]:
+        """
+        Score categories from matches, counting each distinct pattern once.
+
+        Args:
+            matches: Matches returned by `find`.
+
+        Returns:
+            Summed pattern weight per category (every category present).
+        """
+        scores: Dict[FailureCategory, float] = {category: 0.0 for category in FailureCategory}
+        seen = set()
+        for match in matches:
+            key = (match.category, match.pattern)
+            if key not in seen:
+                seen.add(key)
+                scores[match.category] += match.weight
+        return scores
+
+
+def matched_line_numbers(text: str, matches: List[PatternMatch]) -> List[int]:
+    """
+    Map pattern matches to the (0-based) line numbers they occur on.
+
+    Args:
+        text: Text the matches were found in.
+        matches: Matches returned by `PatternMatcher.find`.
+
+    Returns:
+        Sorted, distinct line numbers containing at least one match.
+    """
+    line_starts = [0]
+    start = text.find("\n")
+    while start != -1:
+        line_starts.append(start + 1)
+        start = text.find("\n", start + 1)
+    return sorted({bisect_right(line_starts, match.start) - 1 for match in matches})
+
+
+# Global matcher instance
+_pattern_matcher: Optional[PatternMatcher] = None
+
+
+def get_pattern_matcher() -> PatternMatcher:
+    """
+    Get the global pattern matcher, compiling the library on first use.
+
+    Returns:
+        Global PatternMatcher singleton.
+    """
+    global _pattern_matcher
+    if _pattern_matcher is None:
+        _pattern_matcher = PatternMatcher.from_file(settings.FAILURE_PATTERNS_PATH or DEFAULT_PATTERNS_PATH)
+    return _pattern_matcher
+
+
+def match_failure_patterns(text: str) -> List[PatternMatch]:
+    """
+    Find every failure pattern occurrence in a text.
+
+    Args:
+        text: Text to search (logs or a root cause summary).
+
+    Returns:
+        Matches ordered by end offset.
+    """
+    return get_pattern_matcher().find(text)
+
+
+def classify_matches(matches: List[PatternMatch]) -> Tuple[FailureCategory, float]:
+    """
+    Classifies a failure from pattern matches.
+
+    Args:
+        matches: Matches returned by `match_failure_patterns`.
+
+    Returns:
+        Tuple of (category, confidence_score) where confidence is 0.0-1.0.
+    """
+    matcher = get_pattern_matcher()
+    scores = matcher.scores(matches)
+
+    # Find category with the highest score (first category wins ties)
+    best_category = max(scores.items(), key=lambda x: x[1])[0]
+    best_score = scores[best_category]
+
+    if best_score <= 0:
+        return (FailureCategory.UNKNOWN, 0.3)
+
+    # Confidence grows with the weight of evidence (simple heuristic)
+    confidence = min(0.9, 0.5 + (best_score / matcher.saturation) * 0.4)
+
+    return (best_category, confidence)
+
 
 def classify_failure(root_cause: str, logs: str) -> Tuple[FailureCategory, float]:
     """
@@ -62,31 +256,37 @@ def classify_failure(root_cause: str, logs: str) -> Tuple[FailureCategory, float
     Returns:
         Tuple of (category, confidence_score) where confidence is 0.0-1.0.
     """
-    combined_text = f"{root_cause.lower()} {logs.lower()}"
-    
-    matches: Dict[FailureCategory, int] = {
-        category: 0 for category in FailureCategory
-    }
-    
-    for category, patterns in FAILURE_PATTERNS.items():
-        for pattern in patterns:
-            if pattern in combined_text:
-                matches[category] += 1
-    
-    # Find category with most matches
-    max_matches = max(matches.values())
-    
-    if max_matches == 0:
-        return (FailureCategory.UNKNOWN, 0.3)
-    
-    # Get category with highest match count
-    best_category = max(matches.items(), key=lambda x: x[1])[0]
-    
-    # Confidence is based on match ratio (simple heuristic)
-    total_patterns = sum(len(patterns) for patterns in FAILURE_PATTERNS.values())
-    confidence = min(0.9, 0.5 + (max_matches / total_patterns) * 0.4)
-    
-    return (best_category, confidence)
+    matches = match_failure_patterns(root_cause) + match_failure_patterns(logs)
+    return classify_matches(matches)
+
+def classify_error_records(
+    root_cause: str,
+    records: List[ErrorRecord],
+    logs: str
+) -> Tuple[FailureCategory, float]:
+    """
+    Classifies a failure from its structured error records.
+
+    Only the error types and messages are matched, not the surrounding log
+    output. Failures no parser recognizes (runner, network and timeout
+    problems mostly) have no records, and records whose text matches no
+    pattern say little about the category; both are classified from the
+    logs instead.
+
+    Args:
+        root_cause: The root cause summary from diagnose node (may be empty).
+        records: Error records of the failed steps.
+        logs: Reduced error logs, used when there are no records.
+
+    Returns:
+        Tuple of (category, confidence_score) where confidence is 0.0-1.0.
+    """
+    if records:
+        text = "\n".join(f"{record.error_type}: {record.message}" for record in records)
+        category, confidence = classify_failure(root_cause, text)
+        if category != FailureCategory.UNKNOWN:
+            return category, confidence
+    return classify_failure(root_cause, logs)
 
 def should_auto_fix(category: FailureCategory, confidence: float, min_threshold: float = 0.7) -> bool:
     """
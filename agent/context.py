@@ -1,84 +1,160 @@
 from typing import List, Dict, Optional
+import asyncio
 import logging
-from github import Github, GithubException
+from agent.github_client import GitHubAPIError
+from agent.imports import get_module_map, resolve_imports
+from agent.repo_index import RepoIndex
+from agent.repo_session import RepairSession
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+CONFIG_FILES = ["requirements.txt", "pyproject.toml", ".env.example"]
+
+async def _read_file(
+    session: RepairSession,
+    path: str,
+    semaphore: asyncio.Semaphore
+) -> Optional[str]:
+    """Reads a file's text under the fan-out bound, or None if it is missing or not a file."""
+    async with semaphore:
+        try:
+            return (await session.get_file(path))["content"]
+        except GitHubAPIError as e:
+            logger.debug(f"Context candidate {path} not readable: {e}")
+            return None
+
+async def _load_index(session: RepairSession) -> Optional[RepoIndex]:
+    """Loads the base commit's file index, or None to fall back to guessing paths."""
+    try:
+        return await session.get_index()
+    except GitHubAPIError as e:
+        logger.warning(f"Could not load repository tree for {session.repo_name}: {e}")
+        return None
+
+async def _local_imports(
+    session: RepairSession,
+    content: str,
+    target_file: str,
+    index: Optional[RepoIndex]
+) -> List[str]:
+    """
+    Lists the repository files imported by the target file.
+    
+    Imports are parsed with `ast` and resolved against the commit's module
+    map. Without an index, or when the target does not parse (often the very
+    failure being repaired), the line-based heuristics are used instead.
+    """
+    if index is not None:
+        try:
+            module_map = await get_module_map(session.repo_name, await session.base_sha(), index)
+            return await resolve_imports(content, target_file, module_map)
+        except SyntaxError as e:
+            logger.info(f"Could not parse {target_file} ({e}), guessing import paths")
+    
+    paths: List[str] = []
+    for imp in extract_imports(content):
+        imp_file = resolve_import_path(imp, target_file, session.repo_name, index)
+        if imp_file and imp_file != target_file and imp_file not in paths:
+            paths.append(imp_file)
+    return paths
+
 async def get_related_files(
-    repo: Github,
-    repo_name: str,
+    session: RepairSession,
     target_file: str,
-    root_cause: str
+    root_cause: str,
+    max_concurrency: int = settings.CONTEXT_FETCH_CONCURRENCY,
+    timeout_seconds: float = settings.CONTEXT_GATHER_TIMEOUT_SECONDS
 ) -> Dict[str, str]:
     """
     Identifies and reads related files for context.
     
+    Which candidates exist is answered locally from the commit's file index
+    (one recursive tree fetch, cached across jobs), so only files that exist
+    are downloaded. Candidate files (the target, its test file and, for
+    config-related failures, common config files) are fetched concurrently,
+    bounded by `max_concurrency`. Repository files the target imports (at most
+    `CONTEXT_MAX_IMPORT_FILES`) join the fan-out as soon as the target file
+    arrives and its imports are resolved. Whatever has not arrived when the
+    deadline expires, import resolution included, is cancelled and left out.
+    
     Args:
-        repo: GitHub repository object.
-        repo_name: Full repository name (owner/repo).
+        session: Job-scoped repository session.
         target_file: The file that needs fixing.
         root_cause: Root cause summary for context.
+        max_concurrency: Maximum number of fetches in flight.
+        timeout_seconds: Deadline for the whole gathering step.
         
     Returns:
-        Dictionary mapping file paths to their contents.
+        Dictionary mapping file paths to their contents, target file first,
+        then imports, test file and config files.
     """
-    context_files: Dict[str, str] = {}
+    semaphore = asyncio.Semaphore(max_concurrency)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_seconds
+    index = await _load_index(session)
+    
+    # Candidate paths in the order they should appear in the result
+    candidates: List[str] = [target_file]
+    test_file = find_test_file(target_file, index)
+    if test_file:
+        candidates.append(test_file)
+    if "config" in root_cause.lower() or "environment" in root_cause.lower():
+        candidates.extend(config_file for config_file in CONFIG_FILES if config_file not in candidates)
+    if index is not None:
+        candidates = [target_file] + [path for path in candidates[1:] if index.contains(path) is not False]
+    
+    results: Dict[str, Optional[str]] = {}
+    pending: Dict["asyncio.Task[Optional[str]]", str] = {
+        asyncio.create_task(_read_file(session, path, semaphore)): path for path in candidates
+    }
+    import_files: List[str] = []
+    # Resolving the target's imports (module map build, parse) runs under the same deadline
+    imports_task: Optional["asyncio.Task[List[str]]"] = None
     
     try:
-        # Always include the target file
-        try:
-            content = repo.get_contents(target_file)
-            if isinstance(content, list):
-                # Directory, skip
-                pass
-            else:
-                context_files[target_file] = content.decoded_content.decode()
-        except GithubException as e:
-            logger.warning(f"Could not read target file {target_file}: {e}")
-        
-        # Read imports from the target file if it's Python
-        if target_file.endswith(".py") and target_file in context_files:
-            imports = extract_imports(context_files[target_file])
-            for imp in imports[:5]:  # Limit to 5 imports
-                try:
-                    imp_file = resolve_import_path(imp, target_file, repo_name)
-                    if imp_file and imp_file not in context_files:
-                        content = repo.get_contents(imp_file)
-                        if not isinstance(content, list):
-                            context_files[imp_file] = content.decoded_content.decode()
-                except (GithubException, ValueError):
-                    pass  # Skip if can't resolve
-        
-        # Try to find test file for the target file
-        test_file = find_test_file(target_file)
-        if test_file:
-            try:
-                content = repo.get_contents(test_file)
-                if not isinstance(content, list):
-                    context_files[test_file] = content.decoded_content.decode()
-            except GithubException:
-                pass
-        
-        # Read common config files if relevant
-        if "config" in root_cause.lower() or "environment" in root_cause.lower():
-            config_files = ["requirements.txt", "pyproject.toml", ".env.example"]
-            for config_file in config_files:
-                if config_file not in context_files:
+        while pending or imports_task is not None:
+            waiting = set(pending) if imports_task is None else {*pending, imports_task}
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                logger.warning(f"Context gathering deadline hit, dropping {len(waiting)} pending task(s)")
+                break
+            done, _ = await asyncio.wait(waiting, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task is imports_task:
+                    imports_task = None
                     try:
-                        content = repo.get_contents(config_file)
-                        if not isinstance(content, list):
-                            context_files[config_file] = content.decoded_content.decode()
-                    except GithubException:
-                        pass
-        
+                        imports = task.result()
+                    except Exception as e:
+                        logger.warning(f"Could not resolve imports of {target_file}: {e}")
+                        continue
+                    for imp_file in [imp for imp in imports if imp not in candidates][:settings.CONTEXT_MAX_IMPORT_FILES]:
+                        import_files.append(imp_file)
+                        pending[asyncio.create_task(_read_file(session, imp_file, semaphore))] = imp_file
+                    continue
+                
+                path = pending.pop(task)
+                results[path] = task.result()
+                
+                # Read imports from the target file if it's Python
+                if path == target_file and results[path] is not None and target_file.endswith(".py"):
+                    imports_task = asyncio.create_task(_local_imports(session, results[path], target_file, index))
     except Exception as e:
         logger.error(f"Error gathering context files: {e}")
+    finally:
+        for task in pending:
+            task.cancel()
+        if imports_task is not None:
+            imports_task.cancel()
     
-    return context_files
+    if results.get(target_file) is None:
+        logger.warning(f"Could not read target file {target_file}")
+    
+    ordered = [target_file] + import_files + candidates[1:]
+    return {path: results[path] for path in ordered if results.get(path) is not None}
 
 def extract_imports(file_content: str) -> List[str]:
-    """Extracts import statements from Python file."""
+    """Extracts import statements from Python file (line-based fallback for unparsable sources)."""
     imports: List[str] = []
     lines = file_content.split("\n")
     
@@ -96,11 +172,18 @@ def extract_imports(file_content: str) -> List[str]:
     
     return imports[:10]  # Limit imports
 
-def resolve_import_path(module: str, current_file: str, repo_name: str) -> Optional[str]:
+def resolve_import_path(
+    module: str,
+    current_file: str,
+    repo_name: str,
+    index: Optional[RepoIndex] = None
+) -> Optional[str]:
     """
     Attempts to resolve an import to a file path.
     
-    This is a simplified version - in production, you'd use importlib or AST parsing.
+    Heuristic fallback for sources `agent.imports` cannot parse. With an index, module and package layouts (plain, `app/` and `src/`) are
+    checked locally and only an existing file is returned; without one the
+    path is a guess.
     """
     # Remove relative imports for now
     if module.startswith("."):
@@ -117,10 +200,49 @@ def resolve_import_path(module: str, current_file: str, repo_name: str) -> Optio
         if not path.startswith("app/"):
             path = f"app/{path}"
     
-    return path
+    if index is None:
+        return path
+    
+    module_path = "/".join(module_parts)
+    candidates = [path]
+    for root in ("", "app/", "src/"):
+        candidates.extend([f"{root}{module_path}.py", f"{root}{module_path}/__init__.py"])
+    found = index.first_existing(candidates)
+    if found is None and index.truncated:
+        return path
+    return found
 
-def find_test_file(file_path: str) -> Optional[str]:
-    """Attempts to find a test file for the given file path."""
+def find_test_file(file_path: str, index: Optional[RepoIndex] = None) -> Optional[str]:
+    """
+    Attempts to find a test file for the given file path.
+    
+    With an index, the usual layouts are checked locally: `test_<name>.py` or
+    `<name>_test.py` next to the file, in a sibling `tests/` directory, under a
+    top-level `tests/` tree, and finally anywhere in the repository. Without
+    one, a single conventional path is guessed.
+    """
+    if index is not None and file_path.endswith(".py"):
+        directory, name = file_path.rsplit("/", 1) if "/" in file_path else ("", file_path)
+        stem = name[:-len(".py")]
+        names = [f"test_{stem}.py", f"{stem}_test.py"]
+        prefix = f"{directory}/" if directory else ""
+        relative = directory.split("/", 1)[1] + "/" if "/" in directory else ""
+        candidates = []
+        for test_name in names:
+            candidates.extend([
+                f"{prefix}{test_name}",
+                f"{prefix}tests/{test_name}",
+                f"tests/{prefix}{test_name}",
+                f"tests/{relative}{test_name}",
+                f"tests/{test_name}",
+            ])
+        found = index.first_existing(candidates)
+        if found is None:
+            matches = [path for test_name in names for path in index.find_name(test_name)]
+            found = matches[0] if matches else None
+        if found is not None or not index.truncated:
+            return found
+    
     # Common patterns: test_*.py, *_test.py, tests/*.py
     if file_path.endswith(".py"):
         base = file_path.replace(".py", "")
@@ -0,0 +1,274 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, select
+
+from agent.schemas import DiagnoseResponse
+from app.core.config import settings
+from app.db.base import AsyncSessionLocal
+from app.db.models import DiagnosisCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# (expires_at as time.time(), response, cost of the original call)
+_Entry = Tuple[float, DiagnoseResponse, float]
+
+
+def prompt_version(template: str) -> str:
+    """
+    Derives a version tag from a prompt template.
+
+    Any edit to the template changes the tag, so cached responses produced
+    by an older prompt are never served.
+
+    Args:
+        template: Prompt template text.
+
+    Returns:
+        Short hex digest of the template.
+    """
+    return hashlib.sha256(template.encode()).hexdigest()[:12]
+
+
+def build_cache_key(repo_name: str, fingerprint: str, version: str, model: str) -> str:
+    """
+    Builds the key a diagnosis is cached under.
+
+    Args:
+        repo_name: Full repository name (owner/repo).
+        fingerprint: Failure fingerprint of the logs.
+        version: Prompt version tag.
+        model: Model name.
+
+    Returns:
+        Hex digest identifying the combination.
+    """
+    return hashlib.sha256(f"{repo_name}\n{fingerprint}\n{version}\n{model}".encode()).hexdigest()
+
+
+class DiagnosisCache:
+    """
+    Cache of diagnose responses keyed by `(repo, fingerprint, prompt version, model)`.
+
+    One breakage (a broken dependency pin, a flaky service) fails many runs
+    with logs that fingerprint the same, and each of them would otherwise
+    pay for a Flash call that returns the same diagnosis. The memory tier is
+    an LRU with a TTL; the database tier keeps entries across restarts and
+    instances, and memory misses fall through to it. Expired rows are deleted
+    when read. A hit only reads: per-entry hit counts are kept in memory and
+    written in one batch every `hit_flush_every` hits.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.DIAGNOSIS_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = settings.DIAGNOSIS_CACHE_TTL_SECONDS,
+        persistent: bool = settings.DIAGNOSIS_CACHE_PERSISTENT,
+        hit_flush_every: int = settings.DIAGNOSIS_CACHE_HIT_FLUSH_EVERY
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of responses kept in memory.
+            ttl_seconds: How long a cached diagnosis stays valid.
+            persistent: Whether to use the database tier.
+            hit_flush_every: Hits counted in memory before they are written.
+        """
+        self._max_entries: int = max_entries
+        self._ttl_seconds: float = ttl_seconds
+        self._persistent: bool = persistent
+        self._hit_flush_every: int = hit_flush_every
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._pending_hits: Dict[str, int] = {}
+        self._stats: Dict[str, float] = {
+            "memory_hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+            "dollars_saved": 0.0,
+        }
+
+    def _remember(self, key: str, entry: _Entry) -> None:
+        """Adds an entry to the memory tier, evicting the least recently used."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(
+        self,
+        repo_name: str,
+        fingerprint: str,
+        version: str,
+        model: str
+    ) -> Optional[Tuple[DiagnoseResponse, float]]:
+        """
+        Returns a cached diagnosis.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            fingerprint: Failure fingerprint of the logs.
+            version: Prompt version tag.
+            model: Model name.
+
+        Returns:
+            The cached response and the cost of the call it saves, or None.
+        """
+        key = build_cache_key(repo_name, fingerprint, version, model)
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._entries.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                self._stats["dollars_saved"] += entry[2]
+                await self._count_hit(key)
+                return entry[1], entry[2]
+            del self._entries[key]
+
+        if self._persistent:
+            try:
+                entry = await self._load(key)
+            except Exception as e:
+                logger.warning(f"Diagnosis cache lookup failed: {e}")
+                entry = None
+            if entry is not None:
+                self._remember(key, entry)
+                self._stats["db_hits"] += 1
+                self._stats["dollars_saved"] += entry[2]
+                await self._count_hit(key)
+                return entry[1], entry[2]
+
+        self._stats["misses"] += 1
+        return None
+
+    async def put(
+        self,
+        repo_name: str,
+        fingerprint: str,
+        version: str,
+        model: str,
+        response: DiagnoseResponse,
+        cost: float
+    ) -> None:
+        """
+        Caches a diagnosis.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            fingerprint: Failure fingerprint of the logs.
+            version: Prompt version tag.
+            model: Model name.
+            response: Parsed model response.
+            cost: Estimated cost of the call that produced it.
+        """
+        key = build_cache_key(repo_name, fingerprint, version, model)
+        self._remember(key, (time.time() + self._ttl_seconds, response, cost))
+        if not self._persistent:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.merge(DiagnosisCacheEntry(
+                    cache_key=key,
+                    repo_name=repo_name,
+                    fingerprint=fingerprint,
+                    prompt_version=version,
+                    model=model,
+                    root_cause=response.root_cause,
+                    confidence=response.confidence,
+                    cost=cost,
+                    hits=0,
+                    expires_at=datetime.utcnow() + timedelta(seconds=self._ttl_seconds),
+                ))
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to persist diagnosis cache entry: {e}")
+
+    async def _load(self, key: str) -> Optional[_Entry]:
+        """Reads an unexpired entry from the database tier."""
+        async with AsyncSessionLocal() as db:
+            row = (await db.execute(
+                select(DiagnosisCacheEntry).where(DiagnosisCacheEntry.cache_key == key)
+            )).scalar_one_or_none()
+            if row is None:
+                return None
+            remaining = (row.expires_at - datetime.utcnow()).total_seconds()
+            if remaining <= 0:
+                await db.execute(delete(DiagnosisCacheEntry).where(DiagnosisCacheEntry.cache_key == key))
+                await db.commit()
+                return None
+            response = DiagnoseResponse(root_cause=row.root_cause, confidence=row.confidence)
+            return time.time() + remaining, response, row.cost
+
+    async def _count_hit(self, key: str) -> None:
+        """Counts a hit in memory, writing the counts once enough have accumulated."""
+        if not self._persistent:
+            return
+        self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+        if sum(self._pending_hits.values()) >= self._hit_flush_every:
+            await self.flush_hits()
+
+    async def flush_hits(self) -> None:
+        """Adds the hit counts accumulated in memory to the database rows in one statement."""
+        if not self._pending_hits:
+            return
+        pending, self._pending_hits = self._pending_hits, {}
+        table = DiagnosisCacheEntry.__table__
+        statement = (
+            table.update()
+            .where(table.c.cache_key == bindparam("hit_key"))
+            .values(hits=table.c.hits + bindparam("hit_count"))
+        )
+        try:
+            async with AsyncSessionLocal() as db:
+                connection = await db.connection()
+                await connection.execute(
+                    statement, [{"hit_key": key, "hit_count": count} for key, count in pending.items()]
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to record diagnosis cache hits: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns cache counters for the metrics endpoint.
+
+        Returns:
+            Dictionary with hits per tier, misses, hit rate, dollars saved
+            and the memory entry count.
+        """
+        hits = self._stats["memory_hits"] + self._stats["db_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "dollars_saved": round(self._stats["dollars_saved"], 6),
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+
+# Global cache instance
+_diagnosis_cache: Optional[DiagnosisCache] = None
+
+
+def get_diagnosis_cache() -> DiagnosisCache:
+    """
+    Get the global diagnosis cache.
+
+    Returns:
+        Global DiagnosisCache singleton.
+    """
+    global _diagnosis_cache
+    if _diagnosis_cache is None:
+        _diagnosis_cache = DiagnosisCache()
+    return _diagnosis_cache
+
+
+async def flush_diagnosis_cache() -> None:
+    """Writes the pending hit counts of the global cache, if one was created."""
+    if _diagnosis_cache is not None:
+        await _diagnosis_cache.flush_hits()
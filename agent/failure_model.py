@@ -0,0 +1,349 @@
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from agent.classification import FailureCategory
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MODEL_FORMAT_VERSION = 1
+
+# Calibration grid for the length-normalized scores (see `FailureModel.probabilities`)
+_SCALES = (1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0, 200.0, 500.0, 1000.0)
+
+# Multiplicative hash constants (uint32 arithmetic wraps around)
+_ROLL = np.uint32(0x01000193)
+_MIX = np.uint32(0x9E3779B1)
+
+
+def model_text(root_cause: Optional[str], signature: Optional[Dict[str, Any]]) -> str:
+    """
+    Builds the text the learned classifier scores.
+
+    Jobs store the root cause and the failure signature (see
+    agent/fingerprint.py), not the raw logs, so training and scoring both
+    use this composition.
+
+    Args:
+        root_cause: Root cause summary from diagnose.
+        signature: Failure signature with error lines, frames and test ids.
+
+    Returns:
+        Newline-separated text.
+    """
+    signature = signature or {}
+    parts = [root_cause or ""]
+    for key in ("error_lines", "frames", "test_ids"):
+        parts.extend(signature.get(key) or [])
+    return "\n".join(parts)
+
+
+def featurize(text: str, ngram_sizes: Sequence[int], bits: int) -> np.ndarray:
+    """
+    Hashes the character n-grams of a text into feature buckets.
+
+    The text is lowercased and digits are folded to `0`, so line numbers,
+    durations and counts do not split otherwise identical n-grams. Hashing is
+    a rolling multiply over uint8 arrays, so there is no per-character Python
+    work and the result is identical across processes.
+
+    Args:
+        text: Text to featurize.
+        ngram_sizes: Character n-gram lengths.
+        bits: Number of hash bits; there are `2 ** bits` buckets.
+
+    Returns:
+        Bucket index of every n-gram occurrence (uint32).
+    """
+    data = np.frombuffer(text.lower().encode("utf-8", "ignore"), dtype=np.uint8)
+    data = np.where((data >= 48) & (data <= 57), np.uint8(48), data).astype(np.uint32)
+    shift = np.uint32(32 - bits)
+    buckets = []
+    # Extend every n-gram hash by one character per pass; longer n-grams
+    # reuse the shorter prefix hashes
+    hashed = data
+    for size in range(1, max(ngram_sizes) + 1):
+        count = len(data) - size + 1
+        if count <= 0:
+            break
+        if size > 1:
+            hashed = hashed[:count] * _ROLL + data[size - 1:]
+        if size in ngram_sizes:
+            buckets.append(((hashed + np.uint32(size)) * _MIX) >> shift)
+    if not buckets:
+        return np.zeros(0, dtype=np.uint32)
+    return np.concatenate(buckets)
+
+
+class FailureModel:
+    """
+    Multinomial naive Bayes over hashed character n-grams.
+
+    The model is one `classes x 2 ** bits` table of log-probabilities plus
+    class priors. Scoring gathers the table columns of a text's n-grams and
+    averages them, so it costs a few NumPy operations however long the text
+    is. Averaging (instead of summing) keeps long logs from producing
+    saturated posteriors; `scale` is calibrated at training time so the
+    softmax over the averaged scores behaves like a probability.
+    """
+
+    def __init__(
+        self,
+        classes: List[FailureCategory],
+        log_probs: np.ndarray,
+        log_prior: np.ndarray,
+        ngram_sizes: Sequence[int],
+        bits: int,
+        scale: float
+    ) -> None:
+        """
+        Initialize the model.
+
+        Args:
+            classes: Category of each table row.
+            log_probs: `classes x 2 ** bits` n-gram log-probabilities.
+            log_prior: Log class priors.
+            ngram_sizes: Character n-gram lengths the model was trained on.
+            bits: Number of hash bits.
+            scale: Multiplier applied to the averaged log-probabilities.
+        """
+        self.classes: List[FailureCategory] = classes
+        self.log_probs: np.ndarray = log_probs
+        # Bucket-major float32 copy for scoring with one matrix-vector product
+        self._table: np.ndarray = np.ascontiguousarray(log_probs.T, dtype=np.float32)
+        self.log_prior: np.ndarray = log_prior.astype(np.float32)
+        self.ngram_sizes: Tuple[int, ...] = tuple(int(size) for size in ngram_sizes)
+        self.bits: int = int(bits)
+        self.scale: float = float(scale)
+
+    def mean_log_probs(self, buckets: np.ndarray) -> np.ndarray:
+        """
+        Averages the per-class log-probabilities of n-gram buckets.
+
+        Args:
+            buckets: Non-empty output of `featurize`.
+
+        Returns:
+            Mean log-probability per entry of `classes`.
+        """
+        counts = np.bincount(buckets, minlength=self._table.shape[0]).astype(np.float32)
+        return counts @ self._table / buckets.size
+
+    def probabilities(self, text: str) -> np.ndarray:
+        """
+        Class probabilities for a text.
+
+        Args:
+            text: Text built with `model_text`.
+
+        Returns:
+            Probability per entry of `classes`.
+        """
+        buckets = featurize(text, self.ngram_sizes, self.bits)
+        if buckets.size == 0:
+            scores = self.log_prior
+        else:
+            scores = self.log_prior + self.scale * self.mean_log_probs(buckets)
+        scores = scores - scores.max()
+        weights = np.exp(scores)
+        return weights / weights.sum()
+
+    def predict(self, text: str) -> Tuple[FailureCategory, float]:
+        """
+        Classifies a text.
+
+        Args:
+            text: Text built with `model_text`.
+
+        Returns:
+            Tuple of (category, confidence_score) where confidence is 0.0-1.0.
+        """
+        probabilities = self.probabilities(text)
+        best = int(probabilities.argmax())
+        return self.classes[best], float(probabilities[best])
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Writes the model as a compressed `.npz` file.
+
+        Args:
+            path: Destination path.
+        """
+        np.savez_compressed(
+            path,
+            version=np.array(MODEL_FORMAT_VERSION),
+            classes=np.array([category.value for category in self.classes]),
+            log_probs=self.log_probs.astype(np.float16),
+            log_prior=self.log_prior,
+            ngram_sizes=np.array(self.ngram_sizes),
+            bits=np.array(self.bits),
+            scale=np.array(self.scale),
+        )
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "FailureModel":
+        """
+        Reads a model written by `save`.
+
+        Args:
+            path: Path to the `.npz` file.
+
+        Returns:
+            Loaded model.
+
+        Raises:
+            ValueError: If the file has an unsupported format version.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data["version"])
+            if version != MODEL_FORMAT_VERSION:
+                raise ValueError(f"Unsupported failure model version {version}")
+            return cls(
+                classes=[FailureCategory(value) for value in data["classes"]],
+                log_probs=data["log_probs"],
+                log_prior=data["log_prior"],
+                ngram_sizes=data["ngram_sizes"].tolist(),
+                bits=int(data["bits"]),
+                scale=float(data["scale"]),
+            )
+
+
+def train_failure_model(
+    texts: Sequence[str],
+    labels: Sequence[FailureCategory],
+    validation: Optional[Tuple[Sequence[str], Sequence[FailureCategory]]] = None,
+    ngram_sizes: Sequence[int] = (3, 5),
+    bits: int = 16,
+    alpha: float = 1.0
+) -> FailureModel:
+    """
+    Trains a failure model.
+
+    Args:
+        texts: Training texts built with `model_text`.
+        labels: Category of each training text.
+        validation: Held-out texts and labels used to calibrate `scale`;
+            without them the scale defaults to 50.
+        ngram_sizes: Character n-gram lengths.
+        bits: Number of hash bits.
+        alpha: Additive smoothing per bucket.
+
+    Returns:
+        Trained model.
+
+    Raises:
+        ValueError: If there are no training examples.
+    """
+    if not texts:
+        raise ValueError("No training examples")
+    classes = sorted(set(labels), key=lambda category: category.value)
+    index = {category: i for i, category in enumerate(classes)}
+    buckets = 1 << bits
+
+    counts = np.zeros((len(classes), buckets), dtype=np.float64)
+    class_docs = np.zeros(len(classes), dtype=np.float64)
+    for text, label in zip(texts, labels):
+        row = index[label]
+        counts[row] += np.bincount(featurize(text, ngram_sizes, bits), minlength=buckets)
+        class_docs[row] += 1
+
+    log_probs = np.log(counts + alpha) - np.log(counts.sum(axis=1, keepdims=True) + alpha * buckets)
+    log_prior = np.log(class_docs / class_docs.sum())
+    # Calibrate on the stored precision
+    model = FailureModel(classes, log_probs.astype(np.float16), log_prior, ngram_sizes, bits, scale=50.0)
+
+    if validation is not None and len(validation[0]):
+        known = [(text, index[label]) for text, label in zip(*validation) if label in index]
+        if known:
+            mean_log_probs = np.zeros((len(known), len(classes)), dtype=np.float32)
+            for i, (text, _) in enumerate(known):
+                text_buckets = featurize(text, ngram_sizes, bits)
+                if text_buckets.size:
+                    mean_log_probs[i] = model.mean_log_probs(text_buckets)
+            targets = np.array([row for _, row in known])
+            best_scale, best_likelihood = model.scale, -np.inf
+            for scale in _SCALES:
+                scores = model.log_prior + scale * mean_log_probs
+                scores = scores - scores.max(axis=1, keepdims=True)
+                log_norm = np.log(np.exp(scores).sum(axis=1))
+                likelihood = float((scores[np.arange(len(targets)), targets] - log_norm).mean())
+                if likelihood > best_likelihood:
+                    best_scale, best_likelihood = scale, likelihood
+            model.scale = best_scale
+
+    return model
+
+
+def evaluate(
+    model: FailureModel,
+    texts: Sequence[str],
+    labels: Sequence[FailureCategory],
+    min_confidence: float = settings.MIN_CONFIDENCE_THRESHOLD,
+    learned_min_confidence: float = settings.LEARNED_MIN_CONFIDENCE
+) -> Dict[str, Dict[str, float]]:
+    """
+    Compares the learned classifier with the heuristic on labeled texts.
+
+    Args:
+        model: Trained model.
+        texts: Texts built with `model_text`.
+        labels: True category of each text.
+        min_confidence: Auto-fix confidence threshold of the heuristic.
+        learned_min_confidence: Probability at which the learned prediction
+            is used.
+
+    Returns:
+        Accuracy, UNKNOWN rate, the share of predictions at or above the
+        threshold (`confident_rate`) and the accuracy of those
+        (`confident_accuracy`), for "heuristic" and "learned".
+    """
+    from agent.classification import classify_failure
+
+    thresholds = {"heuristic": min_confidence, "learned": learned_min_confidence}
+    totals = {name: {"correct": 0, "unknown": 0, "confident": 0, "confident_correct": 0} for name in thresholds}
+    for text, label in zip(texts, labels):
+        predictions = {"heuristic": classify_failure("", text), "learned": model.predict(text)}
+        for name, (category, confidence) in predictions.items():
+            confident = confidence >= thresholds[name]
+            totals[name]["correct"] += category == label
+            totals[name]["unknown"] += category == FailureCategory.UNKNOWN
+            totals[name]["confident"] += confident
+            totals[name]["confident_correct"] += category == label and confident
+    count = max(len(texts), 1)
+    return {
+        name: {
+            "accuracy": round(values["correct"] / count, 3),
+            "unknown_rate": round(values["unknown"] / count, 3),
+            "confident_rate": round(values["confident"] / count, 3),
+            "confident_accuracy": round(values["confident_correct"] / max(values["confident"], 1), 3),
+        }
+        for name, values in totals.items()
+    }
+
+
+# Global model instance (loaded on first use)
+_failure_model: Optional[FailureModel] = None
+_failure_model_loaded: bool = False
+
+
+def get_failure_model() -> Optional[FailureModel]:
+    """
+    Get the learned failure classifier, loading it on first use.
+
+    Returns:
+        The model at FAILURE_MODEL_PATH, or None when no model is configured
+        or it cannot be loaded.
+    """
+    global _failure_model, _failure_model_loaded
+    if not _failure_model_loaded:
+        _failure_model_loaded = True
+        if settings.FAILURE_MODEL_PATH:
+            try:
+                _failure_model = FailureModel.load(settings.FAILURE_MODEL_PATH)
+                logger.info(f"Loaded failure model from {settings.FAILURE_MODEL_PATH}")
+            except Exception as e:
+                logger.error(f"Failed to load failure model {settings.FAILURE_MODEL_PATH}: {e}")
+    return _failure_model
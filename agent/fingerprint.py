@@ -0,0 +1,156 @@
+import hashlib
+import json
+import re
+from typing import List, Optional, TypedDict
+
+from agent.log_baseline import normalize_line
+from agent.log_reducer import score_line
+
+# Bumped whenever normalization changes, so old and new fingerprints never collide
+FINGERPRINT_VERSION = 2
+
+# Caps keep signatures small and stable when a run fails in hundreds of places
+MAX_ERROR_LINES = 20
+MAX_FRAMES = 30
+MAX_TEST_IDS = 50
+
+# Stack frames: Python, JavaScript/TypeScript, JVM, Go
+_PY_FRAME_RE = re.compile(r'^\s*File "(?P<path>[^"]+)", line \d+, in (?P<func>\S+)')
+_JS_FRAME_RE = re.compile(r"^\s*at (?:(?P<func>[\w$.<>\[\] ]+?) \()?(?P<path>[^\s()]+?):\d+:\d+\)?\s*$")
+_JVM_FRAME_RE = re.compile(r"^\s*at (?P<func>[\w$.<>]+)\((?P<path>[\w$.-]+?)(?::\d+)?\)\s*$")
+_GO_FRAME_RE = re.compile(r"^\s+(?P<path>/\S+\.go):\d+(?: \+0x[0-9a-f]+)?\s*$")
+
+# Failing tests: pytest, Jest/Vitest, go test, JUnit (Maven surefire / Gradle)
+_TEST_ID_RES = [
+    re.compile(r"^(?:FAILED|ERROR) (?P<id>\S+::\S+)"),
+    re.compile(r"^\s*(?:FAIL) (?P<id>\S+\.(?:test|spec)\.[jt]sx?)\b"),
+    re.compile(r"^\s*--- FAIL: (?P<id>\S+)"),
+    re.compile(r"^\[ERROR\]\s+(?P<id>[\w.$]+(?:\.|#)\w+)(?::\d+)?\s"),
+]
+
+# Prefixes that differ between runners and machines but not between failures
+_PATH_PREFIX_RE = re.compile(
+    r"^.*?(?:/site-packages/|/node_modules/|/go/pkg/mod/|/home/runner/work/[^/]+/[^/]+/|/__w/[^/]+/[^/]+/)"
+)
+# Tokens of an error line that change between runs of the same breakage, on
+# top of the timestamps, durations, hashes, UUIDs and temp paths masked by
+# normalize_line: object addresses, run/job/process IDs, ephemeral ports,
+# source positions (edits elsewhere in a file move them) and test counts.
+# Everything else, version pins and asserted values included, is kept, since
+# it tells one failure from another.
+_VOLATILE_ERROR_RE = re.compile(
+    r"(?P<addr>\b0x[0-9a-fA-F]+\b)"
+    r"|(?P<id>(?i:/(?:runs|jobs|attempts)/|\b(?:run|job|pid|process|thread|worker|attempt|build)(?:[ _-]?id)?[\s#:=]+))\d+"
+    r"|(?P<port>\b(?:localhost|127\.0\.0\.1|0\.0\.0\.0|\[::1?\]):)\d+"
+    r"|(?P<pos>\.[A-Za-z]\w*(?::\d+(?::\d+)?|\(\d+,\d+\))|(?i:\bline )\d+)"
+    r"|\b\d+(?P<count> (?:passed|failed|errors?|skipped|deselected|warnings?|xfailed|xpassed|tests?|suites?|pending|todo)\b)"
+)
+_POSITION_RE = re.compile(r"(?::\d+(?::\d+)?|\(\d+,\d+\)|\d+)$")
+
+
+class FailureSignature(TypedDict):
+    """Stable description of a failure, independent of when and where it ran."""
+    fingerprint: str
+    version: int
+    error_lines: List[str]
+    frames: List[str]
+    test_ids: List[str]
+
+
+def _mask_volatile(match: "re.Match[str]") -> str:
+    """Replacement for one `_VOLATILE_ERROR_RE` match, keeping the text around the number."""
+    kind = match.lastgroup
+    if kind == "addr":
+        return "<addr>"
+    if kind == "pos":
+        return _POSITION_RE.sub("<pos>", match.group("pos"), count=1)
+    if kind == "count":
+        return "<n>" + match.group("count")
+    return match.group(kind) + f"<{kind}>"
+
+
+def _normalize_error(line: str) -> str:
+    """Normalizes an error line, also masking the volatile tokens of `_VOLATILE_ERROR_RE`."""
+    return normalize_line(_VOLATILE_ERROR_RE.sub(_mask_volatile, line))
+
+
+def _frame(line: str) -> Optional[str]:
+    """Returns a line's stack frame as `path:function` without line numbers, if it is one."""
+    for pattern in (_PY_FRAME_RE, _JVM_FRAME_RE, _JS_FRAME_RE, _GO_FRAME_RE):
+        match = pattern.match(line)
+        if match:
+            path = _PATH_PREFIX_RE.sub("", match.group("path"))
+            func = match.groupdict().get("func") or ""
+            return f"{path}:{func.strip()}" if func else path
+    return None
+
+
+def _test_id(line: str) -> Optional[str]:
+    """Returns the failing test a line names, if any."""
+    for pattern in _TEST_ID_RES:
+        match = pattern.match(line)
+        if match:
+            return match.group("id")
+    return None
+
+
+def _append_unique(items: List[str], seen: set, item: str, limit: int) -> None:
+    """Appends an item once, keeping first-seen order, up to `limit` items."""
+    if item not in seen and len(items) < limit:
+        seen.add(item)
+        items.append(item)
+
+
+def fingerprint_log(logs: str) -> FailureSignature:
+    """
+    Turns a failure log into a stable signature.
+
+    The signature has three parts: the normalized lines carrying error
+    markers (timestamps, durations, hashes, temp paths, object addresses,
+    run IDs, ports, source positions and test counts masked, while version
+    pins and asserted values are kept), the shape of the stack traces as `path:function`
+    frames with machine-specific prefixes and line numbers removed, and the
+    ids of the failing tests. Error lines and test ids are sorted so parallel
+    test output order does not matter. The fingerprint is a hash of all three, so the same breakage on
+    another run, branch or runner hashes the same.
+
+    Args:
+        logs: Failed-step logs (reduced or raw).
+
+    Returns:
+        The signature with its hex fingerprint.
+    """
+    error_lines: List[str] = []
+    frames: List[str] = []
+    test_ids: List[str] = []
+    seen_errors: set = set()
+    seen_frames: set = set()
+    seen_tests: set = set()
+
+    for line in logs.splitlines():
+        # Frames and test ids are cheap anchored matches on a prefix check
+        stripped = line.lstrip()
+        if stripped.startswith(("File ", "at ", "/")):
+            frame = _frame(line)
+            if frame:
+                _append_unique(frames, seen_frames, frame, MAX_FRAMES)
+                continue
+        if stripped.startswith(("FAILED", "ERROR", "FAIL", "--- FAIL", "[ERROR]")):
+            test_id = _test_id(line)
+            if test_id:
+                _append_unique(test_ids, seen_tests, test_id, MAX_TEST_IDS)
+        if score_line(line):
+            _append_unique(error_lines, seen_errors, _normalize_error(line), MAX_ERROR_LINES)
+
+    error_lines.sort()
+    test_ids.sort()
+    digest = hashlib.sha256(
+        json.dumps([FINGERPRINT_VERSION, error_lines, frames, test_ids], separators=(",", ":")).encode()
+    ).hexdigest()
+    return {
+        "fingerprint": digest,
+        "version": FINGERPRINT_VERSION,
+        "error_lines": error_lines,
+        "frames": frames,
+        "test_ids": test_ids,
+    }
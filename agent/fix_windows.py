@@ -0,0 +1,270 @@
+import ast
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Names worth looking up in the file (short words are mostly noise)
+_IDENTIFIER_RE = re.compile(r"\b[A-Za-z_][A-Za-z0-9_]{2,}\b")
+# Definitions in languages without a parser here
+_DEFINITION_RE = re.compile(
+    r"^\s*(?:export\s+)?(?:pub(?:\([\w:]+\))?\s+)?(?:async\s+)?"
+    r"(?:def|class|function|func|fn|interface|type|struct|enum|trait)\s+(?:\([^)]*\)\s*)?(?P<name>[A-Za-z_]\w*)"
+)
+_MARKER_RE = re.compile(r"^<<<(?:END )?REGION \d+")
+
+HEADER_LINES = 20  # head of a file without a parser (imports, package clauses)
+
+
+class SpliceError(Exception):
+    """Raised when edited regions cannot be spliced back into the file."""
+
+
+class Region(NamedTuple):
+    """Lines `start` to `end` (0-based, end exclusive) of a file sent to the model."""
+    start: int
+    end: int
+    reason: str  # what selected it, for logs
+
+    @property
+    def size(self) -> int:
+        """Number of lines."""
+        return self.end - self.start
+
+
+def referenced_symbols(texts: Iterable[str]) -> List[str]:
+    """
+    Identifiers mentioned in error messages or the root cause, in order of appearance.
+
+    Args:
+        texts: Root cause, error record messages, test ids.
+
+    Returns:
+        Distinct identifiers of at least three characters.
+    """
+    seen: Dict[str, None] = {}
+    for text in texts:
+        for name in _IDENTIFIER_RE.findall(text or ""):
+            seen.setdefault(name, None)
+    return list(seen)
+
+
+def _python_structure(text: str) -> Optional[Tuple[List[Tuple[int, int, str]], Optional[Tuple[int, int]]]]:
+    """
+    Spans of the functions and classes of a Python module, and of its top-level import block.
+
+    Returns:
+        (spans as 0-based (start, end, name), import block), or None when the
+        file does not parse.
+    """
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return None
+    spans = []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+            spans.append((start - 1, node.end_lineno, node.name))
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    import_block = (imports[0].lineno - 1, imports[-1].end_lineno) if imports else None
+    return spans, import_block
+
+
+def select_regions(
+    text: str,
+    path: str,
+    anchor_lines: Sequence[int],
+    symbols: Sequence[str],
+    max_lines: int,
+    max_chars: int,
+    context_lines: int
+) -> List[Region]:
+    """
+    Picks the regions of a large file that a fix most likely touches.
+
+    Candidates in priority order: the innermost function or class around each
+    anchor line (Python, via `ast`) or `context_lines` lines around it
+    (other languages, or when the enclosing definition is too long), then the
+    definitions of referenced symbols, then the import block or the head of
+    the file. Candidates are taken while the total stays within `max_lines`
+    and `max_chars` (so long lines, e.g. minified code, cannot blow the
+    budget either), and overlapping or adjacent ones are merged.
+
+    Args:
+        text: File content.
+        path: Repository path (selects the Python structure parser).
+        anchor_lines: 1-based lines from the logs, most relevant first.
+        symbols: Identifiers referenced by the failure.
+        max_lines: Maximum number of lines across all regions.
+        max_chars: Maximum number of characters across all regions.
+        context_lines: Lines kept on each side of an anchor without a usable enclosing definition.
+
+    Returns:
+        Sorted, non-overlapping regions; empty when nothing was selected.
+    """
+    lines = text.split("\n")
+    total = len(lines)
+    structure = _python_structure(text) if path.endswith(".py") else None
+    spans, import_block = structure if structure else ([], None)
+    candidates: List[Region] = []
+
+    for anchor in anchor_lines:
+        index = anchor - 1
+        if not 0 <= index < total:
+            continue
+        enclosing = [span for span in spans if span[0] <= index < span[1]]
+        innermost = min(enclosing, key=lambda span: span[1] - span[0]) if enclosing else None
+        if innermost and innermost[1] - innermost[0] <= max_lines // 2:
+            candidates.append(Region(innermost[0], innermost[1], f"line {anchor} in {innermost[2]}"))
+        else:
+            candidates.append(Region(
+                max(0, index - context_lines), min(total, index + context_lines + 1), f"line {anchor}"
+            ))
+
+    # First definition of each name in the file
+    definitions: Dict[str, Tuple[int, int]] = {}
+    if structure:
+        for start, end, name in sorted(spans):
+            definitions.setdefault(name, (start, end))
+    else:
+        for i, line in enumerate(lines):
+            match = _DEFINITION_RE.match(line)
+            if match:
+                definitions.setdefault(match.group("name"), (i, min(total, i + 2 * context_lines)))
+    for name in symbols:
+        if name in definitions:
+            start, end = definitions[name]
+            if end - start <= max_lines // 2:
+                candidates.append(Region(start, end, f"definition of {name}"))
+
+    if import_block:
+        candidates.append(Region(import_block[0], import_block[1], "imports"))
+    elif not structure:
+        candidates.append(Region(0, min(total, HEADER_LINES), "file head"))
+
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line) + 1)
+    selected: List[Region] = []
+    for candidate in candidates:
+        merged = _merge(selected + [candidate])
+        if (sum(region.size for region in merged) <= max_lines
+                and sum(offsets[region.end] - offsets[region.start] for region in merged) <= max_chars):
+            selected = merged
+    return selected
+
+
+def line_window(text: str, line: int, max_lines: int, max_chars: int) -> Optional[Region]:
+    """
+    A single region centred on a line, for when `select_regions` finds nothing usable.
+
+    The window spans at most `max_lines` lines and is halved until it also
+    fits in `max_chars`.
+
+    Args:
+        text: File content.
+        line: 1-based line, usually the one locate pointed at.
+        max_lines: Maximum number of lines in the window.
+        max_chars: Maximum number of characters in the window.
+
+    Returns:
+        The region, or None when the line is outside the file or too long on its own.
+    """
+    lines = text.split("\n")
+    index = line - 1
+    if not 0 <= index < len(lines):
+        return None
+    half = max(0, (max_lines - 1) // 2)
+    while True:
+        start, end = max(0, index - half), min(len(lines), index + half + 1)
+        if sum(len(text_line) + 1 for text_line in lines[start:end]) <= max_chars:
+            return Region(start, end, f"{end - start} lines around line {line}")
+        if half == 0:
+            return None
+        half //= 2
+
+
+def _merge(regions: List[Region]) -> List[Region]:
+    """Sorts regions and merges overlapping or adjacent ones."""
+    merged: List[Region] = []
+    for region in sorted(regions):
+        if merged and region.start <= merged[-1].end:
+            last = merged[-1]
+            if region.end > last.end:
+                merged[-1] = Region(last.start, region.end, f"{last.reason}; {region.reason}")
+            elif region.reason not in last.reason:
+                merged[-1] = last._replace(reason=f"{last.reason}; {region.reason}")
+        else:
+            merged.append(region)
+    return merged
+
+
+def render_regions(text: str, regions: List[Region]) -> str:
+    """
+    Renders the regions of a file with numbered markers.
+
+    Every region is wrapped in `<<<REGION n (lines a-b)>>>` and
+    `<<<END REGION n>>>` lines, and every gap between regions is noted with
+    its line range, so the model sees where each region sits in the file.
+
+    Args:
+        text: File content.
+        regions: Output of `select_regions`.
+
+    Returns:
+        Prompt text.
+    """
+    lines = text.split("\n")
+    parts: List[str] = []
+    position = 0
+    for number, region in enumerate(regions, start=1):
+        if region.start > position:
+            parts.append(f"[lines {position + 1}-{region.start} omitted]")
+        parts.append(f"<<<REGION {number} (lines {region.start + 1}-{region.end})>>>")
+        parts.extend(lines[region.start:region.end])
+        parts.append(f"<<<END REGION {number}>>>")
+        position = region.end
+    if position < len(lines) and any(lines[position:]):
+        parts.append(f"[lines {position + 1}-{len(lines)} omitted]")
+    return "\n".join(parts)
+
+
+def splice_regions(text: str, path: str, regions: List[Region], edits: Dict[int, str]) -> str:
+    """
+    Replaces regions of a file with their edited content.
+
+    Regions are replaced from the last to the first, so earlier positions
+    stay valid; regions without an edit are kept. Marker lines the model
+    echoed back are dropped. A Python file that parsed before must still
+    parse afterwards.
+
+    Args:
+        text: Original file content.
+        path: Repository path.
+        regions: Regions sent to the model.
+        edits: New content by 1-based region number.
+
+    Returns:
+        The spliced file content.
+
+    Raises:
+        SpliceError: If an edit names an unknown region, nothing changes,
+            or the result no longer parses.
+    """
+    unknown = sorted(number for number in edits if not 1 <= number <= len(regions))
+    if unknown:
+        raise SpliceError(f"Unknown regions {unknown}")
+    newline = "\r\n" if "\r\n" in text else "\n"
+    lines = text.split(newline)
+    for number in sorted(edits, reverse=True):
+        region = regions[number - 1]
+        content = edits[number].replace("\r\n", "\n")
+        if content.endswith("\n"):
+            content = content[:-1]
+        new_lines = [line for line in content.split("\n") if not _MARKER_RE.match(line)]
+        lines[region.start:region.end] = new_lines
+    spliced = newline.join(lines)
+    if spliced == text:
+        raise SpliceError("Edits do not change the file")
+    if path.endswith(".py") and _python_structure(spliced) is None and _python_structure(text) is not None:
+        raise SpliceError("Spliced file does not parse")
+    return spliced
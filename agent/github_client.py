@@ -0,0 +1,485 @@
+import base64
+import binascii
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, TypedDict
+from urllib.parse import quote
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class GitHubAPIError(Exception):
+    """Raised when the GitHub API returns an error response."""
+
+    def __init__(self, message: str, status_code: int) -> None:
+        """
+        Initialize the error.
+
+        Args:
+            message: Error message returned by GitHub.
+            status_code: HTTP status of the response.
+        """
+        super().__init__(message)
+        self.status_code: int = status_code
+
+
+class GitHubNotFoundError(GitHubAPIError):
+    """Raised when the requested GitHub resource does not exist."""
+    pass
+
+
+def _raise_for_status(method: str, path: str, response: httpx.Response) -> None:
+    """
+    Raises the matching GitHub error for an error response.
+
+    Args:
+        method: HTTP method of the request.
+        path: API path of the request.
+        response: Response with its body already read.
+
+    Raises:
+        GitHubNotFoundError: If GitHub responded with 404.
+        GitHubAPIError: For any other error response.
+    """
+    if response.status_code < 400:
+        return
+    try:
+        message = response.json().get("message", response.text)
+    except ValueError:
+        message = response.text
+    error_class = GitHubNotFoundError if response.status_code == 404 else GitHubAPIError
+    raise error_class(f"{method} {path}: {response.status_code} {message}", response.status_code)
+
+
+def _decode_text(path: str, data: Dict[str, Any]) -> str:
+    """
+    Decodes the base64 content of a contents or blob response as UTF-8 text.
+
+    Args:
+        path: File path, for error messages.
+        data: Response object with `content` and `encoding`.
+
+    Returns:
+        The file's text.
+
+    Raises:
+        GitHubAPIError: If the content is not base64 or not UTF-8 text (e.g. a binary file).
+    """
+    if data.get("encoding") != "base64":
+        raise GitHubAPIError(f"{path}: unsupported content encoding {data.get('encoding')!r}", 200)
+    try:
+        return base64.b64decode(data.get("content") or "").decode()
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise GitHubAPIError(f"{path} is not a UTF-8 text file ({e})", 200)
+
+
+class RepoFile(TypedDict):
+    """A file read through the contents API."""
+    path: str
+    sha: str
+    content: str
+
+
+class AsyncGitHubClient:
+    """
+    Asynchronous GitHub REST client for the endpoints the agents use.
+
+    All requests go through one pooled `httpx.AsyncClient`, so connections
+    (and TLS sessions) to api.github.com are reused across nodes and jobs,
+    and a request in flight never blocks the event loop the way PyGithub's
+    synchronous calls did.
+    """
+
+    def __init__(
+        self,
+        token: str = settings.GITHUB_TOKEN,
+        base_url: str = settings.GITHUB_API_URL,
+        max_connections: int = settings.GITHUB_MAX_CONNECTIONS,
+        timeout_seconds: float = settings.GITHUB_TIMEOUT_SECONDS,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ) -> None:
+        """
+        Initialize the client. The HTTP client is created on first use.
+
+        Args:
+            token: GitHub token used for authentication.
+            base_url: GitHub REST API base URL.
+            max_connections: Maximum number of pooled connections.
+            timeout_seconds: Per-request timeout.
+            transport: Optional httpx transport, used by tests and benchmarks.
+        """
+        self._token: str = token
+        self._base_url: str = base_url
+        self._max_connections: int = max_connections
+        self._timeout: float = timeout_seconds
+        self._transport: Optional[httpx.AsyncBaseTransport] = transport
+        self._http: Optional[httpx.AsyncClient] = None
+
+    def _client(self) -> httpx.AsyncClient:
+        """Returns the shared HTTP client, creating it if needed."""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                base_url=self._base_url,
+                headers={
+                    "Authorization": f"Bearer {self._token}",
+                    "Accept": "application/vnd.github+json",
+                    "X-GitHub-Api-Version": "2022-11-28",
+                },
+                limits=httpx.Limits(
+                    max_connections=self._max_connections,
+                    max_keepalive_connections=self._max_connections
+                ),
+                timeout=self._timeout,
+                transport=self._transport,
+            )
+        return self._http
+
+    async def request(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        """
+        Sends a request to the GitHub API.
+
+        Args:
+            method: HTTP method.
+            path: API path relative to the base URL.
+            **kwargs: Passed through to `httpx.AsyncClient.request`.
+
+        Returns:
+            The successful response.
+
+        Raises:
+            GitHubNotFoundError: If GitHub responds with 404.
+            GitHubAPIError: For any other error response.
+        """
+        response = await self._client().request(method, path, **kwargs)
+        _raise_for_status(method, path, response)
+        return response
+
+    async def get_repo(self, repo_name: str) -> Dict[str, Any]:
+        """
+        Fetches repository metadata.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+
+        Returns:
+            Repository object as returned by GitHub.
+        """
+        return (await self.request("GET", f"/repos/{repo_name}")).json()
+
+    async def get_workflow_run(self, repo_name: str, run_id: int) -> Dict[str, Any]:
+        """
+        Fetches a workflow run.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            run_id: GitHub Actions workflow run ID.
+
+        Returns:
+            Workflow run object as returned by GitHub.
+        """
+        return (await self.request("GET", f"/repos/{repo_name}/actions/runs/{run_id}")).json()
+
+    async def list_workflow_runs(
+        self,
+        repo_name: str,
+        workflow_id: int,
+        branch: Optional[str] = None,
+        status: Optional[str] = None,
+        per_page: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Lists the most recent runs of a workflow, newest first.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            workflow_id: Workflow ID.
+            branch: Only runs for this branch.
+            status: Only runs with this status or conclusion (e.g. "success").
+            per_page: Number of runs to return.
+
+        Returns:
+            Workflow run objects as returned by GitHub.
+        """
+        params: Dict[str, Any] = {"per_page": per_page}
+        if branch:
+            params["branch"] = branch
+        if status:
+            params["status"] = status
+        response = await self.request(
+            "GET",
+            f"/repos/{repo_name}/actions/workflows/{workflow_id}/runs",
+            params=params
+        )
+        return response.json().get("workflow_runs") or []
+
+    async def list_commit_runs(self, repo_name: str, head_sha: str, per_page: int = 30) -> List[Dict[str, Any]]:
+        """
+        Lists the most recent workflow runs of any workflow for a commit, newest first.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            head_sha: Commit SHA the runs ran against.
+            per_page: Number of runs to return.
+
+        Returns:
+            Workflow run objects as returned by GitHub.
+        """
+        response = await self.request(
+            "GET",
+            f"/repos/{repo_name}/actions/runs",
+            params={"head_sha": head_sha, "per_page": per_page}
+        )
+        return response.json().get("workflow_runs") or []
+
+    async def list_run_jobs(self, repo_name: str, run_id: int) -> List[Dict[str, Any]]:
+        """
+        Lists the jobs of a workflow run's latest attempt, with their steps.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            run_id: GitHub Actions workflow run ID.
+
+        Returns:
+            Job objects as returned by GitHub, across all result pages.
+        """
+        jobs: List[Dict[str, Any]] = []
+        page = 1
+        while True:
+            response = await self.request(
+                "GET",
+                f"/repos/{repo_name}/actions/runs/{run_id}/jobs",
+                params={"filter": "latest", "per_page": 100, "page": page}
+            )
+            data = response.json()
+            batch = data.get("jobs") or []
+            jobs.extend(batch)
+            if not batch or len(jobs) >= data.get("total_count", 0):
+                return jobs
+            page += 1
+
+    @asynccontextmanager
+    async def stream_job_log(self, repo_name: str, job_id: int) -> AsyncIterator[httpx.Response]:
+        """
+        Opens a job's plain-text log as a streamed response.
+
+        GitHub answers with a redirect to short-lived blob storage; the
+        redirect is followed (httpx drops the token on the cross-origin hop)
+        and the body is left unread so callers can consume it line by line.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            job_id: Workflow job ID.
+
+        Yields:
+            The open response; the connection is released on exit.
+
+        Raises:
+            GitHubNotFoundError: If the log does not exist (or has expired).
+            GitHubAPIError: For any other error response.
+        """
+        path = f"/repos/{repo_name}/actions/jobs/{job_id}/logs"
+        async with self._client().stream("GET", path, follow_redirects=True) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                _raise_for_status("GET", path, response)
+            yield response
+
+    async def get_file(self, repo_name: str, path: str, ref: Optional[str] = None) -> RepoFile:
+        """
+        Reads a file through the contents API.
+
+        The contents API only inlines files up to 1 MB; for larger files it
+        answers with `encoding: "none"` and no content, so those are read
+        through the git blobs API (up to 100 MB) instead.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            path: File path within the repository.
+            ref: Branch, tag or commit to read from (default branch if omitted).
+
+        Returns:
+            The file's path, blob SHA and decoded text content.
+
+        Raises:
+            GitHubNotFoundError: If the path does not exist.
+            GitHubAPIError: If the path is a directory, is not UTF-8 text
+                or the request fails.
+        """
+        params = {"ref": ref} if ref else None
+        response = await self.request("GET", f"/repos/{repo_name}/contents/{quote(path)}", params=params)
+        data = response.json()
+        if isinstance(data, list) or data.get("type") != "file":
+            raise GitHubAPIError(f"{path} is not a file", response.status_code)
+        if data.get("encoding") != "base64":
+            logger.info(f"{repo_name}:{path} is too large for the contents API, reading its blob")
+            data = {**data, **await self.get_blob(repo_name, data["sha"])}
+        return {
+            "path": data["path"],
+            "sha": data["sha"],
+            "content": _decode_text(path, data),
+        }
+
+    async def get_blob(self, repo_name: str, sha: str) -> Dict[str, Any]:
+        """
+        Fetches a git blob.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            sha: Blob SHA.
+
+        Returns:
+            Blob object with `content`, `encoding` and `size`.
+        """
+        return (await self.request("GET", f"/repos/{repo_name}/git/blobs/{sha}")).json()
+
+    async def get_tree(self, repo_name: str, sha: str) -> Dict[str, Any]:
+        """
+        Fetches the full recursive git tree of a commit.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            sha: Commit (or tree) SHA.
+
+        Returns:
+            Tree object with `tree` entries (path, type, sha, size) and a
+            `truncated` flag set when GitHub cut the listing short.
+        """
+        response = await self.request(
+            "GET",
+            f"/repos/{repo_name}/git/trees/{sha}",
+            params={"recursive": "1"}
+        )
+        return response.json()
+
+    async def get_branch_sha(self, repo_name: str, branch: str) -> str:
+        """
+        Resolves a branch to the SHA of its head commit.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            branch: Branch name.
+
+        Returns:
+            Head commit SHA.
+        """
+        response = await self.request("GET", f"/repos/{repo_name}/git/ref/heads/{quote(branch)}")
+        return response.json()["object"]["sha"]
+
+    async def create_branch(self, repo_name: str, branch: str, sha: str) -> Dict[str, Any]:
+        """
+        Creates a branch pointing at a commit.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            branch: Name of the new branch.
+            sha: Commit the branch should point at.
+
+        Returns:
+            The created ref object.
+        """
+        response = await self.request(
+            "POST",
+            f"/repos/{repo_name}/git/refs",
+            json={"ref": f"refs/heads/{branch}", "sha": sha}
+        )
+        return response.json()
+
+    async def update_file(
+        self,
+        repo_name: str,
+        path: str,
+        message: str,
+        content: str,
+        sha: str,
+        branch: str
+    ) -> Dict[str, Any]:
+        """
+        Commits new content for an existing file.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            path: File path within the repository.
+            message: Commit message.
+            content: New file content.
+            sha: Blob SHA of the file being replaced.
+            branch: Branch to commit to.
+
+        Returns:
+            The contents API response (commit and content objects).
+        """
+        response = await self.request(
+            "PUT",
+            f"/repos/{repo_name}/contents/{quote(path)}",
+            json={
+                "message": message,
+                "content": base64.b64encode(content.encode()).decode(),
+                "sha": sha,
+                "branch": branch,
+            }
+        )
+        return response.json()
+
+    async def create_pull(
+        self,
+        repo_name: str,
+        title: str,
+        body: str,
+        head: str,
+        base: str,
+        draft: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Opens a pull request.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            title: Pull request title.
+            body: Pull request description.
+            head: Branch containing the changes.
+            base: Branch to merge into.
+            draft: Whether to open the PR as a draft.
+
+        Returns:
+            The created pull request object.
+        """
+        response = await self.request(
+            "POST",
+            f"/repos/{repo_name}/pulls",
+            json={"title": title, "body": body, "head": head, "base": base, "draft": draft}
+        )
+        return response.json()
+
+    async def close(self) -> None:
+        """Closes the pooled HTTP client."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+# Global client instance
+_github_client: Optional[AsyncGitHubClient] = None
+
+
+def get_github_client() -> AsyncGitHubClient:
+    """
+    Get the global GitHub client instance.
+
+    Returns:
+        Global AsyncGitHubClient singleton.
+    """
+    global _github_client
+    if _github_client is None:
+        _github_client = AsyncGitHubClient()
+    return _github_client
+
+
+async def close_github_client() -> None:
+    """Closes the global GitHub client, if one was created."""
+    global _github_client
+    if _github_client is not None:
+        await _github_client.close()
+        _github_client = None
@@ -0,0 +1,255 @@
+import ast
+import asyncio
+import logging
+import posixpath
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from agent.repo_index import RepoIndex
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (module, relative level, imported names) for one import statement;
+# `import a.b` is ("a.b", 0, []) and `from ..c import d` is ("c", 2, ["d"])
+ImportRef = Tuple[Optional[str], int, List[str]]
+
+# Files that mark the root of a Python project inside a repository
+PROJECT_MARKERS = ("pyproject.toml", "setup.py", "setup.cfg")
+
+
+def parse_imports(source: str) -> List[ImportRef]:
+    """
+    Parses every import statement in a Python source file, in source order.
+
+    Module-level function so it can run in a worker process.
+
+    Args:
+        source: Python source code.
+
+    Returns:
+        One ImportRef per import statement, including imports nested in
+        functions and conditional blocks.
+
+    Raises:
+        SyntaxError: If the source cannot be parsed.
+    """
+    refs: List[Tuple[int, ImportRef]] = []
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            refs.extend((node.lineno, (alias.name, 0, [])) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            refs.append((node.lineno, (node.module, node.level, [alias.name for alias in node.names])))
+    return [ref for _, ref in sorted(refs, key=lambda item: item[0])]
+
+
+class ModuleMap:
+    """
+    Maps dotted module names to files for one commit of a repository.
+
+    Modules are named relative to every source root: the repository root,
+    each directory holding a project marker (`pyproject.toml`, `setup.py`,
+    `setup.cfg`) and the `src/` directory of any of those. Packages map to
+    their `__init__.py`. When two roots produce the same name, the shallower
+    root wins.
+    """
+
+    def __init__(self, paths: Iterable[str]) -> None:
+        """
+        Builds the map.
+
+        Args:
+            paths: Every file path in the commit.
+        """
+        all_paths = list(paths)
+        self._files: Set[str] = {path for path in all_paths if path.endswith(".py")}
+        self._modules: Dict[str, str] = {}
+
+        roots = {""}
+        for path in all_paths:
+            directory, name = posixpath.split(path)
+            if name in PROJECT_MARKERS:
+                roots.add(f"{directory}/" if directory else "")
+        roots.update([f"{root}src/" for root in roots])
+        ordered_roots = sorted(roots, key=lambda root: (root.count("/"), root))
+
+        for path in sorted(self._files):
+            for root in ordered_roots:
+                if not path.startswith(root):
+                    continue
+                module = path[len(root):-len(".py")].replace("/", ".")
+                if module.endswith("__init__"):
+                    module = module[:-len("__init__")].rstrip(".")
+                if module:
+                    self._modules.setdefault(module, path)
+
+    def __len__(self) -> int:
+        return len(self._modules)
+
+    def resolve(self, module: str) -> Optional[str]:
+        """
+        Resolves an absolute module name.
+
+        Args:
+            module: Dotted module name.
+
+        Returns:
+            Path of the module file or package `__init__.py`, or None if the
+            module is not part of the repository.
+        """
+        return self._modules.get(module)
+
+    def resolve_relative(self, current_file: str, level: int, module: Optional[str]) -> Optional[str]:
+        """
+        Resolves a relative module against the importing file's location.
+
+        Args:
+            current_file: Path of the importing file.
+            level: Number of leading dots.
+            module: Module after the dots (None for `from . import x`).
+
+        Returns:
+            Path of the module file or package `__init__.py`, or None.
+        """
+        base = posixpath.dirname(current_file)
+        for _ in range(level - 1):
+            if not base:
+                return None
+            base = posixpath.dirname(base)
+        target = posixpath.join(base, *module.split(".")) if module else base
+        for path in (f"{target}.py", posixpath.join(target, "__init__.py")):
+            if path in self._files:
+                return path
+        return None
+
+    def resolve_import(self, ref: ImportRef, current_file: str) -> List[str]:
+        """
+        Resolves one import statement to the repository files it loads.
+
+        For `from x import y`, `y` is tried as a submodule first (`from . import
+        utils`); if no imported name is a submodule, `x` itself is returned.
+
+        Args:
+            ref: Parsed import statement.
+            current_file: Path of the importing file.
+
+        Returns:
+            Paths of repository files, empty for third-party or stdlib imports.
+        """
+        module, level, names = ref
+
+        def lookup(name: Optional[str]) -> Optional[str]:
+            if level:
+                return self.resolve_relative(current_file, level, name)
+            return self.resolve(name) if name else None
+
+        submodules = [
+            path for path in (
+                lookup(f"{module}.{name}" if module else name) for name in names if name != "*"
+            ) if path
+        ]
+        if submodules:
+            return submodules
+        path = lookup(module)
+        return [path] if path else []
+
+
+# Module maps of recently used commits, keyed by (repo, commit sha)
+_module_maps: "OrderedDict[Tuple[str, str], ModuleMap]" = OrderedDict()
+
+# Lazily created pool for parsing large files off the event loop
+_parse_pool: Optional[Executor] = None
+
+
+async def get_module_map(repo_name: str, commit_sha: str, index: RepoIndex) -> ModuleMap:
+    """
+    Returns the module map of a commit, building it once per commit.
+
+    Args:
+        repo_name: Full repository name (owner/repo).
+        commit_sha: Commit SHA the index was built from.
+        index: The commit's file index.
+
+    Returns:
+        The commit's module map, shared across jobs.
+    """
+    key = (repo_name, commit_sha)
+    module_map = _module_maps.get(key)
+    if module_map is None:
+        module_map = await asyncio.to_thread(ModuleMap, list(index))
+        _module_maps[key] = module_map
+        while len(_module_maps) > settings.REPO_INDEX_CACHE_SIZE:
+            _module_maps.popitem(last=False)
+    else:
+        _module_maps.move_to_end(key)
+    return module_map
+
+
+def _get_parse_pool() -> Optional[Executor]:
+    """Returns the process pool for parsing, or None if processes are unavailable."""
+    global _parse_pool
+    if _parse_pool is None:
+        try:
+            _parse_pool = ProcessPoolExecutor(max_workers=settings.IMPORT_PARSE_WORKERS)
+        except (OSError, NotImplementedError) as e:
+            logger.warning(f"Process pool unavailable, parsing large files in threads: {e}")
+            return None
+    return _parse_pool
+
+
+async def parse_imports_async(source: str) -> List[ImportRef]:
+    """
+    Parses imports, moving large files to a worker process.
+
+    Small files are parsed inline because handing them to a process costs
+    more than the parse. Files of `IMPORT_PARSE_OFFLOAD_BYTES` or more are
+    parsed in the process pool (or a thread if processes are unavailable)
+    so they do not stall other jobs on the event loop.
+
+    Args:
+        source: Python source code.
+
+    Returns:
+        Parsed import statements in source order.
+
+    Raises:
+        SyntaxError: If the source cannot be parsed.
+    """
+    if len(source) < settings.IMPORT_PARSE_OFFLOAD_BYTES:
+        return parse_imports(source)
+    pool = _get_parse_pool()
+    if pool is None:
+        return await asyncio.to_thread(parse_imports, source)
+    return await asyncio.get_running_loop().run_in_executor(pool, parse_imports, source)
+
+
+async def resolve_imports(source: str, current_file: str, module_map: ModuleMap) -> List[str]:
+    """
+    Lists the repository files a Python file imports.
+
+    Args:
+        source: Source code of the file.
+        current_file: Path of the file.
+        module_map: Module map of the commit the file was read at.
+
+    Returns:
+        Unique paths of imported repository files, in import order.
+
+    Raises:
+        SyntaxError: If the source cannot be parsed.
+    """
+    resolved: List[str] = []
+    for ref in await parse_imports_async(source):
+        for path in module_map.resolve_import(ref, current_file):
+            if path != current_file and path not in resolved:
+                resolved.append(path)
+    return resolved
+
+
+def shutdown_parse_pool() -> None:
+    """Shuts down the parsing process pool, if it was started."""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
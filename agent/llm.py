@@ -4,6 +4,12 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Vertex AI model versions behind each model type
+MODEL_NAMES: Dict[str, str] = {
+    "flash": "gemini-1.5-flash-001",
+    "pro": "gemini-1.5-pro-001",
+}
+
 class VertexAIClient:
     """
     Client wrapper for Vertex AI Gemini models using LangChain.
@@ -29,12 +35,12 @@ class VertexAIClient:
                 }
                 
                 self._flash_model = ChatVertexAI(
-                    model_name="gemini-1.5-flash-001",
+                    model_name=MODEL_NAMES["flash"],
                     **common_kwargs
                 )
                 
                 self._pro_model = ChatVertexAI(
-                    model_name="gemini-1.5-pro-001",
+                    model_name=MODEL_NAMES["pro"],
                     **common_kwargs
                 )
                 
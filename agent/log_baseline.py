@@ -0,0 +1,170 @@
+import asyncio
+import re
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, FrozenSet, Optional, Tuple
+
+from app.core.config import settings
+
+# Parts of a log line that differ between two runs of the same job without
+# meaning anything: timestamps, durations, commit/object hashes, temp paths
+_VOLATILE_RE = re.compile(
+    r"(?P<ts>\d{4}-\d\d-\d\d[T ]\d\d:\d\d:\d\d(?:[.,]\d+)?(?:Z|[+-]\d\d:?\d\d)?|\b\d\d:\d\d:\d\d(?:\.\d+)?\b)"
+    r"|(?P<tmp>(?:/tmp|/private/var/folders|/var/folders|/home/runner/work/_temp|/runner/_work/_temp"
+    r"|[A-Za-z]:\\Users\\[^\\\s]+\\AppData\\Local\\Temp)[^\s'\":,)]*)"
+    r"|(?P<uuid>\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b)"
+    r"|(?P<hash>\b[0-9a-f]{7,64}\b)"
+    r"|(?P<dur>\b\d+(?:\.\d+)?\s?(?:ms|us|µs|ns|s|secs?|seconds?|m|mins?|minutes?|h)\b)"
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+# Every volatile part contains a digit or a path separator
+_MAYBE_VOLATILE_RE = re.compile(r"[\d/\\]")
+
+
+def normalize_line(line: str) -> str:
+    """
+    Normalizes a log line so unchanged output matches across runs.
+
+    Args:
+        line: Log line without its leading timestamp.
+
+    Returns:
+        The line with volatile parts replaced by placeholders and whitespace
+        collapsed.
+    """
+    if _MAYBE_VOLATILE_RE.search(line):
+        line = _VOLATILE_RE.sub(lambda match: f"<{match.lastgroup}>", line)
+    return _WHITESPACE_RE.sub(" ", line).strip()
+
+
+def line_key(line: str) -> int:
+    """
+    Hashes a normalized log line for set membership.
+
+    Keys are only compared within one process, so the built-in string hash
+    is enough.
+
+    Args:
+        line: Log line without its leading timestamp.
+
+    Returns:
+        Hash of the normalized line.
+    """
+    return hash(normalize_line(line))
+
+
+class LogBaseline:
+    """Line keys of the jobs of a successful run, used to drop unchanged output."""
+
+    def __init__(self, run_id: int, job_keys: Dict[str, FrozenSet[int]]) -> None:
+        """
+        Initialize the baseline.
+
+        Args:
+            run_id: ID of the successful run.
+            job_keys: Line keys of each of its jobs, by job name.
+        """
+        self.run_id: int = run_id
+        self.job_keys: Dict[str, FrozenSet[int]] = job_keys
+
+
+class BaselineCache:
+    """
+    Process-wide LRU of hashed successful job logs keyed by `(repo, job id)`.
+
+    A finished job's log never changes, and consecutive failures of a
+    workflow usually diff against the same green run, so each baseline job
+    log is downloaded and hashed once. Concurrent requests for the same job
+    wait on a single in-flight download.
+    """
+
+    def __init__(self, max_entries: int = settings.LOG_BASELINE_CACHE_SIZE) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of job logs kept.
+        """
+        self._max_entries: int = max_entries
+        self._keys: "OrderedDict[Tuple[str, int], FrozenSet[int]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, int], "asyncio.Future[FrozenSet[int]]"] = {}
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+    async def get(
+        self,
+        repo_name: str,
+        job_id: int,
+        fetch_keys: Callable[[], Awaitable[FrozenSet[int]]]
+    ) -> FrozenSet[int]:
+        """
+        Returns the line keys of a successful job, hashing its log on a miss.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            job_id: Workflow job ID.
+            fetch_keys: Coroutine function that downloads and hashes the log.
+
+        Returns:
+            The job's line keys.
+
+        Raises:
+            GitHubAPIError: If the log could not be downloaded.
+        """
+        key = (repo_name, job_id)
+        keys = self._keys.get(key)
+        if keys is not None:
+            self._keys.move_to_end(key)
+            self._stats["hits"] += 1
+            return keys
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._stats["hits"] += 1
+            return await asyncio.shield(inflight)
+
+        self._stats["misses"] += 1
+        future: "asyncio.Future[FrozenSet[int]]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            keys = await fetch_keys()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so failures nobody waited on are not logged as unhandled
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(keys)
+        self._keys[key] = keys
+        while len(self._keys) > self._max_entries:
+            self._keys.popitem(last=False)
+        return keys
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns cache counters for the metrics endpoint.
+
+        Returns:
+            Dictionary with hit and miss counts and the entry count.
+        """
+        return {**self._stats, "entries": len(self._keys)}
+
+
+# Global cache instance
+_baseline_cache: Optional[BaselineCache] = None
+
+
+def get_baseline_cache() -> BaselineCache:
+    """
+    Get the global baseline cache.
+
+    Returns:
+        Global BaselineCache singleton.
+    """
+    global _baseline_cache
+    if _baseline_cache is None:
+        _baseline_cache = BaselineCache()
+    return _baseline_cache
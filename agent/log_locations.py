@@ -0,0 +1,107 @@
+import posixpath
+import re
+from typing import Dict, Iterable, Optional, Tuple
+
+from agent.log_parsers import EXTERNAL_PATH_RE, ErrorRecord
+from agent.repo_index import RepoIndex
+
+# Checkout roots of hosted and container runners
+_WORKSPACE_RE = re.compile(
+    r"^(?:/home/runner/work/[^/]+/[^/]+/|/__w/[^/]+/[^/]+/|[A-Za-z]:/a/[^/]+/[^/]+/|/github/workspace/)"
+)
+
+
+def normalize_log_path(path: str) -> str:
+    """
+    Turns a path printed in a CI log into a repository-relative path when possible.
+
+    Args:
+        path: Path as printed (absolute runner path, `./`-prefixed, Windows).
+
+    Returns:
+        Normalized path; still absolute if it is outside the checkout.
+    """
+    path = path.strip().strip("'\"").replace("\\", "/")
+    path = _WORKSPACE_RE.sub("", path)
+    while path.startswith("./"):
+        path = path[2:]
+    return posixpath.normpath(path) if path else path
+
+
+def resolve_record_path(record: ErrorRecord, index: RepoIndex) -> Optional[str]:
+    """
+    Maps the file of an error record to a file in the repository.
+
+    Paths that are not in the index as printed are matched by file name,
+    accepting a single indexed file whose path and the printed path end the
+    same way (e.g. an absolute path from another checkout root, or a path
+    relative to a sub-package).
+
+    Args:
+        record: Record from agent/log_parsers.py.
+        index: File index of the commit being repaired.
+
+    Returns:
+        The repository path, or None if it is external or not unique.
+    """
+    if not record.file:
+        return None
+    path = normalize_log_path(record.file)
+    if not path or EXTERNAL_PATH_RE.search(path):
+        return None
+    exists = index.contains(path)
+    if exists:
+        return path
+    candidates = [
+        candidate for candidate in index.find_name(posixpath.basename(path))
+        if path.endswith("/" + candidate) or candidate.endswith("/" + path)
+    ]
+    if len(candidates) == 1:
+        return candidates[0]
+    # A truncated index cannot rule the printed path out
+    if exists is None and not path.startswith("/"):
+        return path
+    return None
+
+
+def locate_from_records(
+    records: Iterable[ErrorRecord],
+    index: RepoIndex,
+    min_confidence: float
+) -> Optional[ErrorRecord]:
+    """
+    Picks the file to fix from the error records of a log.
+
+    Records are resolved against the repository and grouped by file; the
+    file with the most confident record wins, then the one mentioned most
+    often, then the one mentioned first.
+
+    Args:
+        records: Error records in log order.
+        index: File index of the commit being repaired.
+        min_confidence: Minimum confidence for a deterministic pick.
+
+    Returns:
+        The best record (with `file` set to the repository path), or None
+        when no record is confident enough.
+    """
+    best: Dict[str, Tuple[ErrorRecord, int, int]] = {}
+    for position, record in enumerate(records):
+        path = resolve_record_path(record, index)
+        if path is None:
+            continue
+        record = record._replace(file=path)
+        if path not in best:
+            best[path] = (record, 1, position)
+            continue
+        current, mentions, first_seen = best[path]
+        if record.confidence > current.confidence:
+            current = record
+        best[path] = (current, mentions + 1, first_seen)
+
+    if not best:
+        return None
+    record, _, _ = max(best.values(), key=lambda entry: (entry[0].confidence, entry[1], -entry[2]))
+    if record.confidence < min_confidence:
+        return None
+    return record
@@ -0,0 +1,812 @@
+import logging
+import re
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+# Records kept per job; later records are counted but dropped
+MAX_RECORDS = 200
+
+_ANSI_RE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+# Third-party and toolchain code is never the file to fix
+EXTERNAL_PATH_RE = re.compile(
+    r"(?:site-packages/|dist-packages/|node_modules/|/hostedtoolcache/|/lib/python\d|<frozen |<string>"
+    r"|^/usr/|^node:|/go/pkg/mod/|/usr/local/go/|\.cargo/registry/|/rustc/)"
+)
+
+
+class ErrorRecord(NamedTuple):
+    """One error recognized in a failure log."""
+    ecosystem: str  # parser that produced it
+    error_type: str  # exception class, compiler code or tool error kind
+    message: str
+    file: Optional[str] = None  # as printed in the log
+    line: Optional[int] = None
+    test_id: Optional[str] = None
+    confidence: float = 0.0  # how reliably file/line is the code to fix
+
+    def describe(self) -> str:
+        """One-line summary for prompts and logs."""
+        where = f"{self.file}:{self.line}" if self.file and self.line else (self.file or "")
+        parts = [f"[{self.ecosystem}]"]
+        if where:
+            parts.append(where)
+        if self.test_id:
+            parts.append(f"({self.test_id})")
+        message = self.message if self.message.startswith(self.error_type) else f"{self.error_type}: {self.message}"
+        parts.append(message[:200])
+        return " ".join(parts)
+
+
+def record_from_dict(data: Dict[str, Any]) -> ErrorRecord:
+    """
+    Rebuilds a record stored in agent state.
+
+    Args:
+        data: Output of `ErrorRecord._asdict()`.
+
+    Returns:
+        The record.
+    """
+    return ErrorRecord(**{field: data.get(field) for field in ErrorRecord._fields if field in data})
+
+
+def load_error_records(stored: Optional[List[Dict[str, Any]]], logs: str) -> List[ErrorRecord]:
+    """
+    Returns the error records of a job from agent state.
+
+    States checkpointed before records were collected only have the reduced
+    logs, which are parsed instead.
+
+    Args:
+        stored: `error_records` from agent state, if any.
+        logs: `error_logs` from agent state.
+
+    Returns:
+        The job's error records.
+    """
+    if stored is not None:
+        return [record_from_dict(data) for data in stored]
+    return parse_error_records(logs or "")
+
+
+def format_error_records(records: List[ErrorRecord], limit: int = 20) -> str:
+    """
+    Renders error records for a prompt, one line each.
+
+    Args:
+        records: Records in log order.
+        limit: Maximum number of lines; the rest are summarized as a count.
+
+    Returns:
+        Newline-separated summaries.
+    """
+    lines = [record.describe() for record in records[:limit]]
+    if len(records) > limit:
+        lines.append(f"... and {len(records) - limit} more")
+    return "\n".join(lines)
+
+
+class LogParser:
+    """
+    Streaming parser for one ecosystem's failure output.
+
+    Parsers see a log one line at a time through `feed`, a generator that
+    yields the records completed by that line, and keep only a bounded amount
+    of state (the current test, a pending message, a few stack frames).
+    `trigger` is searched in every line; lines that match no parser's trigger
+    are skipped without calling `feed` unless the parser is `active`, i.e. in
+    the middle of a multi-line construct such as a traceback. Triggers are
+    coarse, unanchored alternations that begin with a literal (the line is
+    checked properly by `feed`), so they stay cheap to search.
+    """
+
+    ecosystem: str = ""
+    trigger: str = ""
+
+    @property
+    def active(self) -> bool:
+        """Whether the parser needs to see every line (multi-line state)."""
+        return False
+
+    def feed(self, line: str) -> Iterator[ErrorRecord]:
+        """
+        Consumes one log line.
+
+        Args:
+            line: Log line without timestamp or trailing newline.
+
+        Yields:
+            Records completed by this line.
+        """
+        return iter(())
+
+    def close(self) -> Iterator[ErrorRecord]:
+        """
+        Flushes records still pending at the end of the log.
+
+        Yields:
+            Remaining records.
+        """
+        return iter(())
+
+
+_PARSERS: Dict[str, Type[LogParser]] = {}
+
+
+def register_log_parser(parser: Type[LogParser]) -> Type[LogParser]:
+    """
+    Registers a parser class under its ecosystem.
+
+    Args:
+        parser: LogParser subclass with `ecosystem` and `trigger` set.
+
+    Returns:
+        The class unchanged (usable as a decorator).
+
+    Raises:
+        ValueError: If the ecosystem already has a parser.
+    """
+    if parser.ecosystem in _PARSERS:
+        raise ValueError(f"Log parser for '{parser.ecosystem}' is already registered")
+    _PARSERS[parser.ecosystem] = parser
+    return parser
+
+
+def list_ecosystems() -> List[str]:
+    """
+    Lists the ecosystems with a registered parser.
+
+    Returns:
+        Ecosystem names in registration order.
+    """
+    return list(_PARSERS)
+
+
+_ERROR_TYPE_RE = re.compile(r"^(?P<type>[A-Za-z_][\w.]*(?:Error|Exception|Failure|Exit|Interrupt|Warning))\b")
+
+
+def _split_error(text: str) -> Tuple[str, str]:
+    """Splits `Type: message` into its parts; other text is an `Error`."""
+    match = _ERROR_TYPE_RE.match(text)
+    if match:
+        return match.group("type"), text
+    return "Error", text
+
+
+_PY_FRAME_RE = re.compile(r'^\s*File "(?P<path>[^"]+)", line (?P<line>\d+)')
+
+
+@register_log_parser
+class PytestParser(LogParser):
+    """pytest failure locations (`path:line: Error`), `E` lines and FAILED/ERROR summaries."""
+
+    ecosystem = "pytest"
+    trigger = r"FAILED |ERROR |\.py:\d+: \w|E   "
+
+    _LOCATION_RE = re.compile(r"^(?P<path>[\w./-]+\.py):(?P<line>\d+): (?P<type>\w+)$")
+    _SUMMARY_RE = re.compile(r"^(?:FAILED|ERROR) (?P<path>[\w./-]+\.py)(?P<test>::\S+)?(?: - (?P<message>.*))?$")
+
+    def __init__(self) -> None:
+        self._message: Optional[str] = None  # first `E` line of the current failure
+
+    def feed(self, line: str) -> Iterator[ErrorRecord]:
+        stripped = line.strip()
+        if stripped.startswith("E   "):
+            if self._message is None:
+                self._message = stripped[4:].strip()
+            return
+        match = self._LOCATION_RE.match(stripped)
+        if match:
+            error_type = match.group("type")
+            yield ErrorRecord(
+                self.ecosystem, error_type, self._message or error_type,
+                file=match.group("path"), line=int(match.group("line")), confidence=0.7
+            )
+            self._message = None
+            return
+        match = self._SUMMARY_RE.match(stripped)
+        if match:
+            error_type, message = _split_error(match.group("message") or "")
+            path = match.group("path")
+            yield ErrorRecord(
+                self.ecosystem, error_type, message,
+                file=path, test_id=path + (match.group("test") or ""), confidence=0.5
+            )
+
+
+@register_log_parser
+class UnittestParser(LogParser):
+    """
+    unittest failures and Python tracebacks in general: the innermost frame in
+    project code, with the exception line as message. Outer project frames
+    are kept at low confidence.
+    """
+
+    ecosystem = "unittest"
+    trigger = r'FAIL: |ERROR: |Traceback \(most recent call last\)|File "'
+
+    _TEST_RE = re.compile(r"^(?:FAIL|ERROR): (?P<name>\w+) \((?P<where>[\w.]+)\)")
+    _MAX_FRAMES = 50
+
+    def __init__(self) -> None:
+        self._test_id: Optional[str] = None
+        self._frames: Deque[Tuple[str, int]] = deque(maxlen=self._MAX_FRAMES)
+        self._in_traceback = False
+
+    @property
+    def active(self) -> bool:
+        return self._in_traceback
+
+    def _flush(self, exception: str) -> Iterator[ErrorRecord]:
+        error_type, message = _split_error(exception)
+        project = [frame for frame in self._frames if not EXTERNAL_PATH_RE.search(frame[0])]
+        if project:
+            path, line = project[-1]
+            yield ErrorRecord(self.ecosystem, error_type, message, path, line, self._test_id, 0.85)
+            for path, line in project[:-1]:
+                yield ErrorRecord(self.ecosystem, error_type, message, path, line, self._test_id, 0.3)
+        elif self._test_id:
+            yield ErrorRecord(self.ecosystem, error_type, message, test_id=self._test_id)
+        self._frames.clear()
+        self._in_traceback = False
+        self._test_id = None
+
+    def feed(self, line: str) -> Iterator[ErrorRecord]:
+        test = self._TEST_RE.match(line)
+        if test:
+            name, where = test.group("name"), test.group("where")
+            self._test_id = where if where.endswith("." + name) else f"{where}.{name}"
+            return
+        if line.startswith("Traceback (most recent call last)"):
+            self._frames.clear()
+            self._in_traceback = True
+            return
+        frame = _PY_FRAME_RE.match(line)
+        if frame:
+            # SyntaxErrors are reported with frames but without a header
+            self._frames.append((frame.group("path"), int(frame.group("line"))))
+            self._in_traceback = True
+            return
+        if self._in_traceback and line.strip() and not line.startswith((" ", "\t")):
+            yield from self._flush(line.strip())
+
+    def close(self) -> Iterator[ErrorRecord]:
+        if self._in_traceback:
+            yield from self._flush("")
+
+
+@register_log_parser
+class NpmParser(LogParser):
+    """Jest failures (`● Suite › test` blocks with their first project stack frame) and `npm ERR!` codes."""
+
+    ecosystem = "npm"
+    trigger = r"FAIL |PASS |●|npm ERR! code "
+
+    _FILE_RE = re.compile(r"^\s*(?:FAIL|PASS) (?P<path>\S+)")
+    _TEST_RE = re.compile(r"^\s*● (?P<name>.+)$")
+    _FRAME_RE = re.compile(r"^\s*at (?:.*\()?(?P<path>[^()\s]+?):(?P<line>\d+):\d+\)?$")
+    _NPM_CODE_RE = re.compile(r"^npm ERR! code (?P<code>\S+)")
+    _NPM_LINE_RE = re.compile(r"^npm ERR! (?P<message>.+)$")
+    _MAX_BLOCK_LINES = 200
+
+    def __init__(self) -> None:
+        self._file: Optional[str] = None
+        self._test: Optional[str] = None
+        self._message: Optional[str] = None
+        self._block_lines = 0
+        self._npm_code: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return self._test is not None or self._npm_code is not None
+
+    def _flush_test(self) -> Iterator[ErrorRecord]:
+        if self._test is not None:
+            error_type, message = _split_error(self._message or "")
+            test_id = f"{self._file} › {self._test}" if self._file else self._test
+            yield ErrorRecord(self.ecosystem, error_type, message, self._file, None, test_id, 0.5)
+        self._test = None
+        self._message = None
+        self._block_lines = 0
+
+    def feed(self, line: str) -> Iterator[ErrorRecord]:
+        if self._npm_code is not None:
+            code, self._npm_code = self._npm_code, None
+            npm_line = self._NPM_LINE_RE.match(line)
+            yield ErrorRecord(self.ecosystem, code, npm_line.group("message") if npm_line else code)
+        code = self._NPM_CODE_RE.match(line)
+        if code:
+            self._npm_code = code.group("code")
+            return
+        file_match = self._FILE_RE.match(line)
+        if file_match:
+            yield from self._flush_test()
+            self._file = file_match.group("path")
+            return
+        test = self._TEST_RE.match(line)
+        if test:
+            yield from self._flush_test()
+            self._test = test.group("name").strip()
+            return
+        if self._test is None:
+            return
+        self._block_lines += 1
+        stripped = line.strip()
+        frame = self._FRAME_RE.match(stripped)
+        if frame:
+            path = frame.group("path")
+            if not EXTERNAL_PATH_RE.search(path):
+                error_type, message = _split_error(self._message or "")
+                test_id = f"{self._file} › {self._test}" if self._file else self._test
+                yield ErrorRecord(
+                    self.ecosystem, error_type, message, path, int(frame.group("line")), test_id, 0.75
+                )
+                self._test = None
+                self._message = None
+                self._block_lines = 0
+            return
+        if self._message is None and stripped:
+            self._message = stripped
+        if self._block_lines >= self._MAX_BLOCK_LINES:
+            yield from self._flush_test()
+
+    def close(self) -> Iterator[ErrorRecord]:
+        if self._npm_code is not None:
+            yield ErrorRecord(self.ecosystem, self._npm_code, self._npm_code)
+            self._npm_code = None
+        yield from self._flush_test()
+
+
+@register_log_parser
+class TscParser(LogParser):
+    """TypeScript compiler errors in both the plain and the pretty format."""
+
+    ecosystem = "tsc"
+    trigger = r"error TS\d"
+
+    _ERROR_RE = re.compile(
+        r"^(?P<path>[\w./@-]+\.(?:ts|tsx|mts|cts|js|jsx|vue))"
+        r"(?:\((?P<line>\d+),\d+\)|:(?P<line2>\d+):\d+)\s*[:-]\s*error (?P<code>TS\d+): (?P<message>.*)$"
+    )
+
+    def feed(self, line: str) -> Iterator[ErrorRecord]:
+        match = self._ERROR_RE.match(line.strip())
+        if match:
+            yield ErrorRecord(
+                self.ecosystem, match.group("code"), match.group("message"),
+                file=match.group("path"), line=int(match.group("line") or match.group("line2")), confidence=0.9
+            )
+
+
+@register_log_parser
+class EslintParser(LogParser):
+    """eslint errors in the default (stylish) format: a file line, then `line:col  error  message  rule`."""
+
+    ecosystem = "eslint"
+    trigger = r"\.(?:[cm]?[jt]sx?|vue)$"
+
+    _FILE_RE = re.compile(r"^(?P<path>(?:/|[\w.@-]+/)[\w./@-]*\.(?:[cm]?[jt]sx?|vue))$")
+    _PROBLEM_RE = re.compile(r"^\s+(?P<line>\d+):\d+\s+error\s+(?P<message>.+?)(?:\s{2,}(?P<rule>[\w/@-]+))?$")
+
+    def __init__(self) -> None:
+        self._file: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return self._file is not None
+
+    def feed(self, line: str) -> Iterator[ErrorRecord]:
+        file_match = self._FILE_RE.match(line.strip())
+        if file_match:
+            self._file = file_match.group("path")
+            return
+        if self._file is None:
+            return
+        problem = self._PROBLEM_RE.match(line)
+        if problem:
+            yield ErrorRecord(
+                self.ecosystem, problem.group("rule") or "error", problem.group("message").strip(),
+                file=self._file, line=int(problem.group("line")), confidence=0.8
+            )
+        elif not line.strip() or not line.startswith((" ", "\t")):
+            self._file = None
+
+
+@register_log_parser
+class GoParser(LogParser):
+    """`go build`/`go vet` errors, `go test` failures and panics."""
+
+    ecosystem = "go"
+    trigger = r"=== RUN |--- FAIL: |panic: |\.go:\d+"
+
+    _RUN_RE = re.compile(r"^=== RUN\s+(?P<test>\S+)")
+    _FAIL_RE = re.compile(r"^\s*--- FAIL: (?P<test>\S+)")
+    _BUILD_RE = re.compile(r"^(?P<path>[\w./-]+\.go):(?P<line>\d+):\d+: (?P<message>.+)$")
+    _TEST_LOG_RE = re.compile(r"^\s+(?P<path>[\w./-]+\.go):(?P<line>\d+): (?P<message>.+)$")
+    _PANIC_RE = re.compile(r"^panic: (?P<message>.+)$")
+    _PANIC_FRAME_RE = re.compile(r"^\s+(?P<path>/?[\w./@-]+\.go):(?P<line>\d+)(?: \+0x[0-9a-f]+)?$")
+    _MAX_PANIC_LINES = 200
+
+    def __init__(self) -> None:
+        self._test: Optional[str] = None
+        self._panic: Optional[str] = None
+        self._panic_lines = 0
+
+    @property
+    def active(self) -> bool:
+        return self._panic is not None
+
+    def feed(self, line: str) -> Iterator[ErrorRecord]:
+        if self._panic is not None:
+            self._panic_lines += 1
+            frame = self._PANIC_FRAME_RE.match(line)
+            if frame and not EXTERNAL_PATH_RE.search(frame.group("path")):
+                yield ErrorRecord(
+                    self.ecosystem, "panic", self._panic, frame.group("path"), int(frame.group("line")),
+                    self._test, 0.8
+                )
+                self._panic = None
+            elif self._panic_lines >= self._MAX_PANIC_LINES:
+                yield ErrorRecord(self.ecosystem, "panic", self._panic, test_id=self._test)
+                self._panic = None
+            return
+        match = self._RUN_RE.match(line) or self._FAIL_RE.match(line)
+        if match:
+            self._test = match.group("test")
+            return
+        match = self._PANIC_RE.match(line)
+        if match:
+            self._panic = match.group("message")
+            self._panic_lines = 0
+            return
+        match = self._BUILD_RE.match(line.strip()) if not line.startswith((" ", "\t")) else None
+        if match:
+            yield ErrorRecord(
+                self.ecosystem, "build error", match.group("message"),
+                file=match.group("path"), line=int(match.group("line")), confidence=0.8
+            )
+            return
+        match = self._TEST_LOG_RE.match(line)
+        if match:
+            yield ErrorRecord(
+                self.ecosystem, "test failure", match.group("message"),
+                match.group("path"), int(match.group("line")), self._test, 0.6
+            )
+
+    def close(self) -> Iterator[ErrorRecord]:
+        if self._panic is not None:
+            yield ErrorRecord(self.ecosystem, "panic", self._panic, test_id=self._test)
+            self._panic = None
+
+
+@register_log_parser
+class CargoParser(LogParser):
+    """rustc errors (`error[E0308]: ...` followed by ` --> path:line:col`) and test panics."""
+
+    ecosystem = "cargo"
+    trigger = r"error: |error\[E|--> |panicked at |---- "
+
+    _ERROR_RE = re.compile(r"^error(?:\[(?P<code>E\d+)\])?: (?P<message>.+)$")
+    _ARROW_RE = re.compile(r"^\s*--> (?P<path>[\w./-]+\.rs):(?P<line>\d+):\d+$")
+    _TEST_RE = re.compile(r"^---- (?P<test>\S+) stdout ----")
+    # Rust >= 1.73: "panicked at src/lib.rs:12:5:" with the message on the next line
+    _PANIC_RE = re.compile(r"^thread '(?P<test>[^']+)' panicked at (?P<path>[\w./-]+\.rs):(?P<line>\d+):\d+:$")
+    _OLD_PANIC_RE = re.compile(
+        r"^thread '(?P<test>[^']+)' panicked at '(?P<message>.*)', (?P<path>[\w./-]+\.rs):(?P<line>\d+):\d+$"
+    )
+
+    def __init__(self) -> None:
+        self._error: Optional[Tuple[str, str]] = None  # (code, message) awaiting its location
+        self._error_lines = 0
+        self._panic: Optional[Tuple[str, str, int]] = None  # (test, path, line) awaiting its message
+
+    @property
+    def active(self) -> bool:
+        return self._panic is not None or self._error is not None
+
+    def feed(self, line: str) -> Iterator[ErrorRecord]:
+        if self._panic is not None:
+            test, path, line_number = self._panic
+            self._panic = None
+            yield ErrorRecord(self.ecosystem, "panic", line.strip(), path, line_number, test, 0.7)
+            return
+        match = self._ERROR_RE.match(line)
+        if match:
+            message = match.group("message")
+            # Summary lines have no location of their own
+            if message.startswith(("could not compile", "aborting due to")):
+                self._error = None
+            else:
+                self._error = (match.group("code") or "error", message)
+                self._error_lines = 0
+            return
+        arrow = self._ARROW_RE.match(line)
+        if arrow:
+            if self._error is not None:
+                code, message = self._error
+                self._error = None
+                yield ErrorRecord(
+                    self.ecosystem, code, message,
+                    file=arrow.group("path"), line=int(arrow.group("line")), confidence=0.9
+                )
+            return
+        if self._error is not None:
+            self._error_lines += 1
+            if self._error_lines > 3:
+                self._error = None
+        match = self._PANIC_RE.match(line)
+        if match:
+            self._panic = (match.group("test"), match.group("path"), int(match.group("line")))
+            return
+        match = self._OLD_PANIC_RE.match(line)
+        if match:
+            yield ErrorRecord(
+                self.ecosystem, "panic", match.group("message"),
+                match.group("path"), int(match.group("line")), match.group("test"), 0.7
+            )
+
+
+@register_log_parser
+class MavenParser(LogParser):
+    """javac errors, surefire test failures and build failures reported by Maven."""
+
+    ecosystem = "maven"
+    trigger = r"\[ERROR\] "
+
+    _COMPILE_RE = re.compile(r"^\[ERROR\] (?P<path>\S+\.(?:java|kt|scala)):\[(?P<line>\d+),\d+\] (?P<message>.+)$")
+    # [ERROR] com.acme.CartTest.testTotal:42 expected:<10> but was:<0>
+    _TEST_RE = re.compile(
+        r"^\[ERROR\]\s+(?P<cls>(?:[a-z_][\w]*\.)*[A-Z]\w*)\.(?P<method>\w+):(?P<line>\d+)\s+(?P<message>.*)$"
+    )
+    # [ERROR] testTotal(com.acme.CartTest)  Time elapsed: 0.01 s  <<< FAILURE!
+    _LEGACY_TEST_RE = re.compile(
+        r"^\[ERROR\] (?P<method>\w+)\((?P<cls>[\w.]+)\)\s+Time elapsed.*<<< (?P<kind>FAILURE|ERROR)!"
+    )
+    _GOAL_RE = re.compile(r"^\[ERROR\] Failed to execute goal (?P<message>.+)$")
+
+    def feed(self, line: str) -> Iterator[ErrorRecord]:
+        stripped = line.strip()
+        match = self._COMPILE_RE.match(stripped)
+        if match:
+            yield ErrorRecord(
+                self.ecosystem, "compilation error", match.group("message"),
+                file=match.group("path"), line=int(match.group("line")), confidence=0.9
+            )
+            return
+        match = self._TEST_RE.match(stripped)
+        if match:
+            cls = match.group("cls")
+            error_type, message = _split_error(match.group("message"))
+            yield ErrorRecord(
+                self.ecosystem, error_type, message, cls.replace(".", "/") + ".java",
+                int(match.group("line")), f"{cls}.{match.group('method')}", 0.6
+            )
+            return
+        match = self._LEGACY_TEST_RE.match(stripped)
+        if match:
+            cls = match.group("cls")
+            yield ErrorRecord(
+                self.ecosystem, "test " + match.group("kind").lower(), stripped,
+                cls.replace(".", "/") + ".java", None, f"{cls}.{match.group('method')}", 0.5
+            )
+            return
+        match = self._GOAL_RE.match(stripped)
+        if match:
+            yield ErrorRecord(self.ecosystem, "build failure", match.group("message"))
+
+
+@register_log_parser
+class PipParser(LogParser):
+    """pip resolver and install errors, located in the requirements file when pip names it."""
+
+    ecosystem = "pip"
+    trigger = r"ERROR: |\(from -r |error: subprocess-exited-with-error"
+
+    _REQUIREMENT_SOURCE_RE = re.compile(
+        r"^Collecting (?P<name>[A-Za-z0-9._-]+).*\(from -r (?P<path>\S+) \(line (?P<line>\d+)\)\)"
+    )
+    _ERRORS: Tuple[Tuple[re.Pattern, str], ...] = (
+        (re.compile(r"^ERROR: Could not find a version that satisfies the requirement (?P<name>[A-Za-z0-9._-]+)"),
+         "NoMatchingVersion"),
+        (re.compile(r"^ERROR: No matching distribution found for (?P<name>[A-Za-z0-9._-]+)"),
+         "NoMatchingDistribution"),
+        (re.compile(r"^ERROR: ResolutionImpossible"), "ResolutionImpossible"),
+        (re.compile(r"^ERROR: Cannot install (?P<name>[A-Za-z0-9._-]+).* conflicting dependencies"),
+         "DependencyConflict"),
+        (re.compile(r"^ERROR: pip's dependency resolver does not currently take into account"),
+         "DependencyConflict"),
+        (re.compile(r"^ERROR: Could not install packages"), "InstallError"),
+        (re.compile(r"^error: subprocess-exited-with-error"), "BuildError"),
+    )
+    _MAX_SOURCES = 256
+
+    def __init__(self) -> None:
+        # Requirement name -> (requirements file, line), most recent last
+        self._sources: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+
+    def feed(self, line: str) -> Iterator[ErrorRecord]:
+        stripped = line.strip()
+        source = self._REQUIREMENT_SOURCE_RE.match(stripped)
+        if source:
+            name = source.group("name").lower()
+            self._sources[name] = (source.group("path"), int(source.group("line")))
+            self._sources.move_to_end(name)
+            if len(self._sources) > self._MAX_SOURCES:
+                self._sources.popitem(last=False)
+            return
+        for pattern, error_type in self._ERRORS:
+            match = pattern.match(stripped)
+            if match:
+                name = match.groupdict().get("name")
+                path, line_number = self._sources.get(name.lower(), (None, None)) if name else (None, None)
+                yield ErrorRecord(
+                    self.ecosystem, error_type, stripped[len("ERROR: "):] if stripped.startswith("ERROR: ") else stripped,
+                    file=path, line=line_number, confidence=0.7 if path else 0.0
+                )
+                return
+
+
+@register_log_parser
+class CompilerParser(LogParser):
+    """gcc/clang/swift/kotlin style `path:line[:col]: error: message` diagnostics."""
+
+    ecosystem = "compiler"
+    trigger = r"\.(?:c|cc|cpp|cxx|h|hpp|m|mm|swift|kt|cs|scala):\d+(?::\d+)?: (?:fatal )?error"
+
+    _ERROR_RE = re.compile(
+        r"^(?P<path>[\w./-]+\.(?:c|cc|cpp|cxx|h|hpp|m|mm|swift|kt|cs|scala)):(?P<line>\d+)(?::\d+)?:\s*"
+        r"(?:fatal )?error:?\s*(?P<message>.+)$"
+    )
+
+    def feed(self, line: str) -> Iterator[ErrorRecord]:
+        match = self._ERROR_RE.match(line.strip())
+        if match:
+            yield ErrorRecord(
+                self.ecosystem, "error", match.group("message"),
+                file=match.group("path"), line=int(match.group("line")), confidence=0.9
+            )
+
+
+class ErrorRecordExtractor:
+    """
+    Runs the registered parsers side by side over one stream of log lines.
+
+    One combined trigger regex decides which lines reach the parsers, so the
+    bulk of a log (install output, passing tests) costs a single regex search
+    per line. Identical records are reported once, and at most `max_records`
+    are kept; memory does not depend on the length of the log.
+    """
+
+    def __init__(self, ecosystems: Optional[Iterable[str]] = None, max_records: int = MAX_RECORDS) -> None:
+        """
+        Initialize the extractor.
+
+        Args:
+            ecosystems: Ecosystems to parse; all registered ones by default.
+            max_records: Maximum number of records kept by `feed_lines`.
+        """
+        names = list(ecosystems) if ecosystems is not None else list(_PARSERS)
+        self._parsers: List[LogParser] = [_PARSERS[name]() for name in names]
+        # Triggers are plain alternations starting with literals; joined
+        # without groups the regex engine can skip ahead to candidate
+        # positions instead of trying every branch at every offset
+        self._trigger = re.compile("|".join(parser.trigger for parser in self._parsers))
+        self._active: List[LogParser] = []  # parsers in the middle of a multi-line construct
+        self._max_records: int = max_records
+        self._seen: set = set()
+        self.records: List[ErrorRecord] = []
+        self.dropped: int = 0
+        self.lines_seen: int = 0
+
+    def _accept(self, record: ErrorRecord) -> bool:
+        """Deduplicates records, keeping the key set within the record limit."""
+        if record in self._seen:
+            return False
+        if len(self._seen) < self._max_records * 4:
+            self._seen.add(record)
+        return True
+
+    def feed(self, line: str) -> Iterator[ErrorRecord]:
+        """
+        Consumes one log line.
+
+        Args:
+            line: Log line without timestamp or trailing newline.
+
+        Yields:
+            New records completed by this line.
+        """
+        self.lines_seen += 1
+        if "\x1b" in line:
+            line = _ANSI_RE.sub("", line)
+        if self._trigger.search(line) is not None:
+            parsers = self._parsers
+        elif self._active:
+            parsers = self._active
+        else:
+            return
+        for parser in parsers:
+            try:
+                for record in parser.feed(line):
+                    if self._accept(record):
+                        yield record
+            except Exception as e:
+                logger.warning(f"Log parser {parser.ecosystem} failed on a line: {e}")
+        self._active = [parser for parser in self._parsers if parser.active]
+
+    def feed_lines(self, lines: Iterable[str]) -> None:
+        """
+        Consumes lines, keeping the records they complete.
+
+        Args:
+            lines: Log lines without timestamps or trailing newlines.
+        """
+        for line in lines:
+            for record in self.feed(line):
+                self._keep(record)
+
+    def finish(self) -> Iterator[ErrorRecord]:
+        """
+        Flushes the parsers at the end of the stream.
+
+        Yields:
+            New records that were still pending.
+        """
+        for parser in self._parsers:
+            for record in parser.close():
+                if self._accept(record):
+                    yield record
+
+    def close(self) -> List[ErrorRecord]:
+        """
+        Flushes pending records at the end of the stream.
+
+        Returns:
+            All kept records.
+        """
+        for record in self.finish():
+            self._keep(record)
+        return self.records
+
+    def _keep(self, record: ErrorRecord) -> None:
+        """Keeps a record unless the limit is reached."""
+        if len(self.records) < self._max_records:
+            self.records.append(record)
+        else:
+            self.dropped += 1
+
+
+def iter_error_records(lines: Iterable[str], ecosystems: Optional[Iterable[str]] = None) -> Iterator[ErrorRecord]:
+    """
+    Streams error records out of a log.
+
+    Args:
+        lines: Log lines (any iterable, e.g. an open file), read one at a time.
+        ecosystems: Ecosystems to parse; all registered ones by default.
+
+    Yields:
+        Records in the order they complete.
+    """
+    extractor = ErrorRecordExtractor(ecosystems)
+    for line in lines:
+        yield from extractor.feed(line.rstrip("\r\n"))
+    yield from extractor.finish()
+
+
+def parse_error_records(logs: str, max_records: int = MAX_RECORDS) -> List[ErrorRecord]:
+    """
+    Extracts error records from a log held in memory (e.g. reduced logs).
+
+    Args:
+        logs: Log text.
+        max_records: Maximum number of records to keep.
+
+    Returns:
+        Records in the order they complete.
+    """
+    extractor = ErrorRecordExtractor(max_records=max_records)
+    extractor.feed_lines(logs.splitlines())
+    return extractor.close()
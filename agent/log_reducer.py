@@ -0,0 +1,297 @@
+import re
+from collections import deque
+from typing import Deque, Iterable, List, Optional, Pattern, Tuple
+
+from app.core.config import settings
+
+# Rough characters per token for CI logs (paths and punctuation tokenize densely)
+CHARS_PER_TOKEN = 4
+
+# Line markers of a failure and how strongly each points at the root cause
+ERROR_MARKERS: List[Tuple[Pattern[str], int]] = [
+    (re.compile(r"Traceback \(most recent call last\)"), 5),
+    (re.compile(r"##\[error\]"), 4),
+    (re.compile(r"\b[A-Z]\w*(?:Error|Exception):"), 4),
+    (re.compile(r"exit(?:ed with)? code [1-9]\d*|exit status [1-9]\d*"), 4),
+    (re.compile(r"\bpanic:|\bFATAL\b|\bfatal:"), 4),
+    (re.compile(r"\bFAILED\b|\bFAIL\b|\bFailed\b"), 3),
+    (re.compile(r"\berror(?:\[\w+\])?:|\bERROR\b|npm ERR!", re.IGNORECASE), 3),
+    (re.compile(r"\bAssertionError\b|\bassert\b"), 2),
+]
+
+# Cheap pre-check on lowercased text: every marker above contains one of
+# these words, and most log lines contain none of them
+_MARKER_WORDS = ("err", "exception", "traceback", "fail", "fatal", "panic", "exit", "assert")
+
+# Lines checked together by `feed_lines` before falling back to line-by-line scoring
+_BATCH_LINES = 256
+
+# A window at the very end of the log outranks an identical one at the start by this much
+TAIL_BIAS = 3.0
+
+# Room reserved for one "[... N lines omitted ...]" gap marker
+_GAP_MARKER_CHARS = 32
+
+
+def score_line(line: str) -> int:
+    """
+    Scores how strongly a log line looks like part of a failure.
+
+    Args:
+        line: One log line.
+
+    Returns:
+        Sum of the weights of the markers it contains (0 for ordinary output).
+    """
+    lowered = line.lower()
+    if not any(word in lowered for word in _MARKER_WORDS):
+        return 0
+    return sum(weight for pattern, weight in ERROR_MARKERS if pattern.search(line))
+
+
+class _Window:
+    """Consecutive lines around one or more error markers."""
+
+    __slots__ = ("lines", "score", "chars", "open_until")
+
+    def __init__(self) -> None:
+        self.lines: List[Tuple[int, str]] = []
+        self.score: int = 0
+        self.chars: int = 0
+        self.open_until: int = -1
+
+    def add(self, index: int, line: str) -> None:
+        self.lines.append((index, line))
+        self.chars += len(line) + 1
+
+
+class LogReducer:
+    """
+    Streaming reducer that keeps the parts of a log that explain a failure.
+
+    Lines are fed one at a time. Lines with error markers open a window that
+    takes a few lines of context before and after them; overlapping windows
+    merge. A rolling tail of the log is always kept, since CI runs usually
+    fail at the end. Memory stays within a small multiple of the budget:
+    once held windows exceed it, the weakest, earliest ones are dropped.
+
+    `result()` fills the budget with the tail share first, then the best
+    windows (scored by their markers, with a bias toward later lines), then
+    more of the tail, and joins the kept lines in log order with a marker for
+    every gap.
+    """
+
+    def __init__(
+        self,
+        max_chars: int,
+        context_before: int = 5,
+        context_after: int = 10,
+        tail_share: float = 0.25
+    ) -> None:
+        """
+        Initialize the reducer.
+
+        Args:
+            max_chars: Size of the reduced log.
+            context_before: Lines kept before each error line.
+            context_after: Lines kept after each error line.
+            tail_share: Fraction of the budget reserved for the end of the log.
+        """
+        self.max_chars: int = max_chars
+        self.context_after: int = context_after
+        self.tail_share: float = tail_share
+        self.lines_seen: int = 0
+        self.chars_seen: int = 0
+        self._before: Deque[Tuple[int, str]] = deque(maxlen=context_before)
+        self._tail: Deque[Tuple[int, str]] = deque()
+        self._tail_chars: int = 0
+        self._windows: List[_Window] = []
+        self._window_chars: int = 0
+        self._current: Optional[_Window] = None
+        self._headers: List[Tuple[int, str]] = []
+
+    def add_header(self, text: str) -> None:
+        """
+        Adds a section header (job or step name) that is always kept.
+
+        Args:
+            text: Header line.
+        """
+        self._headers.append((self.lines_seen, text))
+        self.lines_seen += 1
+        self._close_window()
+        self._before.clear()
+
+    def feed(self, line: str) -> None:
+        """
+        Adds the next log line.
+
+        Args:
+            line: Log line without its trailing newline.
+        """
+        index = self.lines_seen
+        self.lines_seen += 1
+        self.chars_seen += len(line) + 1
+
+        self._tail.append((index, line))
+        self._tail_chars += len(line) + 1
+        while self._tail_chars > self.max_chars and len(self._tail) > 1:
+            self._tail_chars -= len(self._tail.popleft()[1]) + 1
+
+        score = score_line(line)
+        window = self._current
+        if score:
+            if window is None:
+                window = self._current = _Window()
+                for before_index, before_line in self._before:
+                    window.add(before_index, before_line)
+            window.score += score
+            window.open_until = index + self.context_after
+        if window is not None:
+            window.add(index, line)
+            if index >= window.open_until or window.chars >= self.max_chars:
+                self._close_window()
+        self._before.append((index, line))
+
+    def feed_lines(self, lines: Iterable[str]) -> None:
+        """
+        Adds several log lines.
+
+        Lines are checked in batches: a batch without any marker word, fed
+        while no window is open, only moves the tail and context buffers.
+
+        Args:
+            lines: Log lines without trailing newlines.
+        """
+        batch: List[str] = []
+        for line in lines:
+            batch.append(line)
+            if len(batch) == _BATCH_LINES:
+                self._feed_batch(batch)
+                batch = []
+        if batch:
+            self._feed_batch(batch)
+
+    def _feed_batch(self, batch: List[str]) -> None:
+        """Adds a batch of lines, skipping per-line scoring when none can match."""
+        if self._current is not None:
+            for line in batch:
+                self.feed(line)
+            return
+        lowered = "\n".join(batch).lower()
+        if any(word in lowered for word in _MARKER_WORDS):
+            for line in batch:
+                self.feed(line)
+            return
+
+        indexed = list(zip(range(self.lines_seen, self.lines_seen + len(batch)), batch))
+        chars = sum(map(len, batch)) + len(batch)
+        self.lines_seen += len(batch)
+        self.chars_seen += chars
+        self._before.extend(indexed)
+        self._tail.extend(indexed)
+        self._tail_chars += chars
+        while self._tail_chars > self.max_chars and len(self._tail) > 1:
+            self._tail_chars -= len(self._tail.popleft()[1]) + 1
+
+    def _close_window(self) -> None:
+        """Moves the open window into the held set, evicting weak windows if over budget."""
+        window = self._current
+        if window is None:
+            return
+        self._current = None
+        self._windows.append(window)
+        self._window_chars += window.chars
+        while self._window_chars > 2 * self.max_chars and len(self._windows) > 1:
+            weakest = min(range(len(self._windows)), key=lambda i: (self._windows[i].score, i))
+            self._window_chars -= self._windows.pop(weakest).chars
+
+    def _priority(self, window: _Window) -> float:
+        """Ranks a window by its markers, favouring windows near the end."""
+        position = window.lines[-1][0] / max(self.lines_seen - 1, 1)
+        return window.score + TAIL_BIAS * position
+
+    def result(self) -> str:
+        """
+        Builds the reduced log from everything fed so far.
+
+        Returns:
+            The kept lines in log order, within `max_chars`.
+        """
+        self._close_window()
+        kept = {index: text for index, text in self._headers}
+        # Every header and the tail may be preceded by a gap marker
+        budget = self.max_chars - sum(len(text) + 1 + _GAP_MARKER_CHARS for text in kept.values()) - _GAP_MARKER_CHARS
+
+        def take(lines: Iterable[Tuple[int, str]], limit: int) -> int:
+            """Keeps lines while they fit in `limit`; returns the characters used."""
+            used = 0
+            for index, line in lines:
+                if index in kept:
+                    continue
+                if used + len(line) + 1 > limit:
+                    break
+                kept[index] = line
+                used += len(line) + 1
+            return used
+
+        def take_tail(limit: int) -> int:
+            """Keeps lines from the end of the log backwards while they fit in `limit`."""
+            return take(reversed(self._tail), limit)
+
+        budget -= take_tail(int(budget * self.tail_share))
+        ranked = sorted(self._windows, key=self._priority, reverse=True)
+        taken = 0
+        for window in ranked:
+            # Leave room for the gap markers the window adds
+            if window.chars + 2 * _GAP_MARKER_CHARS > budget:
+                continue
+            budget -= take(window.lines, budget - 2 * _GAP_MARKER_CHARS) + 2 * _GAP_MARKER_CHARS
+            taken += 1
+        if ranked and not taken and budget > 2 * _GAP_MARKER_CHARS:
+            # Only oversized windows: keep the start of the strongest one
+            budget -= take(ranked[0].lines, budget - 2 * _GAP_MARKER_CHARS) + 2 * _GAP_MARKER_CHARS
+        take_tail(max(budget, 0))
+
+        parts: List[str] = []
+        previous = -1
+        for index in sorted(kept):
+            if index > previous + 1:
+                parts.append(f"[... {index - previous - 1} lines omitted ...]")
+            parts.append(kept[index])
+            previous = index
+        if self.lines_seen > previous + 1:
+            parts.append(f"[... {self.lines_seen - previous - 1} lines omitted ...]")
+        return "\n".join(parts)[:self.max_chars]
+
+
+def token_budget_chars(tokens: Optional[int] = None) -> int:
+    """
+    Converts a token budget into the character budget the reducer works in.
+
+    Args:
+        tokens: Token budget for the log part of a prompt; defaults to
+            `DIAGNOSE_LOG_TOKEN_BUDGET`.
+
+    Returns:
+        Approximate number of characters.
+    """
+    return (tokens if tokens is not None else settings.DIAGNOSE_LOG_TOKEN_BUDGET) * CHARS_PER_TOKEN
+
+
+def reduce_log(text: str, max_chars: int) -> str:
+    """
+    Reduces a complete log held in memory.
+
+    Args:
+        text: Log text.
+        max_chars: Size of the reduced log.
+
+    Returns:
+        The reduced log; `text` unchanged if it already fits.
+    """
+    if len(text) <= max_chars:
+        return text
+    reducer = LogReducer(max_chars)
+    reducer.feed_lines(text.splitlines())
+    return reducer.result()
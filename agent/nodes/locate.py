@@ -1,6 +1,5 @@
 import logging
-from github import Github
-from app.core.config import settings
+from agent.repo_session import RepairSession
 from agent.state import AgentState
 from agent.llm import vertex_client
 from agent.utils import estimate_vertex_cost
@@ -21,9 +20,6 @@ async def locate_node(state: AgentState) -> AgentState:
     logger.info(f"Locating file for root cause: {state['root_cause']}")
     
     try:
-        gh = Github(settings.GITHUB_TOKEN)
-        repo = gh.get_repo(state['repo_name'])
-        
         # Get model and configure structured output
         model = vertex_client.get_model("flash")
         structured_llm = model.with_structured_output(LocateResponse, include_raw=True)
@@ -43,7 +39,7 @@ async def locate_node(state: AgentState) -> AgentState:
         target_file = parsed_result.file_path.strip()
         
         # Gather context files for better understanding
-        context_files = await get_related_files(repo, state['repo_name'], target_file, state.get('root_cause', ''))
+        context_files = await get_related_files(RepairSession(state['job_id'], state['repo_name']), target_file, state.get('root_cause', ''))
         
         logger.info(f"Located target file: {target_file}, gathered {len(context_files)} context files")
         
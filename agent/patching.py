@@ -0,0 +1,278 @@
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Hunk header; models often get the counts wrong, so only the start line is used
+_HUNK_HEADER_RE = re.compile(r"^@@ -(?P<start>\d+)(?:,\d+)? \+\d+(?:,\d+)? @@")
+_FENCE_RE = re.compile(r"^```")
+_SPACE_RE = re.compile(r"\s+")
+
+# Line normalizations tried in order when context lines do not match exactly
+_NORMALIZERS: Tuple[Callable[[str], str], ...] = (
+    lambda line: line,
+    lambda line: line.rstrip(),
+    lambda line: _SPACE_RE.sub(" ", line.strip()),
+)
+
+
+class PatchError(Exception):
+    """Raised when a patch cannot be parsed or applied."""
+
+
+class Hunk(NamedTuple):
+    """One hunk of a unified diff."""
+    old_start: Optional[int]  # 1-based line from the header, None if the header has no numbers
+    lines: List[Tuple[str, str]]  # (" ", "-" or "+", text)
+
+    def old_lines(self, skip_head: int = 0, skip_tail: int = 0) -> List[str]:
+        """Context and removed lines, i.e. the text the hunk replaces."""
+        lines = self.lines[skip_head:len(self.lines) - skip_tail]
+        return [text for op, text in lines if op != "+"]
+
+
+class PatchPlacement(NamedTuple):
+    """Where a hunk applies in the original file."""
+    start: int  # 0-based index of the first replaced line
+    hunk: Hunk
+    skip_head: int  # leading context lines dropped by fuzzing
+    skip_tail: int  # trailing context lines dropped by fuzzing
+    fuzz: int
+    offset: int  # distance from the line in the hunk header
+
+
+def parse_unified_diff(diff: str) -> List[Hunk]:
+    """
+    Parses the hunks of a single-file unified diff.
+
+    File headers, `diff --git`/`index` lines, markdown fences and "No newline
+    at end of file" markers are skipped. Hunk line counts are ignored; a hunk
+    ends at the next header. Empty lines inside a hunk are read as empty
+    context lines (models often drop the leading space).
+
+    Args:
+        diff: Diff text.
+
+    Returns:
+        Hunks in diff order.
+
+    Raises:
+        PatchError: If the diff has no hunk or a hunk changes nothing.
+    """
+    hunks: List[Hunk] = []
+    current: Optional[List[Tuple[str, str]]] = None
+    lines = diff.replace("\r\n", "\n").split("\n")
+    for i, line in enumerate(lines):
+        if _FENCE_RE.match(line):
+            continue
+        if line.startswith("@@"):
+            header = _HUNK_HEADER_RE.match(line)
+            current = []
+            hunks.append(Hunk(int(header.group("start")) if header else None, current))
+            continue
+        if _is_file_header(lines, i):
+            current = None
+            continue
+        if current is None or line.startswith("\\"):
+            continue
+        if line == "":
+            current.append((" ", ""))
+        elif line[0] in " -+":
+            current.append((line[0], line[1:]))
+        else:
+            # Context line whose leading space was lost
+            current.append((" ", line))
+
+    for hunk in hunks:
+        # Trailing blank lines are usually the end of the diff, not context
+        while hunk.lines and hunk.lines[-1] == (" ", ""):
+            hunk.lines.pop()
+    hunks = [hunk for hunk in hunks if hunk.lines]
+    if not hunks:
+        raise PatchError("Patch has no hunks")
+    for hunk in hunks:
+        if all(op == " " for op, _ in hunk.lines):
+            raise PatchError("Patch hunk changes nothing")
+    return hunks
+
+
+def _is_file_header(lines: List[str], i: int) -> bool:
+    """Whether `lines[i]` starts a `---`/`+++` file header (and not a removed line starting with `--`)."""
+    if lines[i].startswith("+++ ") and i > 0 and lines[i - 1].startswith("--- "):
+        return _is_file_header(lines, i - 1)
+    return (
+        lines[i].startswith("--- ")
+        and i + 1 < len(lines) and lines[i + 1].startswith("+++ ")
+        and (i + 2 >= len(lines) or lines[i + 2].startswith(("@@", "diff ", "index ")) or not lines[i + 2].strip())
+    )
+
+
+class _Matcher:
+    """Finds blocks of lines in a file under each normalization, with a lazy line index per level."""
+
+    def __init__(self, lines: List[str]) -> None:
+        self._lines = lines
+        self._normalized: Dict[int, List[str]] = {}
+        self._index: Dict[int, Dict[str, List[int]]] = {}
+
+    def _level(self, level: int) -> Tuple[List[str], Dict[str, List[int]]]:
+        if level not in self._index:
+            normalize = _NORMALIZERS[level]
+            normalized = [normalize(line) for line in self._lines]
+            index: Dict[str, List[int]] = {}
+            for position, line in enumerate(normalized):
+                index.setdefault(line, []).append(position)
+            self._normalized[level] = normalized
+            self._index[level] = index
+        return self._normalized[level], self._index[level]
+
+    def find(self, block: List[str], level: int, lower: int) -> List[int]:
+        """
+        Starts of all occurrences of `block` at or after `lower`.
+
+        Candidates come from the index entry of the block's rarest line, so
+        the cost is proportional to that line's occurrences, not to the file.
+        """
+        normalized, index = self._level(level)
+        normalize = _NORMALIZERS[level]
+        block = [normalize(line) for line in block]
+        anchor = min(range(len(block)), key=lambda i: len(index.get(block[i], ())))
+        starts = []
+        for position in index.get(block[anchor], ()):
+            start = position - anchor
+            if start >= lower and normalized[start:start + len(block)] == block:
+                starts.append(start)
+        return starts
+
+
+def place_hunks(lines: List[str], hunks: List[Hunk], max_fuzz: int = 2) -> List[PatchPlacement]:
+    """
+    Finds where each hunk applies in the original lines.
+
+    Each hunk is looked up with exact lines first, then ignoring trailing
+    whitespace, then ignoring all whitespace differences; if it still does
+    not match, up to `max_fuzz` context lines are dropped from each end (as
+    `patch --fuzz` does). Hunks must apply in order without overlapping.
+    Among several matches the one closest to the header line wins; a hunk
+    without header numbers must match exactly once.
+
+    Args:
+        lines: Original file lines.
+        hunks: Output of `parse_unified_diff`.
+        max_fuzz: Maximum context lines dropped from each end of a hunk.
+
+    Returns:
+        One placement per hunk, in order.
+
+    Raises:
+        PatchError: If a hunk does not match or its position is ambiguous.
+    """
+    matcher = _Matcher(lines)
+    placements: List[PatchPlacement] = []
+    lower = 0
+    for number, hunk in enumerate(hunks, start=1):
+        hint = hunk.old_start - 1 if hunk.old_start is not None else None
+        if placements and hint is not None:
+            # Later hunks shift by the offset the earlier ones were found at
+            hint += placements[-1].offset
+        if not hunk.old_lines():
+            # Pure insertion: "@@ -N,0" inserts after line N
+            if hunk.old_start is None:
+                raise PatchError(f"Hunk {number} adds lines without any context or position")
+            start = hunk.old_start + (placements[-1].offset if placements else 0)
+            if not lower <= start <= len(lines):
+                raise PatchError(f"Hunk {number} inserts outside the file")
+            placement = PatchPlacement(start, hunk, 0, 0, 0, 0)
+        else:
+            placement = _find_placement(matcher, hunk, hint, lower, max_fuzz, number)
+        if placement is None:
+            raise PatchError(f"Hunk {number} does not match the file")
+        placements.append(placement)
+        lower = placement.start + len(hunk.old_lines(placement.skip_head, placement.skip_tail))
+    return placements
+
+
+def _find_placement(
+    matcher: _Matcher,
+    hunk: Hunk,
+    hint: Optional[int],
+    lower: int,
+    max_fuzz: int,
+    number: int
+) -> Optional[PatchPlacement]:
+    """Looks a hunk up at increasing fuzz and normalization levels (see `place_hunks`)."""
+    head, tail = _leading_context(hunk), _leading_context(hunk, reverse=True)
+    skipped = None
+    for fuzz in range(max_fuzz + 1):
+        skip_head, skip_tail = min(fuzz, head), min(fuzz, tail)
+        if (skip_head, skip_tail) == skipped:
+            # No context left to drop
+            break
+        skipped = (skip_head, skip_tail)
+        block = hunk.old_lines(skip_head, skip_tail)
+        for level in range(len(_NORMALIZERS)):
+            starts = matcher.find(block, level, lower)
+            if not starts:
+                continue
+            if hint is None:
+                if len(starts) > 1:
+                    raise PatchError(f"Hunk {number} matches {len(starts)} places and has no line number")
+                return PatchPlacement(starts[0], hunk, skip_head, skip_tail, fuzz, 0)
+            start = min(starts, key=lambda candidate: (abs(candidate - skip_head - hint), candidate))
+            return PatchPlacement(start, hunk, skip_head, skip_tail, fuzz, start - skip_head - hint)
+    return None
+
+
+def _leading_context(hunk: Hunk, reverse: bool = False) -> int:
+    """Number of context lines before the first (or after the last) change."""
+    count = 0
+    for op, _ in (reversed(hunk.lines) if reverse else hunk.lines):
+        if op != " ":
+            break
+        count += 1
+    return count
+
+
+def apply_patch(text: str, diff: str, max_fuzz: int = 2) -> str:
+    """
+    Applies a single-file unified diff to a text.
+
+    Context lines keep the file's own text (so whitespace-insensitive matches
+    do not rewrite them); only added and removed lines change. Line endings
+    and the final newline of the file are preserved.
+
+    Args:
+        text: Original file content.
+        diff: Unified diff against `text`.
+        max_fuzz: Maximum context lines dropped from each end of a hunk.
+
+    Returns:
+        Patched content.
+
+    Raises:
+        PatchError: If the diff cannot be parsed or applied.
+    """
+    newline = "\r\n" if "\r\n" in text else "\n"
+    trailing_newline = text.endswith(newline)
+    body = text[:-len(newline)] if trailing_newline else text
+    lines = body.split(newline) if body else []
+
+    placements = place_hunks(lines, parse_unified_diff(diff), max_fuzz)
+    output: List[str] = []
+    position = 0
+    for placement in placements:
+        output.extend(lines[position:placement.start])
+        position = placement.start
+        hunk_lines = placement.hunk.lines[placement.skip_head:len(placement.hunk.lines) - placement.skip_tail]
+        for op, line in hunk_lines:
+            if op == " ":
+                output.append(lines[position])
+                position += 1
+            elif op == "-":
+                position += 1
+            else:
+                output.append(line)
+    output.extend(lines[position:])
+
+    patched = newline.join(output)
+    if trailing_newline and output:
+        patched += newline
+    return patched
@@ -62,6 +62,77 @@ Original Content:
 {original_content}
 """
 
+FIX_PATCH_PROMPT = """
+You are an expert software engineer fixing CI/CD failures.
+
+Fix the following code based on the reported root cause.
+Return your response as JSON with:
+1. The fix as a unified diff against the original content
+2. A confidence score (0.0-1.0) indicating how certain you are this fix will work
+3. A brief explanation of the fix
+
+Rules:
+- Return ONLY valid JSON, no markdown blocks
+- Return only the changed hunks, not the complete file
+- Start each hunk with an "@@ -<line>,<count> +<line>,<count> @@" header
+- Copy 3 unchanged context lines before and after each change exactly as they appear
+- Prefix context lines with a space, removed lines with "-" and added lines with "+"
+- Maintain existing code style and patterns
+- Only fix what's broken, don't refactor unnecessarily
+- Pay attention to imports and related files context
+
+Format:
+{{
+    "patch": "@@ -12,7 +12,7 @@\n context\n-old line\n+new line\n context\n",
+    "confidence": 0.9,
+    "explanation": "brief explanation of what was fixed"
+}}
+
+Root Cause: {root_cause}
+
+File Path: {file_path}
+
+Original Content:
+{original_content}
+"""
+
+FIX_WINDOW_PROMPT = """
+You are an expert software engineer fixing CI/CD failures.
+
+The file below is too large to show in full. Only the regions most likely
+related to the failure are shown, each between "<<<REGION n (lines a-b)>>>"
+and "<<<END REGION n>>>" markers; omitted lines are noted with their range.
+
+Fix the code based on the reported root cause.
+Return your response as JSON with:
+1. The regions you changed: each region number with the complete new content of that region
+2. A confidence score (0.0-1.0) indicating how certain you are this fix will work
+3. A brief explanation of the fix
+
+Rules:
+- Return ONLY valid JSON, no markdown blocks
+- Return only regions you changed; each content replaces the whole region
+- Do not include the marker lines in the content
+- Do not reference or rewrite omitted lines; put new code (e.g. imports) inside a shown region
+- Maintain existing code style and patterns
+- Only fix what's broken, don't refactor unnecessarily
+- Pay attention to imports and related files context
+
+Format:
+{{
+    "regions": [{{"region": 1, "content": "complete new content of region 1"}}],
+    "confidence": 0.9,
+    "explanation": "brief explanation of what was fixed"
+}}
+
+Root Cause: {root_cause}
+
+File Path: {file_path}
+
+Regions:
+{regions}
+"""
+
 CONTEXT_READING_PROMPT = """
 Analyze the codebase structure and identify related files for context.
 
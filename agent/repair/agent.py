@@ -1,10 +1,14 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import logging
 
+from app.core.config import settings
+from langgraph.graph import START, END
+
 from agent.base import BaseAgent
 from agent.repair.graph import create_repair_graph
 from agent.repair.state import RepairAgentState
 from agent.repair.utils import get_langfuse_callback
+from agent.repo_session import close_session, open_session
 
 logger = logging.getLogger(__name__)
 
@@ -20,9 +24,12 @@ class RepairAgent(BaseAgent):
     def __init__(self) -> None:
         """Initialize the repair agent."""
         self._graph: Any = create_repair_graph()
+        self._checkpointed_graph: Optional[Any] = None
+        self._checkpointer: Optional[Any] = None
         self._name: str = "repair"
         self._description: str = "Automatically diagnoses and fixes CI/CD failures in GitHub Actions workflows"
         self._capabilities: List[str] = [
+            "preclassify",
             "diagnose",
             "classify",
             "locate",
@@ -50,10 +57,23 @@ class RepairAgent(BaseAgent):
         """Compiled LangGraph instance."""
         return self._graph
     
+    def _get_checkpointed_graph(self) -> Any:
+        """Builds the database-checkpointed graph on first use."""
+        if self._checkpointed_graph is None:
+            from agent.checkpoint import DatabaseCheckpointSaver
+            self._checkpointer = DatabaseCheckpointSaver()
+            self._checkpointed_graph = create_repair_graph(checkpointer=self._checkpointer)
+        return self._checkpointed_graph
+    
     async def invoke(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute repair agent with given state.
         
+        When checkpoints are enabled, state is saved after every node under
+        the job ID. If an earlier attempt of the same job stopped partway
+        through, execution resumes at the first node that did not complete
+        instead of re-running (and re-paying for) the nodes before it.
+        
         Args:
             state: Initial agent state dictionary. Must include:
                 - job_id: Job identifier
@@ -64,20 +84,102 @@ class RepairAgent(BaseAgent):
                 - pr_draft: Whether PR should be draft (default False)
         
         Returns:
-            Final agent state dictionary after execution.
+            Final agent state dictionary after execution, including
+            `github_api_calls`. A resumed run also carries `resumed_from_node`
+            and `resume_cost_avoided`.
         """
         langfuse_handler = get_langfuse_callback()
+        callbacks = [langfuse_handler] if langfuse_handler else []
         
-        final_state = await self._graph.ainvoke(
-            state,
-            config={"callbacks": [langfuse_handler] if langfuse_handler else []}
-        )
+        # One repository session per job, shared by every node
+        session = None
+        if state.get("job_id") is not None and state.get("repo_name"):
+            session = open_session(state["job_id"], state["repo_name"])
+        
+        try:
+            if state.get("job_id") is None or not settings.CHECKPOINTS_ENABLED:
+                final_state = await self._graph.ainvoke(state, config={"callbacks": callbacks})
+            else:
+                final_state = await self._invoke_checkpointed(state, str(state["job_id"]), callbacks)
+        finally:
+            if session is not None:
+                close_session(session.job_id)
         
         if langfuse_handler:
             langfuse_handler.flush()
         
+        if session is not None:
+            final_state = {**final_state, "github_api_calls": session.api_calls}
+        
         return final_state
     
+    async def _invoke_checkpointed(
+        self,
+        state: Dict[str, Any],
+        thread_id: str,
+        callbacks: List[Any]
+    ) -> Dict[str, Any]:
+        """
+        Runs the graph with checkpoints, resuming a previous attempt if possible.
+        
+        Nodes report permanent errors by setting status FAILED (those runs
+        are recorded and not retried) and raise transient ones such as
+        GitHub 5xx responses and timeouts (see `is_transient_error`), so the
+        queue retries the job. The resume point is the newest snapshot that
+        was not yet FAILED and still had a node to run: the node that raised.
+        
+        Args:
+            state: Initial agent state dictionary.
+            thread_id: Checkpoint thread (the job ID).
+            callbacks: LangChain callbacks for the run.
+        
+        Returns:
+            Final agent state dictionary.
+        """
+        graph = self._get_checkpointed_graph()
+        config = {"configurable": {"thread_id": thread_id}, "callbacks": callbacks}
+        
+        history = [snapshot async for snapshot in graph.aget_state_history(config)]
+        if history and not history[0].next and history[0].values.get("status") != "FAILED":
+            # A previous attempt finished; only recording its outcome failed
+            logger.info(f"Job {thread_id} already completed its graph run, reusing final state")
+            final_state = history[0].values
+            return {**final_state, "resumed_from_node": END, "resume_cost_avoided": final_state.get("total_cost", 0.0)}
+        
+        resume_point = next(
+            (
+                snapshot for snapshot in history
+                if snapshot.next
+                and snapshot.next[0] != START
+                and snapshot.values.get("status") != "FAILED"
+            ),
+            None
+        )
+        if resume_point is None:
+            if history:
+                await self._checkpointer.adelete_thread(thread_id)
+            return await graph.ainvoke(state, config=config)
+        
+        resumed_from = resume_point.next[0]
+        cost_avoided = resume_point.values.get("total_cost", 0.0)
+        logger.info(f"Resuming job {thread_id} at node '{resumed_from}' (avoided ${cost_avoided:.4f})")
+        final_state = await graph.ainvoke(None, config={**resume_point.config, "callbacks": callbacks})
+        return {**final_state, "resumed_from_node": resumed_from, "resume_cost_avoided": cost_avoided}
+    
+    async def release_job(self, job_id: int) -> None:
+        """
+        Drops the job's checkpoints once its outcome has been recorded.
+        
+        Called for every recorded outcome, including graceful FAILED ones,
+        which are not retried; checkpoints only outlive a run that raised.
+        
+        Args:
+            job_id: Job identifier.
+        """
+        if settings.CHECKPOINTS_ENABLED:
+            self._get_checkpointed_graph()
+            await self._checkpointer.adelete_thread(str(job_id))
+    
     def get_mcp_tools(self) -> List[Dict[str, Any]]:
         """
         Return MCP tools this agent exposes.
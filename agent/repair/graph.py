@@ -1,6 +1,9 @@
 import logging
+from typing import Any, Optional
 from langgraph.graph import StateGraph, END
 from agent.repair.state import RepairAgentState
+from agent.repair.nodes.collect_logs import collect_logs_node
+from agent.repair.nodes.preclassify import preclassify_node
 from agent.repair.nodes.diagnose import diagnose_node
 from agent.repair.nodes.classify import classify_node
 from agent.repair.nodes.locate import locate_node
@@ -11,9 +14,13 @@ from agent.repair.nodes.monitor import monitor_deployment_node
 logger = logging.getLogger(__name__)
 
 
-def create_repair_graph():
+def create_repair_graph(checkpointer: Optional[Any] = None):
     """
     Assembles the LangGraph repair workflow with reliability features.
+
+    Args:
+        checkpointer: Optional LangGraph checkpointer. When set, state is saved
+            after every node so a retried job can resume where it stopped.
     
     Returns:
         Compiled LangGraph workflow for the repair agent.
@@ -21,6 +28,8 @@ def create_repair_graph():
     workflow = StateGraph(RepairAgentState)
 
     # Add Nodes
+    workflow.add_node("logs", collect_logs_node)
+    workflow.add_node("preclassify", preclassify_node)
     workflow.add_node("diagnose", diagnose_node)
     workflow.add_node("classify", classify_node)
     workflow.add_node("locate", locate_node)
@@ -32,13 +41,13 @@ def create_repair_graph():
     def route_start(state: RepairAgentState) -> str:
         if state.get("status") == "MONITORING":
             return "monitor"
-        return "diagnose"
+        return "logs"
 
     workflow.set_conditional_entry_point(
         route_start,
         {
             "monitor": "monitor",
-            "diagnose": "diagnose"
+            "logs": "logs"
         }
     )
 
@@ -46,6 +55,22 @@ def create_repair_graph():
     workflow.add_edge("monitor", END)
 
     # Add Edges with conditional routing
+    workflow.add_edge("logs", "preclassify")
+
+    def route_after_preclassify(state: RepairAgentState) -> str:
+        """Ends the run before any model call when pre-classification rejected it."""
+        if state.get("status") == "FAILED":
+            return "end"
+        return "diagnose"
+
+    workflow.add_conditional_edges(
+        "preclassify",
+        route_after_preclassify,
+        {
+            "diagnose": "diagnose",
+            "end": END
+        }
+    )
     workflow.add_edge("diagnose", "classify")
     
     def route_after_classify(state: RepairAgentState) -> str:
@@ -66,4 +91,4 @@ def create_repair_graph():
     workflow.add_edge("fix", "pr")
     workflow.add_edge("pr", END)
 
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
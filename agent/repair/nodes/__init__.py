@@ -1,3 +1,5 @@
+from agent.repair.nodes.collect_logs import collect_logs_node
+from agent.repair.nodes.preclassify import preclassify_node
 from agent.repair.nodes.diagnose import diagnose_node
 from agent.repair.nodes.classify import classify_node
 from agent.repair.nodes.locate import locate_node
@@ -5,6 +7,8 @@ from agent.repair.nodes.fix import fix_node
 from agent.repair.nodes.github_pr import pr_node
 
 __all__ = [
+    "collect_logs_node",
+    "preclassify_node",
     "diagnose_node",
     "classify_node",
     "locate_node",
@@ -1,6 +1,7 @@
 import logging
 from agent.repair.state import RepairAgentState
-from agent.classification import classify_failure, should_auto_fix
+from agent.classification import classify_error_records, should_auto_fix
+from agent.log_parsers import load_error_records
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -19,8 +20,26 @@ async def classify_node(state: RepairAgentState) -> RepairAgentState:
         root_cause = state.get("root_cause", "")
         error_logs = state.get("error_logs", "")
 
-        category, confidence = classify_failure(root_cause, error_logs)
-        should_fix = should_auto_fix(category, confidence, settings.MIN_CONFIDENCE_THRESHOLD)
+        records = load_error_records(state.get("error_records"), error_logs)
+        category, confidence = classify_error_records(root_cause, records, error_logs)
+
+        # The learned classifier, when configured, replaces the heuristic when
+        # it is confident. Its probability is not on the heuristic's scale, so
+        # it is held to its own threshold instead of compared with the score
+        min_confidence = settings.MIN_CONFIDENCE_THRESHOLD
+        if settings.FAILURE_MODEL_PATH:
+            from agent.failure_model import get_failure_model, model_text
+
+            model = get_failure_model()
+            if model is not None:
+                learned_category, learned_confidence = model.predict(
+                    model_text(root_cause, state.get("failure_signature"))
+                )
+                logger.info(f"Learned classifier: {learned_category}, confidence: {learned_confidence:.2f}")
+                if learned_confidence >= settings.LEARNED_MIN_CONFIDENCE:
+                    category, confidence = learned_category, learned_confidence
+                    min_confidence = settings.LEARNED_MIN_CONFIDENCE
+        should_fix = should_auto_fix(category, confidence, min_confidence)
 
         logger.info(f"Failure category: {category}, confidence: {confidence:.2f}, should_fix: {should_fix}")
 
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+from agent.repair.state import RepairAgentState
+from agent.repair.utils import is_transient_error
+from agent.fingerprint import fingerprint_log
+from agent.github_client import GitHubAPIError
+from agent.repo_session import RepairSession
+from agent.log_parsers import MAX_RECORDS, ErrorRecordExtractor
+from agent.log_reducer import token_budget_chars
+from agent.run_logs import fetch_failed_logs
+
+logger = logging.getLogger(__name__)
+
+
+async def _fetch_failed_logs(
+    session: RepairSession,
+    run_id: str,
+    max_chars: int,
+    extractor: ErrorRecordExtractor
+) -> str:
+    """
+    Fetches the failed-step logs of a workflow run from the jobs API.
+
+    Args:
+        session: Repository session of the job being repaired.
+        run_id: GitHub Actions workflow run ID.
+        max_chars: Maximum number of characters to keep.
+        extractor: Collects the run's structured error records.
+
+    Returns:
+        The reduced failed-step logs, or a short explanation if unavailable.
+
+    Raises:
+        GitHubAPIError: If the logs could not be fetched for a transient
+            reason (see `is_transient_error`), so the job is retried.
+    """
+    try:
+        logs = await fetch_failed_logs(session, int(run_id), max_chars, extractor)
+        if logs.strip():
+            return logs
+        # No failed job (e.g. the run was re-run and passed)
+        return "Could not fetch detailed logs: no failed jobs found for this run."
+    except GitHubAPIError as log_ex:
+        if is_transient_error(log_ex):
+            raise
+        logger.warning(f"Failed to fetch logs for run {run_id}: {log_ex}")
+        return f"Could not fetch detailed logs: {log_ex}"
+    except Exception as log_ex:
+        if is_transient_error(log_ex):
+            raise
+        logger.error(f"Failed to fetch logs for run {run_id}: {log_ex}")
+        return "Error retrieving logs."
+
+
+async def collect_logs_node(state: RepairAgentState) -> RepairAgentState:
+    """
+    Node: Collect Logs
+    Fetches and reduces the failed-step logs of every run in the job,
+    extracts structured error records from them while they stream, and
+    fingerprints them. No model is called, so later stages can decide
+    whether the failure is worth a diagnosis at all.
+    """
+    logger.info(f"Collecting logs for job {state['job_id']} in repo {state['repo_name']}")
+
+    from agent.repo_session import get_session
+
+    try:
+        session = get_session(state['job_id'], state['repo_name'])
+        run = await session.get_workflow_run(int(state['run_id']))
+        
+        # Check if the failure was caused by the agent itself
+        # head_commit.author is a git author (has name/email, not login)
+        head_commit = run.get("head_commit") or {}
+        commit_author = (head_commit.get("author") or {}).get("name") or ""
+        if commit_author == "diviora-repair-agent[bot]" or "repair-agent" in commit_author.lower():
+            return {
+                **state,
+                "status": "FAILED",
+                "error": f"Possible infinite loop detected: failure caused by {commit_author}"
+            }
+
+        # Coalesced jobs carry every failed run for the commit; diagnose sees
+        # all of their logs in one prompt instead of one LLM call per workflow
+        run_ids = state.get("run_ids") or [state['run_id']]
+        # The log token budget is shared across coalesced runs
+        per_run_budget = token_budget_chars() // len(run_ids)
+        # One extractor per run: parsers keep multi-line state per stream
+        extractors = [ErrorRecordExtractor(max_records=MAX_RECORDS // len(run_ids) or 1) for _ in run_ids]
+        if len(run_ids) == 1:
+            logs_content = await _fetch_failed_logs(session, run_ids[0], per_run_budget, extractors[0])
+        else:
+            run_logs = await asyncio.gather(*(
+                _fetch_failed_logs(session, run_id, per_run_budget, extractor)
+                for run_id, extractor in zip(run_ids, extractors)
+            ))
+            logs_content = "\n\n".join(
+                f"=== Workflow run {run_id} ===\n{logs}" for run_id, logs in zip(run_ids, run_logs)
+            )
+        error_records = [record._asdict() for extractor in extractors for record in extractor.close()]
+
+        # Stable signature of the failure, recorded on the job for grouping
+        signature = fingerprint_log(logs_content)
+        return {
+            **state,
+            "error_logs": logs_content,
+            "error_records": error_records,
+            "commit_author": commit_author,
+            "failure_fingerprint": signature["fingerprint"],
+            "failure_signature": signature
+        }
+
+    except Exception as e:
+        if is_transient_error(e):
+            # Raised so the queue retries the job, resuming at this node
+            raise
+        logger.error(f"Error in collect_logs_node: {e}")
+        return {**state, "status": "FAILED", "error": str(e)}
@@ -1,67 +1,66 @@
 import logging
-from app.core.config import settings
 from agent.repair.state import RepairAgentState
+from agent.repair.utils import is_transient_error
 from agent.utils import estimate_vertex_cost
 from agent.schemas import DiagnoseResponse
 from agent.prompts import DIAGNOSE_PROMPT
+from agent.diagnosis_cache import get_diagnosis_cache, prompt_version
+from agent.log_parsers import format_error_records, load_error_records
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Cached diagnoses are only reused while the prompt they were produced with is unchanged
+DIAGNOSE_PROMPT_VERSION = prompt_version(DIAGNOSE_PROMPT)
+
+
 async def diagnose_node(state: RepairAgentState) -> RepairAgentState:
     """
     Node: Diagnose
-    Fetches GitHub Action logs and uses Gemini 1.5 Flash to identify root cause.
+    Uses Gemini 1.5 Flash to identify the root cause from the collected logs.
+    Structured error records lead the logs so the model sees the errors
+    first, however much output surrounds them.
     """
+    if state.get("status") == "FAILED":
+        return state
+
     logger.info(f"Diagnosing job {state['job_id']} for repo {state['repo_name']}")
     
-    from github import Github
-    from agent.llm import vertex_client
+    from agent.llm import MODEL_NAMES, vertex_client
     
     try:
-        gh = Github(settings.GITHUB_TOKEN)
-        repo = gh.get_repo(state['repo_name'])
-        run = repo.get_workflow_run(int(state['run_id']))
-        
-        # Check if the failure was caused by the agent itself
-        # Check if the failure was caused by the agent itself
-        # run.head_commit.author is a GitAuthor (has name/email, not login)
-        commit_author = run.head_commit.author.name if run.head_commit and run.head_commit.author else ""
-        if commit_author == "diviora-repair-agent[bot]" or "repair-agent" in commit_author.lower():
-            return {
-                **state,
-                "status": "FAILED",
-                "error": f"Possible infinite loop detected: failure caused by {commit_author}"
-            }
+        logs_content = state.get("error_logs") or ""
+        signature = state.get("failure_signature") or {}
+        fingerprint = state.get("failure_fingerprint")
 
-        # Fetch logs using gh CLI for reliability
-        import subprocess
-        try:
-            # We use the valid gh CLI already authenticated in the environment
-            # This fetches the logs for the failed steps only
-            result = subprocess.run(
-                ["gh", "run", "view", str(state['run_id']), "--repo", state['repo_name'], "--log-failed"],
-                capture_output=True,
-                text=True,
-                check=False  # Don't throw on error, we handle it
-            )
-            if result.returncode == 0 and result.stdout.strip():
-                logs_content = result.stdout[:20000] # Truncate to avoid context limit
-            else:
-                # Fallback if no failed logs (e.g. run success) or error
-                logs_content = f"Could not fetch detailed logs. stdout: {result.stdout}, stderr: {result.stderr}"
-                if result.returncode != 0:
-                     logger.warning(f"gh cli failed: {result.stderr}")
-        except Exception as log_ex:
-            logger.error(f"Failed to fetch logs via subprocess: {log_ex}")
-            logs_content = "Error retrieving logs."
-
-        # For this implementation, we assume we fetch the text summary of the logs
+        # Logs without any error line, frame or test id (e.g. logs that could
+        # not be fetched) fingerprint alike, so they never use the cache
+        use_cache = settings.DIAGNOSIS_CACHE_ENABLED and bool(fingerprint) and bool(
+            signature.get("error_lines") or signature.get("frames") or signature.get("test_ids")
+        )
+        cache = get_diagnosis_cache()
+        model_name = MODEL_NAMES["flash"]
+        if use_cache:
+            cached = await cache.get(state['repo_name'], fingerprint, DIAGNOSE_PROMPT_VERSION, model_name)
+            if cached is not None:
+                cached_result, cost_avoided = cached
+                logger.info(f"Diagnosis cache hit for job {state['job_id']} ({fingerprint[:12]})")
+                return {
+                    **state,
+                    "root_cause": cached_result.root_cause,
+                    "diagnosis_confidence": cached_result.confidence,
+                    "total_cost": 0.0,
+                    "diagnosis_cached": True,
+                    "diagnosis_cost_avoided": cost_avoided
+                }
 
-        
         # Get model and configure structured output
         model = vertex_client.get_model("flash")
         structured_llm = model.with_structured_output(DiagnoseResponse, include_raw=True)
         
+        records = load_error_records(state.get("error_records"), logs_content)
+        if records:
+            logs_content = f"Structured errors:\n{format_error_records(records)}\n\nRaw logs:\n{logs_content}"
         prompt = DIAGNOSE_PROMPT.format(logs=logs_content)
         
         # Invoke model
@@ -81,16 +80,22 @@ async def diagnose_node(state: RepairAgentState) -> RepairAgentState:
             input_tokens,
             output_tokens
         )
+
+        if use_cache:
+            await cache.put(
+                state['repo_name'], fingerprint, DIAGNOSE_PROMPT_VERSION, model_name, parsed_result, cost
+            )
         
         return {
             **state,
-            "error_logs": logs_content,
             "root_cause": parsed_result.root_cause,
             "diagnosis_confidence": parsed_result.confidence,
-            "total_cost": cost,
-            "commit_author": commit_author
+            "total_cost": cost
         }
         
     except Exception as e:
+        if is_transient_error(e):
+            # Raised so the queue retries the job, resuming at this node
+            raise
         logger.error(f"Error in diagnose_node: {e}")
         return {**state, "status": "FAILED", "error": str(e)}
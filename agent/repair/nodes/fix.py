@@ -1,33 +1,159 @@
 import logging
-from app.core.config import settings
+from typing import Any, List, NamedTuple, Optional, Tuple, Type
+from pydantic import BaseModel
 from agent.repair.state import RepairAgentState
+from agent.repair.utils import is_transient_error
 from agent.utils import estimate_vertex_cost
-from agent.schemas import FixResponse
-from agent.prompts import FIX_PROMPT
+from agent.fix_windows import (
+    Region, SpliceError, line_window, referenced_symbols, render_regions, select_regions, splice_regions
+)
+from agent.log_locations import normalize_log_path
+from agent.log_parsers import load_error_records
+from agent.log_reducer import CHARS_PER_TOKEN
+from agent.patching import PatchError, apply_patch
+from agent.schemas import FixPatchResponse, FixRegionsResponse, FixResponse
+from agent.prompts import FIX_PATCH_PROMPT, FIX_PROMPT, FIX_WINDOW_PROMPT
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+
+class _FixCall(NamedTuple):
+    """Outcome of one fix strategy; `fixed_text` is None when its output could not be used."""
+    fixed_text: Optional[str]
+    confidence: float
+    explanation: str
+    output_tokens: int
+    cost: float
+
+
+async def _invoke_fix(model: Any, schema: Type[BaseModel], prompt: str) -> Tuple[Any, int, float]:
+    """
+    Runs one structured fix call.
+
+    Returns:
+        Tuple of (parsed response, output tokens, estimated cost).
+    """
+    structured_llm = model.with_structured_output(schema, include_raw=True)
+    response = await structured_llm.ainvoke(prompt)
+
+    # Get token usage from metadata
+    usage = response["raw"].usage_metadata or {}
+    input_tokens = usage.get("input_tokens", 0)
+    output_tokens = usage.get("output_tokens", 0)
+
+    # Estimate cost
+    cost = estimate_vertex_cost(
+        "gemini-1.5-pro",
+        input_tokens,
+        output_tokens
+    )
+    return response["parsed"], output_tokens, cost
+
+def _anchor_lines(state: RepairAgentState) -> List[int]:
+    """Lines of the target file named by locate and by the error records, most relevant first."""
+    target = state['target_file_path']
+    lines = [state['target_line']] if state.get('target_line') else []
+    for record in load_error_records(state.get('error_records'), state.get('error_logs') or ''):
+        if record.file and record.line:
+            path = normalize_log_path(record.file)
+            if path == target or path.endswith("/" + target):
+                lines.append(record.line)
+    return list(dict.fromkeys(lines))
+
+def _window_regions(state: RepairAgentState, original_text: str) -> List[Region]:
+    """Regions of a large file around the error lines and the symbols the failure references."""
+    records = load_error_records(state.get('error_records'), state.get('error_logs') or '')
+    symbols = referenced_symbols(
+        [state['root_cause']] + [record.message for record in records] + [record.test_id or '' for record in records]
+    )
+    return select_regions(
+        original_text,
+        state['target_file_path'],
+        _anchor_lines(state),
+        symbols,
+        settings.FIX_WINDOW_MAX_LINES,
+        settings.FIX_WINDOW_MAX_CHARS,
+        settings.FIX_WINDOW_CONTEXT_LINES
+    )
+
+def _fallback_window(state: RepairAgentState, original_text: str) -> Optional[Region]:
+    """A single bounded window around the most relevant error line, or None without one."""
+    anchors = _anchor_lines(state)
+    if not anchors:
+        return None
+    return line_window(original_text, anchors[0], settings.FIX_WINDOW_MAX_LINES, settings.FIX_WINDOW_MAX_CHARS)
+
+async def _fix_regions(
+    model: Any,
+    state: RepairAgentState,
+    original_text: str,
+    regions: List[Region],
+    context_summary: str
+) -> _FixCall:
+    """Sends regions of a file to the model and splices the edited regions back."""
+    logger.info(
+        f"Windowed fix prompt for {state['target_file_path']}: {len(regions)} regions, "
+        f"{sum(region.size for region in regions)} of {original_text.count(chr(10)) + 1} lines "
+        f"({'; '.join(region.reason for region in regions)})"
+    )
+
+    prompt = FIX_WINDOW_PROMPT.format(
+        root_cause=state['root_cause'],
+        file_path=state['target_file_path'],
+        regions=render_regions(original_text, regions)
+    ) + context_summary
+    parsed_result, output_tokens, cost = await _invoke_fix(model, FixRegionsResponse, prompt)
+    try:
+        edits = {edit.region: edit.content for edit in parsed_result.regions}
+        fixed_text = splice_regions(original_text, state['target_file_path'], regions, edits)
+    except SpliceError as e:
+        logger.warning(f"Edited regions of {state['target_file_path']} could not be spliced ({e})")
+        fixed_text = None
+    return _FixCall(fixed_text, parsed_result.confidence, parsed_result.explanation, output_tokens, cost)
+
+async def _fix_patch(model: Any, state: RepairAgentState, original_text: str, prompt: str) -> _FixCall:
+    """Fixes a file through a unified diff applied in process."""
+    parsed_result, output_tokens, cost = await _invoke_fix(model, FixPatchResponse, prompt)
+    try:
+        fixed_text = apply_patch(original_text, parsed_result.patch, settings.FIX_PATCH_MAX_FUZZ)
+    except PatchError as e:
+        logger.warning(f"Patch for {state['target_file_path']} did not apply ({e})")
+        fixed_text = None
+    return _FixCall(fixed_text, parsed_result.confidence, parsed_result.explanation, output_tokens, cost)
+
 async def fix_node(state: RepairAgentState) -> RepairAgentState:
     """
     Node: Fix
     Generates the corrected file content using Gemini 1.5 Pro.
+
+    Files of at least FIX_WINDOW_MIN_LINES lines are windowed: only the
+    regions around the error (see agent/fix_windows.py) are sent, and the
+    edited regions are spliced back, so the prompt stays bounded however
+    large the file is. When no region is found or the edits cannot be
+    spliced, a single window of at most FIX_WINDOW_MAX_LINES lines around the
+    located line is tried instead; such files are never sent whole, so the
+    job fails when that does not produce a fix either. Smaller files of at
+    least FIX_PATCH_MIN_LINES lines are fixed in patch mode: the model
+    returns a unified diff, which is applied in process with fuzzy context
+    matching. Output that cannot be applied falls back to a full-content
+    rewrite.
     """
     if state.get("status") == "FAILED":
         return state
 
     logger.info(f"Generating fix for {state['target_file_path']}")
-    
-    from github import Github
+
+    from agent.repo_session import get_session
     from agent.llm import vertex_client
-    
+
     try:
-        gh = Github(settings.GITHUB_TOKEN)
-        repo = gh.get_repo(state['repo_name'])
-        
         # Fetch current content
-        file_content = repo.get_contents(state['target_file_path'])
-        original_text = file_content.decoded_content.decode()
-        
+        session = get_session(state['job_id'], state['repo_name'])
+        file_content = await session.get_file(state['target_file_path'])
+        original_text = file_content["content"]
+        line_count = original_text.count("\n") + 1
+
         # Build context from related files
         context_summary = ""
         context_files = state.get("context_files", {})
@@ -35,48 +161,83 @@ async def fix_node(state: RepairAgentState) -> RepairAgentState:
             context_summary = "\n\nRelated Files Context:\n"
             for file_path, content in list(context_files.items())[:3]:  # Limit to 3 files
                 context_summary += f"\n--- {file_path} ---\n{content[:500]}\n"
-        
-        # Get model and configure structured output
+
         model = vertex_client.get_model("pro")
-        structured_llm = model.with_structured_output(FixResponse, include_raw=True)
-        
-        prompt = FIX_PROMPT.format(
-            root_cause=state['root_cause'],
-            file_path=state['target_file_path'],
-            original_content=original_text
-        ) + context_summary
-        
-        # Invoke model
-        response = await structured_llm.ainvoke(prompt)
-        
-        parsed_result: FixResponse = response["parsed"]
-        raw_response = response["raw"]
-        
-        fixed_text = parsed_result.fixed_content
-        fix_confidence = parsed_result.confidence
-        explanation = parsed_result.explanation
-        
-        logger.info(f"Fix explanation: {explanation}, confidence: {fix_confidence:.2f}")
-        
-        # Get token usage from metadata
-        usage = raw_response.usage_metadata or {}
-        input_tokens = usage.get("input_tokens", 0)
-        output_tokens = usage.get("output_tokens", 0)
-        
-        # Estimate cost
-        cost = estimate_vertex_cost(
-            "gemini-1.5-pro", 
-            input_tokens,
-            output_tokens
+        prompt_args = {
+            "root_cause": state['root_cause'],
+            "file_path": state['target_file_path'],
+            "original_content": original_text
+        }
+        calls: List[Tuple[str, _FixCall]] = []
+
+        windowed = settings.FIX_WINDOW_ENABLED and line_count >= settings.FIX_WINDOW_MIN_LINES
+        if windowed:
+            regions = _window_regions(state, original_text)
+            if regions:
+                calls.append(("window", await _fix_regions(model, state, original_text, regions, context_summary)))
+            if not calls or calls[-1][1].fixed_text is None:
+                fallback = _fallback_window(state, original_text)
+                # Not worth a second call when it is the region that was just tried
+                if fallback is not None and [fallback[:2]] != [region[:2] for region in regions]:
+                    calls.append((
+                        "line_window", await _fix_regions(model, state, original_text, [fallback], context_summary)
+                    ))
+            if not calls or calls[-1][1].fixed_text is None:
+                error = (
+                    f"No usable fix for {state['target_file_path']}: no region could be edited and "
+                    f"its {line_count} lines are over the FIX_WINDOW_MIN_LINES cap for whole-file prompts"
+                )
+                logger.error(error)
+                return {
+                    **state,
+                    "status": "FAILED",
+                    "error": error,
+                    "total_cost": sum(call.cost for _, call in calls)
+                }
+
+        if not windowed and settings.FIX_PATCH_MODE_ENABLED and line_count >= settings.FIX_PATCH_MIN_LINES:
+            patch = await _fix_patch(
+                model, state, original_text, FIX_PATCH_PROMPT.format(**prompt_args) + context_summary
+            )
+            calls.append(("patch", patch))
+
+        if not windowed and (not calls or calls[-1][1].fixed_text is None):
+            parsed_result, output_tokens, cost = await _invoke_fix(
+                model, FixResponse, FIX_PROMPT.format(**prompt_args) + context_summary
+            )
+            calls.append(("full", _FixCall(
+                parsed_result.fixed_content, parsed_result.confidence, parsed_result.explanation, output_tokens, cost
+            )))
+
+        mode, result = calls[-1]
+        fixed_text = result.fixed_text
+        output_tokens = sum(call.output_tokens for _, call in calls)
+        if mode == "full":
+            full_output_tokens = result.output_tokens
+        else:
+            # What a full-content rewrite would have cost, for comparison
+            full_output_tokens = len(fixed_text) // CHARS_PER_TOKEN
+        if len(calls) > 1:
+            mode = f"{calls[0][0]}_fallback"
+
+        logger.info(
+            f"Fix explanation: {result.explanation}, confidence: {result.confidence:.2f} "
+            f"({mode}, {output_tokens} output tokens)"
         )
-        
+
         return {
             **state,
             "original_content": original_text,
             "fixed_content": fixed_text,
-            "fix_confidence": fix_confidence,
-            "total_cost": cost
+            "fix_confidence": result.confidence,
+            "fix_mode": mode,
+            "fix_output_tokens": output_tokens,
+            "fix_full_output_tokens": full_output_tokens,
+            "total_cost": sum(call.cost for _, call in calls)
         }
     except Exception as e:
+        if is_transient_error(e):
+            # Raised so the queue retries the job, resuming at this node
+            raise
         logger.error(f"Error in fix_node: {e}")
         return {**state, "status": "FAILED", "error": str(e)}
@@ -1,6 +1,7 @@
 import logging
-from app.core.config import settings
+from agent.github_client import GitHubAPIError
 from agent.repair.state import RepairAgentState
+from agent.repair.utils import is_transient_error
 
 logger = logging.getLogger(__name__)
 
@@ -14,25 +15,34 @@ async def pr_node(state: RepairAgentState) -> RepairAgentState:
 
     logger.info(f"Opening PR for {state['repo_name']}")
     
-    from github import Github, InputGitTreeElement
+    from agent.repo_session import get_session
     
     try:
-        gh = Github(settings.GITHUB_TOKEN)
-        repo = gh.get_repo(state['repo_name'])
+        session = get_session(state['job_id'], state['repo_name'])
         
-        # Create a new branch
+        # Create a new branch from the commit the fix was generated against
         branch_name = f"fix/repair-job-{state['job_id']}"
-        sb = repo.get_branch("main")
-        repo.create_git_ref(ref=f"refs/heads/{branch_name}", sha=sb.commit.sha)
+        base_branch = await session.default_branch()
+        try:
+            await session.create_branch(branch_name, await session.base_sha())
+            # The blob SHA was cached when fix_node read the file
+            current_file = await session.get_file(state['target_file_path'])
+        except GitHubAPIError as e:
+            if e.status_code != 422:
+                raise
+            # A retried job finds the branch its earlier attempt created
+            logger.info(f"Branch {branch_name} already exists, reusing it")
+            current_file = await session.get_file(state['target_file_path'], ref=branch_name)
         
-        # Commit the fix
-        repo.update_file(
-            path=state['target_file_path'],
-            message=f"Fix: Automatic repair for CI failure in run {state['run_id']}",
-            content=state['fixed_content'],
-            sha=repo.get_contents(state['target_file_path']).sha,
-            branch=branch_name
-        )
+        # Commit the fix, unless the earlier attempt already did
+        if current_file["content"] != state['fixed_content']:
+            await session.update_file(
+                path=state['target_file_path'],
+                message=f"Fix: Automatic repair for CI failure in run {state['run_id']}",
+                content=state['fixed_content'],
+                sha=current_file["sha"],
+                branch=branch_name
+            )
         
         from app.core.config import settings
         
@@ -53,22 +63,25 @@ async def pr_node(state: RepairAgentState) -> RepairAgentState:
         
         # Create PR (draft by default for human-in-the-loop)
         is_draft = settings.PR_DRAFT_BY_DEFAULT and not settings.AUTO_MERGE_ENABLED
-        pr = repo.create_pull(
+        pr = await session.create_pull(
             title=f"Repair: Fix CI failure in run {state['run_id']}",
             body=pr_body,
             head=branch_name,
-            base="main",
+            base=base_branch,
             draft=is_draft
         )
         
-        logger.info(f"Created {'draft' if is_draft else 'ready'} PR: {pr.html_url}")
+        logger.info(f"Created {'draft' if is_draft else 'ready'} PR: {pr['html_url']}")
         
         return {
             **state,
             "status": "PR_OPENED",
-            "pr_url": pr.html_url,
+            "pr_url": pr["html_url"],
             "pr_draft": is_draft
         }
     except Exception as e:
+        if is_transient_error(e):
+            # Raised so the queue retries the job, resuming at this node
+            raise
         logger.error(f"Error in pr_node: {e}")
         return {**state, "status": "FAILED", "error": str(e)}
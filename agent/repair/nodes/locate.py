@@ -1,74 +1,122 @@
 import logging
-from app.core.config import settings
+import time
+from typing import Optional
 from agent.repair.state import RepairAgentState
+from agent.repair.utils import is_transient_error
 from agent.utils import estimate_vertex_cost
 from agent.context import get_related_files
+from agent.github_client import GitHubAPIError
+from agent.log_locations import locate_from_records
+from agent.log_parsers import ErrorRecord, load_error_records
+from agent.repo_session import RepairSession
 from agent.schemas import LocateResponse
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+async def _locate_from_logs(session: RepairSession, state: RepairAgentState) -> Optional[ErrorRecord]:
+    """
+    Picks the target file from the file/line positions of the error records.
+
+    Returns:
+        The chosen record (with a repository path), or None when no record is
+        confident enough (or the repository tree is unavailable) and the
+        model should decide.
+    """
+    if not settings.LOCATE_FROM_LOGS_ENABLED:
+        return None
+    records = load_error_records(state.get('error_records'), state.get('error_logs') or '')
+    if not any(record.file for record in records):
+        return None
+    try:
+        index = await session.get_index()
+    except GitHubAPIError as e:
+        logger.warning(f"Could not load repository tree for {session.repo_name}: {e}")
+        return None
+    return locate_from_records(records, index, settings.LOCATE_MIN_CONFIDENCE)
+
 async def locate_node(state: RepairAgentState) -> RepairAgentState:
     """
     Node: Locate
-    Identifies which file needs fixing based on the root cause.
-    Also gathers context files for better understanding.
+    Identifies which file needs fixing. File/line positions of the error
+    records (tracebacks, compiler and test output) decide it without a model
+    call when a record is confident; otherwise Flash picks it from the root
+    cause. Also gathers context files for better understanding.
     """
     if state.get("status") == "FAILED":
         return state
 
     logger.info(f"Locating file for root cause: {state['root_cause']}")
     
-    from github import Github
+    from agent.repo_session import get_session
     from agent.llm import vertex_client
     
     try:
-        gh = Github(settings.GITHUB_TOKEN)
-        repo = gh.get_repo(state['repo_name'])
-        
-        # Get model and configure structured output
-        model = vertex_client.get_model("flash")
-        structured_llm = model.with_structured_output(LocateResponse, include_raw=True)
-        
-        prompt = f"""
-        Based on this root cause of a CI/CD failure, identify the absolute file path that likely needs to be fixed.
-        
-        Root Cause: {state['root_cause']}
-        Error Logs: {state.get('error_logs', '')[:500]}
-        """
-        
-        # Invoke model
-        response = await structured_llm.ainvoke(prompt)
-        
-        parsed_result: LocateResponse = response["parsed"]
-        raw_response = response["raw"]
-        target_file = parsed_result.file_path.strip()
+        session = get_session(state['job_id'], state['repo_name'])
+        location = await _locate_from_logs(session, state)
+        cost = 0.0
+        if location is not None:
+            target_file = location.file
+            logger.info(
+                f"Located target file from logs: {target_file}:{location.line} "
+                f"({location.ecosystem} {location.error_type}, confidence {location.confidence:.2f})"
+            )
+        else:
+            # Get model and configure structured output
+            model = vertex_client.get_model("flash")
+            structured_llm = model.with_structured_output(LocateResponse, include_raw=True)
+            
+            prompt = f"""
+            Based on this root cause of a CI/CD failure, identify the absolute file path that likely needs to be fixed.
+            
+            Root Cause: {state['root_cause']}
+            Error Logs: {state.get('error_logs', '')[:500]}
+            """
+            
+            # Invoke model
+            response = await structured_llm.ainvoke(prompt)
+            
+            parsed_result: LocateResponse = response["parsed"]
+            raw_response = response["raw"]
+            target_file = parsed_result.file_path.strip()
+            
+            # Get token usage from metadata
+            usage = raw_response.usage_metadata or {}
+            input_tokens = usage.get("input_tokens", 0)
+            output_tokens = usage.get("output_tokens", 0)
+            
+            # Estimate cost
+            cost = estimate_vertex_cost(
+                "gemini-1.5-flash", 
+                input_tokens,
+                output_tokens
+            )
         
         # Gather context files for better understanding
-        context_files = await get_related_files(repo, state['repo_name'], target_file, state.get('root_cause', ''))
-        
-        logger.info(f"Located target file: {target_file}, gathered {len(context_files)} context files")
-        
-        # Get token usage from metadata
-        usage = raw_response.usage_metadata or {}
-        input_tokens = usage.get("input_tokens", 0)
-        output_tokens = usage.get("output_tokens", 0)
+        gather_started = time.perf_counter()
+        context_files = await get_related_files(session, target_file, state.get('root_cause', ''))
+        context_gather_ms = (time.perf_counter() - gather_started) * 1000
         
-        # Estimate cost
-        cost = estimate_vertex_cost(
-            "gemini-1.5-flash", 
-            input_tokens,
-            output_tokens
+        logger.info(
+            f"Located target file: {target_file}, gathered {len(context_files)} context files "
+            f"in {context_gather_ms:.0f} ms"
         )
         
         # Store context files in state (we'll use them in fix_node)
         state_with_context = {
             **state,
             "target_file_path": target_file,
+            "target_line": location.line if location is not None else None,
+            "located_from_logs": location is not None,
             "total_cost": cost,
-            "context_files": context_files  # Store for fix_node
+            "context_files": context_files,  # Store for fix_node
+            "context_gather_ms": context_gather_ms
         }
         
         return state_with_context
     except Exception as e:
+        if is_transient_error(e):
+            # Raised so the queue retries the job, resuming at this node
+            raise
         logger.error(f"Error in locate_node: {e}")
         return {**state, "status": "FAILED", "error": str(e)}
@@ -0,0 +1,60 @@
+import logging
+from agent.repair.state import RepairAgentState
+from agent.classification import FailureCategory, classify_matches, match_failure_patterns, should_auto_fix
+from agent.log_parsers import load_error_records
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def preclassify_node(state: RepairAgentState) -> RepairAgentState:
+    """
+    Node: Pre-classify
+    Runs the heuristic classifier on the collected logs before any model call.
+    Failures in a category that is never auto-fixed (infrastructure, timeout)
+    end the graph here instead of paying for a diagnosis that would be
+    rejected by classify anyway.
+
+    Only runner-level failures are rejected: logs with error records (a test
+    or build failure the parsers recognized, such as a test raising
+    TimeoutError) always go to diagnose, and the logs must match at least one
+    pattern of weight PRECLASSIFY_MIN_PATTERN_WEIGHT or more, so a few weak
+    words such as "timeout" are not enough.
+    """
+    if state.get("status") == "FAILED" or not settings.PRECLASSIFY_ENABLED:
+        return state
+
+    try:
+        error_logs = state.get("error_logs") or ""
+        if load_error_records(state.get("error_records"), error_logs):
+            return state
+        matches = match_failure_patterns(error_logs)
+        category, confidence = classify_matches(matches)
+
+        # Only categories should_auto_fix rejects regardless of confidence can
+        # stop the graph; everything else still goes to diagnose
+        if category == FailureCategory.UNKNOWN or should_auto_fix(category, 1.0):
+            return state
+        strong = [
+            match.pattern for match in matches
+            if match.category == category and match.weight >= settings.PRECLASSIFY_MIN_PATTERN_WEIGHT
+        ]
+        if not strong or confidence < settings.PRECLASSIFY_MIN_CONFIDENCE:
+            return state
+
+        logger.info(
+            f"Pre-classified job {state['job_id']} as {category.value} ({confidence:.2f}, "
+            f"matched '{strong[0]}'), skipping diagnosis"
+        )
+        return {
+            **state,
+            "failure_category": category.value,
+            "preclassified": True,
+            "status": "FAILED",
+            "error": f"Failure category '{category.value}' with confidence {confidence:.2f} is not auto-fixable (pre-classified from logs)"
+        }
+
+    except Exception as e:
+        # Pre-classification is an optimization; fall through to diagnose
+        logger.warning(f"Error in preclassify_node: {e}")
+        return state
@@ -1,4 +1,4 @@
-from typing import TypedDict, Optional, Annotated, Dict
+from typing import Any, TypedDict, Optional, Annotated, Dict, List
 import operator
 
 
@@ -12,20 +12,34 @@ class RepairAgentState(TypedDict):
     # Core IDs
     job_id: int
     run_id: str
+    run_ids: Optional[List[str]]  # all coalesced runs for the same commit
+    head_sha: Optional[str]
     repo_name: str
     
     # Context
     error_logs: Optional[str]
+    error_records: Optional[List[Dict[str, Any]]]  # structured errors (agent/log_parsers.py ErrorRecord)
     root_cause: Optional[str]
     target_file_path: Optional[str]
+    target_line: Optional[int]  # line reported in the logs, when located from them
+    located_from_logs: Optional[bool]  # target picked by a log parser instead of the model
     original_content: Optional[str]
     fixed_content: Optional[str]
+    fix_mode: Optional[str]  # "window", "line_window", "patch", "full", or "<first mode>_fallback" when a later mode produced the fix
+    fix_output_tokens: Optional[int]  # output tokens of the fix calls
+    fix_full_output_tokens: Optional[int]  # output tokens of a full-content rewrite (estimated in patch mode)
     context_files: Optional[Dict[str, str]]  # file paths to contents
+    context_gather_ms: Optional[float]  # wall-clock time spent gathering context_files
     
     # Confidence scoring
     diagnosis_confidence: Optional[float]
     fix_confidence: Optional[float]
     failure_category: Optional[str]
+    preclassified: Optional[bool]  # rejected by the heuristic classifier before diagnose
+    diagnosis_cached: Optional[bool]  # diagnosis served from the diagnosis cache
+    diagnosis_cost_avoided: Optional[float]
+    failure_fingerprint: Optional[str]  # hash of failure_signature
+    failure_signature: Optional[Dict[str, Any]]  # normalized error lines, frame shape, test ids
     
     # Metadata
     commit_author: Optional[str]
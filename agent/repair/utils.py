@@ -1,7 +1,12 @@
+import asyncio
 import logging
 import os
 from typing import Optional
 
+import httpx
+
+from agent.github_client import GitHubAPIError
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,3 +43,29 @@ def get_langfuse_callback() -> Optional[object]:
         except Exception as inner_e:
              logger.error(f"Error logging Langfuse details: {inner_e}")
         return None
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Tells whether a node error is likely to go away on retry.
+
+    GitHub 5xx and 429 responses, network errors, timeouts and Vertex AI
+    server errors are transient. Nodes re-raise them instead of returning a
+    FAILED state, so the job queue retries the job and the checkpointed
+    graph resumes at the node that failed.
+
+    Args:
+        error: Exception caught by a node.
+
+    Returns:
+        True if the job should be retried.
+    """
+    if isinstance(error, GitHubAPIError):
+        return error.status_code >= 500 or error.status_code == 429
+    if isinstance(error, (httpx.TransportError, asyncio.TimeoutError, TimeoutError)):
+        return True
+    try:
+        from google.api_core import exceptions as google_exceptions
+    except ImportError:
+        return False
+    return isinstance(error, (google_exceptions.ServerError, google_exceptions.TooManyRequests))
@@ -0,0 +1,252 @@
+import asyncio
+import bisect
+import logging
+import posixpath
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RepoIndex:
+    """
+    Immutable index of the files in one commit of a repository.
+
+    Built from a single recursive git tree listing. Paths are kept in one
+    sorted list with a parallel list of blob SHAs, so existence checks are a
+    binary search and directory listings are a prefix range scan. A basename
+    lookup table is built on first use for repo-wide searches (test files).
+
+    GitHub truncates very large tree listings. A truncated index still answers
+    positively for every path it saw, but cannot prove a path is absent, so
+    `contains` returns None for unknown paths and callers fall back to reading
+    the file.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str]], truncated: bool = False) -> None:
+        """
+        Initialize the index.
+
+        Args:
+            entries: (path, blob sha) pairs for every file in the commit.
+            truncated: Whether the listing was cut short by GitHub.
+        """
+        pairs = sorted(entries)
+        self._paths: List[str] = [path for path, _ in pairs]
+        self._shas: List[str] = [sha for _, sha in pairs]
+        self._by_name: Optional[Dict[str, List[str]]] = None
+        self.truncated: bool = truncated
+
+    @classmethod
+    def from_tree(cls, tree: Dict[str, Any]) -> "RepoIndex":
+        """
+        Builds an index from a recursive git tree response.
+
+        Args:
+            tree: Tree object as returned by `AsyncGitHubClient.get_tree`.
+
+        Returns:
+            Index of the tree's files (directories and submodules are skipped).
+        """
+        entries = [
+            (entry["path"], entry["sha"])
+            for entry in tree.get("tree", [])
+            if entry.get("type") == "blob"
+        ]
+        return cls(entries, truncated=bool(tree.get("truncated")))
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def _position(self, path: str) -> Optional[int]:
+        """Returns the list position of a path, or None if it is not indexed."""
+        i = bisect.bisect_left(self._paths, path)
+        if i < len(self._paths) and self._paths[i] == path:
+            return i
+        return None
+
+    def contains(self, path: str) -> Optional[bool]:
+        """
+        Checks whether a file exists at this commit.
+
+        Args:
+            path: File path within the repository.
+
+        Returns:
+            True if it exists, False if it does not, None if the index is
+            truncated and the path was not in the listing.
+        """
+        if self._position(path) is not None:
+            return True
+        return None if self.truncated else False
+
+    def blob_sha(self, path: str) -> Optional[str]:
+        """
+        Returns the blob SHA of a file.
+
+        Args:
+            path: File path within the repository.
+
+        Returns:
+            Git blob SHA, or None if the path is not indexed.
+        """
+        i = self._position(path)
+        return self._shas[i] if i is not None else None
+
+    def with_prefix(self, prefix: str) -> List[str]:
+        """
+        Lists indexed paths starting with a prefix (e.g. a directory + "/").
+
+        Args:
+            prefix: Path prefix.
+
+        Returns:
+            Matching paths in sorted order.
+        """
+        start = bisect.bisect_left(self._paths, prefix)
+        end = start
+        while end < len(self._paths) and self._paths[end].startswith(prefix):
+            end += 1
+        return self._paths[start:end]
+
+    def find_name(self, name: str) -> List[str]:
+        """
+        Lists indexed paths whose file name is `name`, anywhere in the tree.
+
+        Args:
+            name: File name without directories.
+
+        Returns:
+            Matching paths in sorted order.
+        """
+        if self._by_name is None:
+            by_name: Dict[str, List[str]] = {}
+            for path in self._paths:
+                by_name.setdefault(posixpath.basename(path), []).append(path)
+            self._by_name = by_name
+        return self._by_name.get(name, [])
+
+    def first_existing(self, candidates: Iterable[str]) -> Optional[str]:
+        """
+        Returns the first candidate path that exists in the index.
+
+        Args:
+            candidates: Paths in order of preference.
+
+        Returns:
+            The first indexed path, or None if none is indexed.
+        """
+        for path in candidates:
+            if self._position(path) is not None:
+                return path
+        return None
+
+
+class RepoIndexCache:
+    """
+    Process-wide LRU of repository indexes keyed by `(repo, commit sha)`.
+
+    A commit's tree never changes, so an index is fetched once and shared by
+    every job working on that commit. Concurrent requests for the same commit
+    wait on a single in-flight fetch.
+    """
+
+    def __init__(self, max_entries: int = settings.REPO_INDEX_CACHE_SIZE) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of commit indexes kept.
+        """
+        self._max_entries: int = max_entries
+        self._indexes: "OrderedDict[Tuple[str, str], RepoIndex]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], "asyncio.Future[RepoIndex]"] = {}
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0, "truncated": 0}
+
+    async def get(
+        self,
+        repo_name: str,
+        commit_sha: str,
+        fetch_tree: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> RepoIndex:
+        """
+        Returns the index for a commit, fetching its tree on a miss.
+
+        Args:
+            repo_name: Full repository name (owner/repo).
+            commit_sha: Commit SHA.
+            fetch_tree: Coroutine function returning the recursive tree.
+
+        Returns:
+            The commit's index.
+
+        Raises:
+            GitHubAPIError: If the tree could not be fetched.
+        """
+        key = (repo_name, commit_sha)
+        index = self._indexes.get(key)
+        if index is not None:
+            self._indexes.move_to_end(key)
+            self._stats["hits"] += 1
+            return index
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._stats["hits"] += 1
+            return await asyncio.shield(inflight)
+
+        self._stats["misses"] += 1
+        future: "asyncio.Future[RepoIndex]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            index = RepoIndex.from_tree(await fetch_tree())
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so failures nobody waited on are not logged as unhandled
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        if index.truncated:
+            self._stats["truncated"] += 1
+            logger.warning(f"Git tree for {repo_name}@{commit_sha[:7]} is truncated; indexed {len(index)} files")
+        future.set_result(index)
+        self._indexes[key] = index
+        while len(self._indexes) > self._max_entries:
+            self._indexes.popitem(last=False)
+        return index
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns cache counters for the metrics endpoint.
+
+        Returns:
+            Dictionary with hit, miss and truncation counts and the entry count.
+        """
+        return {**self._stats, "entries": len(self._indexes)}
+
+
+# Global cache instance
+_repo_index_cache: Optional[RepoIndexCache] = None
+
+
+def get_repo_index_cache() -> RepoIndexCache:
+    """
+    Get the global repository index cache.
+
+    Returns:
+        Global RepoIndexCache singleton.
+    """
+    global _repo_index_cache
+    if _repo_index_cache is None:
+        _repo_index_cache = RepoIndexCache()
+    return _repo_index_cache
@@ -0,0 +1,385 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import re
+
+import httpx
+
+from agent.blob_cache import BlobCache, get_blob_cache
+from agent.github_client import AsyncGitHubClient, GitHubNotFoundError, RepoFile, get_github_client
+from agent.repo_index import RepoIndex, RepoIndexCache, get_repo_index_cache
+
+logger = logging.getLogger(__name__)
+
+# Only reads pinned to a commit are immutable and safe to share across jobs
+_COMMIT_SHA_RE = re.compile(r"^[0-9a-f]{40}$")
+
+
+class RepairSession:
+    """
+    Job-scoped view of the repository being repaired.
+
+    Created once per job and shared by every node, so repository metadata,
+    branch heads and file contents are fetched from GitHub at most once per
+    job. Files are read at the default branch head resolved on first use,
+    which gives all nodes the same snapshot and lets `pr_node` branch from
+    that commit and reuse the blob SHA `fix_node` already fetched.
+    """
+
+    def __init__(
+        self,
+        job_id: int,
+        repo_name: str,
+        github: Optional[AsyncGitHubClient] = None,
+        blob_cache: Optional[BlobCache] = None,
+        index_cache: Optional[RepoIndexCache] = None
+    ) -> None:
+        """
+        Initialize the session. Nothing is fetched until first needed.
+
+        Args:
+            job_id: Job identifier.
+            repo_name: Full repository name (owner/repo).
+            github: GitHub client; defaults to the process-wide client.
+            blob_cache: File cache; defaults to the process-wide cache.
+            index_cache: Tree index cache; defaults to the process-wide cache.
+        """
+        self.job_id: int = job_id
+        self.repo_name: str = repo_name
+        self.api_calls: int = 0
+        self._github: AsyncGitHubClient = github or get_github_client()
+        self._blob_cache: BlobCache = blob_cache or get_blob_cache()
+        self._index_cache: RepoIndexCache = index_cache or get_repo_index_cache()
+        self._indexes: Dict[str, RepoIndex] = {}
+        self._repo: Optional[Dict[str, Any]] = None
+        self._runs: Dict[int, Dict[str, Any]] = {}
+        self._branch_heads: Dict[str, str] = {}
+        self._files: Dict[Tuple[str, str], RepoFile] = {}
+        self._missing: Set[Tuple[str, str]] = set()
+        # Serializes metadata lookups so concurrent reads resolve the base commit once
+        self._metadata_lock: asyncio.Lock = asyncio.Lock()
+
+    async def get_repo(self) -> Dict[str, Any]:
+        """
+        Returns repository metadata, fetching it on first use.
+
+        Returns:
+            Repository object as returned by GitHub.
+        """
+        async with self._metadata_lock:
+            if self._repo is None:
+                self.api_calls += 1
+                self._repo = await self._github.get_repo(self.repo_name)
+        return self._repo
+
+    async def default_branch(self) -> str:
+        """
+        Returns the repository's default branch.
+
+        Returns:
+            Default branch name.
+        """
+        return (await self.get_repo()).get("default_branch") or "main"
+
+    async def get_workflow_run(self, run_id: int) -> Dict[str, Any]:
+        """
+        Fetches a workflow run of the repository, once per job.
+
+        Args:
+            run_id: GitHub Actions workflow run ID.
+
+        Returns:
+            Workflow run object as returned by GitHub.
+        """
+        if run_id not in self._runs:
+            self.api_calls += 1
+            self._runs[run_id] = await self._github.get_workflow_run(self.repo_name, run_id)
+        return self._runs[run_id]
+
+    async def list_workflow_runs(
+        self,
+        workflow_id: int,
+        branch: Optional[str] = None,
+        status: Optional[str] = None,
+        per_page: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Lists the most recent runs of a workflow, newest first.
+
+        Args:
+            workflow_id: Workflow ID.
+            branch: Only runs for this branch.
+            status: Only runs with this status or conclusion.
+            per_page: Number of runs to return.
+
+        Returns:
+            Workflow run objects.
+        """
+        self.api_calls += 1
+        return await self._github.list_workflow_runs(self.repo_name, workflow_id, branch, status, per_page)
+
+    async def list_run_jobs(self, run_id: int) -> List[Dict[str, Any]]:
+        """
+        Lists the jobs of a workflow run's latest attempt.
+
+        Args:
+            run_id: GitHub Actions workflow run ID.
+
+        Returns:
+            Job objects, including their steps.
+        """
+        self.api_calls += 1
+        return await self._github.list_run_jobs(self.repo_name, run_id)
+
+    @asynccontextmanager
+    async def stream_job_log(self, job_id: int) -> AsyncIterator[httpx.Response]:
+        """
+        Opens a job's plain-text log as a streamed response.
+
+        Args:
+            job_id: Workflow job ID.
+
+        Yields:
+            The open response, with its body unread.
+        """
+        self.api_calls += 1
+        async with self._github.stream_job_log(self.repo_name, job_id) as response:
+            yield response
+
+    async def get_branch_sha(self, branch: str) -> str:
+        """
+        Returns a branch's head commit SHA, resolved once per job.
+
+        Args:
+            branch: Branch name.
+
+        Returns:
+            Head commit SHA.
+        """
+        async with self._metadata_lock:
+            if branch not in self._branch_heads:
+                self.api_calls += 1
+                self._branch_heads[branch] = await self._github.get_branch_sha(self.repo_name, branch)
+        return self._branch_heads[branch]
+
+    async def base_sha(self) -> str:
+        """
+        Returns the default branch head the job works against.
+
+        Returns:
+            Commit SHA that files are read at and fix branches start from.
+        """
+        return await self.get_branch_sha(await self.default_branch())
+
+    async def get_index(self, ref: Optional[str] = None) -> RepoIndex:
+        """
+        Returns the file index of a commit from one recursive tree listing.
+
+        Once loaded, `get_file` answers reads of paths absent from the index
+        without a GitHub call and looks cached contents up by blob SHA.
+
+        Args:
+            ref: Commit SHA; defaults to `base_sha()`.
+
+        Returns:
+            Index of the files at that commit, shared across jobs.
+
+        Raises:
+            GitHubAPIError: If the tree could not be fetched.
+        """
+        commit_sha = ref or await self.base_sha()
+        if commit_sha not in self._indexes:
+            async def fetch_tree() -> Dict[str, Any]:
+                self.api_calls += 1
+                return await self._github.get_tree(self.repo_name, commit_sha)
+
+            self._indexes[commit_sha] = await self._index_cache.get(self.repo_name, commit_sha, fetch_tree)
+        return self._indexes[commit_sha]
+
+    async def get_file(self, path: str, ref: Optional[str] = None) -> RepoFile:
+        """
+        Reads a file, serving repeated reads from the session cache.
+
+        Args:
+            path: File path within the repository.
+            ref: Commit SHA or branch to read at; defaults to `base_sha()`.
+
+        Returns:
+            The file's path, blob SHA and decoded text content.
+
+        Raises:
+            GitHubNotFoundError: If the path does not exist at that ref.
+            GitHubAPIError: If the path is not a file or the request fails.
+        """
+        key = (ref or await self.base_sha(), path)
+        if key in self._missing:
+            raise GitHubNotFoundError(f"{path} not found at {key[0]}", 404)
+        if key in self._files:
+            return self._files[key]
+
+        index = self._indexes.get(key[0])
+        if index is not None:
+            if index.contains(path) is False:
+                self._missing.add(key)
+                raise GitHubNotFoundError(f"{path} not found at {key[0]}", 404)
+            blob_sha = index.blob_sha(path)
+            content = await self._blob_cache.get_blob(self.repo_name, blob_sha) if blob_sha else None
+            if content is not None:
+                self._files[key] = {"path": path, "sha": blob_sha, "content": content}
+                return self._files[key]
+
+        commit_sha = key[0] if _COMMIT_SHA_RE.match(key[0]) else None
+        if commit_sha:
+            cached = await self._blob_cache.get_file(self.repo_name, commit_sha, path)
+            if cached is not None:
+                self._files[key] = cached
+                return cached
+            if await self._blob_cache.is_missing(self.repo_name, commit_sha, path):
+                self._missing.add(key)
+                raise GitHubNotFoundError(f"{path} not found at {commit_sha}", 404)
+
+        self.api_calls += 1
+        try:
+            file = await self._github.get_file(self.repo_name, path, ref=key[0])
+        except GitHubNotFoundError:
+            self._missing.add(key)
+            if commit_sha:
+                await self._blob_cache.put_missing(self.repo_name, commit_sha, path)
+            raise
+        if commit_sha:
+            await self._blob_cache.put_file(self.repo_name, commit_sha, file)
+        self._files[key] = file
+        return file
+
+    async def create_branch(self, branch: str, sha: str) -> None:
+        """
+        Creates a branch and records its head.
+
+        Args:
+            branch: Name of the new branch.
+            sha: Commit the branch should point at.
+        """
+        self.api_calls += 1
+        await self._github.create_branch(self.repo_name, branch, sha)
+        self._branch_heads[branch] = sha
+
+    async def update_file(
+        self,
+        path: str,
+        message: str,
+        content: str,
+        sha: str,
+        branch: str
+    ) -> Dict[str, Any]:
+        """
+        Commits new content for a file and updates the cached branch head.
+
+        Args:
+            path: File path within the repository.
+            message: Commit message.
+            content: New file content.
+            sha: Blob SHA of the file being replaced.
+            branch: Branch to commit to.
+
+        Returns:
+            The contents API response (commit and content objects).
+        """
+        self.api_calls += 1
+        result = await self._github.update_file(self.repo_name, path, message, content, sha, branch)
+        commit_sha = (result.get("commit") or {}).get("sha")
+        if commit_sha:
+            self._branch_heads[branch] = commit_sha
+            blob = result.get("content") or {}
+            if blob.get("sha"):
+                self._files[(commit_sha, path)] = {"path": path, "sha": blob["sha"], "content": content}
+        return result
+
+    async def create_pull(
+        self,
+        title: str,
+        body: str,
+        head: str,
+        base: str,
+        draft: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Opens a pull request.
+
+        Args:
+            title: Pull request title.
+            body: Pull request description.
+            head: Branch containing the changes.
+            base: Branch to merge into.
+            draft: Whether to open the PR as a draft.
+
+        Returns:
+            The created pull request object.
+        """
+        self.api_calls += 1
+        return await self._github.create_pull(self.repo_name, title, body, head, base, draft)
+
+
+# Sessions of jobs currently running in this process, with the number of
+# runs using each. A redelivered job can run twice at once; both runs share
+# the session and it is released when the last one closes it.
+_sessions: Dict[int, RepairSession] = {}
+_session_refs: Dict[int, int] = {}
+
+
+def open_session(job_id: int, repo_name: str) -> RepairSession:
+    """
+    Returns the session for a run of a job, creating it if no run holds one.
+
+    Every call must be paired with `close_session`.
+
+    Args:
+        job_id: Job identifier.
+        repo_name: Full repository name (owner/repo).
+
+    Returns:
+        The job's session.
+    """
+    session = _sessions.get(job_id)
+    if session is None or session.repo_name != repo_name or not _session_refs.get(job_id):
+        session = RepairSession(job_id, repo_name)
+        _sessions[job_id] = session
+        _session_refs[job_id] = 0
+    _session_refs[job_id] += 1
+    return session
+
+
+def get_session(job_id: int, repo_name: str) -> RepairSession:
+    """
+    Returns the job's session, creating one if the graph runs without `invoke`.
+
+    Args:
+        job_id: Job identifier.
+        repo_name: Full repository name (owner/repo).
+
+    Returns:
+        The job's session.
+    """
+    session = _sessions.get(job_id)
+    if session is None or session.repo_name != repo_name:
+        session = RepairSession(job_id, repo_name)
+        _sessions[job_id] = session
+    return session
+
+
+def close_session(job_id: int) -> Optional[RepairSession]:
+    """
+    Releases one run's hold on a job's session; the last release drops it.
+
+    Args:
+        job_id: Job identifier.
+
+    Returns:
+        The session, or None if the job had none.
+    """
+    refs = _session_refs.get(job_id, 0) - 1
+    if refs > 0:
+        _session_refs[job_id] = refs
+        return _sessions.get(job_id)
+    _session_refs.pop(job_id, None)
+    return _sessions.pop(job_id, None)
@@ -0,0 +1,266 @@
+import logging
+import re
+from typing import Any, AsyncIterator, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from agent.github_client import GitHubAPIError
+from agent.log_baseline import LogBaseline, get_baseline_cache, line_key
+from agent.log_parsers import ErrorRecordExtractor
+from agent.log_reducer import LogReducer
+from agent.repo_session import RepairSession
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Job and step conclusions `gh run view --log-failed` treats as failed
+FAILED_CONCLUSIONS = frozenset({"failure", "timed_out", "startup_failure"})
+
+# Every job log line starts with an ISO-8601 timestamp (7 fractional digits)
+_TIMESTAMP_RE = re.compile(r"^\ufeff?(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(?:\.\d+)?Z ?")
+
+# (step name, first second, last second) of a failed step
+StepWindow = Tuple[str, str, str]
+
+
+def _second(timestamp: Optional[str]) -> Optional[str]:
+    """Truncates an ISO-8601 timestamp to whole seconds for string comparison."""
+    return timestamp[:19] if timestamp and len(timestamp) >= 19 else None
+
+
+def failed_step_windows(job: Dict[str, Any]) -> List[StepWindow]:
+    """
+    Returns the time windows of a job's failed steps.
+
+    The jobs API reports step start and end times to the second and the log
+    stamps every line, so a step's output is the lines stamped inside its
+    window. Lines on a boundary second may belong to the neighbouring step.
+
+    Args:
+        job: Job object from `list_run_jobs`.
+
+    Returns:
+        Windows in step order; empty if no failed step has both timestamps.
+    """
+    windows: List[StepWindow] = []
+    for step in sorted(job.get("steps") or [], key=lambda s: s.get("number", 0)):
+        if step.get("conclusion") not in FAILED_CONCLUSIONS:
+            continue
+        start, end = _second(step.get("started_at")), _second(step.get("completed_at"))
+        if start and end:
+            windows.append((step.get("name") or f"step {step.get('number')}", start, end))
+    return windows
+
+
+async def iter_failed_step_lines(
+    lines: AsyncIterator[str],
+    windows: List[StepWindow]
+) -> AsyncIterator[Tuple[Optional[str], str]]:
+    """
+    Filters a streamed job log down to the lines of its failed steps.
+
+    Consumes the log one line at a time and stops reading once the last
+    window has passed, so memory stays bounded by a single line.
+
+    Args:
+        lines: Job log lines as streamed from GitHub.
+        windows: Failed step windows; if empty every line is kept.
+
+    Yields:
+        (step name, line without its timestamp) pairs. The step name is None
+        when no windows were given.
+    """
+    step: Optional[str] = None
+    previous_second = ""
+    last_second = windows[-1][2] if windows else None
+    async for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+        match = _TIMESTAMP_RE.match(line)
+        if match:
+            second = match.group(1)
+            line = line[match.end():]
+            # Consecutive lines mostly share a second, so the window lookup is reused
+            if windows and second != previous_second:
+                if second > last_second:
+                    return
+                previous_second = second
+                step = next((name for name, start, end in windows if start <= second <= end), None)
+        if step is not None or not windows:
+            yield step, line
+
+
+async def feed_failed_job_log(
+    session: RepairSession,
+    job: Dict[str, Any],
+    reducer: LogReducer,
+    known_lines: Optional[FrozenSet[int]] = None,
+    extractor: Optional[ErrorRecordExtractor] = None
+) -> int:
+    """
+    Streams one job's log into a reducer, keeping its failed steps only.
+
+    Args:
+        session: Repository session of the job being repaired.
+        job: Failed job object from `list_run_jobs`.
+        reducer: Reducer collecting the run's logs.
+        known_lines: Line keys of the same job in a successful run; matching
+            lines are dropped before reduction.
+        extractor: Collects error records from every failed-step line
+            (before baseline filtering, so multi-line errors stay intact).
+
+    Returns:
+        Number of lines dropped because the successful run had them too.
+
+    Raises:
+        GitHubAPIError: If the log could not be downloaded.
+    """
+    windows = failed_step_windows(job)
+    job_name = job.get("name") or str(job.get("id"))
+    current_step: Optional[str] = ""
+    dropped = 0
+    # Lines go to the reducer in batches so marker-free stretches are skipped cheaply
+    batch: List[str] = []
+    async with session.stream_job_log(job["id"]) as response:
+        async for step, line in iter_failed_step_lines(response.aiter_lines(), windows):
+            if step != current_step:
+                reducer.feed_lines(batch)
+                batch = []
+                current_step = step
+                reducer.add_header(f"--- {job_name} / {step} ---" if step else f"--- {job_name} ---")
+            if extractor is not None:
+                extractor.feed_lines((line,))
+            if known_lines is not None and line_key(line) in known_lines:
+                dropped += 1
+                continue
+            batch.append(line)
+            if len(batch) >= 1024:
+                reducer.feed_lines(batch)
+                batch = []
+    reducer.feed_lines(batch)
+    return dropped
+
+
+async def last_successful_run(session: RepairSession, run: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Finds the most recent successful run of a run's workflow on its branch.
+
+    Args:
+        session: Repository session of the job being repaired.
+        run: The failed workflow run.
+
+    Returns:
+        The successful run, or None if the workflow never passed on that branch.
+    """
+    if not run.get("workflow_id"):
+        return None
+    runs = await session.list_workflow_runs(
+        run["workflow_id"],
+        branch=run.get("head_branch"),
+        status="success",
+        per_page=5
+    )
+    return next(
+        (candidate for candidate in runs
+         if candidate.get("id") != run.get("id") and candidate.get("conclusion") == "success"),
+        None
+    )
+
+
+async def _hash_job_log(session: RepairSession, job_id: int) -> FrozenSet[int]:
+    """Streams a whole job log and returns the keys of its normalized lines."""
+    keys = set()
+    async with session.stream_job_log(job_id) as response:
+        async for _, line in iter_failed_step_lines(response.aiter_lines(), []):
+            keys.add(line_key(line))
+            if len(keys) >= settings.LOG_BASELINE_MAX_LINES:
+                break
+    return frozenset(keys)
+
+
+async def load_baseline(
+    session: RepairSession,
+    run: Dict[str, Any],
+    job_names: Set[str]
+) -> Optional[LogBaseline]:
+    """
+    Loads the line keys of the last successful run's jobs with matching names.
+
+    Hashed job logs are shared across repair jobs through the baseline cache.
+
+    Args:
+        session: Repository session of the job being repaired.
+        run: The failed workflow run.
+        job_names: Names of the failed jobs.
+
+    Returns:
+        The baseline, or None if there is no successful run with those jobs.
+
+    Raises:
+        GitHubAPIError: If the runs, jobs or a log could not be fetched.
+    """
+    success = await last_successful_run(session, run)
+    if success is None:
+        return None
+    cache = get_baseline_cache()
+    job_keys: Dict[str, FrozenSet[int]] = {}
+    for job in await session.list_run_jobs(success["id"]):
+        name = job.get("name")
+        if name in job_names and name not in job_keys:
+            job_keys[name] = await cache.get(
+                session.repo_name,
+                job["id"],
+                lambda job_id=job["id"]: _hash_job_log(session, job_id)
+            )
+    return LogBaseline(success["id"], job_keys) if job_keys else None
+
+
+async def fetch_failed_logs(
+    session: RepairSession,
+    run_id: int,
+    max_chars: int,
+    extractor: Optional[ErrorRecordExtractor] = None
+) -> str:
+    """
+    Fetches the failed-step logs of a workflow run through the jobs API.
+
+    When enabled, lines that also appear (after normalization) in the same
+    job of the workflow's last successful run on the branch are dropped
+    first, since output shared with a green run rarely explains the failure.
+    Failed jobs are then streamed one at a time into a `LogReducer`, which
+    keeps the error windows and the tail of the output within `max_chars`.
+    The whole job log is used for jobs whose failed steps have no timestamps.
+
+    Args:
+        session: Repository session of the job being repaired.
+        run_id: GitHub Actions workflow run ID.
+        max_chars: Maximum number of characters to keep across all jobs.
+        extractor: Collects structured error records from the full
+            failed-step output while it streams.
+
+    Returns:
+        The reduced failed-step logs, or an empty string if no job failed.
+
+    Raises:
+        GitHubAPIError: If the jobs or a log could not be fetched.
+    """
+    jobs = await session.list_run_jobs(run_id)
+    failed = [job for job in jobs if job.get("conclusion") in FAILED_CONCLUSIONS]
+    if not failed:
+        return ""
+
+    baseline: Optional[LogBaseline] = None
+    if settings.LOG_BASELINE_ENABLED:
+        try:
+            run = await session.get_workflow_run(run_id)
+            baseline = await load_baseline(session, run, {job.get("name") for job in failed})
+        except GitHubAPIError as e:
+            logger.warning(f"No log baseline for run {run_id}: {e}")
+
+    reducer = LogReducer(max_chars)
+    if baseline is not None:
+        reducer.add_header(f"--- lines also in successful run {baseline.run_id} omitted ---")
+    dropped = 0
+    for job in failed:
+        known_lines = baseline.job_keys.get(job.get("name")) if baseline is not None else None
+        dropped += await feed_failed_job_log(session, job, reducer, known_lines, extractor)
+    if baseline is not None:
+        logger.info(f"Run {run_id}: dropped {dropped} log lines also in successful run {baseline.run_id}")
+    return reducer.result()
@@ -16,6 +16,23 @@ class FixResponse(BaseModel):
     confidence: float = Field(description="Confidence score (0.0-1.0) indicating certainty that this fix works.")
     explanation: str = Field(description="A brief explanation of what was fixed and why.")
 
+class FixPatchResponse(BaseModel):
+    """Schema for a fix returned as a unified diff."""
+    patch: str = Field(description="Unified diff of the changes against the original file content.")
+    confidence: float = Field(description="Confidence score (0.0-1.0) indicating certainty that this fix works.")
+    explanation: str = Field(description="A brief explanation of what was fixed and why.")
+
+class RegionEdit(BaseModel):
+    """New content of one region of a windowed file."""
+    region: int = Field(description="Number of the region, as in its <<<REGION n>>> marker.")
+    content: str = Field(description="The complete new content of the region, without marker lines.")
+
+class FixRegionsResponse(BaseModel):
+    """Schema for a fix returned as edited regions of a large file."""
+    regions: List[RegionEdit] = Field(description="The changed regions with their new content.")
+    confidence: float = Field(description="Confidence score (0.0-1.0) indicating certainty that this fix works.")
+    explanation: str = Field(description="A brief explanation of what was fixed and why.")
+
 class ContextAnalysisResponse(BaseModel):
     """Schema for identifying related context files."""
     related_files: List[str] = Field(description="List of file paths that are related to the target file and root cause.")
@@ -1,10 +1,17 @@
 from typing import Dict, Any
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends
-from sqlalchemy import func, select
+from sqlalchemy import desc, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.base import get_db
+from app.core.dedup import webhook_deduplicator
+from app.core.job_queue import get_job_queue
+from agent.blob_cache import get_blob_cache
+from agent.diagnosis_cache import get_diagnosis_cache
+from agent.log_baseline import get_baseline_cache
+from agent.repo_index import get_repo_index_cache
+from app.api.worker import get_worker_stats
+from app.db.base import get_db, get_pool_stats
 from app.db.models import RepairJob, JobStatus
 
 router = APIRouter()
@@ -89,7 +96,99 @@ async def get_metrics(
         .group_by(RepairJob.failure_category)
     )
     category_breakdown = {cat: count for cat, count in category_result.all()}
+
+    # Most frequent failure signatures (same breakage across runs and repos)
+    fingerprint_result = await db.execute(
+        select(RepairJob.failure_fingerprint, func.count(RepairJob.id).label("jobs"))
+        .where(
+            RepairJob.created_at >= cutoff_date,
+            RepairJob.failure_fingerprint.isnot(None)
+        )
+        .group_by(RepairJob.failure_fingerprint)
+        .order_by(desc("jobs"))
+        .limit(10)
+    )
+    top_fingerprints = {fingerprint: count for fingerprint, count in fingerprint_result.all()}
     
+    # Diagnoses served from the diagnosis cache (across all instances)
+    diagnosis_result = await db.execute(
+        select(
+            func.count(RepairJob.id),
+            func.count(RepairJob.id).filter(RepairJob.diagnosis_cached.is_(True)),
+            func.sum(RepairJob.diagnosis_cost_avoided)
+        )
+        .where(
+            RepairJob.created_at >= cutoff_date,
+            RepairJob.failure_fingerprint.isnot(None)
+        )
+    )
+    diagnosed_jobs, cached_diagnoses, diagnosis_cost_avoided = diagnosis_result.one()
+    diagnosis_cache = {
+        "jobs_diagnosed": diagnosed_jobs or 0,
+        "cache_hits": cached_diagnoses or 0,
+        "hit_rate": round(cached_diagnoses / diagnosed_jobs, 3) if diagnosed_jobs else 0.0,
+        "dollars_saved": round(diagnosis_cost_avoided or 0.0, 4),
+        "process": get_diagnosis_cache().stats(),
+    }
+
+    # LLM calls avoided by pre-classification, per day
+    preclassify_result = await db.execute(
+        select(func.date(RepairJob.created_at).label("day"), func.count(RepairJob.id))
+        .where(
+            RepairJob.created_at >= cutoff_date,
+            RepairJob.preclassified.is_(True)
+        )
+        .group_by("day")
+        .order_by("day")
+    )
+    preclassified_per_day = {str(day): count for day, count in preclassify_result.all()}
+    preclassification = {
+        "llm_calls_avoided": sum(preclassified_per_day.values()),
+        "llm_calls_avoided_per_day": preclassified_per_day,
+    }
+
+    # Target files picked from log locations instead of a locate LLM call
+    locate_result = await db.execute(
+        select(
+            func.count(RepairJob.id),
+            func.count(RepairJob.id).filter(RepairJob.located_from_logs.is_(True))
+        )
+        .where(
+            RepairJob.created_at >= cutoff_date,
+            RepairJob.target_file.isnot(None)
+        )
+    )
+    located_jobs, located_from_logs = locate_result.one()
+    locate = {
+        "jobs_located": located_jobs or 0,
+        "located_from_logs": located_from_logs or 0,
+        "hit_rate": round(located_from_logs / located_jobs, 3) if located_jobs else 0.0,
+    }
+
+    # Fix output tokens in patch mode vs. full-file rewrites
+    fix_result = await db.execute(
+        select(
+            RepairJob.fix_mode,
+            func.count(RepairJob.id),
+            func.sum(RepairJob.fix_output_tokens),
+            func.sum(RepairJob.fix_full_output_tokens)
+        )
+        .where(
+            RepairJob.created_at >= cutoff_date,
+            RepairJob.fix_mode.isnot(None)
+        )
+        .group_by(RepairJob.fix_mode)
+    )
+    fix_output = {"jobs_by_mode": {}, "output_tokens": 0, "full_rewrite_output_tokens": 0}
+    for mode, count, output_tokens, full_tokens in fix_result.all():
+        fix_output["jobs_by_mode"][mode] = count
+        fix_output["output_tokens"] += output_tokens or 0
+        fix_output["full_rewrite_output_tokens"] += full_tokens or 0
+    fix_output["output_token_ratio"] = (
+        round(fix_output["output_tokens"] / fix_output["full_rewrite_output_tokens"], 3)
+        if fix_output["full_rewrite_output_tokens"] else 0.0
+    )
+
     # Cost per job
     avg_cost_per_job = (total_cost / total_jobs) if total_jobs > 0 else 0.0
     
@@ -103,5 +202,17 @@ async def get_metrics(
         "avg_diagnosis_confidence": round(avg_diag_conf, 3),
         "avg_fix_confidence": round(avg_fix_conf, 3),
         "status_breakdown": status_breakdown,
-        "category_breakdown": category_breakdown
+        "category_breakdown": category_breakdown,
+        "top_failure_fingerprints": top_fingerprints,
+        "preclassification": preclassification,
+        "locate": locate,
+        "fix_output": fix_output,
+        "diagnosis_cache": diagnosis_cache,
+        "webhook_dedup": webhook_deduplicator.stats(),
+        "job_queue": get_job_queue().stats(),
+        "db_pool": get_pool_stats(),
+        "worker": get_worker_stats(),
+        "blob_cache": get_blob_cache().stats(),
+        "repo_index": get_repo_index_cache().stats(),
+        "log_baseline": get_baseline_cache().stats()
     }
@@ -1,7 +1,9 @@
 import logging
 import json
-from urllib.parse import unquote
-from fastapi import APIRouter, Depends, Request, status, HTTPException
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, Request, Response, status, HTTPException
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import verify_github_signature
@@ -9,62 +11,129 @@ from app.db.base import get_db
 from app.db.models import JobStatus, RepairJob
 from app.schemas.webhook import GitHubWebhookPayload
 from app.core.cloud_tasks import create_cloud_task
+from app.core.coalescing import (
+    attach_run_to_job,
+    can_absorb_run,
+    find_sibling_job,
+    get_coalesce_lock,
+    has_running_siblings,
+    parse_run_ids,
+)
+from app.core.config import settings
+from app.core.dedup import build_run_key, webhook_deduplicator
+from app.core.webhook_filter import InvalidWebhookBody, extract_json_body, prefilter_webhook
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+
+async def _find_existing_job(
+    db: AsyncSession,
+    delivery_id: Optional[str],
+    run_key: str
+) -> Optional[int]:
+    """
+    Looks up a job already created for this delivery or workflow run.
+
+    Args:
+        db: Database session.
+        delivery_id: Value of the X-GitHub-Delivery header, if present.
+        run_key: Idempotency key built from the repository and run ID.
+
+    Returns:
+        The existing job ID, or None if this is the first delivery.
+    """
+    conditions = [RepairJob.run_key == run_key]
+    if delivery_id:
+        conditions.append(RepairJob.delivery_id == delivery_id)
+
+    result = await db.execute(
+        select(RepairJob.id).where(or_(*conditions)).limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+def _duplicate_response(
+    response: Response,
+    job_id: Optional[int],
+    run_id: str
+) -> Dict[str, Any]:
+    """
+    Builds the cheap 200 response returned for an already-handled delivery.
+
+    Args:
+        response: Outgoing response, used to downgrade 202 to 200.
+        job_id: ID of the job that already covers this run.
+        run_id: Workflow run ID from the delivery.
+
+    Returns:
+        Response body pointing at the existing job.
+    """
+    response.status_code = status.HTTP_200_OK
+    return {
+        "message": "Duplicate delivery: repair job already exists",
+        "job_id": job_id,
+        "run_id": run_id
+    }
+
+
 @router.post("/github", status_code=status.HTTP_202_ACCEPTED)
 async def github_webhook(
     request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     _signature: None = Depends(verify_github_signature)
 ):
     """
     Endpoint for GitHub webhooks.
     Validates signature and filters for failed workflow runs.
+    Ignored events are rejected by a byte-level pre-filter before any JSON
+    parsing or Pydantic validation.
     Dispatches to Cloud Tasks for reliable execution.
+
+    Redeliveries of the same delivery or workflow run attempt return 200
+    with the existing job_id instead of creating and dispatching a second
+    job; a failed re-run of a workflow is a new attempt and gets a new job.
+    Failures of the same commit in other workflows are coalesced into the
+    pending job. Its dispatch is delayed by the coalescing window when other
+    runs of the commit are still queued or in progress, and immediate
+    otherwise; once the job has started, a new failure gets a job of its own.
     """
-    # Read raw body BEFORE Pydantic validation
     event_type = request.headers.get("X-GitHub-Event")
     logger.info(f"Received GitHub event: {event_type}")
-    
+
+    if event_type == "ping":
+        return {"message": "Pong"}
+
+    # Use cached body from signature verification (already consumed)
+    raw_body = request.state.body
+    content_type = request.headers.get("Content-Type", "")
+
     try:
-        # Use cached body from signature verification (already consumed)
-        raw_body = request.state.body
-        logger.debug(f"Raw webhook body (first 500 chars): {raw_body.decode()[:500]}")
-        
-        # GitHub sends JSON by default, but we check for form-encoded just in case
-        content_type = request.headers.get("Content-Type", "")
-        
-        if "application/x-www-form-urlencoded" in content_type:
-            # Parse form-encoded: payload=URL_ENCODED_JSON
-            body_str = raw_body.decode()
-            if body_str.startswith("payload="):
-                # Extract and URL-decode the payload
-                payload_json = unquote(body_str[8:])  # Skip "payload=" prefix
-                logger.debug(f"Extracted URL-decoded payload: {payload_json[:500]}")
-                body_dict = json.loads(payload_json)
-            else:
-                raise HTTPException(status_code=400, detail="Invalid form-encoded payload format")
-        else:
-            # Direct JSON (GitHub's default)
-            body_dict = json.loads(raw_body)
-        
-        logger.debug(f"Parsed JSON keys: {list(body_dict.keys())}")
-        
-        # Now validate with Pydantic
+        json_body = extract_json_body(raw_body, content_type)
+    except InvalidWebhookBody as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Cheap pre-filter so only failed workflow_run completions pay for full parsing
+    ignore_reason = prefilter_webhook(event_type, json_body)
+    if ignore_reason:
+        logger.info(f"Ignoring event: {ignore_reason}")
+        return {"message": f"Ignored: {ignore_reason}"}
+
+    try:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Webhook body (first 500 chars): {json_body[:500].decode(errors='replace')}")
+
+        body_dict = json.loads(json_body)
         payload = GitHubWebhookPayload(**body_dict)
     except json.JSONDecodeError as e:
         logger.error(f"Invalid JSON in webhook body: {e}")
         raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
     except Exception as e:
         logger.error(f"Pydantic validation failed: {e}")
-        logger.error(f"Body was: {raw_body.decode()[:500] if 'raw_body' in locals() else 'N/A'}")
+        logger.error(f"Body was: {json_body[:500].decode(errors='replace')}")
         raise HTTPException(status_code=422, detail=f"Validation error: {e}")
 
-    if event_type == "ping":
-        return {"message": "Pong"}
-
     # Only process 'workflow_run' events that have failed
     if not payload.workflow_run or payload.workflow_run.conclusion != "failure":
         logger.info(f"Ignoring event: workflow_run={payload.workflow_run is not None}, conclusion={payload.workflow_run.conclusion if payload.workflow_run else 'N/A'}")
@@ -74,25 +143,85 @@ async def github_webhook(
     repo_name = payload.repository.full_name if payload.repository else "unknown"
     run_id = str(payload.workflow_run.id)
 
-    logger.info(f"Creating repair job for repo={repo_name}, run_id={run_id}")
+    delivery_id = request.headers.get("X-GitHub-Delivery")
+    run_attempt = payload.workflow_run.run_attempt
+    run_key = build_run_key(repo_name, run_id, run_attempt)
 
-    new_job = RepairJob(
-        repo_name=repo_name,
-        run_id=run_id,
-        status=JobStatus.PENDING
-    )
-    
-    db.add(new_job)
-    await db.commit()
-    await db.refresh(new_job)
+    # Cheap in-memory check first; the unique indexes back it up once entries expire
+    existing_job_id = webhook_deduplicator.lookup(delivery_id, run_key)
+    if existing_job_id is None:
+        existing_job_id = await _find_existing_job(db, delivery_id, run_key)
+        if existing_job_id is not None:
+            webhook_deduplicator.record_db_hit()
+            webhook_deduplicator.remember(existing_job_id, delivery_id, run_key)
+
+    if existing_job_id is not None:
+        logger.info(f"Duplicate delivery {delivery_id} for run {run_key}, existing job {existing_job_id}")
+        return _duplicate_response(response, existing_job_id, run_id)
+
+    head_sha = payload.workflow_run.head_sha
+
+    # Sibling workflows failing on the same commit share one job instead of
+    # each paying for a full repair run and opening a competing branch
+    async with get_coalesce_lock(repo_name, head_sha):
+        sibling = await find_sibling_job(db, repo_name, head_sha)
+        # A re-run shares its run ID with the job of the earlier attempt, so only
+        # first attempts count as already covered by it
+        if sibling is not None and run_attempt == 1 \
+                and run_id in (parse_run_ids(sibling.run_ids) or [sibling.run_id]):
+            webhook_deduplicator.record_db_hit()
+            webhook_deduplicator.remember(sibling.id, delivery_id, run_key)
+            return _duplicate_response(response, sibling.id, run_id)
+
+        if sibling is not None and can_absorb_run(sibling):
+            run_ids = await attach_run_to_job(db, sibling, run_id)
+            if run_ids is not None:
+                webhook_deduplicator.remember(sibling.id, delivery_id, run_key)
+                return {
+                    "message": "Failure coalesced into existing repair job",
+                    "job_id": sibling.id,
+                    "run_id": run_id,
+                    "run_ids": run_ids
+                }
+
+        logger.info(f"Creating repair job for repo={repo_name}, run_id={run_id}, head_sha={head_sha}")
+
+        new_job = RepairJob(
+            repo_name=repo_name,
+            run_id=run_id,
+            delivery_id=delivery_id,
+            run_key=run_key,
+            head_sha=head_sha,
+            run_ids=run_id,
+            status=JobStatus.PENDING
+        )
+        
+        db.add(new_job)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # A concurrent delivery of the same run won the insert race
+            await db.rollback()
+            existing_job_id = await _find_existing_job(db, delivery_id, run_key)
+            webhook_deduplicator.record_db_hit()
+            if existing_job_id is not None:
+                webhook_deduplicator.remember(existing_job_id, delivery_id, run_key)
+            return _duplicate_response(response, existing_job_id, run_id)
+        await db.refresh(new_job)
+        webhook_deduplicator.remember(new_job.id, delivery_id, run_key)
 
     # Prepare payload for Cloud Task (includes job_id)
     task_payload = payload.model_dump()
     task_payload["job_id"] = new_job.id
 
+    # Hold the job for the coalescing window only while sibling runs may still fail
+    delay_seconds = 0
+    if settings.COALESCE_WINDOW_SECONDS > 0 and await has_running_siblings(repo_name, head_sha, run_id):
+        delay_seconds = settings.COALESCE_WINDOW_SECONDS
+
     # Dispatch to Google Cloud Tasks
     try:
-        task_name = create_cloud_task(task_payload)
+        task_name = await create_cloud_task(task_payload, delay_seconds=delay_seconds)
         logger.info(f"Created Cloud Task {task_name} for job {new_job.id}")
     except Exception as e:
         logger.error(f"Failed to create Cloud Task for job {new_job.id}: {e}")
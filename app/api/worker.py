@@ -1,38 +1,99 @@
+import json
 import logging
 from typing import Dict, Any
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, status, HTTPException
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import update
 
-from app.db.base import get_db
+from app.db.base import AsyncSessionLocal
 from app.db.models import JobStatus, RepairJob
 from app.schemas.webhook import GitHubWebhookPayload
+from app.core.coalescing import parse_run_ids
+from app.core.job_queue import PermanentJobError
 from agent.registry import get_registry
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Agent runs currently executing in this process and the high-water mark
+_worker_usage: Dict[str, int] = {"in_flight": 0, "peak_in_flight": 0}
+
+
+class JobPayloadError(PermanentJobError):
+    """Raised when a worker payload can never be processed, so retrying is pointless."""
+
+    def __init__(self, message: str, status_code: int = status.HTTP_400_BAD_REQUEST) -> None:
+        """
+        Initialize the error.
+
+        Args:
+            message: Description returned to the caller.
+            status_code: HTTP status the worker endpoint responds with.
+        """
+        super().__init__(message)
+        self.status_code: int = status_code
+
 
 @router.post("/run", status_code=status.HTTP_200_OK)
 async def run_repair_worker(
-    payload: dict,  # Receive raw dict to handle custom fields like job_id
-    db: AsyncSession = Depends(get_db)
+    payload: dict  # Receive raw dict to handle custom fields like job_id
 ):
     """
     Worker endpoint called by Google Cloud Tasks.
     Executes the appropriate agent for a specific job based on agent_name.
     """
+    try:
+        return await process_job(payload)
+    except JobPayloadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def get_worker_stats() -> Dict[str, int]:
+    """
+    Returns the number of agent runs in flight in this process.
+
+    Returns:
+        Dictionary with current and peak in-flight agent runs.
+    """
+    return dict(_worker_usage)
+
+
+async def process_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Runs the agent for one queued job and records the outcome.
+
+    Shared by the Cloud Tasks HTTP endpoint and the in-process local queue,
+    so both backends execute exactly the same invocation path.
+
+    The database is only touched in short units of work before and after the
+    agent run; no connection is held while the agent waits on the LLM and
+    GitHub, so the number of concurrent jobs is not capped by the pool size.
+
+    Args:
+        payload: Job payload as enqueued by the webhook (includes job_id).
+
+    Returns:
+        Summary of the completed job.
+
+    Raises:
+        JobPayloadError: If the payload is invalid or names an unknown agent.
+        Exception: Any agent failure, including the transient node errors
+            the repair graph raises, after the job has been marked FAILED.
+            Per-job state (checkpoints) is kept so the retry can resume.
+    """
     job_id = payload.get("job_id")
     if not job_id:
         logger.error("No job_id provided in worker payload")
-        raise HTTPException(status_code=400, detail="job_id is required")
+        raise JobPayloadError("job_id is required")
 
     # Re-validate the webhook part of the payload
     try:
         gh_payload = GitHubWebhookPayload(**payload)
     except Exception as e:
         logger.error(f"Invalid payload for job {job_id}: {e}")
-        raise HTTPException(status_code=400, detail="Invalid GitHub payload")
+        raise JobPayloadError("Invalid GitHub payload")
 
     logger.info(f"Worker processing job {job_id}")
 
@@ -43,95 +104,179 @@ async def run_repair_worker(
     
     if not agent:
         logger.error(f"Agent '{agent_name}' not found in registry")
-        raise HTTPException(status_code=404, detail=f"Agent '{agent_name}' not found")
+        raise JobPayloadError(f"Agent '{agent_name}' not found", status.HTTP_404_NOT_FOUND)
+
+    try:
+        # Unit of work 1: mark the job FIXING/RUNNING and load its details. The
+        # status is written first so no sibling run can be coalesced into the
+        # job after its run IDs have been read
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(RepairJob)
+                .where(RepairJob.id == job_id)
+                .values(status=JobStatus.FIXING)
+            )
+            initial_state = await _build_initial_state(db, job_id, agent_name, payload, gh_payload)
+            await db.commit()
+
+        # Execute agent with no database connection held
+        _worker_usage["in_flight"] += 1
+        _worker_usage["peak_in_flight"] = max(_worker_usage["peak_in_flight"], _worker_usage["in_flight"])
+        try:
+            final_state = await agent.invoke(initial_state)
+        finally:
+            _worker_usage["in_flight"] -= 1
+
+        # Unit of work 2: record the outcome
+        async with AsyncSessionLocal() as db:
+            await _record_outcome(db, job_id, agent_name, final_state)
+
+        # The outcome is recorded, FAILED or not, and the 200 response means the
+        # queue will not retry, so the checkpoints are no longer needed. Only
+        # the exception path below (which triggers a retry) keeps them
+        try:
+            await agent.release_job(job_id)
+        except Exception as e:
+            logger.warning(f"Failed to release per-job state for job {job_id}: {e}")
+        
+        return {"status": "completed", "job_id": job_id, "agent": agent_name}
+
+    except Exception as e:
+        logger.error(f"Worker failed for job {job_id}: {e}")
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(RepairJob)
+                .where(RepairJob.id == job_id)
+                .values(status=JobStatus.FAILED)
+            )
+            await db.commit()
+        raise
 
-    # Initialize state based on agent type
+
+async def _build_initial_state(
+    db: AsyncSession,
+    job_id: int,
+    agent_name: str,
+    payload: Dict[str, Any],
+    gh_payload: GitHubWebhookPayload
+) -> Dict[str, Any]:
+    """
+    Builds the initial agent state for a job.
+
+    Args:
+        db: Database session.
+        job_id: Job identifier.
+        agent_name: Name of the agent that will run the job.
+        payload: Raw job payload.
+        gh_payload: Validated webhook part of the payload.
+
+    Returns:
+        Initial state dictionary for the agent.
+    """
     # For repair agent, use repair-specific state structure
     if agent_name == "repair":
-        initial_state: Dict[str, Any] = {
+        # Sibling runs may have been coalesced into the job while it was pending
+        job_result = await db.execute(
+            select(RepairJob.run_ids).where(RepairJob.id == job_id)
+        )
+        run_id = str(gh_payload.workflow_run.id)
+        run_ids = parse_run_ids(job_result.scalar_one_or_none()) or [run_id]
+
+        return {
             "job_id": job_id,
-            "run_id": str(gh_payload.workflow_run.id),
+            "run_id": run_id,
+            "run_ids": run_ids,
+            "head_sha": gh_payload.workflow_run.head_sha,
             "repo_name": gh_payload.repository.full_name,
             "total_cost": 0.0,
             "status": "FIXING",
             "pr_draft": False
         }
-    else:
-        # Generic state for other agents
-        initial_state = {
-            "job_id": job_id,
-            "agent_name": agent_name,
-            "status": "RUNNING",
-            "data": payload.get("data", {}),
-            "metadata": payload.get("metadata", {}),
-            "total_cost": 0.0
-        }
 
-    try:
-        # Update status to FIXING/RUNNING
-        status_value = JobStatus.FIXING if agent_name == "repair" else JobStatus.FIXING
+    # Generic state for other agents
+    return {
+        "job_id": job_id,
+        "agent_name": agent_name,
+        "status": "RUNNING",
+        "data": payload.get("data", {}),
+        "metadata": payload.get("metadata", {}),
+        "total_cost": 0.0
+    }
+
+
+async def _record_outcome(
+    db: AsyncSession,
+    job_id: int,
+    agent_name: str,
+    final_state: Dict[str, Any]
+) -> None:
+    """
+    Writes the agent's final state to the job record.
+
+    Args:
+        db: Database session.
+        job_id: Job identifier.
+        agent_name: Name of the agent that ran the job.
+        final_state: Final agent state.
+    """
+    # Build reasoning log for audit trail (repair-specific for now)
+    if agent_name == "repair":
+        reasoning_parts = [
+            f"Diagnosis confidence: {final_state.get('diagnosis_confidence', 'N/A')}",
+            f"Fix confidence: {final_state.get('fix_confidence', 'N/A')}",
+            f"Failure category: {final_state.get('failure_category', 'N/A')}",
+            f"Root cause: {final_state.get('root_cause', 'N/A')}",
+            f"Target file: {final_state.get('target_file_path', 'N/A')}",
+            f"Fix mode: {final_state.get('fix_mode', 'N/A')} "
+            f"({final_state.get('fix_output_tokens', 'N/A')} output tokens, "
+            f"full rewrite {final_state.get('fix_full_output_tokens', 'N/A')})"
+        ]
+        reasoning_log = "\n".join(reasoning_parts)
+        
+        # Log reasoning
+        from app.core.cost_control import log_reasoning
+        await log_reasoning(db, job_id, reasoning_log)
+
+        signature = final_state.get("failure_signature")
+
+        # Update database with results (repair-specific)
         await db.execute(
             update(RepairJob)
             .where(RepairJob.id == job_id)
-            .values(status=status_value)
-        )
-        await db.commit()
-
-        # Execute agent
-        final_state = await agent.invoke(initial_state)
-
-        # Build reasoning log for audit trail (repair-specific for now)
-        if agent_name == "repair":
-            reasoning_parts = [
-                f"Diagnosis confidence: {final_state.get('diagnosis_confidence', 'N/A')}",
-                f"Fix confidence: {final_state.get('fix_confidence', 'N/A')}",
-                f"Failure category: {final_state.get('failure_category', 'N/A')}",
-                f"Root cause: {final_state.get('root_cause', 'N/A')}",
-                f"Target file: {final_state.get('target_file_path', 'N/A')}"
-            ]
-            reasoning_log = "\n".join(reasoning_parts)
-            
-            # Log reasoning
-            from app.core.cost_control import log_reasoning
-            await log_reasoning(db, job_id, reasoning_log)
-
-            # Update database with results (repair-specific)
-            await db.execute(
-                update(RepairJob)
-                .where(RepairJob.id == job_id)
-                .values(
-                    status=final_state.get("status", JobStatus.FAILED),
-                    error_log_summary=final_state.get("root_cause"),
-                    vertex_cost_est=final_state.get("total_cost", 0.0),
-                    pr_url=final_state.get("pr_url"),
-                    pr_draft=final_state.get("pr_draft", False),
-                    diagnosis_confidence=final_state.get("diagnosis_confidence"),
-                    fix_confidence=final_state.get("fix_confidence"),
-                    failure_category=final_state.get("failure_category")
-                )
-            )
-        else:
-            # Generic update for other agents
-            final_status = JobStatus.PR_OPENED if final_state.get("status") == "PR_OPENED" else JobStatus.FAILED
-            await db.execute(
-                update(RepairJob)
-                .where(RepairJob.id == job_id)
-                .values(
-                    status=final_status,
-                    vertex_cost_est=final_state.get("total_cost", 0.0)
-                )
+            .values(
+                status=final_state.get("status", JobStatus.FAILED),
+                error_log_summary=final_state.get("root_cause"),
+                vertex_cost_est=final_state.get("total_cost", 0.0),
+                pr_url=final_state.get("pr_url"),
+                pr_draft=final_state.get("pr_draft", False),
+                diagnosis_confidence=final_state.get("diagnosis_confidence"),
+                fix_confidence=final_state.get("fix_confidence"),
+                failure_category=final_state.get("failure_category"),
+                resumed_from_node=final_state.get("resumed_from_node"),
+                resume_cost_avoided=final_state.get("resume_cost_avoided", 0.0),
+                github_api_calls=final_state.get("github_api_calls", 0),
+                target_file=final_state.get("target_file_path"),
+                located_from_logs=bool(final_state.get("located_from_logs")),
+                fix_mode=final_state.get("fix_mode"),
+                fix_output_tokens=final_state.get("fix_output_tokens"),
+                fix_full_output_tokens=final_state.get("fix_full_output_tokens"),
+                preclassified=bool(final_state.get("preclassified")),
+                diagnosis_cached=bool(final_state.get("diagnosis_cached")),
+                diagnosis_cost_avoided=final_state.get("diagnosis_cost_avoided") or 0.0,
+                failure_fingerprint=final_state.get("failure_fingerprint"),
+                failure_signature=json.dumps(signature) if signature else None
             )
-        
-        await db.commit()
-        
-        return {"status": "completed", "job_id": job_id, "agent": agent_name}
-
-    except Exception as e:
-        logger.error(f"Worker failed for job {job_id}: {e}")
+        )
+    else:
+        # Generic update for other agents
+        final_status = JobStatus.PR_OPENED if final_state.get("status") == "PR_OPENED" else JobStatus.FAILED
         await db.execute(
             update(RepairJob)
             .where(RepairJob.id == job_id)
-            .values(status=JobStatus.FAILED)
+            .values(
+                status=final_status,
+                vertex_cost_est=final_state.get("total_cost", 0.0)
+            )
         )
-        await db.commit()
-        raise HTTPException(status_code=500, detail=str(e))
+    
+    await db.commit()
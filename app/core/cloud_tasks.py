@@ -1,39 +1,210 @@
+import asyncio
 import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
 from google.cloud import tasks_v2
+from google.protobuf import timestamp_pb2
+
 from app.core.config import settings
 
-def create_cloud_task(payload: dict, endpoint: str = "/api/v1/worker/run") -> str:
+logger = logging.getLogger(__name__)
+
+
+class TaskDispatchError(Exception):
+    """Raised when a task could not be handed to the queue."""
+    pass
+
+
+def build_http_task(
+    payload: dict,
+    endpoint: str = "/api/v1/worker/run",
+    delay_seconds: int = 0
+) -> Dict[str, Any]:
     """
-    Creates a Google Cloud Task to process a repair job.
-    
+    Builds the Cloud Tasks HTTP task definition for a worker call.
+
     Args:
         payload: The data to send to the worker.
         endpoint: The worker endpoint to call.
-        
+        delay_seconds: How long Cloud Tasks should wait before dispatching.
+
     Returns:
-        The name of the created task.
-    """
-    client = tasks_v2.CloudTasksClient()
-    
-    parent = client.queue_path(
-        settings.GOOGLE_CLOUD_PROJECT, 
-        settings.GOOGLE_CLOUD_LOCATION, 
-        settings.CLOUD_TASKS_QUEUE
-    )
-    
-    url = f"{settings.SERVICE_URL}{endpoint}"
-    
-    task = {
+        Task definition accepted by `create_task`.
+    """
+    task: Dict[str, Any] = {
         "http_request": {
             "http_method": tasks_v2.HttpMethod.POST,
-            "url": url,
+            "url": f"{settings.SERVICE_URL}{endpoint}",
             "headers": {"Content-Type": "application/json"},
             "body": json.dumps(payload).encode(),
         }
     }
-    
+
+    if delay_seconds > 0:
+        schedule_time = timestamp_pb2.Timestamp()
+        schedule_time.FromDatetime(datetime.now(timezone.utc) + timedelta(seconds=delay_seconds))
+        task["schedule_time"] = schedule_time
+
     # Note: In production, you'd add OIDC token for authentication between Cloud Tasks and Cloud Run
     # task["http_request"]["oidc_token"] = {"service_account_email": settings.SERVICE_ACCOUNT}
 
-    response = client.create_task(request={"parent": parent, "task": task})
-    return response.name
+    return task
+
+
+class CloudTasksDispatcher:
+    """
+    Process-wide asynchronous dispatcher for Cloud Tasks.
+
+    Holds a single `CloudTasksAsyncClient` so the gRPC channel is set up once
+    per process rather than once per webhook, and never blocks the event loop.
+    Every enqueue is its own `create_task` call (Cloud Tasks has no batch
+    create RPC); a semaphore bounds how many run at once, so a webhook burst
+    cannot open an unbounded number of in-flight RPCs.
+
+    The client is built by `client_factory`, which lets tests and local runs
+    substitute a fake queue exposing `queue_path()` and an async `create_task()`.
+    """
+
+    def __init__(
+        self,
+        client_factory: Optional[Callable[[], Any]] = None,
+        max_concurrency: int = settings.CLOUD_TASKS_MAX_CONCURRENCY
+    ) -> None:
+        """
+        Initialize the dispatcher. Nothing is connected until the first enqueue.
+
+        Args:
+            client_factory: Builds the queue client; defaults to `CloudTasksAsyncClient`.
+            max_concurrency: Maximum number of concurrent `create_task` calls.
+        """
+        self._client_factory: Callable[[], Any] = client_factory or tasks_v2.CloudTasksAsyncClient
+        self._client: Optional[Any] = None
+        self._parent: Optional[str] = None
+        self._max_concurrency: int = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._in_flight: int = 0
+        self._stats: Dict[str, int] = {"enqueued": 0, "failed": 0}
+
+    def _ensure_started(self) -> None:
+        """Creates the client and the concurrency bound inside the running event loop."""
+        if self._client is None:
+            self._client = self._client_factory()
+            self._parent = self._client.queue_path(
+                settings.GOOGLE_CLOUD_PROJECT,
+                settings.GOOGLE_CLOUD_LOCATION,
+                settings.CLOUD_TASKS_QUEUE
+            )
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+            self._idle = asyncio.Event()
+            self._idle.set()
+
+    async def enqueue(
+        self,
+        payload: dict,
+        endpoint: str = "/api/v1/worker/run",
+        delay_seconds: int = 0
+    ) -> str:
+        """
+        Enqueues a worker call and waits until Cloud Tasks has accepted it.
+
+        Args:
+            payload: The data to send to the worker.
+            endpoint: The worker endpoint to call.
+            delay_seconds: How long Cloud Tasks should wait before dispatching.
+
+        Returns:
+            The name of the created task.
+
+        Raises:
+            TaskDispatchError: If the task could not be created.
+        """
+        self._ensure_started()
+        task = build_http_task(payload, endpoint, delay_seconds)
+        self._in_flight += 1
+        self._idle.clear()
+        try:
+            async with self._semaphore:
+                response = await self._client.create_task(request={"parent": self._parent, "task": task})
+        except Exception as e:
+            self._stats["failed"] += 1
+            raise TaskDispatchError(str(e)) from e
+        finally:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._idle.set()
+        self._stats["enqueued"] += 1
+        return response.name
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns dispatcher counters.
+
+        Returns:
+            Dictionary with enqueued, failed and in-flight counts.
+        """
+        return {**self._stats, "in_flight": self._in_flight}
+
+    async def close(self) -> None:
+        """Waits for the enqueues in flight and closes the client."""
+        if self._idle is not None:
+            await self._idle.wait()
+        transport = getattr(self._client, "transport", None)
+        if transport is not None and hasattr(transport, "close"):
+            await transport.close()
+        self._client = None
+
+
+# Global dispatcher instance
+_dispatcher: Optional[CloudTasksDispatcher] = None
+
+
+def get_cloud_tasks_dispatcher() -> CloudTasksDispatcher:
+    """
+    Get the global Cloud Tasks dispatcher instance.
+
+    Returns:
+        Global CloudTasksDispatcher singleton.
+    """
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = CloudTasksDispatcher()
+    return _dispatcher
+
+
+async def close_cloud_tasks_dispatcher() -> None:
+    """Closes the global dispatcher, if one was created."""
+    global _dispatcher
+    if _dispatcher is not None:
+        await _dispatcher.close()
+        _dispatcher = None
+
+
+async def create_cloud_task(
+    payload: dict,
+    endpoint: str = "/api/v1/worker/run",
+    delay_seconds: int = 0
+) -> str:
+    """
+    Enqueues a worker job on the configured job queue backend.
+
+    With the default `cloud_tasks` backend this creates a Google Cloud Task
+    that calls the worker over HTTP; the `local` backend runs the job on the
+    in-process worker pool instead.
+
+    Args:
+        payload: The data to send to the worker.
+        endpoint: The worker endpoint to call.
+        delay_seconds: How long Cloud Tasks should wait before dispatching.
+
+    Returns:
+        The name of the queued task.
+
+    Raises:
+        TaskDispatchError: If the task could not be created.
+    """
+    # Imported here because the Cloud Tasks backend itself depends on this module
+    from app.core.job_queue import get_job_queue
+    return await get_job_queue().enqueue(payload, endpoint, delay_seconds)
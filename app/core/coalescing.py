@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import weakref
+from typing import List, Optional
+
+import httpx
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agent.github_client import GitHubAPIError, get_github_client
+from app.db.models import JobStatus, RepairJob
+
+logger = logging.getLogger(__name__)
+
+# One lock per (repo, head_sha) so sibling webhooks handled by this instance
+# cannot both decide they are first and create two jobs for the same commit.
+# The locks only cover a single instance: siblings delivered to different
+# instances at the same moment may still get one job each.
+_coalesce_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def parse_run_ids(raw: Optional[str]) -> List[str]:
+    """
+    Parses the comma-separated `RepairJob.run_ids` column.
+
+    Args:
+        raw: Stored column value.
+
+    Returns:
+        List of workflow run IDs in the order they were attached.
+    """
+    if not raw:
+        return []
+    return [run_id for run_id in raw.split(",") if run_id]
+
+
+def get_coalesce_lock(repo_name: str, head_sha: str) -> asyncio.Lock:
+    """
+    Returns the in-process lock guarding job creation for a commit.
+
+    The lock is local to this process, so it serializes the webhooks one
+    instance handles; it does not coordinate several instances.
+
+    Args:
+        repo_name: Full repository name (owner/repo).
+        head_sha: Commit SHA the failing workflows ran against.
+
+    Returns:
+        Lock shared by every webhook for the same repository and commit.
+    """
+    key = f"{repo_name}@{head_sha}"
+    lock = _coalesce_locks.get(key)
+    if lock is None:
+        lock = asyncio.Lock()
+        _coalesce_locks[key] = lock
+    return lock
+
+
+async def find_sibling_job(
+    db: AsyncSession,
+    repo_name: str,
+    head_sha: str
+) -> Optional[RepairJob]:
+    """
+    Finds the most recent repair job for the same repository and commit.
+
+    Args:
+        db: Database session.
+        repo_name: Full repository name (owner/repo).
+        head_sha: Commit SHA the failing workflow ran against.
+
+    Returns:
+        The latest job for that commit, or None if there is none.
+    """
+    result = await db.execute(
+        select(RepairJob)
+        .where(RepairJob.repo_name == repo_name, RepairJob.head_sha == head_sha)
+        .order_by(RepairJob.id.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def has_running_siblings(repo_name: str, head_sha: str, run_id: str) -> bool:
+    """
+    Checks whether other workflow runs of the same commit may still fail.
+
+    Only then is a new job worth delaying by the coalescing window: a commit
+    with a single workflow, or whose other runs have already completed, has
+    no sibling left to wait for. If GitHub cannot be asked, the answer is
+    True, so the job keeps the window rather than missing a sibling.
+
+    Args:
+        repo_name: Full repository name (owner/repo).
+        head_sha: Commit SHA the failing workflow ran against.
+        run_id: Workflow run ID of the failure itself.
+
+    Returns:
+        True if any other run of the commit is queued or in progress.
+    """
+    try:
+        runs = await get_github_client().list_commit_runs(repo_name, head_sha)
+    except (GitHubAPIError, httpx.HTTPError) as e:
+        logger.warning(f"Could not list runs of {repo_name}@{head_sha}, keeping the coalescing window: {e}")
+        return True
+    return any(str(run.get("id")) != run_id and run.get("status") != "completed" for run in runs)
+
+
+def can_absorb_run(job: RepairJob) -> bool:
+    """
+    Determines whether a sibling failure should be folded into an existing job.
+
+    Only pending jobs absorb runs: the worker reads the job's run IDs when it
+    starts, so a run attached to a job that is already fixing (or has opened
+    its PR) would never be diagnosed. Such a failure gets its own job.
+
+    Args:
+        job: The sibling job for the same commit.
+
+    Returns:
+        True if the run should be attached to the existing job.
+    """
+    return job.status == JobStatus.PENDING
+
+
+async def attach_run_to_job(db: AsyncSession, job: RepairJob, run_id: str) -> Optional[List[str]]:
+    """
+    Records a sibling workflow run on an existing pending job.
+
+    The update only applies while the job is still PENDING, so a worker that
+    started the job in the meantime (and has read its run IDs) is detected.
+
+    Args:
+        db: Database session.
+        job: The job absorbing the run.
+        run_id: Workflow run ID to attach.
+
+    Returns:
+        The job's run IDs after attaching, or None if the job is no longer
+        pending and the run needs a job of its own.
+    """
+    run_ids = parse_run_ids(job.run_ids) or [job.run_id]
+    if run_id in run_ids:
+        return run_ids
+    run_ids.append(run_id)
+    result = await db.execute(
+        update(RepairJob)
+        .where(RepairJob.id == job.id, RepairJob.status == JobStatus.PENDING)
+        .values(run_ids=",".join(run_ids))
+    )
+    await db.commit()
+    if result.rowcount == 0:
+        logger.info(f"Job {job.id} started before run {run_id} could be coalesced into it")
+        return None
+    logger.info(f"Coalesced run {run_id} into job {job.id} (runs: {run_ids})")
+    return run_ids
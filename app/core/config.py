@@ -16,10 +16,64 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./local.db"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: int = 30
 
     # GitHub
     GITHUB_SECRET: str = "placeholder_secret"
     GITHUB_TOKEN: str = "placeholder_token"
+    GITHUB_API_URL: str = "https://api.github.com"
+    GITHUB_MAX_CONNECTIONS: int = 20  # pooled connections shared by all jobs in the process
+    GITHUB_TIMEOUT_SECONDS: float = 30.0
+
+    # Context gathering (files read alongside the target file)
+    CONTEXT_FETCH_CONCURRENCY: int = 8
+    CONTEXT_GATHER_TIMEOUT_SECONDS: float = 20.0
+    CONTEXT_MAX_IMPORT_FILES: int = 5  # repository files imported by the target to include
+    IMPORT_PARSE_OFFLOAD_BYTES: int = 64 * 1024  # larger sources are parsed in a worker process
+    IMPORT_PARSE_WORKERS: int = 2
+
+    # Diagnosis
+    # Failed-step logs are reduced to error windows and the log tail within this many tokens
+    DIAGNOSE_LOG_TOKEN_BUDGET: int = 5000
+    # Drop log lines that also appear in the last successful run of the same workflow and branch
+    LOG_BASELINE_ENABLED: bool = True
+    LOG_BASELINE_CACHE_SIZE: int = 64  # successful job logs whose line hashes are kept
+    LOG_BASELINE_MAX_LINES: int = 200000  # lines hashed per successful job log
+    # Reuse diagnoses for logs with the same failure fingerprint
+    DIAGNOSIS_CACHE_ENABLED: bool = True
+    DIAGNOSIS_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    DIAGNOSIS_CACHE_MAX_ENTRIES: int = 5000
+    DIAGNOSIS_CACHE_PERSISTENT: bool = True  # keep entries in the database across restarts
+    DIAGNOSIS_CACHE_HIT_FLUSH_EVERY: int = 50  # cache hits counted in memory before one batched write
+    # Heuristic classification of the logs before diagnose; non-fixable categories skip the LLM
+    PRECLASSIFY_ENABLED: bool = True
+    PRECLASSIFY_MIN_CONFIDENCE: float = 0.6
+    PRECLASSIFY_MIN_PATTERN_WEIGHT: float = 2.5  # at least one runner-level pattern this strong must match
+    # Locate the target file from file/line positions in the logs before asking the model
+    LOCATE_FROM_LOGS_ENABLED: bool = True
+    LOCATE_MIN_CONFIDENCE: float = 0.7
+    FAILURE_MODEL_PATH: str = ""  # learned classifier (.npz from scripts/train_failure_model.py); empty disables it
+    LEARNED_MIN_CONFIDENCE: float = 0.9  # learned-classifier probability needed to use (and auto-fix on) its prediction
+    FAILURE_PATTERNS_PATH: str = ""  # weighted pattern library (JSON); empty uses agent/data/failure_patterns.json
+    # Fix node asks for a unified diff instead of the whole file; falls back to full content when it does not apply
+    FIX_PATCH_MODE_ENABLED: bool = True
+    FIX_PATCH_MIN_LINES: int = 60  # smaller files are rewritten in full
+    FIX_PATCH_MAX_FUZZ: int = 2  # context lines a hunk may drop from each end when it does not match
+    # Fix prompts for large files carry only the regions around the error (agent/fix_windows.py)
+    FIX_WINDOW_ENABLED: bool = True
+    FIX_WINDOW_MIN_LINES: int = 400  # smaller files are sent in full
+    FIX_WINDOW_MAX_LINES: int = 240  # lines across all regions
+    FIX_WINDOW_MAX_CHARS: int = 16000  # characters across all regions
+    FIX_WINDOW_CONTEXT_LINES: int = 25  # lines around an error line outside any function or class
+
+    # Repository file cache (contents keyed by git blob SHA)
+    BLOB_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    BLOB_CACHE_MAX_PATHS: int = 100000
+    BLOB_CACHE_DIR: str = ""  # empty disables the disk tier
+    BLOB_CACHE_DISK_MAX_BYTES: int = 512 * 1024 * 1024
+    REPO_INDEX_CACHE_SIZE: int = 32  # commits whose file listing is kept in memory
     
     # Google Cloud / Vertex AI
     GOOGLE_CLOUD_PROJECT: str = "placeholder_project"
@@ -29,7 +83,28 @@ class Settings(BaseSettings):
     CLOUD_TASKS_QUEUE: str = "repair-jobs-queue"
     # The URL of the Cloud Run service to be called by Cloud Tasks
     SERVICE_URL: str = "https://your-service-url.a.run.app"
-    
+    CLOUD_TASKS_MAX_CONCURRENCY: int = 8  # concurrent create_task RPCs per process
+
+    # Job Queue
+    # "cloud_tasks" dispatches over HTTP via Cloud Tasks; "local" runs jobs
+    # in-process on an asyncio worker pool backed by the application database
+    JOB_QUEUE_BACKEND: str = "cloud_tasks"
+    LOCAL_QUEUE_WORKERS: int = 4
+    LOCAL_QUEUE_MAX_ATTEMPTS: int = 3
+    LOCAL_QUEUE_RETRY_BACKOFF_SECONDS: float = 2.0  # first retry delay, doubled per attempt
+    LOCAL_QUEUE_DURABLE: bool = True  # persist queued jobs so they survive restarts
+
+    # Webhook Ingestion
+    WEBHOOK_DEDUP_TTL_SECONDS: int = 600  # GitHub redeliveries usually arrive within minutes
+    WEBHOOK_DEDUP_MAX_ENTRIES: int = 10000
+    # Delay before a job starts so sibling workflow failures on the same commit can join it;
+    # only applied while other runs of the commit are still going, 0 disables coalescing delays
+    COALESCE_WINDOW_SECONDS: int = 30
+
+    # Agent Checkpoints
+    # Persist graph state after every node so retried jobs resume instead of restarting
+    CHECKPOINTS_ENABLED: bool = True
+
     # Langfuse
     LANGFUSE_PUBLIC_KEY: str = "pk-lf-..."
     LANGFUSE_SECRET_KEY: str = "sk-lf-..."
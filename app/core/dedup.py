@@ -0,0 +1,132 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# A repair job makes one Flash call in diagnose, one Flash call in locate and
+# one Pro call in fix, so every suppressed duplicate saves this many LLM calls.
+LLM_CALLS_PER_JOB: int = 3
+
+
+def build_run_key(repo_name: str, run_id: str, run_attempt: int = 1) -> str:
+    """
+    Builds the idempotency key stored in `RepairJob.run_key`.
+
+    A re-run keeps its run ID but gets a new attempt number, so the attempt
+    is part of the key and a failed re-run gets a job of its own. The first
+    attempt keeps the plain `owner/repo#run_id` form, which is what keys
+    stored before attempts were tracked look like.
+
+    Args:
+        repo_name: Full repository name (owner/repo).
+        run_id: GitHub Actions workflow run ID.
+        run_attempt: Attempt number of the run (1 for the original run).
+
+    Returns:
+        Key that uniquely identifies a workflow run attempt across repositories.
+    """
+    if run_attempt <= 1:
+        return f"{repo_name}#{run_id}"
+    return f"{repo_name}#{run_id}/{run_attempt}"
+
+
+class WebhookDeduplicator:
+    """
+    Short-lived in-memory record of webhook deliveries that already produced a job.
+
+    GitHub redelivers webhooks on timeouts and manual retries, and every
+    duplicate would otherwise create a job that pays for the full set of LLM
+    calls again. This cache answers the common case (a redelivery within a few
+    minutes) without touching the database; the unique indexes on
+    `repair_jobs` remain the source of truth once entries expire.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        """
+        Initialize the deduplicator.
+
+        Args:
+            ttl_seconds: How long a delivery or run key is remembered.
+            max_entries: Upper bound on remembered keys; oldest are evicted first.
+        """
+        self._ttl_seconds: float = ttl_seconds
+        self._max_entries: int = max_entries
+        self._entries: OrderedDict[str, Tuple[float, int]] = OrderedDict()
+        self._memory_hits: int = 0
+        self._db_hits: int = 0
+
+    def _purge_expired(self, now: float) -> None:
+        """Drops entries whose TTL has elapsed, oldest first."""
+        while self._entries:
+            key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            self._entries.pop(key)
+
+    def lookup(self, *keys: Optional[str]) -> Optional[int]:
+        """
+        Returns the job ID recorded for any of the given keys.
+
+        Args:
+            keys: Delivery IDs or run keys; `None` values are ignored.
+
+        Returns:
+            The existing job ID, or None if no key has been seen recently.
+        """
+        now = time.monotonic()
+        self._purge_expired(now)
+        for key in keys:
+            if key is None:
+                continue
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._memory_hits += 1
+                return entry[1]
+        return None
+
+    def remember(self, job_id: int, *keys: Optional[str]) -> None:
+        """
+        Records that the given keys map to an existing job.
+
+        Args:
+            job_id: ID of the job the delivery was attached to.
+            keys: Delivery IDs or run keys; `None` values are ignored.
+        """
+        expires_at = time.monotonic() + self._ttl_seconds
+        for key in keys:
+            if key is None:
+                continue
+            self._entries[key] = (expires_at, job_id)
+            self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def record_db_hit(self) -> None:
+        """Counts a duplicate that was only caught by the database lookup."""
+        self._db_hits += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns counters describing how much work deduplication avoided.
+
+        Returns:
+            Dictionary with duplicate counts per tier and LLM calls saved.
+        """
+        duplicates = self._memory_hits + self._db_hits
+        return {
+            "duplicates_suppressed": duplicates,
+            "memory_hits": self._memory_hits,
+            "db_hits": self._db_hits,
+            "llm_calls_saved": duplicates * LLM_CALLS_PER_JOB,
+            "tracked_keys": len(self._entries),
+        }
+
+
+webhook_deduplicator = WebhookDeduplicator(
+    ttl_seconds=settings.WEBHOOK_DEDUP_TTL_SECONDS,
+    max_entries=settings.WEBHOOK_DEDUP_MAX_ENTRIES,
+)
@@ -0,0 +1,376 @@
+import asyncio
+import itertools
+import json
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, TypedDict
+
+from sqlalchemy import select, update
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+WORKER_ENDPOINT = "/api/v1/worker/run"
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class PermanentJobError(Exception):
+    """Raised by a job handler when retrying the job can never succeed."""
+    pass
+
+
+class JobQueue(ABC):
+    """
+    Backend-neutral interface for dispatching worker jobs.
+
+    The webhook only needs "run this payload against this worker endpoint,
+    possibly after a delay"; backends decide whether that happens over HTTP
+    through Cloud Tasks or in-process.
+    """
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """Backend identifier (matches `JOB_QUEUE_BACKEND`)."""
+        pass
+
+    @abstractmethod
+    async def enqueue(
+        self,
+        payload: Dict[str, Any],
+        endpoint: str = WORKER_ENDPOINT,
+        delay_seconds: int = 0
+    ) -> str:
+        """
+        Enqueues a job.
+
+        Args:
+            payload: The data to send to the worker.
+            endpoint: The worker endpoint that should handle the job.
+            delay_seconds: How long to wait before the job may run.
+
+        Returns:
+            Backend-specific name of the queued job.
+        """
+        pass
+
+    async def start(self) -> None:
+        """Starts background processing, if the backend has any."""
+        pass
+
+    async def close(self) -> None:
+        """Stops background processing and releases clients."""
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns backend counters for the metrics endpoint.
+
+        Returns:
+            Dictionary of counters.
+        """
+        return {"backend": self.name}
+
+
+class CloudTasksJobQueue(JobQueue):
+    """Dispatches jobs to Google Cloud Tasks, which calls the worker over HTTP."""
+
+    @property
+    def name(self) -> str:
+        """Backend identifier."""
+        return "cloud_tasks"
+
+    async def enqueue(
+        self,
+        payload: Dict[str, Any],
+        endpoint: str = WORKER_ENDPOINT,
+        delay_seconds: int = 0
+    ) -> str:
+        """Enqueues the job through the process-wide Cloud Tasks dispatcher."""
+        from app.core.cloud_tasks import get_cloud_tasks_dispatcher
+        return await get_cloud_tasks_dispatcher().enqueue(payload, endpoint, delay_seconds)
+
+    async def close(self) -> None:
+        """Closes the Cloud Tasks dispatcher."""
+        from app.core.cloud_tasks import close_cloud_tasks_dispatcher
+        await close_cloud_tasks_dispatcher()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the dispatcher counters."""
+        from app.core.cloud_tasks import get_cloud_tasks_dispatcher
+        return {"backend": self.name, **get_cloud_tasks_dispatcher().stats()}
+
+
+class _LocalJob(TypedDict):
+    """A job held by the local queue."""
+    row_id: Optional[int]
+    endpoint: str
+    payload: Dict[str, Any]
+    attempts: int
+
+
+class LocalJobQueue(JobQueue):
+    """
+    In-process job queue served by a pool of asyncio workers.
+
+    Jobs are handed to workers as Python objects and run through the same
+    handler the HTTP worker endpoint uses, skipping the Cloud Tasks round trip
+    and JSON serialization. With `durable` enabled each job is also written to
+    the `queued_jobs` table (SQLite in development), so jobs that were queued
+    or running when the process stopped are picked up again on startup.
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[str, JobHandler],
+        workers: int = settings.LOCAL_QUEUE_WORKERS,
+        max_attempts: int = settings.LOCAL_QUEUE_MAX_ATTEMPTS,
+        durable: bool = settings.LOCAL_QUEUE_DURABLE,
+        retry_backoff_seconds: float = settings.LOCAL_QUEUE_RETRY_BACKOFF_SECONDS
+    ) -> None:
+        """
+        Initialize the queue. Workers start on `start()`.
+
+        Args:
+            handlers: Job handler per worker endpoint.
+            workers: Number of concurrent worker tasks.
+            max_attempts: Attempts per job before it is marked FAILED.
+            durable: Persist jobs to the database for crash recovery.
+            retry_backoff_seconds: Delay before the first retry; it doubles
+                with every further attempt.
+        """
+        self._handlers: Dict[str, JobHandler] = handlers
+        self._worker_count: int = workers
+        self._max_attempts: int = max_attempts
+        self._durable: bool = durable
+        self._retry_backoff: float = retry_backoff_seconds
+        self._queue: Optional["asyncio.Queue[_LocalJob]"] = None
+        self._workers: List["asyncio.Task[None]"] = []
+        self._timers: Set[asyncio.TimerHandle] = set()
+        self._ids = itertools.count(1)
+        self._stats: Dict[str, int] = {"enqueued": 0, "completed": 0, "retried": 0, "failed": 0, "running": 0}
+
+    @property
+    def name(self) -> str:
+        """Backend identifier."""
+        return "local"
+
+    async def start(self) -> None:
+        """Starts the worker pool and re-queues jobs left over from a previous run."""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue()
+        if self._durable:
+            await self._recover()
+        self._workers = [
+            asyncio.create_task(self._work(index)) for index in range(self._worker_count)
+        ]
+        logger.info(f"Local job queue started with {self._worker_count} worker(s)")
+
+    async def enqueue(
+        self,
+        payload: Dict[str, Any],
+        endpoint: str = WORKER_ENDPOINT,
+        delay_seconds: int = 0
+    ) -> str:
+        """
+        Enqueues a job for the in-process workers.
+
+        Raises:
+            ValueError: If no handler is registered for the endpoint.
+        """
+        if endpoint not in self._handlers:
+            raise ValueError(f"No local handler registered for endpoint '{endpoint}'")
+        if self._queue is None:
+            await self.start()
+
+        row_id = await self._persist(payload, endpoint, delay_seconds) if self._durable else None
+        job: _LocalJob = {"row_id": row_id, "endpoint": endpoint, "payload": payload, "attempts": 0}
+        self._schedule(job, delay_seconds)
+        self._stats["enqueued"] += 1
+        return f"local-{row_id if row_id is not None else next(self._ids)}"
+
+    def _schedule(self, job: _LocalJob, delay_seconds: float) -> None:
+        """Puts a job on the queue now or after a delay."""
+        if delay_seconds <= 0:
+            self._queue.put_nowait(job)
+            return
+
+        def _release() -> None:
+            self._timers.discard(handle)
+            self._queue.put_nowait(job)
+
+        handle = asyncio.get_running_loop().call_later(delay_seconds, _release)
+        self._timers.add(handle)
+
+    async def _work(self, index: int) -> None:
+        """Worker loop: runs queued jobs one at a time."""
+        while True:
+            job = await self._queue.get()
+            self._stats["running"] += 1
+            try:
+                await self._run(job)
+            except Exception as e:
+                logger.error(f"Local worker {index} failed to record job outcome: {e}", exc_info=True)
+            finally:
+                self._stats["running"] -= 1
+                self._queue.task_done()
+
+    async def _run(self, job: _LocalJob) -> None:
+        """Runs a single job and records success, retry or failure."""
+        job = {**job, "attempts": job["attempts"] + 1}
+        await self._update_row(job, status="RUNNING")
+        try:
+            await self._handlers[job["endpoint"]](job["payload"])
+        except PermanentJobError as e:
+            logger.error(f"Local job {job['row_id']} rejected: {e}")
+            await self._update_row(job, status="FAILED", error=str(e))
+            self._stats["failed"] += 1
+            return
+        except Exception as e:
+            if job["attempts"] < self._max_attempts:
+                backoff = self._retry_backoff * 2 ** (job["attempts"] - 1)
+                logger.warning(f"Local job {job['row_id']} failed (attempt {job['attempts']}), retrying in {backoff}s: {e}")
+                await self._update_row(job, status="QUEUED", error=str(e), delay_seconds=backoff)
+                self._stats["retried"] += 1
+                self._schedule(job, backoff)
+            else:
+                logger.error(f"Local job {job['row_id']} failed after {job['attempts']} attempt(s): {e}")
+                await self._update_row(job, status="FAILED", error=str(e))
+                self._stats["failed"] += 1
+            return
+
+        await self._update_row(job, status="DONE")
+        self._stats["completed"] += 1
+
+    async def _persist(self, payload: Dict[str, Any], endpoint: str, delay_seconds: int) -> int:
+        """Writes a new queued job row and returns its ID."""
+        from app.db.base import AsyncSessionLocal
+        from app.db.models import QueuedJob
+
+        async with AsyncSessionLocal() as db:
+            row = QueuedJob(
+                endpoint=endpoint,
+                payload=json.dumps(payload),
+                available_at=datetime.utcnow() + timedelta(seconds=delay_seconds)
+            )
+            db.add(row)
+            await db.commit()
+            return row.id
+
+    async def _update_row(
+        self,
+        job: _LocalJob,
+        status: str,
+        error: Optional[str] = None,
+        delay_seconds: float = 0
+    ) -> None:
+        """Mirrors a job's state to its row when the queue is durable."""
+        if job["row_id"] is None:
+            return
+        from app.db.base import AsyncSessionLocal
+        from app.db.models import QueuedJob, QueuedJobStatus
+
+        values: Dict[str, Any] = {"status": QueuedJobStatus(status), "attempts": job["attempts"]}
+        if error is not None:
+            values["last_error"] = error
+        if delay_seconds:
+            values["available_at"] = datetime.utcnow() + timedelta(seconds=delay_seconds)
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(QueuedJob).where(QueuedJob.id == job["row_id"]).values(**values))
+            await db.commit()
+
+    async def _recover(self) -> None:
+        """Re-queues jobs that were queued or running when the process stopped."""
+        from app.db.base import AsyncSessionLocal
+        from app.db.models import QueuedJob, QueuedJobStatus
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(QueuedJob).where(
+                    QueuedJob.status.in_([QueuedJobStatus.QUEUED, QueuedJobStatus.RUNNING])
+                )
+            )
+            rows = result.scalars().all()
+
+        now = datetime.utcnow()
+        for row in rows:
+            job: _LocalJob = {
+                "row_id": row.id,
+                "endpoint": row.endpoint,
+                "payload": json.loads(row.payload),
+                "attempts": row.attempts,
+            }
+            self._schedule(job, max(0.0, (row.available_at - now).total_seconds()))
+        if rows:
+            logger.info(f"Recovered {len(rows)} queued job(s) from the database")
+
+    async def close(self) -> None:
+        """Cancels pending timers and stops the workers."""
+        for handle in self._timers:
+            handle.cancel()
+        self._timers.clear()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns worker pool counters."""
+        return {
+            "backend": self.name,
+            "workers": self._worker_count,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "delayed": len(self._timers),
+            **self._stats,
+        }
+
+
+async def _run_worker_job(payload: Dict[str, Any]) -> None:
+    """Runs a worker job in-process through the same path as the HTTP endpoint."""
+    from app.api.worker import process_job
+    await process_job(payload)
+
+
+def _create_job_queue() -> JobQueue:
+    """Builds the backend selected by `JOB_QUEUE_BACKEND`."""
+    if settings.JOB_QUEUE_BACKEND == "local":
+        return LocalJobQueue(handlers={WORKER_ENDPOINT: _run_worker_job})
+    if settings.JOB_QUEUE_BACKEND != "cloud_tasks":
+        logger.warning(f"Unknown JOB_QUEUE_BACKEND '{settings.JOB_QUEUE_BACKEND}', using cloud_tasks")
+    return CloudTasksJobQueue()
+
+
+# Global job queue instance
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Get the global job queue instance.
+
+    Returns:
+        Global JobQueue singleton for the configured backend.
+    """
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = _create_job_queue()
+    return _job_queue
+
+
+async def start_job_queue() -> None:
+    """Starts the configured job queue backend."""
+    await get_job_queue().start()
+
+
+async def close_job_queue() -> None:
+    """Stops the job queue backend, if one was created."""
+    global _job_queue
+    if _job_queue is not None:
+        await _job_queue.close()
+        _job_queue = None
@@ -0,0 +1,73 @@
+import re
+from typing import Optional
+from urllib.parse import unquote_to_bytes
+
+# GitHub serializes `action` as the first key of every event payload, so an
+# anchored match reads it without parsing the rest of the document.
+_LEADING_ACTION_RE = re.compile(rb'^\s*\{\s*"action"\s*:\s*"([^"]*)"')
+
+# `workflow_run.conclusion` is the only `conclusion` key in a workflow_run
+# payload. If no key in the body says "failure", the run cannot have failed,
+# which makes this a safe rejection test without a full parse.
+_FAILURE_CONCLUSION_RE = re.compile(rb'"conclusion"\s*:\s*"failure"')
+
+_FORM_PAYLOAD_PREFIX = b"payload="
+
+
+class InvalidWebhookBody(Exception):
+    """Raised when a webhook body is not in a format GitHub sends."""
+    pass
+
+
+def extract_json_body(raw_body: bytes, content_type: str) -> bytes:
+    """
+    Returns the JSON document carried by a webhook body.
+
+    GitHub sends JSON by default but can be configured to send
+    `application/x-www-form-urlencoded` with the JSON in a `payload` field.
+
+    Args:
+        raw_body: Raw request body as received.
+        content_type: Value of the Content-Type header.
+
+    Returns:
+        The JSON document as bytes.
+
+    Raises:
+        InvalidWebhookBody: If a form-encoded body has no `payload` field.
+    """
+    if "application/x-www-form-urlencoded" not in content_type:
+        return raw_body
+    if not raw_body.startswith(_FORM_PAYLOAD_PREFIX):
+        raise InvalidWebhookBody("Invalid form-encoded payload format")
+    return unquote_to_bytes(raw_body[len(_FORM_PAYLOAD_PREFIX):])
+
+
+def prefilter_webhook(event_type: Optional[str], json_body: bytes) -> Optional[str]:
+    """
+    Rejects deliveries that can never start a repair job, before full validation.
+
+    Most deliveries are successful runs, `requested`/`in_progress` updates or
+    other event types. Deciding those from the event header and two byte-level
+    pattern checks avoids `json.loads` and Pydantic validation for them. The
+    checks only ever reject; anything that passes is still fully validated.
+
+    Args:
+        event_type: Value of the X-GitHub-Event header.
+        json_body: JSON document from `extract_json_body`.
+
+    Returns:
+        A short reason if the delivery should be ignored, None if it may be a
+        failed workflow run completion.
+    """
+    if event_type != "workflow_run":
+        return f"Not a workflow_run event ({event_type})"
+
+    action_match = _LEADING_ACTION_RE.match(json_body)
+    if action_match is not None and action_match.group(1) != b"completed":
+        return f"Workflow run action is {action_match.group(1).decode(errors='replace')}"
+
+    if _FAILURE_CONCLUSION_RE.search(json_body) is None:
+        return "Not a failed workflow run"
+
+    return None
@@ -1,16 +1,62 @@
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import QueuePool
 
 from app.core.config import settings
 
+
+def pool_kwargs(database_url: str) -> Dict[str, Any]:
+    """
+    Returns the pool sizing arguments for a database URL.
+
+    Sizing only applies to queue pools (Postgres, and file-based SQLite on
+    recent SQLAlchemy releases). Other pools reject the arguments: in-memory
+    SQLite uses a StaticPool and file-based aiosqlite used a NullPool before
+    SQLAlchemy 2.0.38, so they get none.
+
+    Args:
+        database_url: SQLAlchemy database URL.
+
+    Returns:
+        Keyword arguments for `create_async_engine`.
+    """
+    url = make_url(database_url)
+    if not issubclass(url.get_dialect().get_pool_class(url), QueuePool):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+    }
+
+
+_pool_kwargs: Dict[str, Any] = pool_kwargs(settings.DATABASE_URL)
+
 # Create Async Engine
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=False,
-    future=True
+    future=True,
+    **_pool_kwargs
 )
 
+# Connections currently checked out and the high-water mark since startup
+_pool_usage: Dict[str, int] = {"checked_out": 0, "peak_checked_out": 0}
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _on_checkout(*args: Any) -> None:
+    """Tracks pool occupancy when a connection is handed out."""
+    _pool_usage["checked_out"] += 1
+    _pool_usage["peak_checked_out"] = max(_pool_usage["peak_checked_out"], _pool_usage["checked_out"])
+
+@event.listens_for(engine.sync_engine, "checkin")
+def _on_checkin(*args: Any) -> None:
+    """Tracks pool occupancy when a connection is returned."""
+    _pool_usage["checked_out"] = max(0, _pool_usage["checked_out"] - 1)
+
 # Create Async Session Factory
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
@@ -19,6 +65,20 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False
 )
 
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Returns connection pool occupancy for the metrics endpoint.
+
+    Returns:
+        Dictionary with pool size, overflow limit, connections checked out
+        now and the peak number checked out since startup.
+    """
+    return {
+        "pool_size": _pool_kwargs.get("pool_size"),
+        "max_overflow": _pool_kwargs.get("max_overflow"),
+        **_pool_usage,
+    }
+
 class Base(DeclarativeBase):
     """Base class for SQLAlchemy declarative models."""
     pass
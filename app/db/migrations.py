@@ -0,0 +1,124 @@
+"""
+Schema bootstrap for databases created by an older release.
+
+`Base.metadata.create_all` creates missing tables but never alters existing
+ones, so columns added to a table after it first shipped are registered in
+ADDED_COLUMNS and added with ALTER TABLE on startup. The column definition
+(type, NOT NULL, default and indexes) is read from the model, so a new entry
+only names the column.
+"""
+import logging
+from typing import List, Tuple
+
+from sqlalchemy import Column, inspect, literal
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.base import Base
+import app.db.models  # noqa: F401  (registers every table on the metadata)
+
+logger = logging.getLogger(__name__)
+
+# (table, column) added after the table was first released, in release order
+ADDED_COLUMNS: List[Tuple[str, str]] = [
+    # Webhook idempotency keys
+    ("repair_jobs", "delivery_id"),
+    ("repair_jobs", "run_key"),
+    # Coalescing of sibling failures on the same commit
+    ("repair_jobs", "head_sha"),
+    ("repair_jobs", "run_ids"),
+    # Checkpoint resume tracking
+    ("repair_jobs", "resumed_from_node"),
+    ("repair_jobs", "resume_cost_avoided"),
+    # GitHub REST calls per job
+    ("repair_jobs", "github_api_calls"),
+    # Failure fingerprints
+    ("repair_jobs", "failure_fingerprint"),
+    ("repair_jobs", "failure_signature"),
+    # Diagnosis cache
+    ("repair_jobs", "diagnosis_cached"),
+    ("repair_jobs", "diagnosis_cost_avoided"),
+    # Pre-classification before diagnose
+    ("repair_jobs", "preclassified"),
+    # Target file located from log positions
+    ("repair_jobs", "target_file"),
+    ("repair_jobs", "located_from_logs"),
+    # Fix mode and output tokens
+    ("repair_jobs", "fix_mode"),
+    ("repair_jobs", "fix_output_tokens"),
+    ("repair_jobs", "fix_full_output_tokens"),
+]
+
+
+def _column_ddl(column: Column, connection: Connection) -> str:
+    """
+    Renders the column definition of an ALTER TABLE ... ADD COLUMN.
+
+    NOT NULL columns get their Python-side default as a server default, since
+    existing rows need a value.
+    """
+    dialect = connection.dialect
+    ddl = f"{dialect.identifier_preparer.quote(column.name)} {column.type.compile(dialect=dialect)}"
+    if not column.nullable:
+        if column.default is None or not column.default.is_scalar:
+            raise ValueError(f"Column {column.table.name}.{column.name} is NOT NULL without a scalar default")
+        value = literal(column.default.arg, column.type).compile(
+            dialect=dialect, compile_kwargs={"literal_binds": True}
+        )
+        ddl += f" NOT NULL DEFAULT {value}"
+    return ddl
+
+
+def upgrade_schema(connection: Connection) -> List[str]:
+    """
+    Adds the registered columns missing from existing tables.
+
+    Tables that do not exist yet are left to `create_all`, which creates them
+    with every column.
+
+    Args:
+        connection: Synchronous connection (from `AsyncConnection.run_sync`).
+
+    Returns:
+        The added columns as "table.column".
+    """
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    existing = {}
+    added: List[str] = []
+    for table_name, column_name in ADDED_COLUMNS:
+        if table_name not in tables:
+            continue
+        if table_name not in existing:
+            existing[table_name] = {column["name"] for column in inspector.get_columns(table_name)}
+        if column_name in existing[table_name]:
+            continue
+
+        column = Base.metadata.tables[table_name].c[column_name]
+        connection.exec_driver_sql(f"ALTER TABLE {table_name} ADD COLUMN {_column_ddl(column, connection)}")
+        existing[table_name].add(column_name)
+        if column.unique:
+            # SQLite cannot add a UNIQUE constraint to an existing table; a unique index is equivalent
+            connection.exec_driver_sql(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS uq_{table_name}_{column_name} ON {table_name} ({column_name})"
+            )
+        for index in column.table.indexes:
+            # A multi-column index is created once its last column exists
+            if column_name in index.columns and all(indexed.name in existing[table_name] for indexed in index.columns):
+                index.create(connection, checkfirst=True)
+        added.append(f"{table_name}.{column_name}")
+    return added
+
+
+async def init_db(engine: AsyncEngine) -> None:
+    """
+    Creates missing tables and adds columns missing from existing ones.
+
+    Args:
+        engine: Engine of the application database.
+    """
+    async with engine.begin() as conn:
+        added = await conn.run_sync(upgrade_schema)
+        await conn.run_sync(Base.metadata.create_all)
+    if added:
+        logger.info(f"Added columns to existing tables: {', '.join(added)}")
@@ -2,7 +2,7 @@ import enum
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import String, Float, Text, DateTime, Enum
+from sqlalchemy import String, Float, Text, DateTime, Enum, Index, Integer, LargeBinary
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -19,10 +19,22 @@ class RepairJob(Base):
     Database model for tracking CI/CD repair jobs.
     """
     __tablename__ = "repair_jobs"
+    __table_args__ = (
+        Index("ix_repair_jobs_repo_head_sha", "repo_name", "head_sha"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     repo_name: Mapped[str] = mapped_column(String, index=True, nullable=False)
     run_id: Mapped[str] = mapped_column(String, index=True, nullable=False)
+
+    # Idempotency keys for webhook ingestion (NULL for jobs not created by webhooks)
+    delivery_id: Mapped[Optional[str]] = mapped_column(String, unique=True, nullable=True)
+    run_key: Mapped[Optional[str]] = mapped_column(String, unique=True, nullable=True)
+
+    # Failures of the same commit across workflows are coalesced into one job
+    head_sha: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    run_ids: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # comma-separated
+
     status: Mapped[JobStatus] = mapped_column(Enum(JobStatus), default=JobStatus.PENDING, nullable=False)
     
     error_log_summary: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -42,5 +54,139 @@ class RepairJob(Base):
     pr_url: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     pr_draft: Mapped[bool] = mapped_column(default=False, nullable=False)
 
+    # Checkpoint resume tracking (set when a retried job skipped completed nodes)
+    resumed_from_node: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    resume_cost_avoided: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+
+    # GitHub REST calls made by the job's repository session
+    github_api_calls: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    # File chosen by locate, and whether a log parser chose it without a model call
+    target_file: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    located_from_logs: Mapped[bool] = mapped_column(default=False, nullable=False)
+
+    # How the fix was generated ("window", "line_window", "patch", "full", "<mode>_fallback"), its output
+    # tokens and the output tokens of a full-file rewrite (estimated for patches)
+    fix_mode: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    fix_output_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    fix_full_output_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    # Rejected by pre-classification before any model call
+    preclassified: Mapped[bool] = mapped_column(default=False, nullable=False)
+
+    # Diagnosis served from the diagnosis cache instead of a model call
+    diagnosis_cached: Mapped[bool] = mapped_column(default=False, nullable=False)
+    diagnosis_cost_avoided: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+
+    # Normalized failure signature (see agent/fingerprint.py); the hash is
+    # indexed so identical breakages can be grouped without re-reading logs
+    failure_fingerprint: Mapped[Optional[str]] = mapped_column(String(64), index=True, nullable=True)
+    failure_signature: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON
+
     def __repr__(self) -> str:
         return f"<RepairJob(id={self.id}, repo={self.repo_name}, status={self.status})>"
+
+class QueuedJobStatus(str, enum.Enum):
+    """Enum for QueuedJob status in the local job queue."""
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+class QueuedJob(Base):
+    """
+    Database model backing the local in-process job queue.
+
+    Rows make queued work survive a restart; the running process hands the
+    payload to its workers in memory and only reads rows back on startup.
+    """
+    __tablename__ = "queued_jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    endpoint: Mapped[str] = mapped_column(String, nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)  # JSON
+    status: Mapped[QueuedJobStatus] = mapped_column(
+        Enum(QueuedJobStatus), default=QueuedJobStatus.QUEUED, index=True, nullable=False
+    )
+    attempts: Mapped[int] = mapped_column(default=0, nullable=False)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    available_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<QueuedJob(id={self.id}, endpoint={self.endpoint}, status={self.status})>"
+
+class GraphCheckpoint(Base):
+    """
+    Database model for LangGraph checkpoints, one row per completed graph step.
+
+    The thread ID is the job ID, so a retried job can find the state its
+    previous attempt reached and resume from there.
+    """
+    __tablename__ = "graph_checkpoints"
+
+    thread_id: Mapped[str] = mapped_column(String, primary_key=True)
+    checkpoint_ns: Mapped[str] = mapped_column(String, primary_key=True, default="")
+    checkpoint_id: Mapped[str] = mapped_column(String, primary_key=True)
+    parent_checkpoint_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    checkpoint_type: Mapped[str] = mapped_column(String, nullable=False)
+    checkpoint: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    metadata_type: Mapped[str] = mapped_column(String, nullable=False)
+    checkpoint_metadata: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<GraphCheckpoint(thread_id={self.thread_id}, checkpoint_id={self.checkpoint_id})>"
+
+class GraphCheckpointWrite(Base):
+    """
+    Database model for pending writes recorded against a LangGraph checkpoint.
+
+    Writes from nodes that finished before a crash are replayed on resume, so
+    those nodes do not run again.
+    """
+    __tablename__ = "graph_checkpoint_writes"
+
+    thread_id: Mapped[str] = mapped_column(String, primary_key=True)
+    checkpoint_ns: Mapped[str] = mapped_column(String, primary_key=True, default="")
+    checkpoint_id: Mapped[str] = mapped_column(String, primary_key=True)
+    task_id: Mapped[str] = mapped_column(String, primary_key=True)
+    idx: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    channel: Mapped[str] = mapped_column(String, nullable=False)
+    value_type: Mapped[str] = mapped_column(String, nullable=False)
+    value: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    task_path: Mapped[str] = mapped_column(String, default="", nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<GraphCheckpointWrite(thread_id={self.thread_id}, task_id={self.task_id}, idx={self.idx})>"
+
+class DiagnosisCacheEntry(Base):
+    """
+    Database tier of the diagnosis cache.
+
+    One row per `(repo, failure fingerprint, prompt version, model)`, so a
+    diagnosis survives restarts and is shared by every instance.
+    """
+    __tablename__ = "diagnosis_cache"
+
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    repo_name: Mapped[str] = mapped_column(String, nullable=False)
+    fingerprint: Mapped[str] = mapped_column(String(64), index=True, nullable=False)
+    prompt_version: Mapped[str] = mapped_column(String, nullable=False)
+    model: Mapped[str] = mapped_column(String, nullable=False)
+
+    root_cause: Mapped[str] = mapped_column(Text, nullable=False)
+    confidence: Mapped[float] = mapped_column(Float, nullable=False)
+    cost: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)  # USD of the call it replaces
+    hits: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<DiagnosisCacheEntry(repo={self.repo_name}, fingerprint={self.fingerprint[:12]})>"
@@ -5,9 +5,14 @@ import logging
 
 from app.api.router import api_router
 from app.core.config import settings
-from app.db.base import engine, Base
+from app.db.base import engine
+from app.db.migrations import init_db
 from app.core.logging import configure_logging
 from app.core.agents import register_agents
+from app.core.job_queue import close_job_queue, start_job_queue
+from agent.diagnosis_cache import flush_diagnosis_cache
+from agent.github_client import close_github_client
+from agent.imports import shutdown_parse_pool
 
 logger = logging.getLogger(__name__)
 
@@ -49,14 +54,26 @@ async def startup_event():
         # Agents can be registered later if needed
     
     try:
-        # Initialize database tables
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+        # Initialize database tables and add columns missing from older databases
+        await init_db(engine)
         logger.info("Database tables initialized")
     except Exception as e:
         logger.error(f"Database initialization failed: {e}", exc_info=True)
         # In production, you might want to exit or retry
 
+    # Start the job queue after the database, since the local backend recovers from it
+    await start_job_queue()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Release process-wide clients on shutdown.
+    """
+    await close_job_queue()
+    await flush_diagnosis_cache()
+    await close_github_client()
+    shutdown_parse_pool()
+
 @app.get("/")
 async def root():
     """Root endpoint redirection or info."""
@@ -17,6 +17,7 @@ class WorkflowRun(BaseModel):
     head_sha: str
     html_url: str
     run_number: int
+    run_attempt: int = 1
 
 class GitHubWebhookPayload(BaseModel):
     """
@@ -0,0 +1,94 @@
+"""
+Wall-clock benchmark for context-file gathering.
+
+Runs `get_related_files` against a mock GitHub API with fixed per-request
+latency, for a Python target file with several imports and a config-related
+root cause (so the config files are candidates too). Most guessed paths do
+not exist, as in real repositories. Compares one fetch at a time (the
+previous behaviour) with the bounded concurrent fan-out.
+
+Usage:
+    python scripts/bench_context_gathering.py [--latency-ms 80] [--repeat 5]
+"""
+import argparse
+import asyncio
+import base64
+import os
+import sys
+import time
+from typing import List
+
+import httpx
+
+# Ensure app imports work
+sys.path.append(os.getcwd())
+
+from agent.blob_cache import BlobCache
+from agent.context import get_related_files
+from agent.github_client import AsyncGitHubClient
+from agent.repo_session import RepairSession
+
+TARGET = "app/api/worker.py"
+TARGET_SOURCE = """import logging
+from app.core.config import settings
+from app.db.base import get_db
+from app.db.models import RepairJob
+from app.schemas.webhook import GitHubWebhookPayload
+from agent.registry import get_registry
+
+x = (
+"""
+EXISTING = {
+    TARGET: TARGET_SOURCE,
+    "app/app/core/config.py": "SETTINGS = {}\n",
+    "requirements.txt": "fastapi\n",
+}
+
+
+def build_client(latency: float) -> AsyncGitHubClient:
+    """Builds a GitHub client backed by a mock API with fixed latency."""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        path = request.url.path
+        if path == "/repos/o/r":
+            return httpx.Response(200, json={"default_branch": "main"})
+        if "/git/ref/heads/" in path:
+            return httpx.Response(200, json={"object": {"sha": "a" * 40}})
+        file_path = path.split("/contents/", 1)[-1]
+        if file_path not in EXISTING:
+            return httpx.Response(404, json={"message": "Not Found"})
+        content = base64.b64encode(EXISTING[file_path].encode()).decode()
+        return httpx.Response(200, json={"type": "file", "path": file_path, "sha": "b" * 40, "content": content})
+
+    return AsyncGitHubClient(token="bench", transport=httpx.MockTransport(handler))
+
+
+async def gather_once(latency: float, max_concurrency: int) -> float:
+    """Runs one context gathering with a cold session and cache; returns milliseconds."""
+    github = build_client(latency)
+    session = RepairSession(1, "o/r", github=github, blob_cache=BlobCache(disk_dir=None))
+    # Resolve the base commit up front so only file fetches are timed
+    await session.base_sha()
+    start = time.perf_counter()
+    files = await get_related_files(session, TARGET, "config value missing", max_concurrency=max_concurrency)
+    elapsed = (time.perf_counter() - start) * 1000
+    await github.close()
+    assert TARGET in files
+    return elapsed
+
+
+async def main(latency_ms: float, repeat: int) -> None:
+    """Times both strategies and prints the median of each."""
+    latency = latency_ms / 1000
+    print(f"Mock GitHub latency {latency_ms:.0f} ms, {repeat} runs each")
+    for label, concurrency in (("sequential (previous)", 1), ("concurrent fan-out", 8)):
+        timings: List[float] = sorted([await gather_once(latency, concurrency) for _ in range(repeat)])
+        print(f"{label:<22} median {timings[len(timings) // 2]:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency_ms, args.repeat))
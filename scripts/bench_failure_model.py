@@ -0,0 +1,157 @@
+"""
+Accuracy and latency benchmark for the learned failure classifier.
+
+Generates labeled failure texts per category from message templates shaped
+like real tool output (pip, npm, cargo, go, pytest, jest, kubectl, runner
+messages), with random module names, paths and numbers. The last template
+of every category is only used for the test split, so part of the test set
+is phrased differently from anything seen in training. Trains the model,
+prints accuracy / UNKNOWN rate next to the heuristic classifier, then times
+scoring of a 20k-character text and reports the model file size.
+
+Usage:
+    python scripts/bench_failure_model.py [--per-template 60] [--runs 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+# Ensure app imports work
+sys.path.append(os.getcwd())
+
+from agent.classification import FailureCategory
+from agent.failure_model import FailureModel, evaluate, train_failure_model
+
+TEMPLATES: Dict[FailureCategory, List[str]] = {
+    FailureCategory.DEPENDENCY: [
+        "ModuleNotFoundError: No module named '{name}'",
+        "ERROR: Could not find a version that satisfies the requirement {name}=={ver}",
+        "npm ERR! code ERESOLVE unable to resolve dependency tree while resolving {name}@{ver}",
+        "error[E0432]: unresolved import `{name}::{name}`",
+        "go: {name}.io/{name}@v{ver}: missing go.sum entry; to add it run go mod download",
+        "Cannot find module '{name}' or its corresponding type declarations. Require stack: {path}",
+    ],
+    FailureCategory.SYNTAX: [
+        "SyntaxError: invalid syntax ({path}, line {n})",
+        "IndentationError: unexpected indent at {path}:{n}",
+        "{path}({n},{m}): error TS1005: ';' expected.",
+        "error: expected one of `,` or `)`, found `{name}` --> {path}:{n}:{m}",
+        "{path}:{n}:{m}: syntax error: unexpected newline, expecting comma or }}",
+        "Parse error: unexpected '}}' in {path} on line {n}",
+    ],
+    FailureCategory.TEST: [
+        "FAILED tests/test_{name}.py::test_{name} - AssertionError: assert {n} == {m}",
+        "Expected: {n} Received: {m} at Object.<anonymous> ({path}:{n}:{m})",
+        "--- FAIL: Test{name} ({n}.{m}s) {name}_test.go:{n}: got {m}, want {n}",
+        "[ERROR] Tests run: {n}, Failures: {m}, Errors: 0 com.acme.{name}Test",
+        "thread 'tests::{name}' panicked at 'assertion failed: left == right', {path}:{n}",
+        "Failure/Error: expect({name}).to eq({n}) expected: {n} got: {m}",
+    ],
+    FailureCategory.CONFIG: [
+        "Invalid workflow file: .github/workflows/{name}.yml#L{n} unexpected value '{name}'",
+        "Error: environment variable {upper} is not set",
+        "django.core.exceptions.ImproperlyConfigured: {upper} must be set",
+        "yaml.scanner.ScannerError: mapping values are not allowed here in {path}, line {n}",
+        "error: unknown option '--{name}' in tsconfig.json compilerOptions",
+        "KeyError: '{upper}' while reading settings from {path}",
+    ],
+    FailureCategory.INFRASTRUCTURE: [
+        "Error: connect ECONNREFUSED 127.0.0.1:{n}",
+        "OSError: [Errno 28] No space left on device: '{path}'",
+        "The runner has received a shutdown signal. This can happen when the runner service is stopped",
+        "Error response from daemon: toomanyrequests: You have reached your pull rate limit",
+        "fatal: unable to access 'https://github.com/{name}/{name}.git/': Could not resolve host: github.com",
+        "FATAL ERROR: Reached heap limit Allocation failed - JavaScript heap out of memory",
+    ],
+    FailureCategory.TIMEOUT: [
+        "The job running on runner {name}-{n} has exceeded the maximum execution time of {m} minutes.",
+        "panic: test timed out after {n}m0s running tests: Test{name}",
+        "Timeout - Async callback was not invoked within the {n} ms timeout specified by jest.setTimeout",
+        "requests.exceptions.ReadTimeout: HTTPSConnectionPool(host='{name}.com', port=443): Read timed out.",
+        "context deadline exceeded while waiting for {name} to become ready",
+        "Error: The operation was canceled after {n} minutes waiting for {name}",
+    ],
+}
+
+NAMES = ["orders", "cart", "billing", "auth", "search", "router", "payments", "users", "inventory", "shipping"]
+
+
+def render(rng: random.Random, template: str) -> str:
+    """Fills a template with random names, paths and numbers."""
+    name = rng.choice(NAMES)
+    return template.format(
+        name=name,
+        upper=f"{name.upper()}_URL",
+        ver=f"{rng.randrange(1, 9)}.{rng.randrange(30)}.{rng.randrange(10)}",
+        path=f"src/{rng.choice(NAMES)}/{name}.py",
+        n=rng.randrange(1, 500),
+        m=rng.randrange(1, 500),
+    )
+
+
+def corpus(rng: random.Random, per_template: int) -> Tuple[List[Tuple[str, FailureCategory]], List[Tuple[str, FailureCategory]]]:
+    """Builds the training and test splits."""
+    training: List[Tuple[str, FailureCategory]] = []
+    test: List[Tuple[str, FailureCategory]] = []
+    for category, templates in TEMPLATES.items():
+        for i, template in enumerate(templates):
+            for j in range(per_template):
+                example = (render(rng, template), category)
+                # The last template is never trained on
+                if i == len(templates) - 1 or j % 4 == 0:
+                    test.append(example)
+                else:
+                    training.append(example)
+    return training, test
+
+
+def main(per_template: int, runs: int) -> None:
+    """Trains, evaluates and times the model."""
+    rng = random.Random(0)
+    training, test = corpus(rng, per_template)
+    rng.shuffle(training)
+    # Calibrate on examples the model is not fitted on
+    calibration, training = training[: len(training) // 5], training[len(training) // 5:]
+    start = time.perf_counter()
+    model = train_failure_model(
+        [text for text, _ in training],
+        [label for _, label in training],
+        validation=([text for text, _ in calibration], [label for _, label in calibration])
+    )
+    train_seconds = time.perf_counter() - start
+
+    path = os.path.join(tempfile.mkdtemp(), "failure_model.npz")
+    model.save(path)
+    model = FailureModel.load(path)
+
+    print(f"Training: {len(training)} examples ({len(calibration)} for calibration) in {train_seconds:.2f}s; test: {len(test)} examples; "
+          f"scale {model.scale:g}; model file {os.path.getsize(path) / 1024:.0f} KB")
+    report = evaluate(model, [text for text, _ in test], [label for _, label in test])
+    for name, values in report.items():
+        print(f"  {name:<10} " + ", ".join(f"{key} {value:.3f}" for key, value in values.items()))
+
+    long_text = ""
+    while len(long_text) < 20000:
+        long_text += render(rng, rng.choice(TEMPLATES[FailureCategory.TEST])) + "\n"
+    long_text = long_text[:20000]
+    model.predict(long_text)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        model.predict(long_text)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(f"Scoring a 20k-character text: median {timings[len(timings) // 2] * 1000:.3f} ms, "
+          f"p99 {timings[int(len(timings) * 0.99)] * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-template", type=int, default=60)
+    parser.add_argument("--runs", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.per_template, args.runs)
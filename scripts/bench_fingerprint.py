@@ -0,0 +1,150 @@
+"""
+Throughput and stability benchmark for failure fingerprinting.
+
+Builds a corpus of synthetic failure logs from a handful of distinct
+breakages (Python traceback, pytest failures, TypeScript build, Jest, Go test,
+Maven). Every log gets its own timestamps, durations, commit hashes, temp
+paths, runner paths, line numbers and test output order, plus setup noise.
+Fingerprints every log and reports throughput and how many distinct
+fingerprints came out per breakage (1 means the signature is stable).
+
+Usage:
+    python scripts/bench_fingerprint.py [--logs 10000] [--noise-lines 200]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Set
+
+# Ensure app imports work
+sys.path.append(os.getcwd())
+
+from agent.fingerprint import fingerprint_log
+
+
+def _sha(rng: random.Random) -> str:
+    return f"{rng.getrandbits(160):040x}"
+
+
+def python_traceback(rng: random.Random) -> List[str]:
+    root = rng.choice(["/home/runner/work/shop/shop", "/__w/shop/shop"])
+    return [
+        "Traceback (most recent call last):",
+        f'  File "{root}/app/api/checkout.py", line {rng.randrange(30, 60)}, in create_order',
+        "    total = cart.total()",
+        f'  File "/opt/hostedtoolcache/Python/3.11.{rng.randrange(9)}/x64/lib/python3.11/site-packages/cartlib/cart.py", '
+        f"line {rng.randrange(100, 200)}, in total",
+        f"AttributeError: 'NoneType' object has no attribute 'items' (cart at 0x{rng.getrandbits(48):x})",
+        "##[error]Process completed with exit code 1.",
+    ]
+
+
+def pytest_failures(rng: random.Random) -> List[str]:
+    tests = [f"tests/test_orders.py::test_refund_{name}" for name in ("full", "partial", "twice")]
+    rng.shuffle(tests)
+    # The asserted values belong to the breakage; only the test order varies
+    lines = [f"FAILED {test} - AssertionError: assert 42 == 0" for test in tests]
+    return lines + [
+        f"========== 3 failed, {rng.randrange(300, 400)} passed in {rng.random() * 60:.2f}s ==========",
+        "##[error]Process completed with exit code 1.",
+    ]
+
+
+def typescript_build(rng: random.Random) -> List[str]:
+    return [
+        "> web@1.0.0 build",
+        f"src/cart.ts({rng.randrange(10, 30)},{rng.randrange(1, 9)}): error TS2322: "
+        "Type 'string' is not assignable to type 'number'.",
+        "npm ERR! code ELIFECYCLE",
+        f"npm ERR! A complete log of this run can be found in: /tmp/npm-cache/_logs/{_sha(rng)[:12]}-debug.log",
+        "##[error]Process completed with exit code 2.",
+    ]
+
+
+def jest_failure(rng: random.Random) -> List[str]:
+    return [
+        "FAIL src/components/Cart.test.tsx",
+        "  ● Cart › renders total",
+        "    TypeError: Cannot read properties of undefined (reading 'price')",
+        f"      at Object.<anonymous> (/home/runner/work/web/web/src/components/Cart.tsx:{rng.randrange(5, 50)}:12)",
+        f"      at processTicksAndRejections (node:internal/process/task_queues:{rng.randrange(60, 99)}:5)",
+        f"Tests: 1 failed, {rng.randrange(50, 90)} passed",
+        "##[error]Process completed with exit code 1.",
+    ]
+
+
+def go_test(rng: random.Random) -> List[str]:
+    return [
+        f"--- FAIL: TestRouterRoutes ({rng.random():.2f}s)",
+        f"    router_test.go:{rng.randrange(20, 80)}: expected 200, got 404",
+        "panic: runtime error: invalid memory address or nil pointer dereference",
+        f"\t/home/runner/work/svc/svc/internal/api/router.go:{rng.randrange(80, 120)} +0x{rng.getrandbits(16):x}",
+        f"FAIL\texample.com/svc/internal/api\t{rng.random():.3f}s",
+        "##[error]Process completed with exit code 1.",
+    ]
+
+
+def maven_failure(rng: random.Random) -> List[str]:
+    return [
+        f"[ERROR] Tests run: {rng.randrange(40, 60)}, Failures: 1, Errors: 0, Skipped: 0",
+        f"[ERROR] com.acme.CartTest.testTotal:{rng.randrange(20, 90)} expected:<10> but was:<0>",
+        "\tat com.acme.Cart.total(Cart.java)",
+        "[ERROR] Failed to execute goal org.apache.maven.plugins:maven-surefire-plugin:3.2.2:test",
+        "##[error]Process completed with exit code 1.",
+    ]
+
+
+BREAKAGES: Dict[str, Callable[[random.Random], List[str]]] = {
+    "python traceback": python_traceback,
+    "pytest failures": pytest_failures,
+    "typescript build": typescript_build,
+    "jest": jest_failure,
+    "go test": go_test,
+    "maven": maven_failure,
+}
+
+
+def synthetic_log(rng: random.Random, failure: List[str], noise_lines: int) -> str:
+    """Wraps a failure in setup noise with per-run volatile values."""
+    lines = [
+        f"Run actions/checkout@v4 (ref {_sha(rng)})",
+        f"Temporary directory: /home/runner/work/_temp/{_sha(rng)[:8]}",
+    ]
+    for i in range(noise_lines):
+        lines.append(f"Collecting package-{i} (from -r requirements.txt (line {i}))  [{rng.random():.1f}s]")
+    return "\n".join(lines + failure + [f"Post job cleanup took {rng.randrange(1, 9)}s"])
+
+
+def main(logs: int, noise_lines: int) -> None:
+    """Builds the corpus, fingerprints it and prints the results."""
+    rng = random.Random(0)
+    corpus = []
+    for i in range(logs):
+        name = list(BREAKAGES)[i % len(BREAKAGES)]
+        corpus.append((name, synthetic_log(rng, BREAKAGES[name](rng), noise_lines)))
+    size_mb = sum(len(text) for _, text in corpus) / 1024 / 1024
+
+    fingerprints: Dict[str, Set[str]] = defaultdict(set)
+    start = time.perf_counter()
+    for name, text in corpus:
+        fingerprints[name].add(fingerprint_log(text)["fingerprint"])
+    elapsed = time.perf_counter() - start
+
+    print(f"Corpus: {logs} logs, {size_mb:.1f} MB, {len(BREAKAGES)} distinct breakages")
+    print(f"Throughput: {logs / elapsed:,.0f} logs/s, {size_mb / elapsed:.1f} MB/s, "
+          f"{elapsed / logs * 1000:.3f} ms per log")
+    for name, values in fingerprints.items():
+        print(f"  {name:<18} {len(values)} fingerprint(s)")
+    distinct = set().union(*fingerprints.values())
+    print(f"Distinct fingerprints across breakages: {len(distinct)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logs", type=int, default=10000)
+    parser.add_argument("--noise-lines", type=int, default=200)
+    args = parser.parse_args()
+    main(args.logs, args.noise_lines)
@@ -0,0 +1,99 @@
+"""
+Benchmark for region-windowed fix prompts.
+
+Generates Python modules (and, with --language js, brace-style sources
+without a parser) of growing size, with an error line deep inside a class
+method, and measures region selection, rendering and splicing. Reports the
+characters sent to the model against the full file; the windowed prompt
+stays within FIX_WINDOW_MAX_LINES / FIX_WINDOW_MAX_CHARS however large the
+file grows.
+
+Usage:
+    python scripts/bench_fix_windows.py [--sizes 500,5000,50000] [--language py|js] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+# Ensure app imports work
+sys.path.append(os.getcwd())
+
+from agent.fix_windows import referenced_symbols, render_regions, select_regions, splice_regions
+from app.core.config import settings
+
+
+def python_module(lines: int) -> str:
+    """Classes of small methods behind an import block (at least `lines` lines, ending on a whole class)."""
+    parts = ["import math", "import os", "from typing import List", ""]
+    i = 0
+    while len(parts) < lines:
+        parts += [f"class Model{i}:", f"    \"\"\"Model {i}.\"\"\"", ""]
+        for j in range(8):
+            parts += [f"    def score_{j}(self, values: List[float]) -> float:",
+                      "        total = 0.0",
+                      "        for value in values:",
+                      f"            total += math.floor(value * {j})",
+                      "        return total", ""]
+        i += 1
+    return "\n".join(parts) + "\n"
+
+
+def js_module(lines: int) -> str:
+    """Functions of a brace-style language (no structure parser), at least `lines` lines."""
+    parts = ["import { floor } from './math';", ""]
+    i = 0
+    while len(parts) < lines:
+        parts += [f"export function score{i}(values) {{", "  let total = 0;",
+                  "  for (const value of values) {", f"    total += floor(value * {i});", "  }",
+                  "  return total;", "}", ""]
+        i += 1
+    return "\n".join(parts) + "\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="500,5000,50000", help="Comma-separated file sizes in lines")
+    parser.add_argument("--language", choices=("py", "js"), default="py", help="Generated source language")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per size")
+    args = parser.parse_args()
+
+    path = f"app/model.{args.language}"
+    print(f"{'lines':>7} {'file chars':>11} {'prompt chars':>13} {'ratio':>7} {'regions':>8} "
+          f"{'select+render ms':>17} {'splice ms':>10}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        text = python_module(size) if args.language == "py" else js_module(size)
+        lines = text.split("\n")
+        anchor = int(size * 0.7)
+        # Point the error at a statement inside a method or function
+        while "total +=" not in lines[anchor - 1]:
+            anchor += 1
+        name = lines[anchor - 4].split("def ")[-1].split("(")[0] if args.language == "py" else \
+            lines[anchor - 4].split("function ")[-1].split("(")[0]
+        symbols = referenced_symbols([f"{name} returns the wrong total", "AssertionError: 3 != 4"])
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            regions = select_regions(
+                text, path, [anchor], symbols, settings.FIX_WINDOW_MAX_LINES,
+                settings.FIX_WINDOW_MAX_CHARS, settings.FIX_WINDOW_CONTEXT_LINES
+            )
+            prompt = render_regions(text, regions)
+        select_ms = (time.perf_counter() - started) * 1000 / args.repeat
+
+        target = next(number for number, region in enumerate(regions, start=1)
+                      if region.start < anchor <= region.end)
+        region = regions[target - 1]
+        edited = "\n".join(lines[region.start:region.end]).replace("floor(", "round(")
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            spliced = splice_regions(text, path, regions, {target: edited})
+        splice_ms = (time.perf_counter() - started) * 1000 / args.repeat
+        assert spliced.count("\n") == text.count("\n") and "round(" in spliced
+
+        print(f"{size:>7} {len(text):>11} {len(prompt):>13} {len(prompt) / len(text):>7.1%} {len(regions):>8} "
+              f"{select_ms:>17.1f} {splice_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Concurrency benchmark for GitHub access from the repair nodes.
+
+Simulates several repair jobs running in one process, each making the GitHub
+calls a repair run makes (workflow run, target and context files, branch,
+commit, pull request) against a mock GitHub API with fixed per-request
+latency. Compares blocking calls inside coroutines (how the nodes used
+PyGithub) with the shared `AsyncGitHubClient`, and reports wall time and how
+many requests were in flight at the same time.
+
+Usage:
+    python scripts/bench_github_concurrency.py [--jobs 8] [--latency-ms 50]
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict
+
+import httpx
+
+# Ensure app imports work
+sys.path.append(os.getcwd())
+
+from agent.github_client import AsyncGitHubClient
+
+REPO = "o/r"
+FILES = ["app/api/worker.py", "app/db/base.py", "app/tests/test_worker.py", "requirements.txt", "pyproject.toml"]
+
+
+def github_response(request: httpx.Request) -> httpx.Response:
+    """Answers the GitHub endpoints a repair run uses with canned payloads."""
+    path = request.url.path
+    if "/actions/runs/" in path:
+        body: Dict[str, Any] = {"id": 1, "head_commit": {"author": {"name": "dev"}}}
+    elif "/contents/" in path and request.method == "GET":
+        text = "import os\n" * 200
+        body = {"type": "file", "path": path.split("/contents/")[1], "sha": "f" * 40,
+                "content": base64.b64encode(text.encode()).decode()}
+    elif "/git/ref/heads/" in path:
+        body = {"object": {"sha": "a" * 40}}
+    elif path.endswith("/pulls"):
+        body = {"html_url": "https://github.com/o/r/pull/1"}
+    else:
+        body = {}
+    return httpx.Response(200, content=json.dumps(body).encode())
+
+
+class ProgressTracker:
+    """Counts GitHub requests that are in flight at the same time."""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+
+    def enter(self) -> None:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+
+    def leave(self) -> None:
+        self.active -= 1
+
+
+async def repair_job_calls(call: Callable[..., Any], job_id: int) -> None:
+    """Makes the same sequence of GitHub requests as one repair run."""
+    await call("GET", f"/repos/{REPO}/actions/runs/{job_id}")
+    for path in FILES:
+        await call("GET", f"/repos/{REPO}/contents/{path}")
+    await call("GET", f"/repos/{REPO}/contents/{FILES[0]}")
+    await call("GET", f"/repos/{REPO}/git/ref/heads/main")
+    await call("POST", f"/repos/{REPO}/git/refs", json={"ref": f"refs/heads/fix/{job_id}", "sha": "a" * 40})
+    await call("GET", f"/repos/{REPO}/contents/{FILES[0]}")
+    await call("PUT", f"/repos/{REPO}/contents/{FILES[0]}", json={"message": "fix"})
+    await call("POST", f"/repos/{REPO}/pulls", json={"title": "fix"})
+
+
+async def run_blocking(jobs: int, latency: float) -> ProgressTracker:
+    """Previous behaviour: a synchronous HTTP client called from async nodes."""
+    tracker = ProgressTracker()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        tracker.enter()
+        time.sleep(latency)
+        tracker.leave()
+        return github_response(request)
+
+    client = httpx.Client(base_url="https://api.github.com", transport=httpx.MockTransport(handler))
+
+    async def call(method: str, path: str, **kwargs: Any) -> httpx.Response:
+        return client.request(method, path, **kwargs)
+
+    await asyncio.gather(*(repair_job_calls(call, job_id) for job_id in range(jobs)))
+    client.close()
+    return tracker
+
+
+async def run_async(jobs: int, latency: float) -> ProgressTracker:
+    """Current behaviour: the shared pooled AsyncGitHubClient."""
+    tracker = ProgressTracker()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        tracker.enter()
+        await asyncio.sleep(latency)
+        tracker.leave()
+        return github_response(request)
+
+    github = AsyncGitHubClient(token="bench", transport=httpx.MockTransport(handler))
+    await asyncio.gather(*(repair_job_calls(github.request, job_id) for job_id in range(jobs)))
+    await github.close()
+    return tracker
+
+
+async def main(jobs: int, latency_ms: float) -> None:
+    """Runs both variants and prints the comparison."""
+    latency = latency_ms / 1000
+    calls_per_job = len(FILES) + 6
+    print(f"Jobs: {jobs}, {calls_per_job} GitHub calls per job, {latency_ms:.0f} ms per call")
+    for label, variant in (("blocking (PyGithub-style)", run_blocking), ("AsyncGitHubClient", run_async)):
+        start = time.perf_counter()
+        tracker = await variant(jobs, latency)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<26} wall time {elapsed:6.2f}s  peak concurrent requests: {tracker.peak}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.jobs, args.latency_ms))
@@ -0,0 +1,162 @@
+"""
+Fixture check and throughput benchmark for the streaming log parsers.
+
+First parses every log in the fixture corpus (scripts/fixtures/logs) and
+compares the records with `expected.json`, printing a PASS/FAIL line per
+fixture. Then streams a synthetic log of the requested size through
+`iter_error_records` one line at a time: mostly install and passing-test
+noise with the fixture failures interleaved, a ~1 MB block repeated so the
+whole log is never held in memory. Reports throughput and the records
+found, then the peak traced memory for two log sizes; it stays flat however
+large the log is (most of it is the repeated block).
+
+Usage:
+    python scripts/bench_log_parsers.py [--mb 100] [--error-every 5000] [--memory-mb 5] [--update-expected]
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Dict, Iterator, List
+
+# Ensure app imports work
+sys.path.append(os.getcwd())
+
+from agent.log_parsers import ErrorRecord, iter_error_records, list_ecosystems
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "logs")
+EXPECTED_PATH = os.path.join(FIXTURES_DIR, "expected.json")
+
+NOISE = [
+    "Collecting {word}=={n}.{n}.{n}",
+    "  Downloading {word}-{n}.{n}.{n}-py3-none-any.whl ({n} kB)",
+    "tests/test_{word}.py ........................................ [ {n}%]",
+    "PASS src/{word}/{word}.test.ts",
+    "    ok   github.com/acme/{word}  0.0{n}s",
+    "[INFO] Building {word} {n}.{n}-SNAPSHOT",
+    "   Compiling {word} v0.{n}.{n}",
+    "added {n} packages, and audited {n} packages in {n}s",
+    "2024-05-01T10:{n}:{n}.{n}Z ##[group]Run actions/setup-{word}@v{n}",
+]
+WORDS = ["cart", "orders", "pricing", "client", "auth", "search", "cache", "queue", "billing", "users"]
+
+
+def _summary(record: ErrorRecord) -> Dict:
+    """The fields compared against the expected records."""
+    return {
+        "ecosystem": record.ecosystem,
+        "error_type": record.error_type,
+        "file": record.file,
+        "line": record.line,
+        "test_id": record.test_id,
+    }
+
+
+def parse_fixture(path: str) -> List[Dict]:
+    """Parses one fixture log."""
+    with open(path, encoding="utf-8") as f:
+        return [_summary(record) for record in iter_error_records(f)]
+
+
+def check_fixtures(update: bool) -> bool:
+    """Compares every fixture with its expected records."""
+    results = {os.path.basename(path): parse_fixture(path)
+               for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.log")))}
+    if update:
+        with open(EXPECTED_PATH, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {EXPECTED_PATH}")
+        return True
+
+    with open(EXPECTED_PATH, encoding="utf-8") as f:
+        expected = json.load(f)
+    ok = True
+    for name, records in results.items():
+        passed = records == expected.get(name)
+        ok = ok and passed
+        ecosystems = sorted({record["ecosystem"] for record in records})
+        print(f"{'PASS' if passed else 'FAIL'}  {name:<14} {len(records):>2} records  {', '.join(ecosystems)}")
+        if not passed:
+            print(f"      expected {expected.get(name)}\n      got      {records}")
+    print(f"Registered ecosystems: {', '.join(list_ecosystems())}\n")
+    return ok
+
+
+def synthetic_log(size_bytes: int, error_every: int, seed: int = 0) -> Iterator[str]:
+    """
+    Yields log lines until `size_bytes` have been produced.
+
+    A block of about 1 MB is generated once and repeated, so producing the
+    log costs little next to parsing it.
+    """
+    rng = random.Random(seed)
+    failures = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.log"))):
+        with open(path, encoding="utf-8") as f:
+            failures.append(f.read().splitlines())
+    block: List[str] = []
+    block_bytes = 0
+    count = 0
+    while block_bytes < min(size_bytes, 1024 * 1024):
+        count += 1
+        if count % error_every == 0:
+            lines = rng.choice(failures)
+        else:
+            lines = [rng.choice(NOISE).format(word=rng.choice(WORDS), n=rng.randrange(100))]
+        for line in lines:
+            block_bytes += len(line) + 1
+            block.append(line + "\n")
+    produced = 0
+    while produced < size_bytes:
+        for line in block:
+            yield line
+        produced += block_bytes
+
+
+def stream(size_bytes: int, error_every: int) -> Dict[str, int]:
+    """Streams a synthetic log through the parsers, counting records per ecosystem."""
+    ecosystems: Dict[str, int] = {}
+    for record in iter_error_records(synthetic_log(size_bytes, error_every)):
+        ecosystems[record.ecosystem] = ecosystems.get(record.ecosystem, 0) + 1
+    return ecosystems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=float, default=100.0, help="Size of the synthetic log in MB")
+    parser.add_argument("--error-every", type=int, default=5000, help="Insert a fixture failure every N noise lines")
+    parser.add_argument("--memory-mb", type=float, default=5.0,
+                        help="Log size of the first memory measurement (the second is 4x)")
+    parser.add_argument("--update-expected", action="store_true", help="Rewrite expected.json from the parsers")
+    args = parser.parse_args()
+
+    fixtures_ok = check_fixtures(args.update_expected)
+
+    size = int(args.mb * 1024 * 1024)
+    started = time.perf_counter()
+    ecosystems = stream(size, args.error_every)
+    elapsed = time.perf_counter() - started
+    print(f"Streamed {args.mb:.0f} MB in {elapsed:.1f} s ({args.mb / elapsed:.1f} MB/s)")
+    print(f"Distinct records: {sum(ecosystems.values())} "
+          f"({', '.join(f'{name} {count}' for name, count in sorted(ecosystems.items()))})")
+
+    # tracemalloc slows allocation-heavy code down a lot, so memory is
+    # measured on separate, smaller runs
+    for memory_mb in (args.memory_mb, args.memory_mb * 4):
+        tracemalloc.start()
+        stream(int(memory_mb * 1024 * 1024), args.error_every)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"Peak traced memory for {memory_mb:.0f} MB: {peak / 1024:.0f} KiB")
+
+    if not fixtures_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Throughput and reduction benchmark for the diagnose log reducer.
+
+Generates large fixture logs shaped like real CI failures (a pytest run, an
+npm build and a Go build, each with pages of setup noise before the error)
+and runs `LogReducer` over them line by line. Reports the reduction ratio,
+throughput in MB/s, and whether the error line survived, next to plain head
+truncation at the same budget.
+
+Usage:
+    python scripts/bench_log_reducer.py [--log-mb 20] [--tokens 5000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Callable, Dict, List
+
+# Ensure app imports work
+sys.path.append(os.getcwd())
+
+from agent.log_reducer import LogReducer, token_budget_chars
+
+
+def noise(rng: random.Random, target_bytes: int) -> List[str]:
+    """Setup output: package installs, downloads and progress lines."""
+    templates = [
+        "Collecting {pkg}=={ver}",
+        "  Downloading {pkg}-{ver}-py3-none-any.whl (12{n} kB)",
+        "Requirement already satisfied: {pkg} in /opt/hostedtoolcache/Python/3.11/lib/python3.11/site-packages",
+        "npm WARN deprecated {pkg}@{ver}: this package is no longer supported",
+        "go: downloading github.com/{pkg}/{pkg} v{ver}",
+        "tests/test_{pkg}.py::test_case_{n} PASSED                                [ {n}%]",
+    ]
+    lines: List[str] = []
+    size = 0
+    while size < target_bytes:
+        line = rng.choice(templates).format(pkg=f"pkg{rng.randrange(500)}", ver=f"1.{rng.randrange(30)}.0",
+                                            n=rng.randrange(100))
+        lines.append(line)
+        size += len(line) + 1
+    return lines
+
+
+FAILURES: Dict[str, List[str]] = {
+    "pytest": [
+        "=================================== FAILURES ===================================",
+        "________________________________ test_checkout _________________________________",
+        "Traceback (most recent call last):",
+        '  File "app/api/checkout.py", line 42, in create_order',
+        "    total = cart.total()",
+        "AttributeError: 'NoneType' object has no attribute 'total'",
+        "FAILED tests/test_checkout.py::test_checkout - AttributeError: 'NoneType' object",
+        "========================= 1 failed, 812 passed in 41.2s =========================",
+        "##[error]Process completed with exit code 1.",
+    ],
+    "npm": [
+        "> web@1.0.0 build",
+        "> tsc -p .",
+        "src/cart.ts(17,5): error TS2322: Type 'string' is not assignable to type 'number'.",
+        "npm ERR! code ELIFECYCLE",
+        "npm ERR! errno 2",
+        "##[error]Process completed with exit code 2.",
+    ],
+    "go": [
+        "# example.com/service/internal/api",
+        "internal/api/handler.go:88:14: undefined: NewRouter",
+        "FAIL\texample.com/service/internal/api [build failed]",
+        "##[error]Process completed with exit code 1.",
+    ],
+}
+
+# The line a diagnosis needs for each fixture
+KEY_LINES = {
+    "pytest": "AttributeError: 'NoneType' object has no attribute 'total'",
+    "npm": "error TS2322",
+    "go": "undefined: NewRouter",
+}
+
+
+def fixture(kind: str, target_bytes: int, seed: int) -> List[str]:
+    """Builds one fixture log: noise, a few harmless warnings, then the failure."""
+    rng = random.Random(seed)
+    lines = noise(rng, target_bytes)
+    for position in sorted(rng.sample(range(len(lines)), 5)):
+        lines[position] = "WARNING: retrying request after connection reset (attempt 1/3)"
+    return lines + FAILURES[kind] + ["Post job cleanup.", "Cleaning up orphan processes"]
+
+
+def head_truncate(lines: List[str], max_chars: int) -> str:
+    """Previous behaviour: keep the first `max_chars` characters."""
+    return "\n".join(lines)[:max_chars]
+
+
+def reduce(lines: List[str], max_chars: int) -> str:
+    """Current behaviour: stream the lines through the reducer."""
+    reducer = LogReducer(max_chars)
+    reducer.feed_lines(lines)
+    return reducer.result()
+
+
+def main(log_mb: float, tokens: int) -> None:
+    """Runs every fixture through both strategies and prints the comparison."""
+    max_chars = token_budget_chars(tokens)
+    print(f"Fixture logs of {log_mb:.0f} MB, budget {tokens} tokens ({max_chars} chars)")
+    strategies: Dict[str, Callable[[List[str], int], str]] = {"head truncation": head_truncate, "LogReducer": reduce}
+    for seed, kind in enumerate(FAILURES):
+        lines = fixture(kind, int(log_mb * 1024 * 1024), seed)
+        size_mb = sum(len(line) + 1 for line in lines) / 1024 / 1024
+        for label, strategy in strategies.items():
+            start = time.perf_counter()
+            reduced = strategy(lines, max_chars)
+            elapsed = time.perf_counter() - start
+            found = "yes" if KEY_LINES[kind] in reduced else "no"
+            print(f"{kind:<7} {label:<16} ratio {size_mb * 1024 * 1024 / max(len(reduced), 1):8.0f}x  "
+                  f"{size_mb / elapsed:8.1f} MB/s  error kept: {found}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log-mb", type=float, default=20)
+    parser.add_argument("--tokens", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.log_mb, args.tokens)
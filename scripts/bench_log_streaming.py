@@ -0,0 +1,113 @@
+"""
+Memory benchmark for failed-step log download.
+
+Serves a workflow run with one failed job from a fake GitHub API: the jobs
+endpoint lists its steps and the log endpoint redirects to a large plain-text
+log sent in chunks. Compares downloading the whole log into memory (what the
+gh CLI subprocess amounted to) with `fetch_failed_logs`, which streams the log
+and keeps only the failed step, and reports peak Python memory for each.
+
+Usage:
+    python scripts/bench_log_streaming.py [--log-mb 50]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tracemalloc
+from typing import AsyncIterator
+
+import httpx
+
+# Ensure app imports work
+sys.path.append(os.getcwd())
+
+from agent.github_client import AsyncGitHubClient
+from agent.repo_session import RepairSession
+from agent.run_logs import fetch_failed_logs
+
+REPO = "o/r"
+JOB_ID = 7
+LOG_URL = "https://blobs.example.com/job-7.txt"
+
+STEPS = [
+    {"number": 1, "name": "Set up job", "conclusion": "success",
+     "started_at": "2024-05-01T10:00:00Z", "completed_at": "2024-05-01T10:00:01Z"},
+    {"number": 2, "name": "Install", "conclusion": "success",
+     "started_at": "2024-05-01T10:00:02Z", "completed_at": "2024-05-01T10:09:59Z"},
+    {"number": 3, "name": "Run tests", "conclusion": "failure",
+     "started_at": "2024-05-01T10:10:00Z", "completed_at": "2024-05-01T10:10:05Z"},
+    {"number": 4, "name": "Post checkout", "conclusion": "skipped",
+     "started_at": None, "completed_at": None},
+]
+
+
+async def log_chunks(total_bytes: int) -> AsyncIterator[bytes]:
+    """Yields a job log: a long install step followed by a short failing test step."""
+    sent = 0
+    line_no = 0
+    while sent < total_bytes:
+        minute, second = divmod(2 + line_no // 20000, 60)
+        minute = min(minute, 9)
+        chunk = "".join(
+            f"2024-05-01T10:{minute:02d}:{second:02d}.1234567Z Collecting package-{line_no + i} (1.0.0)\n"
+            for i in range(1000)
+        ).encode()
+        line_no += 1000
+        sent += len(chunk)
+        yield chunk
+    tail = "".join(
+        f"2024-05-01T10:10:0{i % 5}.0000000Z FAILED tests/test_app.py::test_{i} - AssertionError\n"
+        for i in range(50)
+    ) + "2024-05-01T10:10:06.0000000Z Post job cleanup.\n"
+    yield tail.encode()
+
+
+def fake_github(log_bytes: int) -> httpx.MockTransport:
+    """Answers the jobs and log endpoints the way api.github.com does."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith("/jobs"):
+            body = {"total_count": 1, "jobs": [{"id": JOB_ID, "name": "test", "conclusion": "failure", "steps": STEPS}]}
+            return httpx.Response(200, content=json.dumps(body).encode())
+        if path.endswith(f"/jobs/{JOB_ID}/logs"):
+            return httpx.Response(302, headers={"Location": LOG_URL})
+        if request.url.host == "blobs.example.com":
+            return httpx.Response(200, content=log_chunks(log_bytes))
+        return httpx.Response(404, content=b'{"message": "Not Found"}')
+
+    return httpx.MockTransport(handler)
+
+
+async def download_whole_log(github: AsyncGitHubClient) -> str:
+    """Previous behaviour: the entire log held in memory, then truncated."""
+    response = await github.request("GET", f"/repos/{REPO}/actions/jobs/{JOB_ID}/logs", follow_redirects=True)
+    return response.text[:20000]
+
+
+async def main(log_mb: float) -> None:
+    """Runs both variants and prints the comparison."""
+    log_bytes = int(log_mb * 1024 * 1024)
+    print(f"Job log: {log_mb:.0f} MB, failed step is the last 50 lines")
+    for label in ("whole log in memory", "streamed failed steps"):
+        github = AsyncGitHubClient(token="bench", transport=fake_github(log_bytes))
+        tracemalloc.start()
+        if label == "whole log in memory":
+            logs = await download_whole_log(github)
+        else:
+            logs = await fetch_failed_logs(RepairSession(1, REPO, github=github), 1, 20000)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        await github.close()
+        failed_lines = logs.count("FAILED tests/")
+        print(f"{label:<22} peak memory {peak / 1024 / 1024:7.1f} MB  "
+              f"kept {len(logs)} chars, {failed_lines} failing-test lines")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log-mb", type=float, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.log_mb))
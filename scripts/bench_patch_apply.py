@@ -0,0 +1,91 @@
+"""
+Benchmark for patch-mode fixes.
+
+Generates a Python module of the requested size and single-hunk fixes
+against it in the shapes models produce: exact, with a stale header line
+number, with whitespace drift in the context, with a wrong context line
+(needs fuzz), without header numbers, and several hunks at once. Checks
+that each patch applies to the intended lines, reports the time to apply
+it, and compares the output tokens of the diff with those of a full-file
+rewrite (estimated at CHARS_PER_TOKEN characters per token).
+
+Usage:
+    python scripts/bench_patch_apply.py [--lines 2000] [--repeat 200]
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List, Tuple
+
+# Ensure app imports work
+sys.path.append(os.getcwd())
+
+from agent.log_reducer import CHARS_PER_TOKEN
+from agent.patching import apply_patch
+
+
+def module(lines: int) -> str:
+    """A module of small, similar functions (repetitive context is the hard case for matching)."""
+    parts: List[str] = ["import math", ""]
+    i = 0
+    while len(parts) < lines:
+        parts += [f"def step_{i}(value):", "    if value is None:", "        return 0",
+                  f"    return math.floor(value * {i}) + 1", ""]
+        i += 1
+    return "\n".join(parts[:lines]) + "\n"
+
+
+def hunk(target: int, header_line: int = None, context_edit=None) -> str:
+    """A hunk changing the return line of `step_{target}`."""
+    start = 3 + target * 5  # 1-based line of "def step_{target}"
+    header = f"@@ -{header_line or start},4 +{header_line or start},4 @@" if header_line != 0 else "@@ @@"
+    context = [f"def step_{target}(value):", "    if value is None:", "        return 0"]
+    if context_edit:
+        context = context_edit(context)
+    return "\n".join([header] + [" " + line for line in context] + [
+        f"-    return math.floor(value * {target}) + 1",
+        f"+    return math.ceil(value * {target}) + 1",
+    ]) + "\n"
+
+
+def cases(functions: int) -> List[Tuple[str, str, List[int]]]:
+    """(name, diff, changed step numbers)."""
+    middle = functions // 2
+    return [
+        ("exact", hunk(middle), [middle]),
+        ("stale line number", hunk(middle, header_line=3 + (middle - 40) * 5), [middle]),
+        ("whitespace drift", hunk(middle, context_edit=lambda c: [line.rstrip() + "  " for line in c]), [middle]),
+        ("wrong context line", hunk(middle, context_edit=lambda c: ["def step_x(value):"] + c[1:]), [middle]),
+        ("no line numbers", hunk(middle, header_line=0), [middle]),
+        ("5 hunks", "".join(hunk(target) for target in range(10, functions, functions // 5)[:5]),
+         list(range(10, functions, functions // 5))[:5]),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=2000, help="Lines in the generated module")
+    parser.add_argument("--repeat", type=int, default=200, help="Applications per case")
+    args = parser.parse_args()
+
+    text = module(args.lines)
+    functions = (args.lines - 2) // 5
+    full_tokens = len(text) // CHARS_PER_TOKEN
+    print(f"Module: {args.lines} lines, ~{full_tokens} tokens for a full rewrite\n")
+    print(f"{'case':<20} {'applied':>8} {'ms/apply':>9} {'patch tokens':>13} {'vs full':>8}")
+    for name, diff, targets in cases(functions):
+        patched = apply_patch(text, diff)
+        ok = all(f"math.ceil(value * {target}) + 1" in patched for target in targets) and \
+            patched.count("math.ceil") == len(targets) and patched.count("\n") == text.count("\n")
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            apply_patch(text, diff)
+        elapsed_ms = (time.perf_counter() - started) * 1000 / args.repeat
+        patch_tokens = len(diff) // CHARS_PER_TOKEN
+        print(f"{name:<20} {'yes' if ok else 'WRONG':>8} {elapsed_ms:>9.2f} {patch_tokens:>13} "
+              f"{patch_tokens / full_tokens:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
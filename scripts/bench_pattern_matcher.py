@@ -0,0 +1,139 @@
+"""
+Scaling benchmark for the failure pattern matcher.
+
+Builds pattern libraries of growing size (the bundled library padded with
+synthetic error phrases) and matches the same log text with three
+strategies: the `PatternMatcher` regex with shared prefixes factored out,
+one `in` scan per pattern (the previous `classify_failure` approach) and a
+flat alternation of the escaped patterns. Reports milliseconds per log for
+each library size; the matcher's time depends mostly on the text length and
+the number of matches it reports, while the per-pattern scan and the flat
+alternation grow with the number of patterns.
+
+Usage:
+    python scripts/bench_pattern_matcher.py [--log-kb 20] [--sizes 25,100,400,1600,6400] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from typing import Callable, Dict, List
+
+# Ensure app imports work
+sys.path.append(os.getcwd())
+
+from agent.classification import DEFAULT_PATTERNS_PATH, FailureCategory, PatternMatcher
+
+WORDS = [
+    "error", "failed", "module", "package", "version", "resolve", "timeout", "connection", "runner",
+    "memory", "config", "invalid", "missing", "unexpected", "token", "assert", "build", "install",
+    "network", "daemon", "cache", "artifact", "lock", "compile", "import", "syntax", "host", "socket",
+]
+
+
+def bundled_patterns() -> Dict[FailureCategory, Dict[str, float]]:
+    """Loads the bundled pattern library."""
+    with open(DEFAULT_PATTERNS_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    return {FailureCategory(name): weights for name, weights in data["categories"].items()}
+
+
+def library(rng: random.Random, size: int) -> Dict[FailureCategory, Dict[str, float]]:
+    """The bundled library trimmed or padded to `size` patterns."""
+    patterns: Dict[FailureCategory, Dict[str, float]] = {category: {} for category in FailureCategory}
+    bundled = [(category, pattern, weight)
+               for category, weights in bundled_patterns().items() for pattern, weight in weights.items()]
+    for category, pattern, weight in bundled[:size]:
+        patterns[category][pattern] = weight
+    categories = [category for category in FailureCategory if category != FailureCategory.UNKNOWN]
+    count = min(size, len(bundled))
+    while count < size:
+        phrase = " ".join(rng.choice(WORDS) for _ in range(rng.randrange(2, 5)))
+        category = rng.choice(categories)
+        if phrase not in patterns[category]:
+            patterns[category][phrase] = 1.0
+            count += 1
+    return patterns
+
+
+def log_text(rng: random.Random, size_bytes: int) -> str:
+    """Log-like text made of the same vocabulary as the synthetic patterns."""
+    lines: List[str] = []
+    size = 0
+    while size < size_bytes:
+        line = f"[{rng.randrange(10000)}] " + " ".join(rng.choice(WORDS) for _ in range(rng.randrange(4, 12)))
+        lines.append(line)
+        size += len(line) + 1
+    lines.append("ModuleNotFoundError: No module named 'requests'")
+    return "\n".join(lines)
+
+
+def per_pattern_scan(patterns: Dict[FailureCategory, Dict[str, float]]) -> Callable[[str], int]:
+    """The previous approach: a substring check per pattern."""
+    flat = [pattern.lower() for weights in patterns.values() for pattern in weights]
+
+    def run(text: str) -> int:
+        text = text.lower()
+        return sum(1 for pattern in flat if pattern in text)
+    return run
+
+
+def flat_regex(patterns: Dict[FailureCategory, Dict[str, float]]) -> Callable[[str], int]:
+    """One alternation of every pattern, longest first (reports non-overlapping matches only)."""
+    flat = sorted({pattern.lower() for weights in patterns.values() for pattern in weights}, key=len, reverse=True)
+    regex = re.compile("|".join(re.escape(pattern) for pattern in flat))
+
+    def run(text: str) -> int:
+        return sum(1 for _ in regex.finditer(text.lower()))
+    return run
+
+
+def prefix_regex(patterns: Dict[FailureCategory, Dict[str, float]]) -> Callable[[str], int]:
+    """The PatternMatcher regex (prefixes factored out, overlapping matches reported)."""
+    matcher = PatternMatcher(patterns)
+
+    def run(text: str) -> int:
+        return len(matcher.find(text))
+    return run
+
+
+def time_ms(run: Callable[[str], int], text: str, repeat: int) -> float:
+    """Best-of-`repeat` wall time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(text)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(log_kb: int, sizes: List[int], repeat: int) -> None:
+    """Runs every strategy over every library size and prints a table."""
+    rng = random.Random(0)
+    text = log_text(rng, log_kb * 1024)
+    strategies = {"prefix regex": prefix_regex, "per-pattern in": per_pattern_scan, "flat regex": flat_regex}
+
+    print(f"Log: {len(text) / 1024:.0f} KB; best of {repeat} runs, ms per log")
+    print(f"{'patterns':>9}" + "".join(f"{name:>17}" for name in strategies) + f"{'matches':>9}{'compile ms':>13}")
+    for size in sizes:
+        patterns = library(rng, size)
+        start = time.perf_counter()
+        matcher = PatternMatcher(patterns)
+        compile_ms = (time.perf_counter() - start) * 1000
+        matches = len(matcher.find(text))
+        row = f"{size:>9}"
+        for build in strategies.values():
+            row += f"{time_ms(build(patterns), text, repeat):>17.2f}"
+        print(row + f"{matches:>9}{compile_ms:>13.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log-kb", type=int, default=20)
+    parser.add_argument("--sizes", default="25,100,400,1600,6400")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.log_kb, [int(size) for size in args.sizes.split(",")], args.repeat)
@@ -0,0 +1,201 @@
+"""
+Micro-benchmark for the webhook pre-filter.
+
+Compares the previous ingestion path (json.loads + Pydantic validation for
+every delivery) with the pre-filtered path on a realistic mix of GitHub
+deliveries and reports requests/sec for each.
+
+Usage:
+    python scripts/bench_webhook_prefilter.py [--requests 20000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Ensure app imports work
+sys.path.append(os.getcwd())
+
+from app.core.webhook_filter import extract_json_body, prefilter_webhook
+from app.schemas.webhook import GitHubWebhookPayload
+
+# Share of each delivery kind, based on what a busy repository sends
+EVENT_MIX: List[Tuple[str, float]] = [
+    ("workflow_run:completed:success", 0.40),
+    ("workflow_run:requested", 0.15),
+    ("workflow_run:in_progress", 0.15),
+    ("workflow_run:completed:cancelled", 0.03),
+    ("workflow_run:completed:failure", 0.07),
+    ("check_run", 0.10),
+    ("push", 0.06),
+    ("pull_request", 0.04),
+]
+
+
+def _user(login: str) -> Dict[str, Any]:
+    """Builds a user object shaped like GitHub's."""
+    return {
+        "login": login,
+        "id": random.randint(1, 10**8),
+        "node_id": "MDQ6VXNlcjE=",
+        "avatar_url": f"https://avatars.githubusercontent.com/u/{login}",
+        "html_url": f"https://github.com/{login}",
+        "type": "User",
+        "site_admin": False,
+    }
+
+
+def _repository() -> Dict[str, Any]:
+    """Builds a repository object with the bulk of GitHub's URL fields."""
+    repo = {
+        "id": 123456789,
+        "name": "solar-mender",
+        "full_name": "diviora/solar-mender",
+        "private": True,
+        "owner": _user("diviora"),
+        "description": "CI/CD repair agent",
+        "default_branch": "main",
+    }
+    for field in ("archive", "assignees", "blobs", "branches", "collaborators", "comments",
+                  "commits", "compare", "contents", "contributors", "deployments", "downloads",
+                  "events", "forks", "git_commits", "git_refs", "git_tags", "hooks", "issue_comment",
+                  "issue_events", "issues", "keys", "labels", "languages", "merges", "milestones",
+                  "notifications", "pulls", "releases", "stargazers", "statuses", "subscribers",
+                  "subscription", "tags", "teams", "trees"):
+        repo[f"{field}_url"] = f"https://api.github.com/repos/diviora/solar-mender/{field}{{/id}}"
+    return repo
+
+
+def _workflow_run(action: str, conclusion: Optional[str]) -> Dict[str, Any]:
+    """Builds a workflow_run object."""
+    status = "completed" if action == "completed" else ("queued" if action == "requested" else "in_progress")
+    return {
+        "id": random.randint(10**9, 10**10),
+        "name": random.choice(["lint", "tests", "build"]),
+        "node_id": "WFR_kwLOA",
+        "head_branch": "main",
+        "head_sha": "%040x" % random.getrandbits(160),
+        "path": ".github/workflows/ci.yml",
+        "display_title": "Refactor worker session handling",
+        "run_number": random.randint(1, 5000),
+        "event": "push",
+        "status": status,
+        "conclusion": conclusion,
+        "workflow_id": 4242,
+        "html_url": "https://github.com/diviora/solar-mender/actions/runs/1",
+        "pull_requests": [],
+        "created_at": "2026-01-01T00:00:00Z",
+        "updated_at": "2026-01-01T00:05:00Z",
+        "actor": _user("dev"),
+        "triggering_actor": _user("dev"),
+        "run_attempt": 1,
+        "head_commit": {
+            "id": "%040x" % random.getrandbits(160),
+            "message": "Refactor worker session handling\n\n" + "Details. " * 40,
+            "author": {"name": "Dev", "email": "dev@example.com"},
+            "committer": {"name": "Dev", "email": "dev@example.com"},
+        },
+        "repository": _repository(),
+        "head_repository": _repository(),
+    }
+
+
+def build_delivery(kind: str) -> Tuple[str, bytes]:
+    """
+    Builds one delivery of the given kind.
+
+    Args:
+        kind: Entry from EVENT_MIX.
+
+    Returns:
+        Tuple of (X-GitHub-Event header value, raw JSON body).
+    """
+    parts = kind.split(":")
+    event = parts[0]
+    if event == "workflow_run":
+        action = parts[1]
+        conclusion = parts[2] if len(parts) > 2 else None
+        body = {
+            "action": action,
+            "workflow_run": _workflow_run(action, conclusion),
+            "workflow": {"id": 4242, "name": "CI", "path": ".github/workflows/ci.yml"},
+            "repository": _repository(),
+            "sender": _user("dev"),
+        }
+    elif event == "check_run":
+        body = {
+            "action": "completed",
+            "check_run": {"id": 1, "status": "completed", "conclusion": "success",
+                          "output": {"title": "ok", "summary": "All checks passed. " * 20}},
+            "repository": _repository(),
+            "sender": _user("dev"),
+        }
+    elif event == "push":
+        body = {
+            "ref": "refs/heads/main",
+            "commits": [{"id": "%040x" % random.getrandbits(160), "message": "Update docs " * 10}] * 3,
+            "repository": _repository(),
+            "sender": _user("dev"),
+        }
+    else:
+        body = {
+            "action": "synchronize",
+            "pull_request": {"number": 12, "title": "Fix worker", "body": "Description. " * 50},
+            "repository": _repository(),
+            "sender": _user("dev"),
+        }
+    return event, json.dumps(body, separators=(",", ":")).encode()
+
+
+def baseline_path(event_type: str, raw_body: bytes) -> bool:
+    """Previous handler logic: parse and validate every delivery, then filter."""
+    _ = f"Raw webhook body (first 500 chars): {raw_body.decode()[:500]}"
+    body_dict = json.loads(raw_body)
+    _ = f"Parsed JSON keys: {list(body_dict.keys())}"
+    payload = GitHubWebhookPayload(**body_dict)
+    if event_type == "ping":
+        return False
+    return bool(payload.workflow_run and payload.workflow_run.conclusion == "failure")
+
+
+def prefiltered_path(event_type: str, raw_body: bytes) -> bool:
+    """Current handler logic: byte-level pre-filter, full validation only for candidates."""
+    if event_type == "ping":
+        return False
+    json_body = extract_json_body(raw_body, "application/json")
+    if prefilter_webhook(event_type, json_body):
+        return False
+    payload = GitHubWebhookPayload(**json.loads(json_body))
+    return bool(payload.workflow_run and payload.workflow_run.conclusion == "failure")
+
+
+def run(requests: int, seed: int) -> None:
+    """Builds the delivery mix, checks both paths agree, and times them."""
+    random.seed(seed)
+    kinds = [kind for kind, _ in EVENT_MIX]
+    weights = [weight for _, weight in EVENT_MIX]
+    deliveries = [build_delivery(kind) for kind in random.choices(kinds, weights, k=requests)]
+    avg_size = sum(len(body) for _, body in deliveries) / len(deliveries)
+
+    for event_type, body in deliveries:
+        assert baseline_path(event_type, body) == prefiltered_path(event_type, body)
+
+    print(f"Deliveries: {requests}, average body {avg_size / 1024:.1f} KiB")
+    for name, handler in (("baseline (parse + validate all)", baseline_path),
+                          ("pre-filtered", prefiltered_path)):
+        start = time.perf_counter()
+        for event_type, body in deliveries:
+            handler(event_type, body)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<34} {requests / elapsed:>12,.0f} req/s  ({elapsed * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.requests, args.seed)
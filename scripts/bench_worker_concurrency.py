@@ -0,0 +1,135 @@
+"""
+Concurrency check for the worker's database usage.
+
+Runs a burst of jobs through `process_job` against a deliberately small
+connection pool, with a stand-in agent that only waits (as a real run waits
+on Vertex AI and GitHub). Compares it with the previous shape of the worker,
+where one session stayed open across the agent run, and reports how many
+jobs were in flight at once and the peak number of pooled connections used.
+
+Usage:
+    python scripts/bench_worker_concurrency.py [--jobs 20] [--pool-size 2] [--agent-seconds 0.5]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+# Ensure app imports work
+sys.path.append(os.getcwd())
+
+
+def configure(pool_size: int) -> str:
+    """Points the app at a scratch SQLite database with a small, strict pool."""
+    db_path = os.path.join(tempfile.mkdtemp(), "bench_worker.db")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = "0"
+    os.environ["CHECKPOINTS_ENABLED"] = "false"
+    return db_path
+
+
+def build_payload(job_id: int) -> Dict[str, Any]:
+    """Builds a worker payload for one job."""
+    return {
+        "job_id": job_id,
+        "action": "completed",
+        "workflow_run": {
+            "id": 1000 + job_id,
+            "name": "tests",
+            "status": "completed",
+            "conclusion": "failure",
+            "head_branch": "main",
+            "head_sha": f"{job_id:040x}",
+            "html_url": "https://github.com/o/r/actions/runs/1",
+            "run_number": job_id,
+        },
+        "repository": {"full_name": "o/r", "name": "r", "owner": {"login": "o"}},
+    }
+
+
+async def run(jobs: int, agent_seconds: float) -> None:
+    """Runs the burst through both worker shapes and prints the comparison."""
+    from sqlalchemy import select, update
+
+    from agent.base import BaseAgent
+    from agent.registry import get_registry
+    from app.api import worker
+    from app.db import base as db_base
+    from app.db.base import AsyncSessionLocal, Base, engine
+    from app.db.models import JobStatus, RepairJob
+
+    class WaitingAgent(BaseAgent):
+        """Stand-in agent whose run is pure latency."""
+        name = "repair"
+        description = "Waits instead of calling the LLM"
+        capabilities: List[str] = []
+        graph = None
+
+        async def invoke(self, state: Dict[str, Any]) -> Dict[str, Any]:
+            await asyncio.sleep(agent_seconds)
+            return {**state, "status": "PR_OPENED", "root_cause": "bench", "total_cost": 0.0}
+
+    agent = WaitingAgent()
+    get_registry()._agents["repair"] = agent
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async def reset_jobs() -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(RepairJob).values(status=JobStatus.PENDING))
+            await db.commit()
+
+    async with AsyncSessionLocal() as db:
+        db.add_all([RepairJob(id=i, repo_name="o/r", run_id=str(1000 + i)) for i in range(1, jobs + 1)])
+        await db.commit()
+
+    async def held_session_job(payload: Dict[str, Any]) -> None:
+        """Previous shape: one session (and its connection) spans the whole run."""
+        async with AsyncSessionLocal() as db:
+            await db.execute(select(RepairJob.run_ids).where(RepairJob.id == payload["job_id"]))
+            worker._worker_usage["in_flight"] += 1
+            worker._worker_usage["peak_in_flight"] = max(
+                worker._worker_usage["peak_in_flight"], worker._worker_usage["in_flight"]
+            )
+            try:
+                final_state = await agent.invoke({"job_id": payload["job_id"]})
+            finally:
+                worker._worker_usage["in_flight"] -= 1
+            await db.execute(
+                update(RepairJob).where(RepairJob.id == payload["job_id"]).values(status=final_state["status"])
+            )
+            await db.commit()
+
+    print(f"Jobs: {jobs}, pool size: {db_base.settings.DB_POOL_SIZE} (no overflow), agent run: {agent_seconds}s")
+    for label, handler in (("held session (previous)", held_session_job),
+                           ("short units of work", worker.process_job)):
+        await reset_jobs()
+        worker._worker_usage.update(in_flight=0, peak_in_flight=0)
+        db_base._pool_usage["peak_checked_out"] = 0
+
+        start = time.perf_counter()
+        await asyncio.gather(*(handler(build_payload(i)) for i in range(1, jobs + 1)))
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"{label:<26} peak in flight {worker._worker_usage['peak_in_flight']:>4}  "
+            f"peak connections {db_base._pool_usage['peak_checked_out']:>3}  "
+            f"wall time {elapsed:6.2f}s"
+        )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--agent-seconds", type=float, default=0.5)
+    args = parser.parse_args()
+    configure(args.pool_size)
+    asyncio.run(run(args.jobs, args.agent_seconds))
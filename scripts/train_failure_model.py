@@ -0,0 +1,108 @@
+"""
+Offline trainer for the learned failure classifier.
+
+Reads categorized jobs from the database (root cause plus stored failure
+signature) and/or a JSONL file of curated `{"text": ..., "category": ...}`
+examples, holds out a validation split, trains the hashed n-gram naive Bayes
+model in agent/failure_model.py and writes it as a compressed `.npz`. Point
+FAILURE_MODEL_PATH at the output to use it in the classify node.
+
+Job categories were assigned by the classifier in place at the time, so
+`--pr-opened-only` restricts training to jobs whose category led to a fix PR.
+Prints the validation accuracy of the model next to the heuristic, and the share
+and accuracy of predictions at or above LEARNED_MIN_CONFIDENCE.
+
+Usage:
+    python scripts/train_failure_model.py --output failure_model.npz [--examples labeled.jsonl]
+        [--pr-opened-only] [--no-db] [--validation 0.2] [--bits 16]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+from typing import List, Tuple
+
+# Ensure app imports work
+sys.path.append(os.getcwd())
+
+from agent.classification import FailureCategory
+from agent.failure_model import evaluate, model_text, train_failure_model
+
+Example = Tuple[str, FailureCategory]
+
+
+async def load_jobs(pr_opened_only: bool) -> List[Example]:
+    """Loads categorized jobs with a stored failure signature."""
+    from sqlalchemy import select
+
+    from app.db.base import AsyncSessionLocal
+    from app.db.models import JobStatus, RepairJob
+
+    query = select(RepairJob.error_log_summary, RepairJob.failure_signature, RepairJob.failure_category).where(
+        RepairJob.failure_category.isnot(None),
+        RepairJob.failure_category != FailureCategory.UNKNOWN.value,
+        RepairJob.failure_signature.isnot(None)
+    )
+    if pr_opened_only:
+        query = query.where(RepairJob.status == JobStatus.PR_OPENED)
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(query)).all()
+    return [
+        (model_text(root_cause, json.loads(signature)), FailureCategory(category))
+        for root_cause, signature, category in rows
+    ]
+
+
+def load_examples(path: str) -> List[Example]:
+    """Loads curated examples from a JSONL file."""
+    examples: List[Example] = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                examples.append((record["text"], FailureCategory(record["category"])))
+    return examples
+
+
+def main(args: argparse.Namespace) -> None:
+    """Loads the examples, trains, reports and writes the model."""
+    examples: List[Example] = []
+    if not args.no_db:
+        examples.extend(asyncio.run(load_jobs(args.pr_opened_only)))
+    if args.examples:
+        examples.extend(load_examples(args.examples))
+    if not examples:
+        sys.exit("No labeled examples found")
+
+    random.Random(args.seed).shuffle(examples)
+    held_out = int(len(examples) * args.validation)
+    validation, training = examples[:held_out], examples[held_out:]
+    model = train_failure_model(
+        [text for text, _ in training],
+        [label for _, label in training],
+        validation=([text for text, _ in validation], [label for _, label in validation]),
+        bits=args.bits
+    )
+    model.save(args.output)
+
+    print(f"Examples: {len(training)} training, {len(validation)} validation; "
+          f"classes: {', '.join(category.value for category in model.classes)}; scale {model.scale:g}")
+    if validation:
+        report = evaluate(model, [text for text, _ in validation], [label for _, label in validation])
+        for name, values in report.items():
+            print(f"  {name:<10} " + ", ".join(f"{key} {value:.3f}" for key, value in values.items()))
+    print(f"Wrote {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--examples", default="")
+    parser.add_argument("--pr-opened-only", action="store_true")
+    parser.add_argument("--no-db", action="store_true")
+    parser.add_argument("--validation", type=float, default=0.2)
+    parser.add_argument("--bits", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.db.migrations import init_db
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """
+    Session factory bound to a fresh SQLite database with the current schema.
+
+    NullPool keeps connections from outliving the event loop of the
+    `asyncio.run` call that opened them, so each test step can use its own.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", poolclass=NullPool)
+    asyncio.run(init_db(engine))
+    yield async_sessionmaker(bind=engine, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+class WebhookClient:
+    """Posts signed GitHub webhooks to the webhook route and records the jobs it dispatches."""
+
+    SECRET = "test-secret"
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self.dispatched = []  # (job_id, delay_seconds) per dispatched job
+        self.deduplicator = None
+        self.running_siblings = False  # answer of the GitHub sibling-run check
+
+    @staticmethod
+    def payload(run_id=1, head_sha="abc", run_attempt=1, conclusion="failure"):
+        """A `workflow_run` completion for repository o/r."""
+        return {
+            "action": "completed",
+            "workflow_run": {
+                "id": run_id, "name": "CI", "status": "completed", "conclusion": conclusion,
+                "head_branch": "main", "head_sha": head_sha, "html_url": "https://github.com/o/r",
+                "run_number": run_id, "run_attempt": run_attempt,
+            },
+            "repository": {"full_name": "o/r", "name": "r", "owner": {"login": "o"}},
+        }
+
+    async def post(self, payload, delivery_id=None, event="workflow_run"):
+        """Sends one delivery and returns the response."""
+        import hashlib
+        import hmac
+        import json
+
+        import httpx
+
+        body = json.dumps(payload).encode()
+        headers = {
+            "Content-Type": "application/json",
+            "X-GitHub-Event": event,
+            "X-Hub-Signature-256": "sha256=" + hmac.new(self.SECRET.encode(), body, hashlib.sha256).hexdigest(),
+        }
+        if delivery_id:
+            headers["X-GitHub-Delivery"] = delivery_id
+        transport = httpx.ASGITransport(app=self.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/github", content=body, headers=headers)
+
+
+@pytest.fixture
+def webhook(session_factory, monkeypatch):
+    """
+    `WebhookClient` for the webhook route, backed by the test database.
+
+    Jobs are recorded instead of dispatched, the check for running sibling
+    runs answers `client.running_siblings` without calling GitHub, and every
+    test gets an empty in-memory deduplicator.
+    """
+    pytest.importorskip("fastapi")
+    from fastapi import FastAPI
+
+    from app.api import webhook as webhook_module
+    from app.core.config import settings
+    from app.core.dedup import WebhookDeduplicator
+    from app.db.base import get_db
+
+    app = FastAPI()
+    app.include_router(webhook_module.router)
+    client = WebhookClient(app)
+
+    async def test_db():
+        async with session_factory() as db:
+            yield db
+
+    async def record_task(payload, endpoint="/api/v1/worker/run", delay_seconds=0):
+        client.dispatched.append((payload["job_id"], delay_seconds))
+        return f"task-{payload['job_id']}"
+
+    async def running_siblings(repo_name, head_sha, run_id):
+        return client.running_siblings
+
+    app.dependency_overrides[get_db] = test_db
+    monkeypatch.setattr(webhook_module, "has_running_siblings", running_siblings)
+    monkeypatch.setattr(settings, "GITHUB_SECRET", WebhookClient.SECRET)
+    monkeypatch.setattr(webhook_module, "create_cloud_task", record_task)
+    client.deduplicator = WebhookDeduplicator(ttl_seconds=600, max_entries=100)
+    monkeypatch.setattr(webhook_module, "webhook_deduplicator", client.deduplicator)
+    return client
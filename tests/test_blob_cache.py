@@ -0,0 +1,118 @@
+import asyncio
+import os
+
+from agent.blob_cache import BlobCache
+
+
+def _file(path, sha, content):
+    return {"path": path, "sha": sha, "content": content}
+
+
+def _cache(**kwargs):
+    kwargs.setdefault("max_bytes", 1000)
+    kwargs.setdefault("max_paths", 100)
+    kwargs.setdefault("disk_dir", None)
+    return BlobCache(**kwargs)
+
+
+def test_file_read_at_a_commit_is_a_memory_hit():
+    cache = _cache()
+
+    async def scenario():
+        await cache.put_file("o/r", "c1", _file("setup.py", "b1", "setup()"))
+        return await cache.get_file("o/r", "c1", "setup.py"), await cache.get_file("o/r", "c2", "setup.py")
+
+    hit, other_commit = asyncio.run(scenario())
+    assert hit == _file("setup.py", "b1", "setup()")
+    assert other_commit is None
+    assert (cache.stats()["memory_hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_unchanged_file_is_stored_once_across_commits():
+    cache = _cache()
+
+    async def scenario():
+        await cache.put_file("o/r", "c1", _file("requirements.txt", "b1", "httpx\n"))
+        await cache.put_file("o/r", "c2", _file("requirements.txt", "b1", "httpx\n"))
+        return await cache.get_file("o/r", "c2", "requirements.txt")
+
+    assert asyncio.run(scenario())["content"] == "httpx\n"
+    assert cache.stats()["blobs"] == 1
+    assert cache.stats()["paths"] == 2
+    assert cache.stats()["memory_bytes"] == len("httpx\n")
+
+
+def test_missing_paths_are_remembered():
+    cache = _cache()
+
+    async def scenario():
+        await cache.put_missing("o/r", "c1", "tox.ini")
+        return (
+            await cache.is_missing("o/r", "c1", "tox.ini"),
+            await cache.get_file("o/r", "c1", "tox.ini"),
+            await cache.is_missing("o/r", "c2", "tox.ini"),
+        )
+
+    assert asyncio.run(scenario()) == (True, None, False)
+    assert cache.stats()["negative_hits"] == 1
+    assert cache.stats()["misses"] == 0
+
+
+def test_least_recently_used_blobs_are_evicted_for_space():
+    cache = _cache(max_bytes=25)
+
+    async def scenario():
+        for sha in ("b1", "b2"):
+            await cache.put_blob("o/r", sha, "x" * 10)
+        await cache.get_blob("o/r", "b1")  # b2 is now the oldest
+        await cache.put_blob("o/r", "b3", "y" * 10)
+        # Larger than the whole budget, so never kept
+        await cache.put_blob("o/r", "b4", "z" * 30)
+        return [await cache.get_blob("o/r", sha) is not None for sha in ("b1", "b2", "b3", "b4")]
+
+    assert asyncio.run(scenario()) == [True, False, True, False]
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["memory_bytes"] == 20
+
+
+def test_path_index_is_bounded():
+    cache = _cache(max_paths=2)
+
+    async def scenario():
+        for commit in ("c1", "c2", "c3"):
+            await cache.put_file("o/r", commit, _file("a.py", "b1", "pass"))
+        return [await cache.get_file("o/r", commit, "a.py") is not None for commit in ("c1", "c2", "c3")]
+
+    assert asyncio.run(scenario()) == [False, True, True]
+    assert cache.stats()["paths"] == 2
+
+
+def test_disk_tier_survives_a_new_process(tmp_path):
+    async def scenario():
+        await _cache(disk_dir=str(tmp_path)).put_file("o/r", "c1", _file("a.py", "b1", "print('hi')"))
+        restarted = _cache(disk_dir=str(tmp_path))
+        first = await restarted.get_file("o/r", "c1", "a.py")
+        second = await restarted.get_file("o/r", "c1", "a.py")
+        return restarted, first, second
+
+    restarted, first, second = asyncio.run(scenario())
+    assert first == second == _file("a.py", "b1", "print('hi')")
+    assert (restarted.stats()["disk_hits"], restarted.stats()["memory_hits"]) == (1, 1)
+
+
+def test_disk_tier_evicts_least_recently_used_files(tmp_path):
+    cache = _cache(disk_dir=str(tmp_path), disk_max_bytes=250)
+
+    async def scenario():
+        await cache.put_blob("o/r", "b1", "a" * 100)
+        await cache.put_blob("o/r", "b2", "b" * 100)
+        # b1 was used longer ago than b2
+        os.utime(cache._blob_path("o/r", "b1"), (1, 1))
+        await cache.put_blob("o/r", "b3", "c" * 100)
+
+    asyncio.run(scenario())
+    assert not os.path.exists(cache._blob_path("o/r", "b1"))
+    assert os.path.exists(cache._blob_path("o/r", "b2"))
+    assert os.path.exists(cache._blob_path("o/r", "b3"))
+    assert cache.stats()["disk_evictions"] == 1
+    assert cache.stats()["disk_bytes"] == 200
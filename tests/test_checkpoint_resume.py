@@ -0,0 +1,150 @@
+import asyncio
+from collections import Counter
+from typing import Any, Dict
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+pytest.importorskip("langgraph")
+pytest.importorskip("fastapi")
+
+from agent import checkpoint, repo_session  # noqa: E402
+from agent.github_client import GitHubAPIError  # noqa: E402
+from agent.registry import get_registry  # noqa: E402
+from agent.repair import graph  # noqa: E402
+from agent.repair.agent import RepairAgent  # noqa: E402
+from agent.repair.utils import is_transient_error  # noqa: E402
+from app.api import worker  # noqa: E402
+from app.db.models import GraphCheckpoint, JobStatus, RepairJob  # noqa: E402
+
+PAYLOAD_RUN = {
+    "id": 7, "name": "CI", "status": "completed", "conclusion": "failure",
+    "head_branch": "main", "head_sha": "abc", "html_url": "https://x", "run_number": 1,
+}
+
+
+class FakeSession:
+    """Repository session whose first `create_pull` fails with a GitHub 502."""
+
+    def __init__(self) -> None:
+        self.pull_attempts = 0
+        self.branches = set()
+        self.files = {("main", "app/cart.py"): {"path": "app/cart.py", "sha": "b1", "content": "total = 0\n"}}
+
+    async def default_branch(self) -> str:
+        return "main"
+
+    async def base_sha(self) -> str:
+        return "abc"
+
+    async def create_branch(self, branch: str, sha: str) -> None:
+        if branch in self.branches:
+            raise GitHubAPIError("Reference already exists", 422)
+        self.branches.add(branch)
+
+    async def get_file(self, path: str, ref: str = None) -> Dict[str, Any]:
+        return self.files.get((ref, path)) or self.files[("main", path)]
+
+    async def update_file(self, path, message, content, sha, branch) -> Dict[str, Any]:
+        self.files[(branch, path)] = {"path": path, "sha": "b2", "content": content}
+        return {}
+
+    async def create_pull(self, title, body, head, base, draft=False) -> Dict[str, Any]:
+        self.pull_attempts += 1
+        if self.pull_attempts == 1:
+            raise GitHubAPIError("POST /pulls: 502 Bad Gateway", 502)
+        return {"html_url": "https://github.test/o/r/pull/1"}
+
+
+@pytest.fixture
+def repair_agent(session_factory, monkeypatch):
+    """A RepairAgent whose model-backed nodes are counting stubs and whose pr node is real."""
+    calls = Counter()
+
+    def stub(name, cost=0.0, **update):
+        async def node(state):
+            calls[name] += 1
+            # total_cost is summed by the state reducer, so nodes return their own cost
+            return {**state, **update, "total_cost": cost}
+        return node
+
+    monkeypatch.setattr(graph, "collect_logs_node", stub("logs", error_logs="assert 0 == 3"))
+    monkeypatch.setattr(graph, "preclassify_node", stub("preclassify"))
+    monkeypatch.setattr(graph, "diagnose_node", stub("diagnose", root_cause="total is never summed", cost=0.02))
+    monkeypatch.setattr(graph, "classify_node", stub("classify", failure_category="test"))
+    monkeypatch.setattr(graph, "locate_node", stub("locate", target_file_path="app/cart.py"))
+    monkeypatch.setattr(graph, "fix_node", stub("fix", fixed_content="total = sum(items)\n", cost=0.05))
+    session = FakeSession()
+    monkeypatch.setattr(repo_session, "get_session", lambda job_id, repo_name: session)
+    monkeypatch.setattr(checkpoint, "AsyncSessionLocal", session_factory)
+    monkeypatch.setattr(worker, "AsyncSessionLocal", session_factory)
+
+    agent = RepairAgent()
+    registry = get_registry()
+    previous = registry._agents.get("repair")
+    registry._agents["repair"] = agent
+    yield agent, calls, session
+    if previous is None:
+        registry._agents.pop("repair", None)
+    else:
+        registry._agents["repair"] = previous
+
+
+def test_retried_job_resumes_at_the_failed_node(repair_agent, session_factory):
+    agent, calls, session = repair_agent
+
+    async def scenario():
+        async with session_factory() as db:
+            job = RepairJob(repo_name="o/r", run_id="7", status=JobStatus.PENDING)
+            db.add(job)
+            await db.commit()
+        payload = {"job_id": job.id, "workflow_run": PAYLOAD_RUN, "repository": {"full_name": "o/r", "name": "r", "owner": {}}}
+
+        # First delivery: the PR call fails transiently, so the worker raises and the queue retries
+        with pytest.raises(GitHubAPIError):
+            await worker.process_job(payload)
+        async with session_factory() as db:
+            assert (await db.get(RepairJob, job.id)).status == JobStatus.FAILED
+            assert await db.scalar(select(GraphCheckpoint.thread_id).limit(1)) == str(job.id)
+
+        # Retry: resumes at pr without calling diagnose or fix again
+        await worker.process_job(payload)
+        async with session_factory() as db:
+            job = await db.get(RepairJob, job.id)
+            checkpoints = await db.scalar(select(GraphCheckpoint.thread_id).limit(1))
+        return job, checkpoints
+
+    job, checkpoints = asyncio.run(scenario())
+
+    assert calls == {"logs": 1, "preclassify": 1, "diagnose": 1, "classify": 1, "locate": 1, "fix": 1}
+    assert session.pull_attempts == 2
+    assert job.status == JobStatus.PR_OPENED
+    assert job.pr_url == "https://github.test/o/r/pull/1"
+    assert job.resumed_from_node == "pr"
+    assert job.resume_cost_avoided == pytest.approx(0.07)
+    # The recorded outcome releases the checkpoints
+    assert checkpoints is None
+
+
+def test_permanent_node_error_fails_without_retry(repair_agent):
+    agent, calls, session = repair_agent
+    session.create_pull = None  # calling it raises TypeError, a permanent error
+
+    state = asyncio.run(agent.invoke({
+        "job_id": 99, "run_id": "7", "repo_name": "o/r", "total_cost": 0.0, "status": "FIXING", "pr_draft": False,
+    }))
+    assert state["status"] == "FAILED"
+    assert "resumed_from_node" not in state
+
+
+@pytest.mark.parametrize("error, transient", [
+    (GitHubAPIError("Bad Gateway", 502), True),
+    (GitHubAPIError("rate limited", 429), True),
+    (GitHubAPIError("Validation Failed", 422), False),
+    (httpx.ConnectTimeout("timed out"), True),
+    (asyncio.TimeoutError(), True),
+    (ValueError("bad model output"), False),
+])
+def test_is_transient_error(error, transient):
+    assert is_transient_error(error) is transient
@@ -0,0 +1,55 @@
+from agent.classification import FailureCategory, PatternMatcher, classify_failure, matched_line_numbers
+
+PATTERNS = {
+    FailureCategory.TIMEOUT: {"timed out": 1.0, "read timed out": 1.5, "Timeout": 1.0, "timeouterror": 1.5},
+    FailureCategory.INFRASTRUCTURE: {"connection timed out": 1.0, "out of memory": 2.0},
+}
+
+
+def _found(matcher, text):
+    return [(match.start, match.end, match.pattern) for match in matcher.find(text)]
+
+
+def test_reports_nested_and_overlapping_occurrences():
+    matcher = PatternMatcher(PATTERNS)
+    text = "requests: Read timed out of memory"
+    assert _found(matcher, text) == [
+        (10, 24, "read timed out"), (15, 24, "timed out"), (21, 34, "out of memory"),
+    ]
+    assert all(text.lower()[start:end] == pattern for start, end, pattern in _found(matcher, text))
+
+
+def test_prefixes_and_shared_patterns():
+    matcher = PatternMatcher(PATTERNS)
+    categories = [(match.pattern, match.category) for match in matcher.find("TimeoutError; connection timed out")]
+    assert categories == [
+        ("timeout", FailureCategory.TIMEOUT),
+        ("timeouterror", FailureCategory.TIMEOUT),
+        ("connection timed out", FailureCategory.INFRASTRUCTURE),
+        ("timed out", FailureCategory.TIMEOUT),
+    ]
+    assert len(matcher) == 6
+
+
+def test_scores_count_each_pattern_once():
+    matcher = PatternMatcher(PATTERNS)
+    scores = matcher.scores(matcher.find("timed out\ntimed out\nout of memory"))
+    assert scores[FailureCategory.TIMEOUT] == 1.0
+    assert scores[FailureCategory.INFRASTRUCTURE] == 2.0
+
+
+def test_empty_library_and_special_characters():
+    assert PatternMatcher({}).find("anything") == []
+    matcher = PatternMatcher({FailureCategory.DEPENDENCY: {"requires python (>=3.9)": 1.0}})
+    assert _found(matcher, "error: requires Python (>=3.9)") == [(7, 30, "requires python (>=3.9)")]
+
+
+def test_matched_line_numbers():
+    matcher = PatternMatcher(PATTERNS)
+    text = "ok\nread timed out\nok\nout of memory\n"
+    assert matched_line_numbers(text, matcher.find(text)) == [1, 3]
+
+
+def test_bundled_library_classifies_logs():
+    assert classify_failure("", "ModuleNotFoundError: No module named 'requests'")[0] == FailureCategory.DEPENDENCY
+    assert classify_failure("", "nothing recognizable here") == (FailureCategory.UNKNOWN, 0.3)
@@ -0,0 +1,110 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("google.cloud.tasks_v2")
+
+from app.core.cloud_tasks import CloudTasksDispatcher, TaskDispatchError  # noqa: E402
+
+
+class FakeCloudTasksClient:
+    """In-memory stand-in for `CloudTasksAsyncClient` that records created tasks."""
+
+    def __init__(self, latency: float = 0.01, fail_endpoints=()) -> None:
+        self.latency = latency
+        self.fail_endpoints = set(fail_endpoints)
+        self.requests = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def queue_path(self, project: str, location: str, queue: str) -> str:
+        return f"projects/{project}/locations/{location}/queues/{queue}"
+
+    async def create_task(self, request):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            url = request["task"]["http_request"]["url"]
+            if any(url.endswith(endpoint) for endpoint in self.fail_endpoints):
+                raise RuntimeError("queue unavailable")
+            self.requests.append(request)
+            return SimpleNamespace(name=f"{request['parent']}/tasks/{len(self.requests)}")
+        finally:
+            self.in_flight -= 1
+
+
+def test_enqueue_creates_one_task_on_a_shared_client():
+    created = []
+
+    def factory():
+        created.append(FakeCloudTasksClient(latency=0))
+        return created[-1]
+
+    async def scenario():
+        dispatcher = CloudTasksDispatcher(factory)
+        names = [await dispatcher.enqueue({"job_id": i}, delay_seconds=i) for i in range(3)]
+        stats = dispatcher.stats()
+        await dispatcher.close()
+        return names, stats
+
+    names, stats = asyncio.run(scenario())
+    (client,) = created
+    assert names == [f"{client.requests[0]['parent']}/tasks/{n}" for n in (1, 2, 3)]
+    assert "schedule_time" not in client.requests[0]["task"]
+    assert "schedule_time" in client.requests[1]["task"]
+    assert stats == {"enqueued": 3, "failed": 0, "in_flight": 0}
+
+
+def test_burst_is_bounded_by_max_concurrency():
+    client = FakeCloudTasksClient()
+
+    async def scenario():
+        dispatcher = CloudTasksDispatcher(lambda: client, max_concurrency=4)
+        names = await asyncio.gather(*(dispatcher.enqueue({"job_id": i}) for i in range(50)))
+        stats = dispatcher.stats()
+        await dispatcher.close()
+        return names, stats
+
+    names, stats = asyncio.run(scenario())
+    assert len(set(names)) == 50
+    assert stats["enqueued"] == 50 and stats["failed"] == 0
+    assert client.peak_in_flight == 4
+    assert {request["parent"] for request in client.requests} == {client.requests[0]["parent"]}
+
+
+def test_failed_create_raises_for_its_caller_only():
+    client = FakeCloudTasksClient(fail_endpoints={"/api/v1/worker/broken"})
+
+    async def scenario():
+        dispatcher = CloudTasksDispatcher(lambda: client)
+        results = await asyncio.gather(
+            dispatcher.enqueue({"job_id": 1}),
+            dispatcher.enqueue({"job_id": 2}, endpoint="/api/v1/worker/broken"),
+            return_exceptions=True,
+        )
+        stats = dispatcher.stats()
+        await dispatcher.close()
+        return results, stats
+
+    results, stats = asyncio.run(scenario())
+    assert isinstance(results[0], str)
+    assert isinstance(results[1], TaskDispatchError)
+    assert stats["enqueued"] == 1 and stats["failed"] == 1
+
+
+def test_close_waits_for_enqueues_in_flight():
+    client = FakeCloudTasksClient(latency=0.05)
+
+    async def scenario():
+        dispatcher = CloudTasksDispatcher(lambda: client, max_concurrency=2)
+        pending = [asyncio.create_task(dispatcher.enqueue({"job_id": i})) for i in range(3)]
+        await asyncio.sleep(0)
+        assert dispatcher.stats()["in_flight"] == 3
+        await dispatcher.close()
+        assert all(task.done() for task in pending)
+        return [task.result() for task in pending]
+
+    assert len(asyncio.run(scenario())) == 3
+    assert len(client.requests) == 3
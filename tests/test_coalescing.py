@@ -0,0 +1,149 @@
+import asyncio
+
+import httpx
+from sqlalchemy import update
+
+from agent.github_client import AsyncGitHubClient
+from app.core import coalescing
+from app.core.coalescing import (
+    attach_run_to_job,
+    can_absorb_run,
+    find_sibling_job,
+    get_coalesce_lock,
+    has_running_siblings,
+    parse_run_ids,
+)
+from app.core.config import settings
+from app.db.models import JobStatus, RepairJob
+
+
+def _add_job(session_factory, status=JobStatus.PENDING):
+    async def add():
+        async with session_factory() as db:
+            job = RepairJob(repo_name="o/r", run_id="1", head_sha="abc", run_ids="1", status=status)
+            db.add(job)
+            await db.commit()
+            return job
+    return asyncio.run(add())
+
+
+def test_parse_run_ids():
+    assert parse_run_ids(None) == []
+    assert parse_run_ids("") == []
+    assert parse_run_ids("1,2,,3") == ["1", "2", "3"]
+
+
+def test_only_pending_jobs_absorb_runs():
+    for status in JobStatus:
+        assert can_absorb_run(RepairJob(status=status)) == (status == JobStatus.PENDING)
+
+
+def test_coalesce_lock_is_shared_per_commit():
+    lock = get_coalesce_lock("o/r", "abc")
+    assert get_coalesce_lock("o/r", "abc") is lock
+    assert get_coalesce_lock("o/r", "def") is not lock
+
+
+def test_attach_run_to_pending_job(session_factory):
+    _add_job(session_factory)
+
+    async def attach():
+        async with session_factory() as db:
+            job = await find_sibling_job(db, "o/r", "abc")
+            first = await attach_run_to_job(db, job, "2")
+            job = await find_sibling_job(db, "o/r", "abc")
+            again = await attach_run_to_job(db, job, "2")
+            return first, again, job.run_ids
+
+    first, again, stored = asyncio.run(attach())
+    assert first == ["1", "2"]
+    assert again == ["1", "2"]
+    assert stored == "1,2"
+
+
+def test_attach_fails_once_the_worker_started_the_job(session_factory):
+    _add_job(session_factory)
+
+    async def attach():
+        async with session_factory() as db:
+            job = await find_sibling_job(db, "o/r", "abc")
+            assert can_absorb_run(job)
+            # The worker picks the job up between the webhook's read and its update
+            async with session_factory() as worker_db:
+                await worker_db.execute(
+                    update(RepairJob).where(RepairJob.id == job.id).values(status=JobStatus.FIXING)
+                )
+                await worker_db.commit()
+            attached = await attach_run_to_job(db, job, "2")
+            await db.refresh(job)
+            return attached, job.run_ids
+
+    attached, stored = asyncio.run(attach())
+    assert attached is None
+    assert stored == "1"
+
+
+def _running_siblings(monkeypatch, runs=None, status_code=200):
+    """Runs `has_running_siblings` for run 1 against a fake list of the commit's runs."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(status_code, json={"workflow_runs": runs or []})
+
+    client = AsyncGitHubClient(token="t", base_url="https://api.github.test", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(coalescing, "get_github_client", lambda: client)
+    return asyncio.run(has_running_siblings("o/r", "abc", "1")), requests
+
+
+def test_siblings_still_running(monkeypatch):
+    running, requests = _running_siblings(monkeypatch, [
+        {"id": 1, "status": "completed"}, {"id": 2, "status": "completed"}, {"id": 3, "status": "queued"},
+    ])
+    assert running is True
+    assert requests[0].url.path == "/repos/o/r/actions/runs"
+    assert requests[0].url.params["head_sha"] == "abc"
+
+
+def test_no_sibling_left_to_wait_for(monkeypatch):
+    assert _running_siblings(monkeypatch, [{"id": 1, "status": "completed"}])[0] is False
+    # The failing run itself may not be reported as completed yet
+    assert _running_siblings(monkeypatch, [{"id": 1, "status": "in_progress"}, {"id": 2, "status": "completed"}])[0] is False
+
+
+def test_github_errors_keep_the_window(monkeypatch):
+    assert _running_siblings(monkeypatch, status_code=502)[0] is True
+
+
+def test_job_starts_right_away_without_running_siblings(webhook):
+    response = asyncio.run(webhook.post(webhook.payload()))
+    assert response.status_code == 202
+    assert webhook.dispatched == [(response.json()["job_id"], 0)]
+
+
+def test_job_waits_for_running_siblings(webhook):
+    webhook.running_siblings = True
+    response = asyncio.run(webhook.post(webhook.payload()))
+    assert webhook.dispatched == [(response.json()["job_id"], settings.COALESCE_WINDOW_SECONDS)]
+
+
+def test_zero_window_never_delays(webhook, monkeypatch):
+    webhook.running_siblings = True
+    monkeypatch.setattr(settings, "COALESCE_WINDOW_SECONDS", 0)
+    asyncio.run(webhook.post(webhook.payload()))
+    assert webhook.dispatched[0][1] == 0
+
+
+def test_sibling_failure_joins_the_delayed_job(webhook, session_factory):
+    webhook.running_siblings = True
+
+    async def scenario():
+        first = await webhook.post(webhook.payload(run_id=1), delivery_id="d-1")
+        sibling = await webhook.post(webhook.payload(run_id=2), delivery_id="d-2")
+        return first.json(), sibling
+
+    first, sibling = asyncio.run(scenario())
+    assert sibling.status_code == 202
+    assert sibling.json()["job_id"] == first["job_id"]
+    assert sibling.json()["run_ids"] == ["1", "2"]
+    assert len(webhook.dispatched) == 1
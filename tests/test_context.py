@@ -0,0 +1,47 @@
+import asyncio
+import time
+
+from agent import context
+from agent.github_client import GitHubNotFoundError
+from agent.repo_index import RepoIndex
+
+FILES = {
+    "app/service.py": "from app.models import User\n\n\ndef run():\n    return User()\n",
+    "app/models.py": "class User:\n    pass\n",
+}
+
+
+class FakeSession:
+    """Duck-typed RepairSession serving a fixed set of files."""
+
+    repo_name = "o/r"
+
+    async def get_index(self, ref=None):
+        return RepoIndex([(path, f"sha-{path}") for path in FILES])
+
+    async def base_sha(self):
+        return "c" * 40
+
+    async def get_file(self, path, ref=None):
+        if path not in FILES:
+            raise GitHubNotFoundError(path, 404)
+        return {"path": path, "sha": f"sha-{path}", "content": FILES[path]}
+
+
+def test_imported_files_join_the_context():
+    files = asyncio.run(context.get_related_files(FakeSession(), "app/service.py", "NameError"))
+    assert list(files) == ["app/service.py", "app/models.py"]
+
+
+def test_import_resolution_is_bounded_by_the_deadline(monkeypatch):
+    async def slow_module_map(repo_name, commit_sha, index):
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(context, "get_module_map", slow_module_map)
+
+    started = time.perf_counter()
+    files = asyncio.run(context.get_related_files(FakeSession(), "app/service.py", "NameError", timeout_seconds=0.2))
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 2
+    assert list(files) == ["app/service.py"]
@@ -0,0 +1,113 @@
+import asyncio
+from typing import List
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects.sqlite.aiosqlite import SQLiteDialect_aiosqlite
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool, StaticPool
+
+from app.db.base import pool_kwargs
+from app.db.migrations import init_db
+from app.db.models import JobStatus, RepairJob
+
+
+def test_pool_kwargs_only_for_queue_pools():
+    assert pool_kwargs("sqlite+aiosqlite:///:memory:") == {}
+    assert set(pool_kwargs("postgresql+asyncpg://user:secret@db/repair")) == {
+        "pool_size", "max_overflow", "pool_timeout"
+    }
+
+
+def _engine_select_one(url):
+    async def scenario():
+        engine = create_async_engine(url, **pool_kwargs(url))
+        async with engine.connect() as conn:
+            value = (await conn.execute(text("SELECT 1"))).scalar_one()
+        pool = engine.pool
+        await engine.dispose()
+        return value, pool
+    return asyncio.run(scenario())
+
+
+def test_file_sqlite_engine_with_queue_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        SQLiteDialect_aiosqlite, "get_pool_class", classmethod(lambda cls, url: AsyncAdaptedQueuePool)
+    )
+    url = f"sqlite+aiosqlite:///{tmp_path / 'queue.db'}"
+    value, pool = _engine_select_one(url)
+    assert value == 1
+    assert isinstance(pool, QueuePool) and pool.size() == pool_kwargs(url)["pool_size"]
+
+
+def test_file_sqlite_engine_with_null_pool(tmp_path, monkeypatch):
+    # SQLAlchemy before 2.0.38 gives file-based aiosqlite a NullPool, which rejects sizing arguments
+    monkeypatch.setattr(SQLiteDialect_aiosqlite, "get_pool_class", classmethod(lambda cls, url: NullPool))
+    url = f"sqlite+aiosqlite:///{tmp_path / 'null.db'}"
+    assert pool_kwargs(url) == {}
+    value, pool = _engine_select_one(url)
+    assert value == 1 and isinstance(pool, NullPool)
+
+
+def test_in_memory_sqlite_engine():
+    value, pool = _engine_select_one("sqlite+aiosqlite:///:memory:")
+    assert value == 1 and isinstance(pool, StaticPool)
+
+
+def test_worker_runs_more_jobs_than_pooled_connections(tmp_path, monkeypatch):
+    """With one pooled connection and no overflow, a burst of slow agent runs still proceeds concurrently."""
+    pytest.importorskip("fastapi")
+    from agent.base import BaseAgent
+    from agent.registry import get_registry
+    from app.api import worker
+
+    class WaitingAgent(BaseAgent):
+        name = "waiting"
+        description = "Waits as a run waits on the LLM"
+        capabilities: List[str] = []
+        graph = None
+
+        async def invoke(self, state):
+            await asyncio.sleep(0.3)
+            return {**state, "status": "PR_OPENED", "total_cost": 0.0}
+
+    jobs = 8
+
+    async def scenario():
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'burst.db'}",
+            poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=0, pool_timeout=1
+        )
+        await init_db(engine)
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        monkeypatch.setattr(worker, "AsyncSessionLocal", session_factory)
+        async with session_factory() as db:
+            db.add_all([RepairJob(id=i, repo_name="o/r", run_id=str(i)) for i in range(1, jobs + 1)])
+            await db.commit()
+
+        payloads = [{
+            "job_id": i,
+            "agent_name": "waiting",
+            "workflow_run": {
+                "id": i, "name": "CI", "status": "completed", "conclusion": "failure",
+                "head_branch": "main", "head_sha": "abc", "html_url": "https://x", "run_number": i,
+            },
+            "repository": {"full_name": "o/r", "name": "r", "owner": {}},
+        } for i in range(1, jobs + 1)]
+        worker._worker_usage.update(in_flight=0, peak_in_flight=0)
+        await asyncio.gather(*(worker.process_job(payload) for payload in payloads))
+        async with session_factory() as db:
+            statuses = {(await db.get(RepairJob, i)).status for i in range(1, jobs + 1)}
+        await engine.dispose()
+        return statuses
+
+    registry = get_registry()
+    registry._agents["waiting"] = WaitingAgent()
+    try:
+        statuses = asyncio.run(scenario())
+    finally:
+        registry._agents.pop("waiting", None)
+
+    assert statuses == {JobStatus.PR_OPENED}
+    # Holding the connection across the 0.3 s runs would serialize them and time out the pool
+    assert worker.get_worker_stats()["peak_in_flight"] == jobs
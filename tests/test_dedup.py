@@ -0,0 +1,177 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core import dedup
+from app.core.dedup import LLM_CALLS_PER_JOB, WebhookDeduplicator, build_run_key
+from app.db.models import JobStatus, RepairJob
+
+
+class Clock:
+    """Stands in for `time.monotonic` in app.core.dedup."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(dedup.time, "monotonic", clock)
+    return clock
+
+
+def test_run_key_includes_re_run_attempts():
+    assert build_run_key("o/r", "42") == "o/r#42"
+    assert build_run_key("o/r", "42", 1) == "o/r#42"
+    assert build_run_key("o/r", "42", 2) == "o/r#42/2"
+    assert build_run_key("o/other", "42") != build_run_key("o/r", "42")
+
+
+def test_remembered_keys_expire_after_the_ttl(clock):
+    deduplicator = WebhookDeduplicator(ttl_seconds=60, max_entries=10)
+    deduplicator.remember(7, "delivery-1", None, "o/r#1")
+
+    clock.now += 59
+    assert deduplicator.lookup(None, "o/r#1") == 7
+    assert deduplicator.lookup("delivery-1") == 7
+    clock.now += 1
+    assert deduplicator.lookup("delivery-1", "o/r#1") is None
+    assert deduplicator.stats()["tracked_keys"] == 0
+
+
+def test_remembering_again_refreshes_the_ttl(clock):
+    deduplicator = WebhookDeduplicator(ttl_seconds=60, max_entries=10)
+    deduplicator.remember(7, "o/r#1")
+    clock.now += 50
+    deduplicator.remember(7, "o/r#1")
+    clock.now += 50
+    assert deduplicator.lookup("o/r#1") == 7
+
+
+def test_oldest_keys_are_evicted_beyond_max_entries(clock):
+    deduplicator = WebhookDeduplicator(ttl_seconds=60, max_entries=3)
+    for job_id in range(1, 5):
+        deduplicator.remember(job_id, f"o/r#{job_id}")
+    assert deduplicator.lookup("o/r#1") is None
+    assert [deduplicator.lookup(f"o/r#{job_id}") for job_id in range(2, 5)] == [2, 3, 4]
+
+    # Refreshing a key moves it to the back of the eviction order
+    deduplicator.remember(2, "o/r#2")
+    deduplicator.remember(5, "o/r#5")
+    assert deduplicator.lookup("o/r#3") is None
+    assert deduplicator.lookup("o/r#2") == 2
+
+
+def test_stats_count_both_tiers(clock):
+    deduplicator = WebhookDeduplicator(ttl_seconds=60, max_entries=10)
+    deduplicator.remember(7, "o/r#1")
+    deduplicator.lookup("o/r#1")
+    deduplicator.lookup("o/r#2")
+    deduplicator.record_db_hit()
+    assert deduplicator.stats() == {
+        "duplicates_suppressed": 2,
+        "memory_hits": 1,
+        "db_hits": 1,
+        "llm_calls_saved": 2 * LLM_CALLS_PER_JOB,
+        "tracked_keys": 1,
+    }
+
+
+def _jobs(session_factory):
+    async def load():
+        async with session_factory() as db:
+            return list((await db.execute(select(RepairJob).order_by(RepairJob.id))).scalars().all())
+    return asyncio.run(load())
+
+
+def test_redelivery_is_answered_from_memory(webhook, session_factory, monkeypatch):
+    from app.api import webhook as webhook_module
+
+    async def scenario():
+        first = await webhook.post(webhook.payload(), delivery_id="d-1")
+
+        async def no_db_lookup(*args):
+            raise AssertionError("redelivery reached the database")
+        monkeypatch.setattr(webhook_module, "_find_existing_job", no_db_lookup)
+        # Same delivery, and a new delivery of the same run attempt
+        again = await webhook.post(webhook.payload(), delivery_id="d-1")
+        other = await webhook.post(webhook.payload(), delivery_id="d-2")
+        return first, again, other
+
+    first, again, other = asyncio.run(scenario())
+    job_id = first.json()["job_id"]
+    assert first.status_code == 202
+    assert (again.status_code, again.json()["job_id"]) == (200, job_id)
+    assert (other.status_code, other.json()["job_id"]) == (200, job_id)
+    assert webhook.deduplicator.stats()["memory_hits"] == 2
+    assert len(webhook.dispatched) == 1
+    assert len(_jobs(session_factory)) == 1
+
+
+def test_redelivery_after_the_ttl_is_caught_by_the_database(webhook, session_factory):
+    async def scenario():
+        first = await webhook.post(webhook.payload(), delivery_id="d-1")
+        webhook.deduplicator._entries.clear()
+        return first, await webhook.post(webhook.payload(), delivery_id="d-1")
+
+    first, again = asyncio.run(scenario())
+    assert (again.status_code, again.json()["job_id"]) == (200, first.json()["job_id"])
+    assert webhook.deduplicator.stats()["db_hits"] == 1
+    assert len(_jobs(session_factory)) == 1
+
+
+def test_insert_race_returns_the_winning_job(webhook, session_factory, monkeypatch):
+    from app.api import webhook as webhook_module
+
+    # Another instance stored the same run between our lookup and our insert
+    async def add_winner():
+        async with session_factory() as db:
+            job = RepairJob(repo_name="o/r", run_id="1", run_key="o/r#1", head_sha="other-sha", run_ids="1")
+            db.add(job)
+            await db.commit()
+            return job.id
+    winner_id = asyncio.run(add_winner())
+
+    real_lookup = webhook_module._find_existing_job
+    lookups = []
+
+    async def racing_lookup(db, delivery_id, run_key):
+        lookups.append(run_key)
+        return None if len(lookups) == 1 else await real_lookup(db, delivery_id, run_key)
+    monkeypatch.setattr(webhook_module, "_find_existing_job", racing_lookup)
+
+    async def scenario():
+        raced = await webhook.post(webhook.payload(), delivery_id="d-1")
+        # The winner is remembered, so a redelivery does not reach the database
+        again = await webhook.post(webhook.payload(), delivery_id="d-1")
+        return raced, again
+
+    raced, again = asyncio.run(scenario())
+    assert (raced.status_code, raced.json()["job_id"]) == (200, winner_id)
+    assert (again.status_code, again.json()["job_id"]) == (200, winner_id)
+    assert lookups == ["o/r#1", "o/r#1"]
+    assert webhook.deduplicator.stats()["db_hits"] == 1
+    assert webhook.dispatched == []
+    assert len(_jobs(session_factory)) == 1
+
+
+def test_failed_re_run_gets_a_new_job(webhook, session_factory):
+    async def scenario():
+        first = await webhook.post(webhook.payload(), delivery_id="d-1")
+        async with session_factory() as db:
+            await db.execute(update(RepairJob).values(status=JobStatus.FAILED))
+            await db.commit()
+        rerun = await webhook.post(webhook.payload(run_attempt=2), delivery_id="d-2")
+        again = await webhook.post(webhook.payload(run_attempt=2), delivery_id="d-3")
+        return first, rerun, again
+
+    first, rerun, again = asyncio.run(scenario())
+    assert rerun.status_code == 202
+    assert rerun.json()["job_id"] != first.json()["job_id"]
+    assert (again.status_code, again.json()["job_id"]) == (200, rerun.json()["job_id"])
+    assert [job.run_key for job in _jobs(session_factory)] == ["o/r#1", "o/r#1/2"]
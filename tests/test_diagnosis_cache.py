@@ -0,0 +1,44 @@
+import asyncio
+
+from agent import diagnosis_cache
+from agent.diagnosis_cache import DiagnosisCache, build_cache_key
+from agent.schemas import DiagnoseResponse
+from app.db.models import DiagnosisCacheEntry
+
+RESPONSE = DiagnoseResponse(root_cause="foo 2.0 removed bar()", confidence=0.9)
+
+
+def _stored_hits(session_factory, key):
+    async def read():
+        async with session_factory() as db:
+            return (await db.get(DiagnosisCacheEntry, key)).hits
+    return asyncio.run(read())
+
+
+def test_hits_are_written_in_batches(session_factory, monkeypatch):
+    monkeypatch.setattr(diagnosis_cache, "AsyncSessionLocal", session_factory)
+    cache = DiagnosisCache(hit_flush_every=3)
+    key = build_cache_key("o/r", "f" * 64, "v1", "flash")
+
+    asyncio.run(cache.put("o/r", "f" * 64, "v1", "flash", RESPONSE, 0.002))
+    for _ in range(2):
+        assert asyncio.run(cache.get("o/r", "f" * 64, "v1", "flash")) == (RESPONSE, 0.002)
+    assert _stored_hits(session_factory, key) == 0
+
+    asyncio.run(cache.get("o/r", "f" * 64, "v1", "flash"))
+    assert _stored_hits(session_factory, key) == 3
+
+    asyncio.run(cache.get("o/r", "f" * 64, "v1", "flash"))
+    asyncio.run(cache.flush_hits())
+    assert _stored_hits(session_factory, key) == 4
+
+
+def test_database_tier_serves_other_instances(session_factory, monkeypatch):
+    monkeypatch.setattr(diagnosis_cache, "AsyncSessionLocal", session_factory)
+    asyncio.run(DiagnosisCache().put("o/r", "f" * 64, "v1", "flash", RESPONSE, 0.002))
+
+    other = DiagnosisCache()
+    assert asyncio.run(other.get("o/r", "f" * 64, "v1", "flash")) == (RESPONSE, 0.002)
+    assert asyncio.run(other.get("o/r", "e" * 64, "v1", "flash")) is None
+    stats = other.stats()
+    assert stats["db_hits"] == 1 and stats["misses"] == 1
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from agent.classification import FailureCategory
+from agent.failure_model import evaluate, train_failure_model
+
+TEXTS = {
+    FailureCategory.DEPENDENCY: [
+        "ModuleNotFoundError: No module named 'requests'",
+        "ERROR: Could not find a version that satisfies the requirement numpy==9.9",
+        "npm ERR! 404 Not Found - GET https://registry.npmjs.org/left-pad-x",
+    ],
+    FailureCategory.TEST: [
+        "AssertionError: assert 0 == 3 in tests/test_cart.py::test_cart_total",
+        "expect(received).toBe(expected) Expected: 3 Received: 0",
+        "--- FAIL: TestTotal (0.00s) cart_test.go:14: got 0, want 3",
+    ],
+}
+
+
+def _corpus():
+    texts, labels = [], []
+    for category, examples in TEXTS.items():
+        for text in examples:
+            texts.append(text)
+            labels.append(category)
+    return texts, labels
+
+
+def test_evaluate_reports_each_classifier_at_its_own_threshold():
+    texts, labels = _corpus()
+    model = train_failure_model(texts, labels, bits=12)
+    everything = evaluate(model, texts, labels, min_confidence=0.0, learned_min_confidence=0.0)
+    nothing = evaluate(model, texts, labels, min_confidence=1.01, learned_min_confidence=1.01)
+    for name in ("heuristic", "learned"):
+        assert everything[name]["confident_rate"] == 1.0
+        assert everything[name]["confident_accuracy"] == everything[name]["accuracy"]
+        assert nothing[name]["confident_rate"] == 0.0
+    assert everything["learned"]["accuracy"] == 1.0
+
+
+class _FakeModel:
+    def __init__(self, category, confidence):
+        self.prediction = (category, confidence)
+
+    def predict(self, text):
+        return self.prediction
+
+
+@pytest.fixture
+def classify(monkeypatch):
+    pytest.importorskip("langgraph")
+    from agent import failure_model
+    from agent.repair.nodes.classify import classify_node
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "FAILURE_MODEL_PATH", "model.npz")
+    monkeypatch.setattr(settings, "LEARNED_MIN_CONFIDENCE", 0.9)
+
+    def run(prediction):
+        monkeypatch.setattr(failure_model, "get_failure_model", lambda: _FakeModel(*prediction))
+        state = {
+            "job_id": 1, "status": "DIAGNOSING", "error_records": [],
+            "root_cause": "The requests package is not installed",
+            "error_logs": "ModuleNotFoundError: No module named 'requests'",
+        }
+        return asyncio.run(classify_node(state))
+    return run
+
+
+def test_learned_prediction_below_its_threshold_is_ignored(classify):
+    # More than the heuristic's score, but below LEARNED_MIN_CONFIDENCE
+    state = classify((FailureCategory.TEST, 0.8))
+    assert state["failure_category"] == FailureCategory.DEPENDENCY.value
+
+
+def test_confident_learned_prediction_is_used(classify):
+    state = classify((FailureCategory.TEST, 0.95))
+    assert state["failure_category"] == FailureCategory.TEST.value
+    assert state["status"] == "DIAGNOSING"
+
+
+def test_confident_learned_prediction_of_a_skipped_category(classify):
+    state = classify((FailureCategory.INFRASTRUCTURE, 0.99))
+    assert state["failure_category"] == FailureCategory.INFRASTRUCTURE.value
+    assert state["status"] == "FAILED"
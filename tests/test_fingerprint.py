@@ -0,0 +1,77 @@
+from agent.fingerprint import FINGERPRINT_VERSION, fingerprint_log
+
+# Failed-step logs as collect_logs hands them over (runner timestamps already stripped)
+PYTEST_RUN = """============================= FAILURES =============================
+Traceback (most recent call last):
+  File "/home/runner/work/shop/shop/app/cart.py", line 42, in total
+    return sum(item.price for item in items)
+TypeError: unsupported operand type(s) for +: 'int' and 'NoneType'
+FAILED tests/test_cart.py::test_total - TypeError: unsupported operand
+FAILED tests/test_cart.py::test_empty - TypeError: unsupported operand
+========= 2 failed, 40 passed in 3.21s =========
+"""
+
+
+def test_signature_parts():
+    signature = fingerprint_log(PYTEST_RUN)
+    assert signature["version"] == FINGERPRINT_VERSION
+    assert len(signature["fingerprint"]) == 64
+    assert signature["frames"] == ["app/cart.py:total"]
+    assert signature["test_ids"] == ["tests/test_cart.py::test_empty", "tests/test_cart.py::test_total"]
+    assert any("TypeError: unsupported operand" in line for line in signature["error_lines"])
+
+
+def test_same_failure_on_another_run_and_runner_matches():
+    rerun = (PYTEST_RUN
+             .replace("/home/runner/work/shop/shop/", "/__w/shop/shop/")
+             .replace("line 42", "line 57")
+             .replace("in 3.21s", "in 9.87s"))
+    assert fingerprint_log(rerun)["fingerprint"] == fingerprint_log(PYTEST_RUN)["fingerprint"]
+
+
+def test_test_order_does_not_matter():
+    lines = PYTEST_RUN.splitlines()
+    swapped = lines[:5] + [lines[6], lines[5]] + lines[7:]
+    assert fingerprint_log("\n".join(swapped))["fingerprint"] == fingerprint_log(PYTEST_RUN)["fingerprint"]
+
+
+def test_different_failures_differ():
+    other_error = PYTEST_RUN.replace("TypeError: unsupported operand type(s)", "KeyError: 'price'")
+    other_test = PYTEST_RUN.replace("::test_empty", "::test_discount")
+    fingerprints = {fingerprint_log(logs)["fingerprint"] for logs in (PYTEST_RUN, other_error, other_test)}
+    assert len(fingerprints) == 3
+
+
+def test_frames_from_other_runtimes():
+    logs = "\n".join([
+        "    at computeTotal (/home/runner/work/web/web/src/cart.ts:12:7)",
+        "\tat com.acme.Cart.total(Cart.java:31)",
+        "\t/home/runner/go/pkg/mod/github.com/acme/cart@v1.2.0/cart.go:18 +0x1d",
+    ])
+    assert fingerprint_log(logs)["frames"] == [
+        "src/cart.ts:computeTotal",
+        "Cart.java:com.acme.Cart.total",
+        "github.com/acme/cart@v1.2.0/cart.go",
+    ]
+
+
+def test_version_pins_and_asserted_values_are_kept():
+    pin = "ERROR: Could not find a version that satisfies the requirement foo=={version}"
+    assert fingerprint_log(pin.format(version="1.2.3")) != fingerprint_log(pin.format(version="2.0.0"))
+    assert "foo==1.2.3" in fingerprint_log(pin.format(version="1.2.3"))["error_lines"][0]
+
+    assertion = "FAILED tests/test_cart.py::test_total - AssertionError: assert {value} == 4"
+    assert (fingerprint_log(assertion.format(value=3))["fingerprint"]
+            != fingerprint_log(assertion.format(value=5))["fingerprint"])
+
+
+def test_volatile_tokens_are_masked():
+    logs = "\n".join([
+        "ERROR: run {run} failed on job_id={job}: connect ECONNREFUSED 127.0.0.1:{port}",
+        "E   RuntimeError: <Pool object at {addr}> timed out after {secs}s",
+        "src/cart.ts({line},5): error TS2322: Type 'string' is not assignable to type 'number'.",
+        "========= 2 failed, {passed} passed in 3.21s =========",
+    ])
+    first = fingerprint_log(logs.format(run=1001, job=77, port=54321, addr="0x7f01", secs=30, line=12, passed=40))
+    second = fingerprint_log(logs.format(run=2002, job=88, port=40001, addr="0x7fff", secs=31, line=19, passed=41))
+    assert first["fingerprint"] == second["fingerprint"]
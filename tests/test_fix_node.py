@@ -0,0 +1,88 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any, List
+
+import pytest
+
+pytest.importorskip("langgraph")
+
+import agent.repo_session
+from agent.llm import vertex_client
+from agent.repair.nodes.fix import fix_node
+from agent.schemas import FixRegionsResponse, RegionEdit
+from app.core.config import settings
+
+# A module without imports whose only function is longer than the window budget
+SOURCE = "\n".join(["def run(values):"] + [f"    total_{n} = values[{n}]" for n in range(1, 300)]) + "\n"
+BROKEN_LINE = 150  # "    total_149 = values[149]"
+
+
+class FakeModel:
+    """Structured-output model answering every call with the next queued response."""
+
+    def __init__(self, responses: List[Any]) -> None:
+        self.responses = responses
+        self.prompts: List[str] = []
+
+    def with_structured_output(self, schema, include_raw=False):
+        return self
+
+    async def ainvoke(self, prompt: str):
+        self.prompts.append(prompt)
+        raw = SimpleNamespace(usage_metadata={"input_tokens": 1000, "output_tokens": 100})
+        return {"raw": raw, "parsed": self.responses.pop(0)}
+
+
+class FakeSession:
+    async def get_file(self, path: str):
+        return {"content": SOURCE}
+
+
+def _edit(region: int, content: str) -> FixRegionsResponse:
+    return FixRegionsResponse(regions=[RegionEdit(region=region, content=content)], confidence=0.9, explanation="fixed")
+
+
+def _fix(monkeypatch, responses, target_line=BROKEN_LINE):
+    model = FakeModel(responses)
+    monkeypatch.setattr(agent.repo_session, "get_session", lambda job_id, repo_name: FakeSession())
+    monkeypatch.setattr(vertex_client, "get_model", lambda model_type="flash": model)
+    monkeypatch.setattr(settings, "FIX_WINDOW_MIN_LINES", 200)
+    monkeypatch.setattr(settings, "FIX_WINDOW_MAX_LINES", 40)
+    monkeypatch.setattr(settings, "FIX_WINDOW_CONTEXT_LINES", 5)
+    state = {
+        "job_id": 1, "repo_name": "o/r", "status": "FIXING", "root_cause": "IndexError in run",
+        "target_file_path": "calc.py", "target_line": target_line, "error_records": [], "error_logs": "",
+    }
+    return asyncio.run(fix_node(state)), model
+
+
+def test_unusable_regions_fall_back_to_a_window_around_the_line(monkeypatch):
+    fixed_line = "    total_149 = values[149] if len(values) > 149 else 0"
+    window_lines = SOURCE.split("\n")[BROKEN_LINE - 20:BROKEN_LINE + 19]
+    window_lines[19] = fixed_line
+    state, model = _fix(monkeypatch, [
+        _edit(7, "nonsense"),  # names a region that was never sent
+        _edit(1, "\n".join(window_lines)),
+    ])
+
+    assert state["fix_mode"] == "window_fallback"
+    assert state["fixed_content"] == SOURCE.replace("    total_149 = values[149]\n", fixed_line + "\n")
+    assert "<<<REGION 1 (lines 131-169)>>>" in model.prompts[1]
+    # The whole file is never sent
+    assert all(len(prompt) < len(SOURCE) / 2 for prompt in model.prompts)
+
+
+def test_large_file_fails_instead_of_a_whole_file_prompt(monkeypatch):
+    state, model = _fix(monkeypatch, [_edit(7, "nonsense"), _edit(7, "nonsense")])
+
+    assert state["status"] == "FAILED"
+    assert "FIX_WINDOW_MIN_LINES" in state["error"]
+    assert len(model.prompts) == 2
+    assert state["total_cost"] > 0
+
+
+def test_large_file_without_a_located_line_fails_without_a_model_call(monkeypatch):
+    state, model = _fix(monkeypatch, [], target_line=None)
+
+    assert state["status"] == "FAILED"
+    assert model.prompts == []
@@ -0,0 +1,160 @@
+import pytest
+
+from agent.fix_windows import (
+    Region, SpliceError, _merge, line_window, referenced_symbols, render_regions, select_regions, splice_regions
+)
+
+MODULE = "\n".join([
+    "import os",                            # 1
+    "from typing import List",              # 2
+    "",                                     # 3
+    "LIMIT = 10",                           # 4
+    "",                                     # 5
+    "",                                     # 6
+    "def load(path):",                      # 7
+    "    with open(path) as f:",            # 8
+    "        return f.read()",              # 9
+    "",                                     # 10
+    "",                                     # 11
+    "class Store:",                         # 12
+    "    @property",                        # 13
+    "    def size(self):",                  # 14
+    "        return LIMIT",                 # 15
+    "",                                     # 16
+    "    def save(self, items: List[str]):",  # 17
+    "        for item in items:",           # 18
+    "            os.write(1, item)",        # 19
+    "",                                     # 20
+    "",                                     # 21
+    "def main():",                          # 22
+    "    Store().save(load('x'))",          # 23
+]) + "\n"
+
+
+def _select(text=MODULE, path="store.py", anchors=(), symbols=(), max_lines=100, max_chars=10000, context=2):
+    return select_regions(text, path, list(anchors), list(symbols), max_lines, max_chars, context)
+
+
+def test_referenced_symbols_are_distinct_and_ordered():
+    assert referenced_symbols(["NameError: name 'load' is not defined", None, "in load via Store"]) == \
+        ["NameError", "name", "load", "not", "defined", "via", "Store"]
+
+
+def test_anchor_selects_innermost_enclosing_definition():
+    assert _select(anchors=[19]) == [Region(0, 2, "imports"), Region(16, 19, "line 19 in save")]
+
+
+def test_decorators_belong_to_their_definition():
+    assert _select(anchors=[15])[-1] == Region(12, 15, "line 15 in size")
+
+
+def test_anchor_outside_any_definition_gets_context_lines():
+    # Lines 3-5 touch the import block, so the two are merged
+    assert _select(anchors=[4], context=1) == [Region(0, 5, "imports; line 4")]
+
+
+def test_referenced_symbols_select_their_definitions():
+    assert _select(symbols=["load", "missing", "main"]) == [
+        Region(0, 2, "imports"), Region(6, 9, "definition of load"), Region(21, 23, "definition of main"),
+    ]
+
+
+def test_overlapping_regions_are_merged():
+    # The anchor sits in `save`, which lies inside `Store`
+    regions = _select(anchors=[18], symbols=["Store"])
+    assert regions[-1] == Region(11, 19, "definition of Store; line 18 in save")
+
+
+def test_merge_joins_adjacent_and_keeps_separate_regions():
+    assert _merge([Region(5, 8, "b"), Region(0, 5, "a"), Region(10, 12, "c"), Region(6, 7, "b")]) == [
+        Region(0, 8, "a; b"), Region(10, 12, "c"),
+    ]
+
+
+def test_budget_drops_later_candidates():
+    # Imports come last in priority, so they go first when the line budget runs out
+    assert _select(anchors=[19], symbols=["load"], max_lines=6) == [
+        Region(6, 9, "definition of load"), Region(16, 19, "line 19 in save"),
+    ]
+    long_lines = MODULE.replace("os.write(1, item)", "os.write(1, item)" + " " * 500)
+    assert _select(long_lines, anchors=[19], max_chars=200) == [Region(0, 2, "imports")]
+
+
+def test_other_languages_use_definition_patterns_and_file_head():
+    source = "\n".join(["package main", ""] + [f"// line {n}" for n in range(3, 30)]
+                       + ["func Handle(w Writer) {", "    w.Write(nil)", "}"]) + "\n"
+    assert _select(source, path="main.go", symbols=["Handle"], context=1) == [
+        Region(0, 20, "file head"), Region(29, 31, "definition of Handle"),
+    ]
+
+
+def test_unparseable_python_falls_back_to_context_lines():
+    broken = MODULE.replace("def main():", "def main(:")
+    assert _select(broken, anchors=[19], context=1) == [Region(0, 20, "file head; line 19")]
+
+
+def test_render_marks_regions_and_gaps():
+    rendered = render_regions(MODULE, [Region(0, 2, "imports"), Region(6, 9, "definition of load")])
+    assert rendered.split("\n") == [
+        "<<<REGION 1 (lines 1-2)>>>",
+        "import os",
+        "from typing import List",
+        "<<<END REGION 1>>>",
+        "[lines 3-6 omitted]",
+        "<<<REGION 2 (lines 7-9)>>>",
+        "def load(path):",
+        "    with open(path) as f:",
+        "        return f.read()",
+        "<<<END REGION 2>>>",
+        "[lines 10-24 omitted]",
+    ]
+
+
+def test_splice_replaces_edited_regions_only():
+    regions = [Region(0, 2, "imports"), Region(6, 9, "definition of load")]
+    fixed = splice_regions(MODULE, "store.py", regions, {
+        2: "def load(path):\n    with open(path, encoding='utf-8') as f:\n        return f.read()\n",
+    })
+    assert fixed == MODULE.replace("open(path)", "open(path, encoding='utf-8')")
+
+
+def test_splice_drops_echoed_markers():
+    regions = [Region(6, 9, "definition of load")]
+    edit = [line for line in render_regions(MODULE, regions).split("\n") if not line.startswith("[lines")]
+    edit[2] = "    with open(path, 'rb') as f:"
+    fixed = splice_regions(MODULE, "store.py", regions, {1: "\n".join(edit)})
+    assert fixed == MODULE.replace("open(path)", "open(path, 'rb')")
+
+
+def test_splice_preserves_crlf_and_trailing_newline():
+    crlf = MODULE.replace("\n", "\r\n")
+    fixed = splice_regions(crlf, "store.py", [Region(14, 15, "line 15 in size")], {1: "        return LIMIT * 2\r\n"})
+    assert fixed == crlf.replace("return LIMIT", "return LIMIT * 2")
+    assert fixed.endswith("\r\n") and "\r\r" not in fixed
+
+    no_newline = MODULE.rstrip("\n")
+    fixed = splice_regions(no_newline, "store.py", [Region(22, 23, "line 23")], {1: "    Store().save([])\n"})
+    assert fixed == no_newline.replace("load('x')", "[]")
+
+
+def test_splice_rejects_unusable_edits():
+    regions = [Region(6, 9, "definition of load")]
+    with pytest.raises(SpliceError, match="Unknown regions"):
+        splice_regions(MODULE, "store.py", regions, {2: "pass"})
+    with pytest.raises(SpliceError, match="do not change"):
+        splice_regions(MODULE, "store.py", regions, {})
+    with pytest.raises(SpliceError, match="does not parse"):
+        splice_regions(MODULE, "store.py", regions, {1: "def load(path:\n    return None"})
+    # Only Python is checked
+    assert splice_regions(MODULE, "store.txt", regions, {1: "def load(path:"})
+
+
+def test_line_window_is_bounded_and_centred():
+    assert line_window(MODULE, 12, max_lines=5, max_chars=10000) == Region(9, 14, "5 lines around line 12")
+    assert line_window(MODULE, 1, max_lines=5, max_chars=10000) == Region(0, 3, "3 lines around line 1")
+    assert line_window(MODULE, 99, max_lines=5, max_chars=10000) is None
+
+
+def test_line_window_shrinks_to_the_character_budget():
+    assert line_window(MODULE, 18, max_lines=9, max_chars=100) == Region(15, 20, "5 lines around line 18")
+    assert line_window(MODULE, 18, max_lines=9, max_chars=5) is None
@@ -0,0 +1,69 @@
+import asyncio
+import base64
+
+import httpx
+import pytest
+
+from agent.github_client import AsyncGitHubClient, GitHubAPIError
+
+LARGE_TEXT = "x = 1\n" * 200000  # over the contents API's 1 MB inline limit
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    path = request.url.path
+    if path == "/repos/o/r/contents/small.py":
+        return httpx.Response(200, json={
+            "type": "file", "path": "small.py", "sha": "s1", "encoding": "base64", "content": _b64(b"print('hi')\n"),
+        })
+    if path == "/repos/o/r/contents/empty.py":
+        return httpx.Response(200, json={"type": "file", "path": "empty.py", "sha": "s0", "encoding": "base64",
+                                         "content": ""})
+    if path == "/repos/o/r/contents/large.py":
+        return httpx.Response(200, json={
+            "type": "file", "path": "large.py", "sha": "s2", "encoding": "none", "content": "", "size": len(LARGE_TEXT),
+        })
+    if path == "/repos/o/r/git/blobs/s2":
+        return httpx.Response(200, json={"sha": "s2", "encoding": "base64", "content": _b64(LARGE_TEXT.encode()),
+                                         "size": len(LARGE_TEXT)})
+    if path == "/repos/o/r/contents/logo.png":
+        return httpx.Response(200, json={
+            "type": "file", "path": "logo.png", "sha": "s3", "encoding": "base64", "content": _b64(b"\x89PNG\r\n\x1a\n\xff"),
+        })
+    if path == "/repos/o/r/contents/src":
+        return httpx.Response(200, json=[{"type": "file", "path": "src/a.py"}])
+    return httpx.Response(404, json={"message": "Not Found"})
+
+
+def _get_file(path: str):
+    async def scenario():
+        client = AsyncGitHubClient(token="t", base_url="https://api.github.test", transport=httpx.MockTransport(_handler))
+        try:
+            return await client.get_file("o/r", path)
+        finally:
+            await client.close()
+    return asyncio.run(scenario())
+
+
+def test_small_file_is_decoded_inline():
+    assert _get_file("small.py") == {"path": "small.py", "sha": "s1", "content": "print('hi')\n"}
+    assert _get_file("empty.py")["content"] == ""
+
+
+def test_large_file_is_read_through_the_blobs_api():
+    file = _get_file("large.py")
+    assert file["sha"] == "s2"
+    assert file["content"] == LARGE_TEXT
+
+
+def test_binary_file_raises_github_api_error():
+    with pytest.raises(GitHubAPIError, match="not a UTF-8 text file"):
+        _get_file("logo.png")
+
+
+def test_directory_raises_github_api_error():
+    with pytest.raises(GitHubAPIError, match="is not a file"):
+        _get_file("src")
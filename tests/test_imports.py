@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from agent import imports
+from agent.imports import ModuleMap, parse_imports, parse_imports_async, resolve_imports
+from app.core.config import settings
+
+PATHS = [
+    "pyproject.toml",
+    "app/__init__.py",
+    "app/core/__init__.py",
+    "app/core/config.py",
+    "app/core/utils.py",
+    "app/api/routes.py",
+    "scripts/run.py",
+    "libs/tool/setup.py",
+    "libs/tool/src/tool/__init__.py",
+    "libs/tool/src/tool/cli.py",
+    "src/app/core/config.py",
+    "README.md",
+]
+
+SOURCE = """\
+import os
+import app.core.config
+from app.core import utils, missing
+from . import utils as helpers
+from ..core.config import Settings
+from tool.cli import main
+from requests import get
+
+
+def lazy():
+    from app.api import routes
+"""
+
+
+def test_parse_imports_in_source_order():
+    assert parse_imports(SOURCE) == [
+        ("os", 0, []),
+        ("app.core.config", 0, []),
+        ("app.core", 0, ["utils", "missing"]),
+        (None, 1, ["utils"]),
+        ("core.config", 2, ["Settings"]),
+        ("tool.cli", 0, ["main"]),
+        ("requests", 0, ["get"]),
+        ("app.api", 0, ["routes"]),
+    ]
+
+
+def test_parse_imports_raises_on_invalid_source():
+    with pytest.raises(SyntaxError):
+        parse_imports("from import x")
+
+
+def test_module_map_roots():
+    module_map = ModuleMap(PATHS)
+    assert module_map.resolve("app") == "app/__init__.py"
+    assert module_map.resolve("app.core.utils") == "app/core/utils.py"
+    # Project marker directories and their src/ are roots too
+    assert module_map.resolve("tool") == "libs/tool/src/tool/__init__.py"
+    assert module_map.resolve("tool.cli") == "libs/tool/src/tool/cli.py"
+    # The repository root is shallower than src/, so it wins
+    assert module_map.resolve("app.core.config") == "app/core/config.py"
+    assert module_map.resolve("requests") is None
+
+
+def test_resolve_relative():
+    module_map = ModuleMap(PATHS)
+    assert module_map.resolve_relative("app/core/utils.py", 1, "config") == "app/core/config.py"
+    assert module_map.resolve_relative("app/api/routes.py", 2, "core") == "app/core/__init__.py"
+    assert module_map.resolve_relative("app/api/routes.py", 2, None) == "app/__init__.py"
+    assert module_map.resolve_relative("app/api/routes.py", 4, "core") is None
+
+
+def test_resolve_import_prefers_submodules():
+    module_map = ModuleMap(PATHS)
+    current = "app/api/routes.py"
+    assert module_map.resolve_import(("app.core", 0, ["utils", "missing"]), current) == ["app/core/utils.py"]
+    assert module_map.resolve_import(("app.core.config", 0, ["Settings"]), current) == ["app/core/config.py"]
+    assert module_map.resolve_import(("app.core", 0, ["*"]), current) == ["app/core/__init__.py"]
+    assert module_map.resolve_import(("requests", 0, ["get"]), current) == []
+
+
+def test_resolve_imports_lists_each_file_once():
+    module_map = ModuleMap(PATHS)
+    resolved = asyncio.run(resolve_imports(SOURCE + "import app.core.utils\n", "app/core/utils.py", module_map))
+    # The file itself (imported three ways) and third-party modules are left out
+    assert resolved == ["app/core/config.py", "libs/tool/src/tool/cli.py", "app/api/routes.py"]
+
+
+def test_large_files_are_parsed_off_the_event_loop(monkeypatch):
+    offloaded = []
+
+    async def to_thread(function, *args):
+        offloaded.append(function)
+        return function(*args)
+
+    monkeypatch.setattr(settings, "IMPORT_PARSE_OFFLOAD_BYTES", 100)
+    monkeypatch.setattr(imports, "_get_parse_pool", lambda: None)
+    monkeypatch.setattr(imports.asyncio, "to_thread", to_thread)
+
+    assert asyncio.run(parse_imports_async("import os\n")) == [("os", 0, [])]
+    assert offloaded == []
+    assert asyncio.run(parse_imports_async("import os\n" + "x = 1\n" * 50)) == [("os", 0, [])]
+    assert offloaded == [parse_imports]
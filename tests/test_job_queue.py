@@ -0,0 +1,216 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import pytest
+from sqlalchemy import select
+
+from app.core.job_queue import WORKER_ENDPOINT, LocalJobQueue, PermanentJobError
+from app.db import base
+from app.db.models import QueuedJob, QueuedJobStatus
+
+
+class Handler:
+    """Job handler recording its calls; fails the first `failures` calls of a job."""
+
+    def __init__(self, failures: int = 0, error: Exception = None, hold: float = 0.0) -> None:
+        self.failures = failures
+        self.error = error or RuntimeError("vertex unavailable")
+        self.hold = hold
+        self.calls: List[Dict[str, Any]] = []
+        self.running = 0
+        self.peak = 0
+
+    async def __call__(self, payload: Dict[str, Any]) -> None:
+        self.calls.append(payload)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.hold)
+            if sum(call == payload for call in self.calls) <= self.failures:
+                raise self.error
+        finally:
+            self.running -= 1
+
+
+def _queue(handler: Handler, **kwargs: Any) -> LocalJobQueue:
+    kwargs.setdefault("durable", False)
+    kwargs.setdefault("retry_backoff_seconds", 0.01)
+    return LocalJobQueue(handlers={WORKER_ENDPOINT: handler}, **kwargs)
+
+
+async def _until(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.005)
+
+
+@pytest.fixture
+def durable(session_factory, monkeypatch):
+    """Points the durable queue at the test database; returns a helper reading its rows."""
+    monkeypatch.setattr(base, "AsyncSessionLocal", session_factory)
+
+    async def rows() -> List[QueuedJob]:
+        async with session_factory() as db:
+            return list((await db.execute(select(QueuedJob).order_by(QueuedJob.id))).scalars().all())
+    return session_factory, rows
+
+
+def test_worker_pool_caps_concurrency():
+    handler = Handler(hold=0.05)
+
+    async def scenario():
+        queue = _queue(handler, workers=2)
+        await queue.start()
+        for job_id in range(6):
+            await queue.enqueue({"job_id": job_id})
+        await _until(lambda: queue.stats()["completed"] == 6)
+        stats = queue.stats()
+        await queue.close()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert handler.peak == 2
+    assert sorted(call["job_id"] for call in handler.calls) == list(range(6))
+    assert (stats["enqueued"], stats["running"], stats["queued"]) == (6, 0, 0)
+
+
+def test_delayed_job_waits_for_its_delay():
+    handler = Handler()
+
+    async def scenario():
+        queue = _queue(handler)
+        await queue.enqueue({"job_id": 1}, delay_seconds=0.1)
+        await asyncio.sleep(0.05)
+        early = (len(handler.calls), queue.stats()["delayed"])
+        await _until(lambda: handler.calls)
+        await queue.close()
+        return early
+
+    assert asyncio.run(scenario()) == (0, 1)
+
+
+def test_unknown_endpoint_is_rejected():
+    with pytest.raises(ValueError):
+        asyncio.run(_queue(Handler()).enqueue({"job_id": 1}, endpoint="/api/v1/nowhere"))
+
+
+def test_failed_job_is_retried_with_backoff(durable):
+    _, rows = durable
+    handler = Handler(failures=2)
+
+    async def scenario():
+        queue = _queue(handler, durable=True, max_attempts=3, retry_backoff_seconds=0.05)
+        started = asyncio.get_running_loop().time()
+        await queue.enqueue({"job_id": 1})
+        await _until(lambda: queue.stats()["completed"] == 1)
+        elapsed = asyncio.get_running_loop().time() - started
+        stats = queue.stats()
+        await queue.close()
+        return elapsed, stats, await rows()
+
+    elapsed, stats, (row,) = asyncio.run(scenario())
+    assert len(handler.calls) == 3
+    # 0.05 s before the second attempt, 0.1 s before the third
+    assert elapsed >= 0.15
+    assert (stats["retried"], stats["failed"]) == (2, 0)
+    assert (row.status, row.attempts, row.last_error) == (QueuedJobStatus.DONE, 3, "vertex unavailable")
+
+
+def test_job_fails_after_max_attempts(durable):
+    _, rows = durable
+    handler = Handler(failures=10)
+
+    async def scenario():
+        queue = _queue(handler, durable=True, max_attempts=3)
+        await queue.enqueue({"job_id": 1})
+        await _until(lambda: queue.stats()["failed"] == 1)
+        await asyncio.sleep(0.05)
+        stats = queue.stats()
+        await queue.close()
+        return stats, await rows()
+
+    stats, (row,) = asyncio.run(scenario())
+    assert len(handler.calls) == 3
+    assert (stats["retried"], stats["completed"], stats["delayed"]) == (2, 0, 0)
+    assert (row.status, row.attempts) == (QueuedJobStatus.FAILED, 3)
+
+
+def test_permanent_error_fails_without_retry(durable):
+    _, rows = durable
+    handler = Handler(failures=10, error=PermanentJobError("job_id is required"))
+
+    async def scenario():
+        queue = _queue(handler, durable=True, max_attempts=3)
+        await queue.enqueue({})
+        await _until(lambda: queue.stats()["failed"] == 1)
+        stats = queue.stats()
+        await queue.close()
+        return stats, await rows()
+
+    stats, (row,) = asyncio.run(scenario())
+    assert len(handler.calls) == 1
+    assert stats["retried"] == 0
+    assert (row.status, row.attempts, row.last_error) == (QueuedJobStatus.FAILED, 1, "job_id is required")
+
+
+def test_restart_recovers_queued_and_running_jobs(durable):
+    session_factory, rows = durable
+    handler = Handler()
+
+    async def scenario():
+        now = datetime.utcnow()
+        async with session_factory() as db:
+            db.add_all([
+                # Running when the process died
+                QueuedJob(endpoint=WORKER_ENDPOINT, payload=json.dumps({"job_id": 1}),
+                          status=QueuedJobStatus.RUNNING, attempts=1, available_at=now),
+                # Waiting out a retry delay
+                QueuedJob(endpoint=WORKER_ENDPOINT, payload=json.dumps({"job_id": 2}),
+                          status=QueuedJobStatus.QUEUED, attempts=1, available_at=now + timedelta(seconds=0.1)),
+                # Finished jobs stay finished
+                QueuedJob(endpoint=WORKER_ENDPOINT, payload=json.dumps({"job_id": 3}),
+                          status=QueuedJobStatus.DONE, attempts=1, available_at=now),
+            ])
+            await db.commit()
+
+        queue = _queue(handler, durable=True)
+        await queue.start()
+        await _until(lambda: queue.stats()["completed"] == 2)
+        await queue.close()
+        return await rows()
+
+    stored = asyncio.run(scenario())
+    assert [call["job_id"] for call in handler.calls] == [1, 2]
+    assert [(row.status, row.attempts) for row in stored] == [
+        (QueuedJobStatus.DONE, 2), (QueuedJobStatus.DONE, 2), (QueuedJobStatus.DONE, 1),
+    ]
+
+
+def test_close_cancels_timers_and_workers_and_keeps_durable_jobs(durable):
+    _, rows = durable
+    handler = Handler(hold=10.0)
+
+    async def scenario():
+        queue = _queue(handler, durable=True)
+        await queue.enqueue({"job_id": 1})
+        await queue.enqueue({"job_id": 2}, delay_seconds=30)
+        await _until(lambda: handler.running == 1)
+        workers = list(queue._workers)
+        await queue.close()
+        closed = (all(worker.cancelled() for worker in workers), queue.stats())
+
+        # A new process picks both jobs up again
+        restarted = _queue(Handler(), durable=True)
+        await restarted.start()
+        recovered = restarted.stats()["queued"], restarted.stats()["delayed"]
+        await restarted.close()
+        return closed, recovered
+
+    (all_cancelled, stats), recovered = asyncio.run(scenario())
+    assert all_cancelled
+    assert (stats["delayed"], stats["queued"]) == (0, 0)
+    assert handler.calls == [{"job_id": 1}]
+    assert recovered == (1, 1)
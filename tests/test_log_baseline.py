@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from agent.log_baseline import BaselineCache, line_key, normalize_line
+
+
+@pytest.mark.parametrize("line, normalized", [
+    ("Started at 2024-05-01T12:03:04.123Z", "Started at <ts>"),
+    ("[2024-05-01 12:03:04,5+02:00] resolving", "[<ts>] resolving"),
+    ("12:03:04 compiling", "<ts> compiling"),
+    ("HEAD is now at 3f2a9c1 Bump version", "HEAD is now at <hash> Bump version"),
+    ("sha256:9b1f0e7c4d2a8e6f3b5c7d9e1f0a2b4c6d8e0f1a3b5c7d9e1f0a2b4c6d8e0f1a", "sha256:<hash>"),
+    ("request 123e4567-e89b-12d3-a456-426614174000 done", "request <uuid> done"),
+    ("Ran 42 tests in 3.512s", "Ran 42 tests in <dur>"),
+    ("built in 850 ms, total 2 minutes", "built in <dur>, total <dur>"),
+    ("wrote /tmp/pytest-of-runner/pytest-3/out.txt: ok", "wrote <tmp>: ok"),
+    ("  collected   12 items  ", "collected 12 items"),
+])
+def test_normalize_line_masks_volatile_parts(line, normalized):
+    assert normalize_line(line) == normalized
+
+
+def test_meaningful_numbers_are_kept():
+    assert normalize_line("FAILED tests/test_api.py::test_get - assert 404 == 200") == \
+        "FAILED tests/test_api.py::test_get - assert 404 == 200"
+    assert normalize_line("error: line 12 col 7") == "error: line 12 col 7"
+
+
+def test_line_keys_match_across_runs():
+    assert line_key("12:03:04 Ran 3 tests in 0.51s") == line_key("18:44:10  Ran 3 tests in 1.02s")
+    assert line_key("Ran 3 tests in 0.51s") != line_key("Ran 4 tests in 0.51s")
+
+
+class Fetcher:
+    """`fetch_keys` stand-in that counts calls and can be held open."""
+
+    def __init__(self, keys=frozenset({1, 2}), error=None):
+        self.keys = keys
+        self.error = error
+        self.calls = 0
+        self.release = None
+
+    async def __call__(self):
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.keys
+
+
+def test_concurrent_gets_share_one_fetch():
+    fetcher = Fetcher()
+    cache = BaselineCache(max_entries=4)
+
+    async def scenario():
+        fetcher.release = asyncio.Event()
+        waiters = [asyncio.create_task(cache.get("o/r", 7, fetcher)) for _ in range(5)]
+        await asyncio.sleep(0)
+        fetcher.release.set()
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(scenario()) == [frozenset({1, 2})] * 5
+    assert fetcher.calls == 1
+    assert cache.stats() == {"hits": 4, "misses": 1, "entries": 1}
+
+
+def test_failed_fetch_reaches_every_waiter_and_is_not_cached():
+    fetcher = Fetcher(error=RuntimeError("log gone"))
+    cache = BaselineCache(max_entries=4)
+
+    async def scenario():
+        fetcher.release = asyncio.Event()
+        waiters = [asyncio.create_task(cache.get("o/r", 7, fetcher)) for _ in range(3)]
+        await asyncio.sleep(0)
+        fetcher.release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        fetcher.error, fetcher.release = None, None
+        return results, await cache.get("o/r", 7, fetcher)
+
+    results, retried = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retried == frozenset({1, 2})
+    assert fetcher.calls == 2
+
+
+def test_least_recently_used_job_is_evicted():
+    fetcher = Fetcher()
+    cache = BaselineCache(max_entries=2)
+
+    async def scenario():
+        await cache.get("o/r", 1, fetcher)
+        await cache.get("o/r", 2, fetcher)
+        await cache.get("o/r", 1, fetcher)  # job 2 is now the oldest
+        await cache.get("o/r", 3, fetcher)
+        await cache.get("o/r", 1, fetcher)
+        await cache.get("o/r", 2, fetcher)
+
+    asyncio.run(scenario())
+    assert fetcher.calls == 4
+    assert cache.stats() == {"hits": 2, "misses": 4, "entries": 2}
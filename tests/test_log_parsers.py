@@ -0,0 +1,90 @@
+import glob
+import json
+import os
+
+import pytest
+
+from agent.log_parsers import (
+    ErrorRecordExtractor,
+    format_error_records,
+    iter_error_records,
+    list_ecosystems,
+    load_error_records,
+    parse_error_records,
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "scripts", "fixtures", "logs")
+FIXTURE_LOGS = sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.log")))
+
+with open(os.path.join(FIXTURES_DIR, "expected.json"), encoding="utf-8") as f:
+    EXPECTED = json.load(f)
+
+
+def _summary(record):
+    return {
+        "ecosystem": record.ecosystem,
+        "error_type": record.error_type,
+        "file": record.file,
+        "line": record.line,
+        "test_id": record.test_id,
+    }
+
+
+@pytest.mark.parametrize("path", FIXTURE_LOGS, ids=os.path.basename)
+def test_fixture_logs_match_expected_records(path):
+    with open(path, encoding="utf-8") as f:
+        records = [_summary(record) for record in iter_error_records(f)]
+    assert records == EXPECTED[os.path.basename(path)]
+
+
+def test_every_ecosystem_has_a_fixture():
+    covered = {record["ecosystem"] for records in EXPECTED.values() for record in records}
+    assert covered == set(list_ecosystems())
+
+
+def test_ansi_codes_and_noise_are_ignored():
+    logs = "\n".join([
+        "Collecting requests==2.31.0",
+        "tests/test_cart.py ....F                                   [100%]",
+        "\x1b[31mFAILED\x1b[0m tests/test_cart.py::test_total - AssertionError: assert 0 == 3",
+    ])
+    records = parse_error_records(logs)
+    assert [(record.ecosystem, record.test_id) for record in records] == [
+        ("pytest", "tests/test_cart.py::test_total")
+    ]
+
+
+def test_records_are_deduplicated_and_capped():
+    line = "src/cart.ts(12,5): error TS2322: Type 'string' is not assignable to type 'number'."
+    assert len(parse_error_records("\n".join([line] * 5))) == 1
+
+    extractor = ErrorRecordExtractor(max_records=3)
+    extractor.feed_lines(
+        f"src/file{i}.ts({i},1): error TS2304: Cannot find name 'x{i}'." for i in range(1, 11)
+    )
+    records = extractor.close()
+    assert len(records) == 3
+    assert extractor.dropped == 7
+
+
+def test_restricted_ecosystems():
+    with open(os.path.join(FIXTURES_DIR, "pytest.log"), encoding="utf-8") as f:
+        logs = f.read()
+    assert parse_error_records(logs)
+    assert list(iter_error_records(logs.splitlines(), ecosystems=["cargo"])) == []
+
+
+def test_stored_records_round_trip_and_format():
+    with open(os.path.join(FIXTURES_DIR, "go.log"), encoding="utf-8") as f:
+        logs = f.read()
+    records = parse_error_records(logs)
+    stored = [record._asdict() for record in records]
+
+    assert load_error_records(stored, "") == records
+    # Older checkpoints without stored records fall back to parsing the logs
+    assert load_error_records(None, logs) == records
+
+    rendered = format_error_records(records, limit=2).splitlines()
+    assert len(rendered) == 3
+    assert rendered[0].startswith("[go] cart_test.go:18 (TestCartTotal)")
+    assert rendered[-1] == f"... and {len(records) - 2} more"
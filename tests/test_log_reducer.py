@@ -0,0 +1,100 @@
+from agent.log_reducer import CHARS_PER_TOKEN, LogReducer, reduce_log, score_line, token_budget_chars
+from app.core.config import settings
+
+
+def _filler(start, stop):
+    return [f"step output {n:04d}" for n in range(start, stop)]
+
+
+def _reduce(lines, max_chars, **kwargs):
+    reducer = LogReducer(max_chars, **kwargs)
+    reducer.feed_lines(lines)
+    return reducer, reducer.result()
+
+
+def test_score_line():
+    assert score_line("Collecting requests==2.31.0") == 0
+    assert score_line("Traceback (most recent call last):") == 5
+    # ##[error] and "Error:" both count
+    assert score_line("##[error]Process completed with exit code 2.") == 4 + 4 + 3
+
+
+def test_nearby_error_lines_share_one_window():
+    lines = _filler(0, 400)
+    lines[100] = "ValueError: bad config"
+    lines[106] = "FAILED tests/test_config.py::test_load"
+    _, result = _reduce(lines, max_chars=1200, context_before=2, context_after=10, tail_share=0.1)
+
+    kept = result.split("\n")
+    start = kept.index("step output 0098")
+    # Two lines before the first error through ten after the second, without a gap
+    assert kept[start:start + 19] == lines[98:117]
+    assert kept[start + 19].startswith("[... ")
+
+
+def test_distant_error_lines_get_separate_windows():
+    lines = _filler(0, 400)
+    lines[50] = "ValueError: bad config"
+    lines[250] = "AssertionError: assert 1 == 2"
+    reducer, result = _reduce(lines, max_chars=1500, context_before=1, context_after=2, tail_share=0.1)
+
+    assert len(reducer._windows) == 2
+    assert "step output 0049\nValueError: bad config\nstep output 0051\nstep output 0052\n[... " in result
+    assert "step output 0249\nAssertionError: assert 1 == 2\nstep output 0251\nstep output 0252\n[... " in result
+
+
+def test_tail_share_keeps_the_end_of_the_log():
+    lines = _filler(0, 1000)
+    lines[10] = "##[error]setup failed"
+    _, result = _reduce(lines, max_chars=2000, tail_share=0.25)
+
+    assert "##[error]setup failed" in result
+    assert result.endswith("step output 0999")
+    assert result.startswith("[... ")
+
+
+def test_log_without_errors_reduces_to_its_tail():
+    _, result = _reduce(_filler(0, 1000), max_chars=500)
+
+    kept = result.split("\n")
+    assert kept[0].startswith("[... ") and kept[0].endswith(" lines omitted ...]")
+    assert kept[1:] == _filler(1000 - len(kept) + 1, 1000)
+
+
+def test_result_never_exceeds_the_budget():
+    lines = _filler(0, 2000)
+    for n in range(0, 2000, 37):
+        lines[n] = f"E   AssertionError: case {n} failed " + "x" * 200
+    lines.append("FATAL " + "y" * 5000)
+    for max_chars in (100, 1000, 4000):
+        reducer, result = _reduce(lines, max_chars)
+        assert len(result) <= max_chars
+        # Held windows stay within a small multiple of the budget while streaming
+        assert reducer._window_chars <= 2 * max_chars + len(lines[-1]) + 1
+
+
+def test_headers_are_always_kept():
+    reducer = LogReducer(300)
+    reducer.add_header("--- test / Run pytest ---")
+    reducer.feed_lines(_filler(0, 500))
+    assert reducer.result().startswith("--- test / Run pytest ---\n[... ")
+
+
+def test_batched_and_per_line_feeding_agree():
+    lines = _filler(0, 1500)
+    lines[700] = "npm ERR! code ELIFECYCLE"
+    per_line = LogReducer(1000)
+    for line in lines:
+        per_line.feed(line)
+    assert _reduce(lines, 1000)[1] == per_line.result()
+
+
+def test_reduce_log_leaves_short_logs_alone():
+    text = "line 1\nERROR: short\n"
+    assert reduce_log(text, 1000) is text
+    assert len(reduce_log(text * 500, 1000)) <= 1000
+
+
+def test_token_budget_chars():
+    assert token_budget_chars(100) == 100 * CHARS_PER_TOKEN
+    assert token_budget_chars() == settings.DIAGNOSE_LOG_TOKEN_BUDGET * CHARS_PER_TOKEN
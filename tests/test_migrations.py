@@ -0,0 +1,89 @@
+import asyncio
+
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.migrations import init_db
+from app.db.models import JobStatus, RepairJob
+
+# repair_jobs as the first release created it
+BASELINE_REPAIR_JOBS = """
+CREATE TABLE repair_jobs (
+    id INTEGER NOT NULL PRIMARY KEY,
+    repo_name VARCHAR NOT NULL,
+    run_id VARCHAR NOT NULL,
+    status VARCHAR(9) NOT NULL,
+    error_log_summary TEXT,
+    vertex_cost_est FLOAT NOT NULL,
+    diagnosis_confidence FLOAT,
+    fix_confidence FLOAT,
+    failure_category VARCHAR,
+    reasoning_log TEXT,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    pr_url VARCHAR,
+    pr_draft BOOLEAN NOT NULL
+)
+"""
+
+
+def _columns(sync_conn, table):
+    return {column["name"] for column in inspect(sync_conn).get_columns(table)}
+
+
+def _indexes(sync_conn, table):
+    return {index["name"] for index in inspect(sync_conn).get_indexes(table)}
+
+
+def test_init_db_adds_registered_columns_to_existing_tables(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'old.db'}")
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql(BASELINE_REPAIR_JOBS)
+            await conn.exec_driver_sql(
+                "INSERT INTO repair_jobs (id, repo_name, run_id, status, vertex_cost_est, created_at, updated_at, "
+                "pr_draft) VALUES (1, 'o/r', '42', 'PENDING', 0.0, '2024-01-01', '2024-01-01', 0)"
+            )
+
+        await init_db(engine)
+        # Running it again on an up-to-date database is a no-op
+        await init_db(engine)
+
+        async with engine.connect() as conn:
+            columns = await conn.run_sync(_columns, "repair_jobs")
+            indexes = await conn.run_sync(_indexes, "repair_jobs")
+
+        # The upgraded table works through the ORM, for old rows and new ones
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_factory() as db:
+            db.add(RepairJob(repo_name="o/r", run_id="43", delivery_id="d-1", head_sha="abc", fix_mode="patch"))
+            await db.commit()
+        async with session_factory() as db:
+            jobs = (await db.execute(select(RepairJob).order_by(RepairJob.id))).scalars().all()
+        await engine.dispose()
+        return columns, indexes, jobs
+
+    columns, indexes, jobs = asyncio.run(scenario())
+
+    # Every column added since the first release is registered
+    assert columns == set(RepairJob.__table__.columns.keys())
+    assert {
+        "uq_repair_jobs_delivery_id", "uq_repair_jobs_run_key", "ix_repair_jobs_repo_head_sha",
+        "ix_repair_jobs_failure_fingerprint",
+    } <= indexes
+    old, new = jobs
+    assert (old.status, old.delivery_id, old.github_api_calls, old.preclassified, old.fix_mode) == \
+        (JobStatus.PENDING, None, 0, False, None)
+    assert (new.delivery_id, new.head_sha, new.fix_mode, new.resume_cost_avoided) == ("d-1", "abc", "patch", 0.0)
+
+
+def test_init_db_creates_a_fresh_database(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'new.db'}")
+        await init_db(engine)
+        async with engine.connect() as conn:
+            columns = await conn.run_sync(_columns, "repair_jobs")
+        await engine.dispose()
+        return columns
+
+    assert set(RepairJob.__table__.columns.keys()) == asyncio.run(scenario())
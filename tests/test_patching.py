@@ -0,0 +1,105 @@
+import pytest
+
+from agent.patching import PatchError, apply_patch, parse_unified_diff, place_hunks
+
+ORIGINAL = "\n".join([
+    "import math",
+    "",
+    "def area(radius):",
+    "    return math.pi * radius",
+    "",
+    "def perimeter(radius):",
+    "    return 2 * math.pi * radius",
+    "",
+]) + "\n"
+
+FIXED = ORIGINAL.replace("math.pi * radius\n\ndef perimeter", "math.pi * radius ** 2\n\ndef perimeter")
+
+AREA_HUNK = """@@ -3,2 +3,2 @@
+ def area(radius):
+-    return math.pi * radius
++    return math.pi * radius ** 2
+"""
+
+
+def test_exact_patch():
+    assert apply_patch(ORIGINAL, AREA_HUNK) == FIXED
+
+
+def test_file_headers_fences_and_wrong_counts_are_ignored():
+    diff = "```diff\n--- a/geometry.py\n+++ b/geometry.py\n" + AREA_HUNK.replace("-3,2 +3,2", "-3,9 +3,1") + "```\n"
+    assert apply_patch(ORIGINAL, diff) == FIXED
+
+
+def test_stale_line_number_finds_the_nearest_match():
+    assert apply_patch(ORIGINAL, AREA_HUNK.replace("-3,2 +3,2", "-40,2 +40,2")) == FIXED
+
+
+def test_hunk_without_line_numbers_must_be_unique():
+    assert apply_patch(ORIGINAL, AREA_HUNK.replace("@@ -3,2 +3,2 @@", "@@ @@")) == FIXED
+
+    ambiguous = "@@ @@\n \n-def perimeter(radius):\n+def circumference(radius):\n"
+    repeated = ORIGINAL + "\n" + ORIGINAL
+    with pytest.raises(PatchError, match="matches 2 places"):
+        apply_patch(repeated, ambiguous)
+
+
+def test_whitespace_drift_keeps_the_file_context():
+    drifted = AREA_HUNK.replace(" def area(radius):", " def area(radius):   ")
+    assert apply_patch(ORIGINAL, drifted) == FIXED
+
+
+def test_wrong_context_line_applies_with_fuzz_only():
+    diff = """@@ -1,4 +1,4 @@
+ import maths
+ 
+ def area(radius):
+-    return math.pi * radius
++    return math.pi * radius ** 2
+"""
+    assert apply_patch(ORIGINAL, diff, max_fuzz=1) == FIXED
+    with pytest.raises(PatchError, match="does not match"):
+        apply_patch(ORIGINAL, diff, max_fuzz=0)
+
+
+def test_context_lines_without_leading_space():
+    diff = "@@ -3,2 +3,2 @@\ndef area(radius):\n-    return math.pi * radius\n+    return math.pi * radius ** 2\n"
+    assert apply_patch(ORIGINAL, diff) == FIXED
+
+
+def test_several_hunks_and_pure_insertion():
+    diff = AREA_HUNK + """@@ -6,0 +7,1 @@
++    \"\"\"Circumference of a circle.\"\"\"
+"""
+    patched = apply_patch(ORIGINAL, diff)
+    assert patched == FIXED.replace(
+        "def perimeter(radius):\n", "def perimeter(radius):\n    \"\"\"Circumference of a circle.\"\"\"\n"
+    )
+
+
+def test_crlf_and_missing_final_newline_are_preserved():
+    crlf = ORIGINAL.replace("\n", "\r\n")
+    assert apply_patch(crlf, AREA_HUNK) == FIXED.replace("\n", "\r\n")
+    assert apply_patch(ORIGINAL.rstrip("\n"), AREA_HUNK) == FIXED.rstrip("\n")
+
+
+def test_overlapping_hunks_are_rejected():
+    lines = ORIGINAL.split("\n")
+    with pytest.raises(PatchError):
+        place_hunks(lines, parse_unified_diff(AREA_HUNK + AREA_HUNK))
+
+
+@pytest.mark.parametrize("diff, message", [
+    ("", "no hunks"),
+    ("just some prose\n", "no hunks"),
+    ("@@ -1,1 +1,1 @@\n import math\n", "changes nothing"),
+])
+def test_unusable_diffs(diff, message):
+    with pytest.raises(PatchError, match=message):
+        apply_patch(ORIGINAL, diff)
+
+
+def test_removed_line_starting_with_dashes_is_not_a_file_header():
+    text = "x = 1\n-- comment\ny = 2\n"
+    diff = "@@ -1,3 +1,2 @@\n x = 1\n--- comment\n y = 2\n"
+    assert apply_patch(text, diff) == "x = 1\ny = 2\n"
@@ -0,0 +1,58 @@
+import asyncio
+import glob
+import os
+
+import pytest
+
+pytest.importorskip("langgraph")
+
+from agent.log_parsers import parse_error_records
+from agent.repair.nodes.preclassify import preclassify_node
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "..", "scripts", "fixtures", "logs")
+
+RUNNER_TIMEOUT = """\
+Run pytest -q
+tests/test_orders.py ........................................ [ 40%]
+##[error]The job running on runner GitHub Actions 4 has exceeded the maximum execution time of 360 minutes.
+##[error]The operation was canceled.
+"""
+
+TEST_TIMEOUT = """\
+FAILED tests/test_client.py::test_fetch - TimeoutError: timed out waiting for response
+FAILED tests/test_client.py::test_retry - TimeoutError: read timed out
+"""
+
+
+def _preclassify(logs, records=None):
+    state = {"job_id": 1, "status": "DIAGNOSING", "error_logs": logs, "error_records": records,
+             "diagnosis_confidence": None}
+    return asyncio.run(preclassify_node(state))
+
+
+def test_runner_timeout_skips_diagnosis():
+    state = _preclassify(RUNNER_TIMEOUT)
+    assert state["status"] == "FAILED"
+    assert state["preclassified"] is True
+    assert state["failure_category"] == "timeout"
+    assert state["diagnosis_confidence"] is None
+
+
+def test_test_level_timeouts_go_to_diagnose():
+    assert parse_error_records(TEST_TIMEOUT)
+    state = _preclassify(TEST_TIMEOUT)
+    assert state["status"] == "DIAGNOSING"
+    assert not state.get("preclassified")
+
+
+def test_weak_patterns_go_to_diagnose():
+    # "timeout" and "timed out" score 0.58 together, but neither is runner-level evidence
+    state = _preclassify("Step failed: timeout while polling\nretry timed out\n", records=[])
+    assert state["status"] == "DIAGNOSING"
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.log"))), ids=os.path.basename)
+def test_fixture_failures_go_to_diagnose(path):
+    with open(path, encoding="utf-8") as f:
+        state = _preclassify(f.read())
+    assert state["status"] == "DIAGNOSING"
@@ -0,0 +1,87 @@
+import asyncio
+
+from agent.repo_index import RepoIndex, RepoIndexCache
+
+TREE = {
+    "truncated": False,
+    "tree": [
+        {"path": "src", "type": "tree", "sha": "t1"},
+        {"path": "src/app/models.py", "type": "blob", "sha": "b3"},
+        {"path": "src/app/__init__.py", "type": "blob", "sha": "b2"},
+        {"path": "src/app_settings.py", "type": "blob", "sha": "b4"},
+        {"path": "tests/app/test_models.py", "type": "blob", "sha": "b5"},
+        {"path": "tests/test_models.py", "type": "blob", "sha": "b6"},
+        {"path": "vendor/lib", "type": "commit", "sha": "c1"},
+        {"path": "setup.py", "type": "blob", "sha": "b1"},
+    ],
+}
+
+
+def test_index_holds_only_files_in_sorted_order():
+    index = RepoIndex.from_tree(TREE)
+    assert list(index) == [
+        "setup.py", "src/app/__init__.py", "src/app/models.py", "src/app_settings.py",
+        "tests/app/test_models.py", "tests/test_models.py",
+    ]
+    assert len(index) == 6
+
+
+def test_contains_and_blob_sha():
+    index = RepoIndex.from_tree(TREE)
+    assert index.contains("src/app/models.py") is True
+    assert index.contains("src/app") is False
+    assert index.contains("vendor/lib") is False
+    assert index.blob_sha("setup.py") == "b1"
+    assert index.blob_sha("missing.py") is None
+
+
+def test_truncated_index_cannot_prove_absence():
+    index = RepoIndex.from_tree({**TREE, "truncated": True})
+    assert index.truncated
+    assert index.contains("setup.py") is True
+    assert index.contains("missing.py") is None
+
+
+def test_with_prefix_lists_a_directory():
+    index = RepoIndex.from_tree(TREE)
+    assert index.with_prefix("src/app/") == ["src/app/__init__.py", "src/app/models.py"]
+    assert index.with_prefix("src/app") == ["src/app/__init__.py", "src/app/models.py", "src/app_settings.py"]
+    assert index.with_prefix("docs/") == []
+    assert index.with_prefix("") == list(index)
+
+
+def test_find_name_searches_the_whole_tree():
+    index = RepoIndex.from_tree(TREE)
+    assert index.find_name("test_models.py") == ["tests/app/test_models.py", "tests/test_models.py"]
+    assert index.find_name("app") == []
+
+
+def test_first_existing_keeps_preference_order():
+    index = RepoIndex.from_tree(TREE)
+    assert index.first_existing(["src/app.py", "src/app/__init__.py", "setup.py"]) == "src/app/__init__.py"
+    assert index.first_existing(["pyproject.toml"]) is None
+
+
+def test_cache_fetches_each_commit_once():
+    cache = RepoIndexCache(max_entries=2)
+    fetched = []
+
+    def fetcher(commit):
+        async def fetch_tree():
+            fetched.append(commit)
+            await asyncio.sleep(0.01)
+            return TREE
+        return fetch_tree
+
+    async def scenario():
+        first = await asyncio.gather(*(cache.get("o/r", "c1", fetcher("c1")) for _ in range(3)))
+        await cache.get("o/r", "c2", fetcher("c2"))
+        await cache.get("o/r", "c1", fetcher("c1"))  # c2 is now the oldest
+        await cache.get("o/r", "c3", fetcher("c3"))
+        await cache.get("o/r", "c2", fetcher("c2"))
+        return first
+
+    first = asyncio.run(scenario())
+    assert first[0] is first[1] is first[2]
+    assert fetched == ["c1", "c2", "c3", "c2"]
+    assert cache.stats() == {"hits": 3, "misses": 4, "truncated": 0, "entries": 2}
@@ -0,0 +1,33 @@
+from agent import repo_session
+from agent.repo_session import close_session, get_session, open_session
+
+
+def test_concurrent_runs_of_a_job_share_its_session():
+    first = open_session(101, "o/r")
+    second = open_session(101, "o/r")
+    assert second is first
+
+    # The first run finishing must not pull the session from under the second
+    assert close_session(101) is first
+    assert get_session(101, "o/r") is first
+
+    assert close_session(101) is first
+    assert 101 not in repo_session._sessions
+    assert close_session(101) is None
+
+
+def test_new_run_after_release_gets_a_fresh_session():
+    first = open_session(102, "o/r")
+    close_session(102)
+    second = open_session(102, "o/r")
+    assert second is not first
+    close_session(102)
+
+
+def test_session_created_outside_invoke_is_replaced_on_open():
+    orphan = get_session(103, "o/r")
+    session = open_session(103, "o/r")
+    assert session is not orphan
+    assert get_session(103, "o/r") is session
+    close_session(103)
+    assert 103 not in repo_session._sessions
@@ -0,0 +1,135 @@
+import asyncio
+from typing import AsyncIterator, Dict, List
+
+import httpx
+import pytest
+
+from agent.github_client import AsyncGitHubClient, GitHubAPIError
+from agent.repo_session import RepairSession
+from agent.run_logs import failed_step_windows, fetch_failed_logs, iter_failed_step_lines
+
+LOG_URL = "https://blobs.example.test/job-7.txt"
+
+STEPS = [
+    {"number": 1, "name": "Set up job", "conclusion": "success",
+     "started_at": "2024-05-01T10:00:00Z", "completed_at": "2024-05-01T10:00:01Z"},
+    {"number": 3, "name": "Run tests", "conclusion": "failure",
+     "started_at": "2024-05-01T10:10:00Z", "completed_at": "2024-05-01T10:10:05Z"},
+    {"number": 2, "name": "Install", "conclusion": "success",
+     "started_at": "2024-05-01T10:00:02Z", "completed_at": "2024-05-01T10:09:59Z"},
+    {"number": 4, "name": "Post job", "conclusion": "success",
+     "started_at": "2024-05-01T10:10:06Z", "completed_at": "2024-05-01T10:10:07Z"},
+]
+
+LOG_LINES = [
+    "2024-05-01T10:00:00.1000000Z ##[group]Run actions/checkout@v4",
+    "2024-05-01T10:05:00.0000000Z Collecting requests==2.31.0",
+    "2024-05-01T10:10:01.0000000Z FAILED tests/test_cart.py::test_total - assert 0 == 3",
+    "2024-05-01T10:10:05.9000000Z ##[error]Process completed with exit code 1.",
+    "2024-05-01T10:10:06.0000000Z Post job cleanup.",
+]
+
+
+class FakeGitHub:
+    """Serves one failed run: the jobs list, the log redirect and the log download."""
+
+    def __init__(self, steps: List[Dict], log_lines: List[str], log_status: int = 200) -> None:
+        self.steps = steps
+        self.log_lines = log_lines
+        self.log_status = log_status
+        self.lines_sent = 0
+        self.requests: List[str] = []
+
+    async def _body(self) -> AsyncIterator[bytes]:
+        for line in self.log_lines:
+            self.lines_sent += 1
+            yield (line + "\r\n").encode()
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(str(request.url))
+        path = request.url.path
+        if path == "/repos/o/r/actions/runs/1/jobs":
+            return httpx.Response(200, json={"total_count": 2, "jobs": [
+                {"id": 7, "name": "test", "conclusion": "failure", "steps": self.steps},
+                {"id": 8, "name": "lint", "conclusion": "success", "steps": []},
+            ]})
+        if path == "/repos/o/r/actions/runs/1":
+            return httpx.Response(200, json={"id": 1, "workflow_id": None})
+        if path == "/repos/o/r/actions/jobs/7/logs":
+            if self.log_status != 200:
+                return httpx.Response(self.log_status, json={"message": "Server Error"})
+            return httpx.Response(302, headers={"Location": LOG_URL})
+        if str(request.url) == LOG_URL:
+            assert "Authorization" not in request.headers
+            return httpx.Response(200, content=self._body())
+        return httpx.Response(404, json={"message": "Not Found"})
+
+
+def _fetch(fake: FakeGitHub) -> str:
+    async def scenario():
+        github = AsyncGitHubClient(token="t", base_url="https://api.github.test",
+                                   transport=httpx.MockTransport(fake.handler))
+        try:
+            return await fetch_failed_logs(RepairSession(1, "o/r", github=github), 1, 10000)
+        finally:
+            await github.close()
+    return asyncio.run(scenario())
+
+
+def test_failed_step_windows_are_in_step_order():
+    steps = STEPS + [{"number": 5, "name": "Deploy", "conclusion": "timed_out",
+                      "started_at": "2024-05-01T10:11:00Z", "completed_at": None}]
+    assert failed_step_windows({"steps": steps}) == [("Run tests", "2024-05-01T10:10:00", "2024-05-01T10:10:05")]
+
+
+def test_only_failed_step_lines_are_kept():
+    fake = FakeGitHub(STEPS, LOG_LINES)
+    logs = _fetch(fake)
+    assert "--- test / Run tests ---" in logs
+    assert "FAILED tests/test_cart.py::test_total - assert 0 == 3" in logs
+    assert "##[error]Process completed with exit code 1." in logs
+    assert "Collecting requests" not in logs and "actions/checkout" not in logs
+    assert "2024-05-01T10:10:01" not in logs
+    assert LOG_URL in fake.requests
+    assert not any("/jobs/8/logs" in url for url in fake.requests)
+
+
+def test_stream_stops_after_the_last_failed_window():
+    fake = FakeGitHub(STEPS, LOG_LINES + [f"2024-05-01T10:11:{i % 60:02d}.0000000Z noise {i}" for i in range(1000)])
+    logs = _fetch(fake)
+    assert "Post job cleanup." not in logs and "noise" not in logs
+    # Reading ends at the first line past the window, not at the end of the log
+    assert fake.lines_sent < 50
+
+
+def test_iter_failed_step_lines_stops_reading():
+    consumed = []
+
+    async def lines():
+        for line in LOG_LINES + ["2024-05-01T10:12:00.0000000Z never read"]:
+            consumed.append(line)
+            yield line + "\n"
+
+    async def collect():
+        windows = [("Run tests", "2024-05-01T10:10:00", "2024-05-01T10:10:05")]
+        return [pair async for pair in iter_failed_step_lines(lines(), windows)]
+
+    assert asyncio.run(collect()) == [
+        ("Run tests", "FAILED tests/test_cart.py::test_total - assert 0 == 3"),
+        ("Run tests", "##[error]Process completed with exit code 1."),
+    ]
+    assert consumed[-1] == LOG_LINES[4]
+
+
+def test_steps_without_timestamps_fall_back_to_the_whole_log():
+    steps = [dict(step, started_at=None, completed_at=None) for step in STEPS]
+    logs = _fetch(FakeGitHub(steps, LOG_LINES))
+    assert "--- test ---" in logs
+    for line in ("actions/checkout@v4", "Collecting requests==2.31.0", "assert 0 == 3", "Post job cleanup."):
+        assert line in logs
+
+
+def test_log_download_errors_propagate():
+    with pytest.raises(GitHubAPIError) as error:
+        _fetch(FakeGitHub(STEPS, LOG_LINES, log_status=502))
+    assert error.value.status_code == 502
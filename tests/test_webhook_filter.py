@@ -0,0 +1,74 @@
+import asyncio
+import json
+from urllib.parse import quote_from_bytes
+
+import pytest
+
+from app.core.webhook_filter import InvalidWebhookBody, extract_json_body, prefilter_webhook
+
+
+def _body(action="completed", conclusion="failure"):
+    return json.dumps({
+        "action": action,
+        "workflow_run": {"id": 1, "status": "completed", "conclusion": conclusion},
+        "repository": {"full_name": "o/r"},
+    }).encode()
+
+
+def test_failed_completion_passes():
+    assert prefilter_webhook("workflow_run", _body()) is None
+
+
+@pytest.mark.parametrize("event", ["push", "check_run", None])
+def test_other_events_are_rejected(event):
+    assert prefilter_webhook(event, _body()) == f"Not a workflow_run event ({event})"
+
+
+@pytest.mark.parametrize("action", ["requested", "in_progress"])
+def test_other_actions_are_rejected(action):
+    assert prefilter_webhook("workflow_run", _body(action=action, conclusion=None)) == \
+        f"Workflow run action is {action}"
+
+
+@pytest.mark.parametrize("conclusion", ["success", "cancelled", "skipped", None])
+def test_other_conclusions_are_rejected(conclusion):
+    assert prefilter_webhook("workflow_run", _body(conclusion=conclusion)) == "Not a failed workflow run"
+
+
+def test_action_not_first_is_left_to_full_validation():
+    body = json.dumps({"workflow_run": {"conclusion": "failure"}, "action": "completed"}).encode()
+    assert prefilter_webhook("workflow_run", body) is None
+
+
+def test_whitespace_in_the_document_is_tolerated():
+    body = b'  {\n  "action" : "completed",\n  "workflow_run": {"conclusion" :  "failure"}\n}'
+    assert prefilter_webhook("workflow_run", body) is None
+
+
+def test_json_body_is_returned_as_is():
+    assert extract_json_body(_body(), "application/json") == _body()
+
+
+def test_form_encoded_payload_is_unwrapped():
+    form = b"payload=" + quote_from_bytes(_body()).encode()
+    assert extract_json_body(form, "application/x-www-form-urlencoded") == _body()
+
+
+def test_form_without_payload_field_is_invalid():
+    with pytest.raises(InvalidWebhookBody):
+        extract_json_body(b"other=1", "application/x-www-form-urlencoded")
+
+
+@pytest.mark.parametrize("event, changes", [
+    ("push", {}),
+    ("workflow_run", {"action": "requested", "conclusion": None}),
+    ("workflow_run", {"conclusion": "success"}),
+])
+def test_webhook_ignores_filtered_deliveries(webhook, event, changes):
+    payload = webhook.payload()
+    payload["action"] = changes.get("action", payload["action"])
+    payload["workflow_run"]["conclusion"] = changes.get("conclusion", "failure")
+    response = asyncio.run(webhook.post(payload, event=event))
+    assert response.status_code == 202
+    assert response.json()["message"].startswith("Ignored: ")
+    assert webhook.dispatched == []
@@ -0,0 +1,91 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from agent.base import BaseAgent  # noqa: E402
+from agent.registry import get_registry  # noqa: E402
+from app.api import worker  # noqa: E402
+from app.db.models import JobStatus, RepairJob  # noqa: E402
+
+
+class StubAgent(BaseAgent):
+    """Agent returning a fixed final state (or raising) and recording released jobs."""
+
+    name = "stub"
+    description = "Returns a canned final state"
+    capabilities: List[str] = []
+    graph = None
+
+    def __init__(self, final_status: str = "PR_OPENED", error: Exception = None) -> None:
+        self.final_status = final_status
+        self.error = error
+        self.released: List[int] = []
+
+    async def invoke(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        if self.error is not None:
+            raise self.error
+        return {**state, "status": self.final_status, "total_cost": 0.01}
+
+    async def release_job(self, job_id: int) -> None:
+        self.released.append(job_id)
+
+
+@pytest.fixture
+def run_job(session_factory, monkeypatch):
+    """Runs `process_job` for a fresh pending job with the given agent; returns the stored job."""
+    monkeypatch.setattr(worker, "AsyncSessionLocal", session_factory)
+    registry = get_registry()
+
+    def run(agent: StubAgent):
+        async def scenario():
+            async with session_factory() as db:
+                job = RepairJob(repo_name="o/r", run_id="7", status=JobStatus.PENDING)
+                db.add(job)
+                await db.commit()
+            payload = {
+                "job_id": job.id,
+                "agent_name": agent.name,
+                "workflow_run": {
+                    "id": 7, "name": "CI", "status": "completed", "conclusion": "failure",
+                    "head_branch": "main", "head_sha": "abc", "html_url": "https://x", "run_number": 1,
+                },
+                "repository": {"full_name": "o/r", "name": "r", "owner": {}},
+            }
+            error = None
+            try:
+                await worker.process_job(payload)
+            except Exception as e:
+                error = e
+            async with session_factory() as db:
+                return await db.get(RepairJob, job.id), error
+
+        registry._agents[agent.name] = agent
+        try:
+            return asyncio.run(scenario())
+        finally:
+            registry._agents.pop(agent.name, None)
+
+    return run
+
+
+@pytest.mark.parametrize("final_status", ["PR_OPENED", "FAILED"])
+def test_recorded_outcomes_release_per_job_state(run_job, final_status):
+    agent = StubAgent(final_status)
+    job, error = run_job(agent)
+
+    assert error is None
+    assert job.status == JobStatus(final_status)
+    # A graceful FAILED returns 200 and is never retried, so its checkpoints go too
+    assert agent.released == [job.id]
+
+
+def test_raising_run_keeps_per_job_state_for_the_retry(run_job):
+    agent = StubAgent(error=RuntimeError("vertex unavailable"))
+    job, error = run_job(agent)
+
+    assert isinstance(error, RuntimeError)
+    assert job.status == JobStatus.FAILED
+    assert agent.released == []